@@ -0,0 +1,205 @@
+"""
+Benchmark de carga: rutas de lectura con Session síncrona vs AsyncSession.
+
+Levanta un servidor uvicorn (1 worker) con dos rutas equivalentes sobre
+la misma base SQLite temporal:
+- /sync:  `def` + Session (se ejecuta en el threadpool de Starlette, 40 hilos)
+- /async: `async def` + AsyncSession (aiosqlite)
+
+Cada ruta lista los últimos --page-size controles de operación. Con --db-latency-ms
+cada request ejecuta además `SELECT sleep_ms(n)` dentro del driver, para
+simular la latencia de red de una base remota (PostgreSQL/Supabase).
+
+Reporta throughput y latencias p50/p99 con N clientes concurrentes.
+
+Uso:
+    python benchmark_async_db.py [--clients 200] [--duration 10] [--db-latency-ms 20] [--page-size 100]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def build_app():
+    """App mínima con las dos variantes de la ruta (se importa desde uvicorn)."""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import create_engine, event, select, text
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    from models import ControlOperacion
+
+    path = os.environ["BENCH_DB_PATH"]
+    latency = int(os.environ.get("BENCH_DB_LATENCY_MS", "0"))
+    pool = int(os.environ.get("BENCH_POOL_SIZE", "100"))
+    page_size = int(os.environ.get("BENCH_PAGE_SIZE", "100"))
+
+    def add_sleep(dbapi_connection, _record):
+        dbapi_connection.create_function("sleep_ms", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+    engine = create_engine(
+        f"sqlite:///{path}", pool_size=pool, max_overflow=0,
+        connect_args={"check_same_thread": False}
+    )
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool, max_overflow=0
+    )
+    event.listen(engine, "connect", add_sleep)
+    event.listen(async_engine.sync_engine, "connect", add_sleep)
+
+    SessionLocal = sessionmaker(bind=engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    query = select(ControlOperacion).order_by(
+        ControlOperacion.fecha.desc(), ControlOperacion.hora.desc()
+    ).limit(page_size)
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def read_sync(db=Depends(get_db)):
+        if latency:
+            db.execute(text("SELECT sleep_ms(:ms)"), {"ms": latency})
+        return len(db.execute(query).scalars().all())
+
+    @app.get("/async")
+    async def read_async(db=Depends(get_async_db)):
+        if latency:
+            await db.execute(text("SELECT sleep_ms(:ms)"), {"ms": latency})
+        return len((await db.execute(query)).scalars().all())
+
+    return app
+
+
+def seed(path: Path, rows: int) -> None:
+    """Crea la base temporal con `rows` controles de operación."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.schema import upgrade_schema
+    from models import ControlOperacion
+
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade_schema(engine)
+    start = date(2024, 1, 1)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([
+            ControlOperacion(
+                fecha=start + timedelta(days=i // 24), hora=dtime(i % 24, 0),
+                turbedad_ac=10 + i % 30, ph_ac=7.2, dosis_sulfato=1.5
+            )
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+async def load(url: str, clients: int, duration: float):
+    """N clientes concurrentes haciendo requests durante `duration` segundos."""
+    import httpx
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        async def client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    response = await http.get(url)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - t0)
+                except Exception:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(clients)])
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Session vs AsyncSession")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--db-latency-ms", type=int, default=0)
+    parser.add_argument("--pool-size", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        seed(path, args.rows)
+
+        port = free_port()
+        env = dict(
+            os.environ,
+            BENCH_DB_PATH=str(path),
+            BENCH_DB_LATENCY_MS=str(args.db_latency_ms),
+            BENCH_POOL_SIZE=str(args.pool_size),
+            BENCH_PAGE_SIZE=str(args.page_size),
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmark_async_db:build_app", "--factory",
+             "--port", str(port), "--log-level", "warning", "--no-access-log"],
+            cwd=BACKEND_DIR, env=env
+        )
+        try:
+            time.sleep(3)
+            print(
+                f"{args.clients} clientes, {args.duration:.0f}s por ruta, "
+                f"latencia simulada {args.db_latency_ms} ms, pool {args.pool_size}, "
+                f"{args.page_size} filas por respuesta"
+            )
+            print("-" * 56)
+            print(f"{'ruta':<8}{'req/s':>10}{'p50 ms':>12}{'p99 ms':>12}{'errores':>10}")
+            for route in ("sync", "async"):
+                r = asyncio.run(load(f"http://127.0.0.1:{port}/{route}", args.clients, args.duration))
+                print(f"{route:<8}{r['rps']:>10.1f}{r['p50']:>12.1f}{r['p99']:>12.1f}{r['errors']:>10}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
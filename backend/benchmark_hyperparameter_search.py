@@ -0,0 +1,114 @@
+"""
+Benchmark de búsqueda de hiperparámetros (successive halving vs grilla vs fijos).
+
+Sobre datos sintéticos compara, por modelo de boosting:
+
+- fijos: parámetros de `models.algorithms` (como hoy)
+- grilla: las mismas configuraciones candidatas, todas con
+  `max_estimators` árboles y sin early stopping
+- halving: SuccessiveHalvingSearch (rondas + early stopping)
+
+Reporta RMSE en test, tiempo de pared y tiempo de CPU del proceso.
+
+Uso:
+    python benchmark_hyperparameter_search.py [--rows 4000] [--candidates 27] [--budget 600] [--models xgboost lightgbm]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml.models.trainer import ChemicalConsumptionTrainer
+from ml.models.evaluator import ModelEvaluator
+from ml.models.hyperparameter_search import SuccessiveHalvingSearch, sample_candidates
+
+FEATURES = [f"x{i}" for i in range(12)]
+TARGETS = ["sulfato", "cal", "hipoclorito", "cloro_gas"]
+
+
+def make_data(rows: int, seed: int):
+    """Targets con términos no lineales e interacciones, más ruido."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(0, 1, (rows, len(FEATURES))), columns=FEATURES)
+    signal = 3 * X["x0"] + 2 * np.sin(2 * X["x1"]) + X["x2"] * X["x3"] + np.abs(X["x4"])
+    y = pd.DataFrame({
+        target: 50 + (i + 1) * signal + rng.normal(0, 1.0, rows)
+        for i, target in enumerate(TARGETS)
+    })
+    return X, y
+
+
+def test_rmse(model, X, y) -> float:
+    return ModelEvaluator.calculate_metrics(y, model.predict(X), target_names=TARGETS)['average']['RMSE']
+
+
+def timed(fn):
+    """Ejecuta fn y devuelve (resultado, segundos de pared, segundos de CPU)."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = fn()
+    return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de hiperparámetros")
+    parser.add_argument("--rows", type=int, default=4000)
+    parser.add_argument("--candidates", type=int, default=27)
+    parser.add_argument("--budget", type=float, default=600, help="Presupuesto de halving (s)")
+    parser.add_argument("--models", nargs="+", default=["xgboost", "lightgbm"])
+    args = parser.parse_args()
+
+    logging.getLogger("ml.training").setLevel(logging.WARNING)
+
+    X, y = make_data(args.rows, seed=0)
+    trainer = ChemicalConsumptionTrainer()
+    X_train, X_val, X_test, y_train, y_val, y_test = trainer.split_data(X, y)
+
+    for name in args.models:
+        scores = {}
+
+        fixed = clone(trainer._initialize_models()[name])
+        _, wall, cpu = timed(lambda: fixed.fit(X_train, y_train))
+        scores['fijos'] = {'rmse': test_rmse(fixed, X_test, y_test), 'wall_s': wall, 'cpu_s': cpu, 'fits': 1}
+
+        search = SuccessiveHalvingSearch(time_budget_seconds=args.budget)
+        search.n_candidates = args.candidates
+
+        def grid():
+            best = None
+            candidates = search.space.get(name, {})
+            for params in sample_candidates(candidates, args.candidates, search.random_state):
+                model = clone(trainer._initialize_models()[name])
+                model.set_params(**{f"estimator__{k}": v for k, v in params.items()},
+                                 estimator__n_estimators=search.max_estimators)
+                model.fit(X_train, y_train)
+                val = test_rmse(model, X_val, y_val)
+                if best is None or val < best[0]:
+                    best = (val, model)
+            return best[1]
+
+        model, wall, cpu = timed(grid)
+        scores['grilla'] = {'rmse': test_rmse(model, X_test, y_test), 'wall_s': wall, 'cpu_s': cpu,
+                            'fits': args.candidates}
+
+        best, wall, cpu = timed(lambda: search.run([name], X_train, y_train, X_val, y_val))
+        scores['halving'] = {'rmse': test_rmse(best[name]['model'], X_test, y_test), 'wall_s': wall,
+                             'cpu_s': cpu, 'fits': len(search.history)}
+
+        print(f"\n{name}: {args.rows} filas, {args.candidates} candidatos, "
+              f"rondas {search._budgets()}, {search.max_workers} hilos")
+        print("-" * 60)
+        report = ModelEvaluator.generate_comparison_report(scores)
+        print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        print(f"halving: {best[name]['params']}, árboles {best[name]['best_iterations']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark de reentrenamiento incremental vs completo (XGBoost / LightGBM).
+
+Entrena un modelo base con --base filas sintéticas y luego llegan --new
+filas con una relación desplazada. Compara, sobre un test de la nueva
+distribución:
+
+- full: ajuste desde cero con base + nuevas
+- incremental: `train_incremental` sobre el modelo base, solo con las nuevas
+- base: el modelo base sin reentrenar
+
+Uso:
+    python benchmark_incremental.py [--base 5000] [--new 300] [--estimators 50] [--models xgboost lightgbm]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from ml.models.trainer import ChemicalConsumptionTrainer
+from ml.models.evaluator import ModelEvaluator
+
+FEATURES = [f"x{i}" for i in range(12)]
+TARGETS = ["sulfato", "cal", "hipoclorito", "cloro_gas"]
+
+
+def make_data(rows: int, shift: float, seed: int):
+    """Features normales; targets lineales + no lineales, con `shift` en la pendiente de x0."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(0, 1, (rows, len(FEATURES))), columns=FEATURES)
+    base = 3 * X["x0"] * (1 + shift) + 2 * np.sin(X["x1"]) + X["x2"] * X["x3"]
+    y = pd.DataFrame({
+        target: 50 + (i + 1) * base + rng.normal(0, 0.5, rows)
+        for i, target in enumerate(TARGETS)
+    })
+    return X, y
+
+
+def rmse_mape(model, X, y) -> dict:
+    metrics = ModelEvaluator.calculate_metrics(y, model.predict(X), target_names=TARGETS)['average']
+    return {'rmse': metrics['RMSE'], 'mape': metrics['MAPE']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reentrenamiento incremental")
+    parser.add_argument("--base", type=int, default=5000, help="Filas del entrenamiento original")
+    parser.add_argument("--new", type=int, default=300, help="Filas nuevas")
+    parser.add_argument("--estimators", type=int, default=50, help="Árboles agregados por target")
+    parser.add_argument("--models", nargs="+", default=["xgboost", "lightgbm"])
+    args = parser.parse_args()
+
+    X_base, y_base = make_data(args.base, shift=0.0, seed=0)
+    X_new, y_new = make_data(args.new, shift=0.3, seed=1)
+    X_test, y_test = make_data(2000, shift=0.3, seed=2)
+    X_val, y_val = X_new.iloc[: args.new // 5], y_new.iloc[: args.new // 5]
+
+    import logging
+    logging.getLogger("ml.training").setLevel(logging.WARNING)
+
+    for name in args.models:
+        trainer = ChemicalConsumptionTrainer()
+        template = trainer._initialize_models()[name]
+
+        base_model = clone(template)
+        base_model.fit(X_base, y_base)
+
+        full_model = clone(template)
+        start = time.perf_counter()
+        full_model.fit(pd.concat([X_base, X_new]), pd.concat([y_base, y_new]))
+        full_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        trainer.train_incremental(
+            base_model, name, X_new, y_new, X_val, y_val, n_estimators=args.estimators
+        )
+        incremental_seconds = time.perf_counter() - start
+        incremental_model = trainer.models[name]
+
+        scores = {
+            'base': {**rmse_mape(base_model, X_test, y_test), 'training_seconds': 0.0},
+            'full': {**rmse_mape(full_model, X_test, y_test), 'training_seconds': full_seconds},
+            'incremental': {
+                **rmse_mape(incremental_model, X_test, y_test),
+                'training_seconds': incremental_seconds
+            },
+        }
+
+        print(f"\n{name}: base={args.base} filas, nuevas={args.new}, +{args.estimators} árboles")
+        print("-" * 60)
+        report = ModelEvaluator.generate_comparison_report(scores)
+        print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
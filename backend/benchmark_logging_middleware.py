@@ -0,0 +1,101 @@
+"""
+Benchmark del costo por request de LoggingMiddleware.
+
+Monta una app mínima con dos rutas y la ejecuta en proceso (httpx +
+ASGITransport, sin red) con y sin LoggingMiddleware:
+- /json:   respuesta JSON pequeña
+- /stream: StreamingResponse de --chunks bloques de 1 KB (como los Excel)
+
+El logging se configura con setup_logging(); los registros van a stderr,
+así que conviene redirigirlo a un archivo para medir también la escritura.
+
+Uso:
+    python benchmark_logging_middleware.py [--requests 3000] [--concurrency 20] 2> /tmp/bench.log
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from core.logging_middleware import LoggingMiddleware, setup_logging
+
+
+def build_app(with_middleware: bool, chunks: int) -> FastAPI:
+    app = FastAPI()
+    if with_middleware:
+        app.add_middleware(LoggingMiddleware)
+
+    @app.get("/json")
+    async def json_route():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream_route():
+        async def body():
+            for _ in range(chunks):
+                yield b"x" * 1024
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    """Devuelve microsegundos por request (tiempo de pared / requests)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # calentamiento
+            await client.get(path)
+
+        per_worker = requests // concurrency
+
+        async def worker():
+            for _ in range(per_worker):
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return elapsed / (per_worker * concurrency) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de LoggingMiddleware")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3, help="Se reporta la mejor de N corridas")
+    args = parser.parse_args()
+
+    setup_logging()
+    apps = {
+        "sin middleware": build_app(False, args.chunks),
+        "LoggingMiddleware": build_app(True, args.chunks),
+    }
+
+    print(f"{args.requests} requests, concurrencia {args.concurrency}, stream de {args.chunks} KB")
+    print("-" * 60)
+    print(f"{'app':<20}{'/json us/req':>16}{'/stream us/req':>18}")
+    results = {}
+    for name, app in apps.items():
+        json_us = min(asyncio.run(run(app, "/json", args.requests, args.concurrency)) for _ in range(args.repeat))
+        stream_us = min(asyncio.run(run(app, "/stream", args.requests, args.concurrency)) for _ in range(args.repeat))
+        results[name] = (json_us, stream_us)
+        print(f"{name:<20}{json_us:>16.1f}{stream_us:>18.1f}")
+
+    base_json, base_stream = results["sin middleware"]
+    mw_json, mw_stream = results["LoggingMiddleware"]
+    print("-" * 60)
+    print(f"{'costo middleware':<20}{mw_json - base_json:>16.1f}{mw_stream - base_stream:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark del costo de registrar métricas (core.metrics).
+
+Mide nanosegundos por operación de Counter.inc e Histogram.observe con
+1 y N hilos escribiendo a la vez (cada hilo usa su propio shard), y el
+tiempo de generar el texto de /metrics con --routes etiquetas de ruta.
+
+Uso:
+    python benchmark_metrics.py [--ops 200000] [--threads 8] [--routes 50]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.metrics import MetricsRegistry
+
+
+def run_threads(target, threads: int, ops: int) -> float:
+    """Devuelve ns por operación (tiempo de pared / operaciones totales)."""
+    workers = [threading.Thread(target=target, args=(ops,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return elapsed / (ops * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de core.metrics")
+    parser.add_argument("--ops", type=int, default=200000, help="Operaciones por hilo")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--routes", type=int, default=50)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "Contador", ("route",))
+    histogram = registry.histogram("bench_seconds", "Histograma", ("method", "route", "status"))
+    labels = [("GET", f"/api/ruta_{i}", "200") for i in range(args.routes)]
+    values = [random.expovariate(20) for _ in range(1000)]
+
+    def inc(ops: int):
+        for _ in range(ops):
+            counter.inc(labels=("/api/ruta",))
+
+    def observe(ops: int):
+        for i in range(ops):
+            histogram.observe(values[i % 1000], labels[i % args.routes])
+
+    print(f"{args.ops} operaciones por hilo, {args.routes} rutas")
+    print("-" * 50)
+    print(f"{'operación':<22}{'1 hilo ns/op':>14}{f'{args.threads} hilos ns/op':>14}")
+    for name, target in (("Counter.inc", inc), ("Histogram.observe", observe)):
+        single = run_threads(target, 1, args.ops)
+        multi = run_threads(target, args.threads, args.ops)
+        print(f"{name:<22}{single:>14.0f}{multi:>14.0f}")
+
+    start = time.perf_counter()
+    text = registry.render()
+    render_ms = (time.perf_counter() - start) * 1000
+    print("-" * 50)
+    print(f"render(): {render_ms:.2f} ms, {len(text.splitlines())} líneas")
+
+
+if __name__ == "__main__":
+    main()
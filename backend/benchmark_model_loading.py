@@ -0,0 +1,130 @@
+"""
+Benchmark de carga de artefactos de modelo.
+
+Compara, con N procesos cargando el mismo model.pkl a la vez (como los
+workers de uvicorn):
+- compressed: joblib compress=3 (formato anterior)
+- raw:        sin compresión, carga completa
+- mmap:       sin compresión, joblib.load(mmap_mode='r')
+
+Para cada formato reporta tamaño en disco, tiempo de carga y memoria por
+worker: RSS y PSS (memoria proporcional; las páginas compartidas se
+dividen entre los procesos que las usan). Requiere Linux (/proc).
+
+Uso:
+    python benchmark_model_loading.py [--model-dir DIR] [--workers 4]
+    python benchmark_model_loading.py --synthetic-trees 300
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Agregar directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+FORMATS = {
+    "compressed": {"compress": 3, "mmap_mode": None},
+    "raw": {"compress": 0, "mmap_mode": None},
+    "mmap": {"compress": 0, "mmap_mode": "r"},
+}
+
+
+def read_memory_kb() -> dict:
+    """Rss y Pss del proceso actual en KB."""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def worker(path: str, mmap_mode, barrier, results) -> None:
+    """Carga el modelo, espera a los demás workers y mide memoria."""
+    import sklearn.ensemble  # noqa: F401  (excluir el costo de importar sklearn)
+
+    before = read_memory_kb()
+    start = time.perf_counter()
+    model = joblib.load(path, mmap_mode=mmap_mode)
+    load_time = time.perf_counter() - start
+
+    # Medir con todos los workers vivos para que PSS refleje lo compartido
+    barrier.wait()
+    after = read_memory_kb()
+    barrier.wait()
+
+    results.put({
+        "load_time": load_time,
+        "rss_kb": after["rss"] - before["rss"],
+        "pss_kb": after["pss"] - before["pss"],
+    })
+    del model
+
+
+def build_synthetic_model(n_trees: int):
+    """Entrena un RandomForest grande sobre datos sintéticos."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(20000, 30))
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.normal(size=20000)
+    return RandomForestRegressor(n_estimators=n_trees, n_jobs=-1, random_state=42).fit(X, y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga de modelos")
+    parser.add_argument("--model-dir", type=Path, help="Directorio de un modelo entrenado")
+    parser.add_argument("--synthetic-trees", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.model_dir:
+        model = joblib.load(args.model_dir / "model.pkl")
+        source = str(args.model_dir)
+    else:
+        model = build_synthetic_model(args.synthetic_trees)
+        source = f"RandomForest sintético ({args.synthetic_trees} árboles)"
+
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"Modelo: {source}")
+    print(f"Workers simultáneos: {args.workers}")
+    print("-" * 78)
+    print(f"{'formato':<12}{'disco MB':>10}{'carga ms':>12}{'RSS MB/worker':>16}{'PSS MB/worker':>16}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fmt in FORMATS.items():
+            path = Path(tmp) / f"model_{name}.pkl"
+            joblib.dump(model, path, compress=fmt["compress"])
+
+            barrier = ctx.Barrier(args.workers)
+            results = ctx.Queue()
+            procs = [
+                ctx.Process(target=worker, args=(str(path), fmt["mmap_mode"], barrier, results))
+                for _ in range(args.workers)
+            ]
+            for p in procs:
+                p.start()
+            rows = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+
+            print(
+                f"{name:<12}"
+                f"{path.stat().st_size / 1e6:>10.1f}"
+                f"{np.mean([r['load_time'] for r in rows]) * 1000:>12.1f}"
+                f"{np.mean([r['rss_kb'] for r in rows]) / 1024:>16.1f}"
+                f"{np.mean([r['pss_kb'] for r in rows]) / 1024:>16.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark del arranque: create_all vs verificación de revisión de esquema.
+
+Cada modo se ejecuta en un proceso nuevo (worker en frío) contra una base
+ya migrada y reporta tiempo y número de sentencias SQL. Con --latency-ms
+se suma una latencia artificial por sentencia para simular una base
+remota (p. ej. PostgreSQL en Supabase) sobre SQLite local.
+
+Uso:
+    python benchmark_schema_check.py [--runs 5] [--latency-ms 20]
+    DATABASE_URL=postgresql://... python benchmark_schema_check.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+WORKER = r"""
+import json, sys, time
+from sqlalchemy import create_engine, event
+
+url, mode, latency = sys.argv[1], sys.argv[2], float(sys.argv[3]) / 1000
+engine = create_engine(url)
+statements = []
+
+@event.listens_for(engine, "before_cursor_execute")
+def count(conn, cursor, statement, *args):
+    statements.append(statement)
+    if latency:
+        time.sleep(latency)
+
+from models import Base
+from core.schema import check_schema
+
+start = time.perf_counter()
+if mode == "create_all":
+    Base.metadata.create_all(bind=engine)
+else:
+    check_schema(engine)
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "statements": len(statements)}))
+"""
+
+
+def run_worker(url: str, mode: str, latency_ms: float) -> dict:
+    """Ejecuta un modo en un proceso nuevo."""
+    out = subprocess.run(
+        [sys.executable, "-c", WORKER, url, mode, str(latency_ms)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de verificación de esquema")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Latencia simulada por sentencia SQL")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv("DATABASE_URL") or f"sqlite:///{tmp}/bench.db"
+        if not os.getenv("DATABASE_URL"):
+            from sqlalchemy import create_engine
+            sys.path.insert(0, str(BACKEND_DIR))
+            from core.schema import upgrade_schema
+            upgrade_schema(create_engine(url))
+
+        print(f"Base: {url.split('@')[-1]} | latencia simulada: {args.latency_ms} ms/sentencia")
+        print("-" * 60)
+        print(f"{'modo':<16}{'sentencias':>12}{'mediana ms':>14}{'máx ms':>12}")
+        for mode in ("create_all", "schema_check"):
+            rows = [run_worker(url, mode, args.latency_ms) for _ in range(args.runs)]
+            times = [r["ms"] for r in rows]
+            print(
+                f"{mode:<16}{rows[0]['statements']:>12}"
+                f"{statistics.median(times):>14.1f}{max(times):>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark de lectura/escritura concurrente en SQLite con y sin el perfil.
+
+Para cada modo crea una base temporal (migrada con Alembic y con
+--rows controles de operación) y ejecuta durante --duration segundos:
+- --writers hilos insertando un control por transacción (como el ingreso
+  de datos de los operadores)
+- --readers hilos listando los últimos 100 controles (como los dashboards)
+
+Modos:
+- default: SQLite sin ajustes (rollback journal, synchronous=FULL)
+- profile: core.sqlite_tuning.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, ...)
+
+Uso:
+    python benchmark_sqlite_profile.py [--writers 2] [--readers 8] [--duration 10]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from core.schema import upgrade_schema
+from core.sqlite_tuning import apply_sqlite_profile, SQLITE_PRAGMAS
+from models import ControlOperacion
+
+
+def seed(engine, rows: int) -> None:
+    """Crea el esquema y `rows` controles históricos."""
+    upgrade_schema(engine)
+    start = date(2020, 1, 1)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([
+            ControlOperacion(
+                fecha=start + timedelta(days=i // 24), hora=dtime(i % 24, 0),
+                turbedad_ac=10 + i % 30, ph_ac=7.2, dosis_sulfato=1.5
+            )
+            for i in range(rows)
+        ])
+        db.commit()
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def run_mode(mode: str, args) -> dict:
+    """Ejecuta la carga mixta en un modo y devuelve métricas."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_engine(
+            url, pool_size=args.writers + args.readers, max_overflow=0,
+            connect_args={"check_same_thread": False}
+        )
+        if mode == "profile":
+            apply_sqlite_profile(engine, SQLITE_PRAGMAS)
+        seed(engine, args.rows)
+
+        Session = sessionmaker(bind=engine)
+        deadline = time.perf_counter() + args.duration
+        lock = threading.Lock()
+        write_lat, read_lat, errors = [], [], [0]
+        next_day = [date(2030, 1, 1)]
+
+        def writer():
+            while time.perf_counter() < deadline:
+                with lock:
+                    day = next_day[0]
+                    next_day[0] += timedelta(days=1)
+                t0 = time.perf_counter()
+                try:
+                    with Session() as db:
+                        db.add(ControlOperacion(fecha=day, hora=dtime(8, 0), turbedad_ac=12.0))
+                        db.commit()
+                    write_lat.append(time.perf_counter() - t0)
+                except Exception:
+                    errors[0] += 1
+
+        query = select(ControlOperacion).order_by(
+            ControlOperacion.fecha.desc(), ControlOperacion.hora.desc()
+        ).limit(100)
+
+        def reader():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    with Session() as db:
+                        db.execute(query).scalars().all()
+                    read_lat.append(time.perf_counter() - t0)
+                except Exception:
+                    errors[0] += 1
+
+        threads = (
+            [threading.Thread(target=writer) for _ in range(args.writers)]
+            + [threading.Thread(target=reader) for _ in range(args.readers)]
+        )
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    return {
+        "writes_s": len(write_lat) / elapsed,
+        "reads_s": len(read_lat) / elapsed,
+        "write_p99": percentile(write_lat, 0.99),
+        "read_p99": percentile(read_lat, 0.99),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del perfil SQLite")
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.writers} escritores, {args.readers} lectores, {args.duration:.0f}s, {args.rows} filas")
+    print("-" * 72)
+    print(f"{'modo':<10}{'escrit./s':>11}{'lect./s':>10}{'p99 escr. ms':>15}{'p99 lect. ms':>15}{'errores':>10}")
+    for mode in ("default", "profile"):
+        r = run_mode(mode, args)
+        print(
+            f"{mode:<10}{r['writes_s']:>11.1f}{r['reads_s']:>10.1f}"
+            f"{r['write_p99']:>15.1f}{r['read_p99']:>15.1f}{r['errors']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,21 @@ Configuración de la base de datos PostgreSQL
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import NullPool
-from typing import Generator
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Generator
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
+from core.sqlite_tuning import apply_sqlite_profile, SQLITE_PROFILE_ENABLED
+
+logger = logging.getLogger("app")
+
 # Cargar variables de entorno
 load_dotenv()
 
@@ -21,24 +30,53 @@ DATABASE_URL = os.getenv(
 # Detectar tipo de base de datos
 is_sqlite = DATABASE_URL.startswith("sqlite")
 
-# Configurar engine según el tipo de base de datos
-if is_sqlite:
-    # Configuración para SQLite
-    engine = create_engine(
-        DATABASE_URL,
-        echo=False,
-        future=True,
-        connect_args={"check_same_thread": False}  # Necesario para SQLite con FastAPI
-    )
-else:
+# Tamaño de pool del primario (escrituras y lecturas transaccionales)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Réplica de lectura para reportes, exportaciones y consultas analíticas.
+# Sin DATABASE_READ_URL las lecturas usan el primario.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+READ_DB_POOL_SIZE = int(os.getenv("READ_DB_POOL_SIZE", "5"))
+READ_DB_MAX_OVERFLOW = int(os.getenv("READ_DB_MAX_OVERFLOW", "10"))
+
+# Segundos sin intentar la réplica tras un fallo de conexión
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+
+
+def _create_sync_engine(url: str, pool_size: int, max_overflow: int) -> Engine:
+    """
+    Crea un engine síncrono con la configuración según el tipo de base.
+
+    Args:
+        url: URL de conexión
+        pool_size: Conexiones permanentes del pool (solo PostgreSQL)
+        max_overflow: Conexiones extra en picos (solo PostgreSQL)
+
+    Returns:
+        Engine configurado
+    """
+    if url.startswith("sqlite"):
+        # Configuración para SQLite
+        sqlite_engine = create_engine(
+            url,
+            echo=False,
+            future=True,
+            connect_args={"check_same_thread": False}  # Necesario para SQLite con FastAPI
+        )
+        if SQLITE_PROFILE_ENABLED:
+            # WAL, synchronous=NORMAL, mmap, busy_timeout... en cada conexión nueva
+            apply_sqlite_profile(sqlite_engine)
+        return sqlite_engine
+
     # Configuración para PostgreSQL (Supabase)
-    engine = create_engine(
-        DATABASE_URL,
+    return create_engine(
+        url,
         pool_pre_ping=True,
         echo=False,
         future=True,
-        pool_size=5,
-        max_overflow=10,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
         pool_recycle=3600,
         connect_args={
             "client_encoding": "utf8",
@@ -46,6 +84,17 @@ else:
         }
     )
 
+
+engine = _create_sync_engine(DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW)
+
+# Pool propio para la réplica: la carga de reportes no compite con el
+# ingreso de datos por las conexiones del primario
+has_read_replica = bool(DATABASE_READ_URL) and DATABASE_READ_URL != DATABASE_URL
+read_engine = (
+    _create_sync_engine(DATABASE_READ_URL, READ_DB_POOL_SIZE, READ_DB_MAX_OVERFLOW)
+    if has_read_replica else engine
+)
+
 # Crear SessionLocal
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -55,10 +104,98 @@ SessionLocal = sessionmaker(
 )
 
 
+
+class ReadOnlySession(Session):
+    """
+    Session de solo lectura para ReadSessionLocal.
+
+    Rechaza el flush de cambios: las escrituras deben ir al primario
+    mediante get_db aunque la réplica no esté configurada.
+    """
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Sesión de solo lectura: use get_db para escribir")
+        super().flush(objects)
+
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine,
+    class_=ReadOnlySession,
+    expire_on_commit=False
+)
+
+# Sesiones de solo lectura sobre el primario, cuando la réplica falla
+PrimaryReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    class_=ReadOnlySession,
+    expire_on_commit=False
+)
+
+_replica_down_until = 0.0
+
+def _to_async_url(url: str) -> str:
+    """Traduce la URL síncrona al driver async equivalente (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql+psycopg2:", "postgresql:", "postgres:"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg:", 1)
+    return url
+
+
+# Engine async para rutas de lectura de alto tráfico: no ocupan un hilo
+# del threadpool de Starlette mientras esperan a la base de datos
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _to_async_url(DATABASE_URL))
+
+if is_sqlite:
+    # aiosqlite usa NullPool por defecto (una conexión y un hilo por sesión)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        poolclass=AsyncAdaptedQueuePool
+    )
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        echo=False,
+        pool_size=int(os.getenv("ASYNC_DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20")),
+        pool_recycle=3600,
+        connect_args={"timeout": 10}
+    )
+
+
+class AsyncSyncSession(Session):
+    """
+    Session síncrona interna de AsyncSessionLocal.
+
+    Clase propia para registrar en ella los mismos hooks de sesión
+    (eventos en vivo, invalidación de caché) que en SessionLocal.
+    """
+
+
+if is_sqlite and SQLITE_PROFILE_ENABLED:
+    apply_sqlite_profile(async_engine.sync_engine)
+
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+    sync_session_class=AsyncSyncSession
+)
+
+
 def get_db() -> Generator[Session, None, None]:
     """
-    Dependency para obtener una sesión de base de datos
-    Se usa en FastAPI con Depends(get_db)
+    Dependency para obtener una sesión de base de datos (primario)
+    Se usa en FastAPI con Depends(get_db) para escrituras
     """
     db = SessionLocal()
     try:
@@ -67,12 +204,57 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def _open_read_session() -> Session:
+    """
+    Abre una sesión de lectura en la réplica o, si no responde, en el primario.
+
+    Tras un fallo de conexión la réplica se omite durante
+    REPLICA_RETRY_SECONDS para no penalizar cada request.
+    """
+    global _replica_down_until
+
+    if not has_read_replica or time.monotonic() < _replica_down_until:
+        return PrimaryReadSessionLocal()
+
+    db = ReadSessionLocal()
+    try:
+        db.connection()
+        return db
+    except DBAPIError as e:
+        db.close()
+        _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        logger.warning(f"⚠️ Réplica de lectura no disponible, usando el primario: {type(e).__name__}")
+        return PrimaryReadSessionLocal()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency para obtener una sesión de solo lectura
+    Usa la réplica (DATABASE_READ_URL) si está configurada; si no, el primario.
+    Se usa en reportes, exportaciones y consultas analíticas con Depends(get_read_db)
+    """
+    db = _open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency para obtener una sesión async de base de datos
+    Se usa en rutas `async def` con Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """
-    Inicializa la base de datos creando todas las tablas
+    Inicializa la base de datos aplicando las migraciones pendientes
     """
-    from models import Base
-    Base.metadata.create_all(bind=engine)
+    from core.schema import upgrade_schema
+    upgrade_schema(engine)
     print("✅ Base de datos inicializada correctamente")
 
 
@@ -3,16 +3,19 @@ from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from core.database import get_db
+from core.database import get_async_db
 from core.config import settings
 from models.usuario import Usuario
 from schemas.auth import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)):
+async def get_user_from_token(token: str, db: AsyncSession) -> Usuario:
+    """Decodifica el JWT y carga el usuario con su rol (401 si no es válido)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -27,12 +30,34 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Se
     except JWTError:
         raise credentials_exception
     
-    user = db.query(Usuario).options(joinedload(Usuario.rol_obj)).filter(Usuario.username == token_data.username).first()
+    result = await db.execute(
+        select(Usuario).options(joinedload(Usuario.rol_obj)).where(Usuario.username == token_data.username)
+    )
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
     return user
 
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: AsyncSession = Depends(get_async_db)):
+    return await get_user_from_token(token, db)
+
 async def get_current_active_user(current_user: Annotated[Usuario, Depends(get_current_user)]):
     if not current_user.activo:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+def is_admin(user: Usuario) -> bool:
+    """Usuario activo con rol de categoría ADMINISTRADOR."""
+    return bool(
+        user.activo and user.rol_obj is not None
+        and user.rol_obj.categoria == "ADMINISTRADOR"
+    )
+
+async def require_admin(current_user: Annotated[Usuario, Depends(get_current_active_user)]):
+    """Verificar que el usuario actual sea un administrador activo"""
+    if not is_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Solo los administradores pueden acceder a este recurso"
+        )
+    return current_user
@@ -23,12 +23,14 @@ class APIException(Exception):
         message: str,
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
         error_code: Optional[str] = None,
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
     ):
         self.message = message
         self.status_code = status_code
         self.error_code = error_code or "INTERNAL_ERROR"
         self.details = details or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -80,6 +82,19 @@ class MLModelException(APIException):
         )
 
 
+class ServiceNotReadyException(APIException):
+    """Exception para componentes que todavía se están inicializando."""
+    
+    def __init__(self, component: str, state: str, retry_after: int = 5):
+        super().__init__(
+            message=f"El componente '{component}' aún no está listo ({state})",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            error_code="SERVICE_NOT_READY",
+            details={"component": component, "state": state},
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
 # ============================================================================
 # Exception Handlers
 # ============================================================================
@@ -107,7 +122,8 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
             "details": exc.details,
             "timestamp": datetime.utcnow().isoformat(),
             "path": request.url.path
-        }
+        },
+        headers=exc.headers
     )
 
 
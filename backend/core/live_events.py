@@ -0,0 +1,283 @@
+"""
+Canal de eventos en vivo (push) para dashboards.
+
+Publica los registros operativos, de producción, fisicoquímicos y las
+anomalías detectadas en cuanto se confirman en la base de datos, para que
+los clientes no tengan que hacer polling de los endpoints de listado.
+
+Arquitectura:
+- Hooks de sesión SQLAlchemy (after_flush / after_commit) capturan los
+  cambios y los publican solo si la transacción se confirma
+- EventBroadcaster mantiene un buffer de repetición acotado y una cola
+  acotada por cliente (backpressure: se descartan los eventos más antiguos
+  y se notifica al cliente cuántos perdió)
+
+Nota: el broadcaster vive en memoria de cada worker; un cliente recibe
+los cambios confirmados por el worker al que está conectado.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect
+
+logger = logging.getLogger("app")
+
+REPLAY_BUFFER_SIZE = int(os.getenv("LIVE_EVENTS_REPLAY_SIZE", "500"))
+CLIENT_QUEUE_SIZE = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "100"))
+KEEPALIVE_SECONDS = float(os.getenv("LIVE_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+EVENT_TYPES = ("operacion", "produccion", "fisicoquimico", "anomalia")
+CONTROL_EVENT_TYPES = ("lagged", "reset")
+
+
+class LiveSubscription:
+    """Suscripción de un cliente con filtros y cola acotada."""
+
+    def __init__(
+        self,
+        tipos: Optional[Set[str]] = None,
+        severidades: Optional[Set[str]] = None,
+        queue_size: int = CLIENT_QUEUE_SIZE
+    ):
+        self.tipos = tipos or set(EVENT_TYPES)
+        self.severidades = severidades
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        # Mayor id incluido en la repetición del buffer al suscribirse
+        self.replayed_through = 0
+
+    def matches(self, evt: Dict[str, Any]) -> bool:
+        """Verifica si el evento pasa los filtros del cliente."""
+        if evt["tipo"] in CONTROL_EVENT_TYPES:
+            return True
+        if evt["tipo"] not in self.tipos:
+            return False
+        if self.severidades and evt["tipo"] == "anomalia":
+            return evt["data"].get("severidad") in self.severidades
+        return True
+
+    def offer(self, evt: Dict[str, Any], replay: bool = False) -> None:
+        """
+        Encola el evento descartando el más antiguo si la cola está llena.
+
+        Args:
+            evt: Evento a entregar
+            replay: True si viene de la repetición del buffer al suscribirse
+        """
+        if not self.matches(evt):
+            return
+        # Un evento en vivo ya incluido en la repetición es un duplicado; el
+        # resto se entrega aunque llegue fuera de orden (varios hilos publican)
+        if not replay and evt["id"] is not None and evt["id"] <= self.replayed_through:
+            return
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(evt)
+
+    async def next_event(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Espera el siguiente evento.
+
+        Si el cliente perdió eventos por ir lento, devuelve primero un evento
+        `lagged` con la cantidad descartada.
+
+        Returns:
+            Evento o None si se agotó el timeout
+        """
+        if self.dropped:
+            lost, self.dropped = self.dropped, 0
+            return {"id": None, "tipo": "lagged", "accion": "overflow", "data": {"descartados": lost}}
+
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroadcaster:
+    """
+    Distribuidor de eventos en memoria con buffer de repetición.
+
+    `publish` es seguro desde cualquier hilo (los endpoints síncronos corren
+    en el thread pool); la entrega a las colas ocurre en el event loop.
+    """
+
+    def __init__(self, replay_size: int = REPLAY_BUFFER_SIZE):
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=replay_size)
+        self._subscribers: Set[LiveSubscription] = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def publish(self, tipo: str, accion: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Publica un evento a todos los suscriptores.
+
+        Args:
+            tipo: Tipo de evento (operacion, produccion, fisicoquimico, anomalia)
+            accion: created, updated o deleted
+            data: Contenido serializable a JSON
+
+        Returns:
+            Evento publicado
+        """
+        with self._lock:
+            evt = {
+                "id": self._next_id,
+                "tipo": tipo,
+                "accion": accion,
+                "timestamp": datetime.utcnow().isoformat(),
+                "data": data,
+            }
+            self._next_id += 1
+            self._buffer.append(evt)
+            loop = self._loop
+
+        if loop is not None and not loop.is_closed() and self._subscribers:
+            loop.call_soon_threadsafe(self._dispatch, evt)
+
+        return evt
+
+    def _dispatch(self, evt: Dict[str, Any]) -> None:
+        """Entrega un evento a las colas de los suscriptores (en el event loop)."""
+        for subscription in list(self._subscribers):
+            subscription.offer(evt)
+
+    def subscribe(
+        self,
+        tipos: Optional[Set[str]] = None,
+        severidades: Optional[Set[str]] = None,
+        last_event_id: Optional[int] = None
+    ) -> LiveSubscription:
+        """
+        Registra un cliente, repitiendo los eventos posteriores a `last_event_id`.
+
+        Debe llamarse desde el event loop.
+
+        Args:
+            tipos: Tipos de evento a recibir (todos por defecto)
+            severidades: Severidades de anomalía a recibir (todas por defecto)
+            last_event_id: Último evento recibido antes de reconectar
+
+        Returns:
+            LiveSubscription del cliente
+        """
+        subscription = LiveSubscription(tipos, severidades)
+
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.add(subscription)
+            backlog = list(self._buffer)
+
+        if last_event_id is not None:
+            subscription.replayed_through = backlog[-1]["id"] if backlog else 0
+            if backlog and backlog[0]["id"] > last_event_id + 1:
+                # El cliente estuvo desconectado más de lo que cubre el buffer
+                subscription.offer({
+                    "id": None,
+                    "tipo": "reset",
+                    "accion": "gap",
+                    "data": {"oldest_available_id": backlog[0]["id"]},
+                })
+            for evt in backlog:
+                if evt["id"] > last_event_id:
+                    subscription.offer(evt, replay=True)
+
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription) -> None:
+        """Elimina un cliente."""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del broadcaster (clientes conectados y buffer)."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "buffered_events": len(self._buffer),
+                "last_event_id": self._next_id - 1,
+                "replay_buffer_size": self._buffer.maxlen,
+            }
+
+
+broadcaster = EventBroadcaster()
+
+
+# ============================================================================
+# Hooks de sesión SQLAlchemy
+# ============================================================================
+
+def _tracked_models() -> Dict[type, str]:
+    """Modelos publicados en el canal en vivo y su tipo de evento."""
+    from models import ControlOperacion, ProduccionFiltro, MonitoreoFisicoquimico, AnomaliaOperacion
+
+    return {
+        ControlOperacion: "operacion",
+        ProduccionFiltro: "produccion",
+        MonitoreoFisicoquimico: "fisicoquimico",
+        AnomaliaOperacion: "anomalia",
+    }
+
+
+def _serialize(obj: Any) -> Dict[str, Any]:
+    """Serializa solo los atributos ya cargados (no emite SQL)."""
+    state = inspect(obj)
+    columns = {attr.key for attr in state.mapper.column_attrs}
+    return jsonable_encoder({k: v for k, v in state.dict.items() if k in columns})
+
+
+def register_session_events(session_factory) -> None:
+    """
+    Registra los hooks que publican cambios confirmados.
+
+    Args:
+        session_factory: sessionmaker (o clase de Session) cuyas sesiones se observan
+    """
+    tracked = _tracked_models()
+
+    @event.listens_for(session_factory, "after_flush")
+    def _collect_changes(session, flush_context):
+        if not session.info.get("live_events", True):
+            return
+
+        pending: List = session.info.setdefault("live_pending", [])
+        for accion, objects in (
+            ("created", session.new),
+            ("updated", session.dirty),
+            ("deleted", session.deleted),
+        ):
+            for obj in objects:
+                tipo = tracked.get(type(obj))
+                if tipo is None:
+                    continue
+                if accion == "updated" and not session.is_modified(obj, include_collections=False):
+                    continue
+                pending.append((tipo, accion, obj))
+
+    @event.listens_for(session_factory, "after_commit")
+    def _publish_changes(session):
+        pending = session.info.pop("live_pending", None)
+        if not pending:
+            return
+
+        for tipo, accion, obj in pending:
+            try:
+                broadcaster.publish(tipo, accion, _serialize(obj))
+            except Exception as e:
+                logger.warning(f"No se pudo publicar evento en vivo ({tipo}): {e}")
+
+    @event.listens_for(session_factory, "after_soft_rollback")
+    def _discard_changes(session, previous_transaction):
+        session.info.pop("live_pending", None)
@@ -1,50 +1,106 @@
 """
 Middleware de logging profesional para FastAPI.
 Registra todas las requests y responses con información estructurada.
+
+Es un middleware ASGI puro (sin BaseHTTPMiddleware): no crea una tarea ni
+re-empaqueta el stream de la respuesta, por lo que las StreamingResponse
+(exportaciones Excel) pasan sin copia. Los registros se encolan con
+QueueHandler y un QueueListener los formatea y escribe en otro hilo.
 """
 
-import time
+import atexit
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import json
+import os
+import random
+import time
+from logging.handlers import QueueListener
+from typing import List
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from core.request_context import request_scope, route_template
+from core.query_counter import query_stats, QueryStats, QueryBudgetExceeded, QUERY_BUDGET_ENFORCE
+from ml.utils.logger import move_handlers_to_queue
 
 logger = logging.getLogger("app")
 
+# Fracción de requests exitosas (< 400) que se registran; errores,
+# requests lentas y advertencias de consultas se registran siempre
+LOG_SUCCESS_SAMPLE_RATE = float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", "1.0"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
+
+class LoggingMiddleware:
+    """Middleware ASGI para logging estructurado de requests/responses."""
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware para logging estructurado de requests/responses."""
-    
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Intercepta requests y responses para logging."""
-        
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generar ID único para la request
         request_id = f"{int(time.time() * 1000)}"
-        
+        method = scope["method"]
+        path = scope["path"]
+
         # Información de la request
-        start_time = time.time()
-        
+        start_time = time.perf_counter()
+        sampled = LOG_SUCCESS_SAMPLE_RATE >= 1 or random.random() < LOG_SUCCESS_SAMPLE_RATE
+
         # Log de request entrante
-        logger.info(
-            f"REQUEST: {request.method} {request.url.path}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": dict(request.query_params),
-                "client_host": request.client.host if request.client else None,
-                "user_agent": request.headers.get("user-agent"),
-            }
-        )
-        
-        # Procesar request
+        if sampled:
+            request = Request(scope)
+            logger.info(
+                f"REQUEST: {method} {path}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "query_params": dict(request.query_params),
+                    "client_host": request.client.host if request.client else None,
+                    "user_agent": request.headers.get("user-agent"),
+                }
+            )
+
+        status_code = 500
+        stats = QueryStats()
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+                if stats.over_budget:
+                    budget_message = (
+                        f"{method} {path} ejecutó {stats.count} consultas "
+                        f"(presupuesto {stats.budget})"
+                    )
+                    if QUERY_BUDGET_ENFORCE:
+                        raise QueryBudgetExceeded(budget_message)
+                    logger.warning(f"⚠️ Presupuesto de consultas excedido: {budget_message}")
+
+                # Agregar header con request ID
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                headers.append("X-Process-Time", f"{duration_ms:.2f}ms")
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append("X-DB-Time", f"{stats.total_ms:.2f}ms")
+            await send(message)
+
+        # Procesar request (el scope queda disponible para la capa de datos)
+        scope_token = request_scope.set(scope)
+        stats_token = query_stats.set(stats)
+        HTTP_REQUESTS_IN_FLIGHT.inc()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
             # Log de error
             logger.error(
@@ -56,65 +112,100 @@ class LoggingMiddleware(BaseHTTPMiddleware):
                 exc_info=True
             )
             raise
-        
-        # Calcular duración
-        duration_ms = (time.time() - start_time) * 1000
-        
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            request_scope.reset(scope_token)
+            query_stats.reset(stats_token)
+            # Plantilla de ruta (no la URL) para acotar la cardinalidad
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start_time,
+                (method, route_template(scope) or "sin_ruta", str(status_code))
+            )
+
+        # Calcular duración (incluye el envío completo del cuerpo)
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        repeated = stats.repeated()
+
         # Log de response
-        log_level = logging.INFO if response.status_code < 400 else logging.WARNING
-        logger.log(
-            log_level,
-            f"RESPONSE: {request.method} {request.url.path} - {response.status_code}",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": round(duration_ms, 2),
-            }
-        )
-        
-        # Agregar header con request ID
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = f"{duration_ms:.2f}ms"
-        
-        return response
+        if sampled or status_code >= 400 or duration_ms >= LOG_SLOW_REQUEST_MS or repeated:
+            log_level = logging.INFO if status_code < 400 else logging.WARNING
+            logger.log(
+                log_level,
+                f"RESPONSE: {method} {path} - {status_code}",
+                extra={
+                    "request_id": request_id,
+                    "method": method,
+                    "path": path,
+                    "status_code": status_code,
+                    "duration_ms": round(duration_ms, 2),
+                    "db_queries": stats.count,
+                    "db_time_ms": round(stats.total_ms, 2),
+                }
+            )
+
+        # Sentencias repetidas con distintos parámetros: probable N+1
+        for statement, times in repeated:
+            logger.warning(
+                f"⚠️ Posible N+1 en {method} {path}: "
+                f"{times}x {statement[:200]}",
+                extra={"request_id": request_id, "statement": statement, "repetitions": times}
+            )
+
+
+_listeners: List[QueueListener] = []
+
+
+def stop_logging() -> None:
+    """Vacía las colas de logging y detiene los hilos de escritura."""
+    while _listeners:
+        _listeners.pop().stop()
 
 
 def setup_logging():
     """Configura el logging estructurado de la aplicación."""
-    
+
+    # Logger principal
+    app_logger = logging.getLogger("app")
+    if _listeners:
+        # Ya configurado (la app se importó más de una vez)
+        return app_logger
+
     # Formato del logger
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    
-    # Logger principal
-    app_logger = logging.getLogger("app")
+
     app_logger.setLevel(logging.INFO)
-    
+
     # Handler para consola con formato estructurado
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
-    
+
     # Formato con más detalles
     formatter = logging.Formatter(
         '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(formatter)
-    
+
     app_logger.addHandler(console_handler)
-    
+
     # Logger para ML
     ml_logger = logging.getLogger("ml")
     ml_logger.setLevel(logging.INFO)
     ml_logger.addHandler(console_handler)
-    
+
     # Silenciar logs verbosos de librerías
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
-    
+
+    # Formateo y escritura fuera del event loop
+    for target in (logging.getLogger(), app_logger, ml_logger):
+        listener = move_handlers_to_queue(target)
+        if listener is not None:
+            _listeners.append(listener)
+    atexit.register(stop_logging)
+
     return app_logger
@@ -0,0 +1,413 @@
+"""
+Métricas de la aplicación en formato de texto de Prometheus.
+
+Contadores, gauges e histogramas propios (sin dependencias externas)
+pensados para el camino caliente:
+- Cada hilo escribe en su propio shard (dict en un threading.local), así
+  que registrar una observación no toma locks ni compite con otros hilos.
+  Al exponer las métricas se suman los shards. Los shards de hilos
+  terminados (el threadpool de AnyIO retira hilos ociosos) se acumulan en
+  un total base y se descartan, así que su número no crece con el tiempo.
+- Los histogramas tienen buckets fijos: observar es un bisect y dos sumas.
+
+Varios workers de uvicorn: con METRICS_MULTIPROC_DIR cada proceso vuelca
+su snapshot en `<dir>/metrics_<pid>.json` (cada METRICS_FLUSH_SECONDS y al
+exponer) y /metrics combina los archivos de todos. Contadores e
+histogramas se suman incluidos los de procesos terminados; los gauges
+solo de procesos vivos. El directorio debe vaciarse antes de arrancar.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Latencias HTTP / DB (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Duraciones largas: análisis de anomalías y entrenamiento (segundos)
+LONG_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    """Base: nombre, ayuda, etiquetas y shards por hilo."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        # (hilo dueño, valores); los de hilos terminados se suman en _retired
+        self._shards: List[Tuple[weakref.ref, Dict[LabelValues, Any]]] = []
+        self._retired: Dict[LabelValues, Any] = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, Any]:
+        try:
+            return self._local.values
+        except AttributeError:
+            # Primera escritura de este hilo: único punto con lock
+            values: Dict[LabelValues, Any] = {}
+            self._local.values = values
+            with self._shards_lock:
+                self._retire_dead_shards()
+                self._shards.append((weakref.ref(threading.current_thread()), values))
+            return values
+
+    def _retire_dead_shards(self) -> None:
+        """Suma en `_retired` los shards de hilos terminados (con `_shards_lock`)."""
+        alive = []
+        for thread_ref, values in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                alive.append((thread_ref, values))
+            else:
+                # El hilo ya no escribe: se puede leer sin carreras
+                for labels, value in values.items():
+                    self._merge(self._retired, labels, value)
+        self._shards = alive
+
+    def _merge(self, totals: Dict[LabelValues, Any], labels: LabelValues, value: Any) -> None:
+        raise NotImplementedError
+
+    def _shard_items(self) -> Iterable[Tuple[LabelValues, Any]]:
+        with self._shards_lock:
+            self._retire_dead_shards()
+            shards = [values for _, values in self._shards]
+            retired = [
+                (labels, list(value) if isinstance(value, list) else value)
+                for labels, value in self._retired.items()
+            ]
+        yield from retired
+        for shard in shards:
+            yield from list(shard.items())
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def _merge(self, totals: Dict[LabelValues, float], labels: LabelValues, value: float) -> None:
+        totals[labels] = totals.get(labels, 0.0) + value
+
+    def collect(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for labels, value in self._shard_items():
+            self._merge(totals, labels, value)
+        return totals
+
+
+class Gauge(Counter):
+    """Valor que sube y baja (p. ej. requests en curso)."""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        self.inc(-amount, labels)
+
+
+class Histogram(_Metric):
+    """Histograma con buckets fijos (límites superiores inclusivos)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        shard = self._shard()
+        data = shard.get(labels)
+        if data is None:
+            # [conteo por bucket..., conteo +Inf, suma]
+            data = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def time(self, labels: LabelValues = ()) -> "_Timer":
+        """Context manager que observa la duración del bloque en segundos."""
+        return _Timer(self, labels)
+
+    def _merge(self, totals: Dict[LabelValues, List[float]], labels: LabelValues, data: List[float]) -> None:
+        current = totals.get(labels)
+        if current is None:
+            totals[labels] = list(data)
+        else:
+            for i, value in enumerate(data):
+                current[i] += value
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        totals: Dict[LabelValues, List[float]] = {}
+        for labels, data in self._shard_items():
+            self._merge(totals, labels, data)
+        return totals
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+
+# Colector: función que devuelve [(nombre, tipo, ayuda, labelnames, {labels: valor})]
+Collector = Callable[[], List[Tuple[str, str, str, Tuple[str, ...], Dict[LabelValues, float]]]]
+
+
+class MetricsRegistry:
+    """Registro de métricas y colectores; genera el texto de exposición."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._flusher: Optional[threading.Thread] = None
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """Agrega una función evaluada al exponer (estado de pools, cachés...)."""
+        self._collectors.append(collector)
+
+    # --- Snapshot y multiproceso -----------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Estado actual de este proceso en forma serializable."""
+        families: Dict[str, Dict[str, Any]] = {}
+        for metric in self._metrics.values():
+            family = {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "samples": [[list(labels), value] for labels, value in metric.collect().items()],
+            }
+            if isinstance(metric, Histogram):
+                family["buckets"] = list(metric.buckets)
+            families[metric.name] = family
+
+        for collector in self._collectors:
+            for name, type_name, documentation, labelnames, samples in collector():
+                families[name] = {
+                    "type": type_name,
+                    "help": documentation,
+                    "labelnames": list(labelnames),
+                    "samples": [[list(labels), value] for labels, value in samples.items()],
+                }
+        return families
+
+    def flush(self) -> None:
+        """Vuelca el snapshot de este proceso en METRICS_MULTIPROC_DIR."""
+        if not METRICS_MULTIPROC_DIR:
+            return
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+        path = os.path.join(METRICS_MULTIPROC_DIR, f"metrics_{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "families": self.snapshot()}, f)
+        os.replace(tmp_path, path)
+
+    def start_flusher(self) -> None:
+        """Hilo de fondo que vuelca el snapshot periódicamente (solo multiproceso)."""
+        if not METRICS_MULTIPROC_DIR or self._flusher is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(METRICS_FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        self._flusher = threading.Thread(target=loop, name="metrics-flusher", daemon=True)
+        self._flusher.start()
+
+    def _merged_families(self) -> Dict[str, Dict[str, Any]]:
+        if not METRICS_MULTIPROC_DIR:
+            return self.snapshot()
+
+        self.flush()
+        merged: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "metrics_*.json"))):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(data["pid"])
+
+            for name, family in data["families"].items():
+                if family["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**family, "samples": {}})
+                for labels, value in family["samples"]:
+                    key = tuple(labels)
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = value
+                    elif isinstance(value, list):
+                        target["samples"][key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target["samples"][key] = current + value
+
+        for family in merged.values():
+            family["samples"] = [[list(labels), value] for labels, value in family["samples"].items()]
+        return merged
+
+    # --- Exposición ----------------------------------------------------
+
+    def render(self) -> str:
+        """Texto de exposición de Prometheus (todas las familias, todos los workers)."""
+        lines: List[str] = []
+        for name, family in sorted(self._merged_families().items()):
+            lines.append(f"# HELP {name} {_escape_help(family['help'])}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            labelnames = family["labelnames"]
+
+            for labels, value in sorted(family["samples"], key=lambda sample: sample[0]):
+                if family["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                    continue
+
+                cumulative = 0
+                for bound, count in zip(family["buckets"] + ["+Inf"], value[:-1]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _format_value(bound)
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labelnames, labels, ('le', le))} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}")
+                lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[Any], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, labels)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+# --- HTTP -------------------------------------------------------------------
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Duración de las requests HTTP por ruta (plantilla) y código de estado",
+    ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "Requests HTTP en curso"
+)
+
+# --- Base de datos -------------------------------------------------------------
+
+DB_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Espera para obtener una conexión del pool",
+    ("pool",)
+)
+
+# --- ML ---------------------------------------------------------------------
+
+ML_PREDICTION_DURATION = registry.histogram(
+    "ml_prediction_stage_duration_seconds",
+    "Duración de cada etapa de la predicción (validation, features, scaling, model, total)",
+    ("stage",)
+)
+ML_PREDICTION_ERRORS = registry.counter(
+    "ml_prediction_errors_total",
+    "Predicciones fallidas por tipo de error",
+    ("error",)
+)
+ML_ANOMALY_SCAN_DURATION = registry.histogram(
+    "ml_anomaly_scan_duration_seconds",
+    "Duración del análisis de anomalías (stored, recompute, rebuild)",
+    ("mode",),
+    buckets=LONG_BUCKETS
+)
+ML_TRAINING_DURATION = registry.histogram(
+    "ml_training_duration_seconds",
+    "Duración de los trabajos de entrenamiento por resultado",
+    ("status",),
+    buckets=LONG_BUCKETS
+)
@@ -0,0 +1,420 @@
+"""
+Instrumentación de los pools de conexiones y control adaptativo.
+
+`PoolMetrics` registra, mediante eventos del pool de SQLAlchemy:
+- latencia de checkout (espera por una conexión libre + pre-ping)
+- tiempo que cada ruta retiene la conexión (checkout -> checkin)
+- uso del overflow y timeouts del pool
+- conexiones nuevas e invalidadas
+
+`PoolController` (opcional, POOL_CONTROLLER_ENABLED) ajusta el
+max_overflow efectivo dentro de [POOL_CONTROLLER_MIN_OVERFLOW,
+POOL_CONTROLLER_MAX_OVERFLOW] según la espera p95 observada.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from core.metrics import registry, DB_CHECKOUT_WAIT
+from core.request_context import route_label
+
+logger = logging.getLogger("app")
+
+# Muestras recientes de espera para calcular percentiles
+POOL_METRICS_SAMPLES = int(os.getenv("POOL_METRICS_SAMPLES", "2000"))
+
+POOL_CONTROLLER_ENABLED = os.getenv("POOL_CONTROLLER_ENABLED", "false").lower() in ("1", "true", "yes")
+POOL_CONTROLLER_INTERVAL_SECONDS = float(os.getenv("POOL_CONTROLLER_INTERVAL_SECONDS", "30"))
+POOL_CONTROLLER_MIN_OVERFLOW = int(os.getenv("POOL_CONTROLLER_MIN_OVERFLOW", "5"))
+POOL_CONTROLLER_MAX_OVERFLOW = int(os.getenv("POOL_CONTROLLER_MAX_OVERFLOW", "40"))
+POOL_CONTROLLER_TARGET_WAIT_MS = float(os.getenv("POOL_CONTROLLER_TARGET_WAIT_MS", "50"))
+POOL_CONTROLLER_STEP = int(os.getenv("POOL_CONTROLLER_STEP", "5"))
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class _RouteStats:
+    """Acumulado de tiempo en uso de conexiones para una ruta."""
+
+    __slots__ = ("checkouts", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, held_ms: float) -> None:
+        self.checkouts += 1
+        self.total_ms += held_ms
+        self.max_ms = max(self.max_ms, held_ms)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "checkouts": self.checkouts,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class PoolMetrics:
+    """
+    Métricas de un pool de conexiones.
+
+    Se engancha a los eventos connect/checkout/checkin/invalidate del pool
+    y envuelve `engine.raw_connection` para medir la espera de checkout
+    (los eventos del pool solo se disparan una vez obtenida la conexión).
+    """
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.name = name
+        self._lock = threading.Lock()
+        self._windows: List[Deque[float]] = []
+        self.reset()
+
+        self._raw_connection = engine.raw_connection
+        engine.raw_connection = self._timed_raw_connection
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+
+    def reset(self) -> None:
+        """Reinicia los contadores (no afecta al pool)."""
+        with self._lock:
+            self.started_at = time.time()
+            self.waits_ms: Deque[float] = deque(maxlen=POOL_METRICS_SAMPLES)
+            self.checkouts = 0
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.overflow_checkouts = 0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+            self.routes: Dict[str, _RouteStats] = {}
+
+    # --- Hooks --------------------------------------------------------
+
+    def _timed_raw_connection(self):
+        start = time.perf_counter()
+        try:
+            return self._raw_connection()
+        except PoolTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            DB_CHECKOUT_WAIT.observe(wait, (self.name,))
+            self.record_wait(wait * 1000)
+
+    def record_wait(self, wait_ms: float) -> None:
+        """Registra una espera de checkout en los acumulados y en cada ventana."""
+        with self._lock:
+            self.waits_ms.append(wait_ms)
+            for window in self._windows:
+                window.append(wait_ms)
+            self.wait_count += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def add_window(self, maxlen: int = POOL_METRICS_SAMPLES) -> Deque[float]:
+        """
+        Crea una ventana de esperas propia para un consumidor.
+
+        El consumidor puede vaciarla (con `_lock`) sin afectar las muestras
+        que reporta `snapshot`.
+
+        Args:
+            maxlen: Máximo de muestras retenidas
+
+        Returns:
+            Deque que recibe cada espera nueva
+        """
+        window: Deque[float] = deque(maxlen=maxlen)
+        with self._lock:
+            self._windows.append(window)
+        return window
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+        connection_record.info["route"] = route_label()
+
+        pool = self.engine.pool
+        overflow = pool.overflow() if hasattr(pool, "overflow") else 0
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+        with self._lock:
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        route = connection_record.info.pop("route", "sin_request")
+        if started is None:
+            return
+        held_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.routes.setdefault(route, _RouteStats()).add(held_ms)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.soft_invalidations += 1
+
+    # --- Lectura ------------------------------------------------------
+
+    def wait_percentile(self, q: float) -> Optional[float]:
+        """Percentil `q` (0-1) de la espera de checkout en ms sobre las muestras recientes."""
+        with self._lock:
+            values = sorted(self.waits_ms)
+        return _percentile(values, q)
+
+    def pool_state(self) -> Dict[str, Any]:
+        """Contadores instantáneos del pool."""
+        pool = self.engine.pool
+        state: Dict[str, Any] = {"pool": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                state[name] = method()
+        max_overflow = getattr(pool, "_max_overflow", None)
+        if max_overflow is not None:
+            state["max_overflow"] = max_overflow
+        timeout = getattr(pool, "_timeout", None)
+        if timeout is not None:
+            state["timeout_seconds"] = timeout
+        return state
+
+    def snapshot(self, top_routes: int = 20) -> Dict[str, Any]:
+        """
+        Métricas acumuladas desde el último reset.
+
+        Args:
+            top_routes: Rutas a incluir, ordenadas por tiempo total en uso
+
+        Returns:
+            Diccionario serializable con estado del pool, esperas y rutas
+        """
+        with self._lock:
+            waits = sorted(self.waits_ms)
+            routes = sorted(self.routes.items(), key=lambda item: item[1].total_ms, reverse=True)
+            data = {
+                "name": self.name,
+                "since": self.started_at,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "soft_invalidations": self.soft_invalidations,
+                "overflow_checkouts": self.overflow_checkouts,
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "checkout_wait_ms": {
+                    "avg": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else None,
+                    "max": round(self.wait_max_ms, 3),
+                    "p50": _percentile(waits, 0.50),
+                    "p95": _percentile(waits, 0.95),
+                    "p99": _percentile(waits, 0.99),
+                    "samples": len(waits),
+                    "count": self.wait_count,
+                },
+                "routes": {route: stats.to_dict() for route, stats in routes[:top_routes]},
+            }
+        data["state"] = self.pool_state()
+        return data
+
+
+class PoolController:
+    """
+    Ajusta el max_overflow del pool según la espera de checkout.
+
+    Cada `interval` segundos mira la espera p95 de las muestras recientes:
+    - por encima de `target_wait_ms`: sube max_overflow un paso
+    - por debajo de un quinto del objetivo y sin usar el overflow actual:
+      lo baja un paso
+    Siempre dentro de [min_overflow, max_overflow]. Las conexiones de
+    overflow se cierran al devolverse, así que bajar el límite no corta
+    conexiones en uso.
+    """
+
+    def __init__(
+        self,
+        metrics: PoolMetrics,
+        interval: float = POOL_CONTROLLER_INTERVAL_SECONDS,
+        min_overflow: int = POOL_CONTROLLER_MIN_OVERFLOW,
+        max_overflow: int = POOL_CONTROLLER_MAX_OVERFLOW,
+        target_wait_ms: float = POOL_CONTROLLER_TARGET_WAIT_MS,
+        step: int = POOL_CONTROLLER_STEP
+    ):
+        self.metrics = metrics
+        self.interval = interval
+        self.min_overflow = min_overflow
+        self.max_overflow = max_overflow
+        self.target_wait_ms = target_wait_ms
+        self.step = step
+        self.adjustments: Deque[Dict[str, Any]] = deque(maxlen=50)
+        self._waits = metrics.add_window()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def supported(self) -> bool:
+        """Solo QueuePool (y su variante async) tiene límite de overflow."""
+        return hasattr(self.metrics.engine.pool, "_max_overflow")
+
+    def evaluate(self) -> Optional[int]:
+        """
+        Evalúa la ventana actual y ajusta el límite si corresponde.
+
+        El controlador usa su propia ventana de esperas y la vacía tras cada
+        evaluación, para que la siguiente decisión refleje solo la carga
+        reciente sin borrar los percentiles del diagnóstico.
+
+        Returns:
+            Nuevo max_overflow si cambió, None si no
+        """
+        if not self.supported:
+            return None
+
+        pool = self.metrics.engine.pool
+        with self.metrics._lock:
+            waits = sorted(self._waits)
+            self._waits.clear()
+        p95 = _percentile(waits, 0.95)
+        if p95 is None:
+            return None
+
+        current = pool._max_overflow
+        new = current
+        if p95 > self.target_wait_ms:
+            new = min(self.max_overflow, current + self.step)
+        elif p95 < self.target_wait_ms / 5 and pool.overflow() <= 0:
+            new = max(self.min_overflow, current - self.step)
+
+        if new == current:
+            return None
+
+        pool._max_overflow = new
+        self.adjustments.append({
+            "at": time.time(), "from": current, "to": new, "p95_wait_ms": round(p95, 3)
+        })
+        logger.info(f"🎚️ Pool {self.metrics.name}: max_overflow {current} -> {new} (espera p95 {p95:.1f} ms)")
+        return new
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._task is not None,
+            "supported": self.supported,
+            "bounds": [self.min_overflow, self.max_overflow],
+            "target_wait_ms": self.target_wait_ms,
+            "interval_seconds": self.interval,
+            "adjustments": list(self.adjustments),
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.evaluate()
+            except Exception as e:
+                logger.warning(f"⚠️ Falló el control del pool {self.metrics.name}: {e}")
+
+    def start(self) -> None:
+        """Inicia la evaluación periódica en el event loop actual."""
+        if self._task is None and self.supported and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Pools instrumentados: nombre -> métricas / controlador
+pool_metrics: Dict[str, PoolMetrics] = {}
+pool_controllers: Dict[str, PoolController] = {}
+
+
+def instrument_pool(engine: Engine, name: str) -> PoolMetrics:
+    """
+    Instrumenta el pool de un engine (idempotente por nombre).
+
+    Para engines async se debe pasar `async_engine.sync_engine`.
+
+    Args:
+        engine: Engine síncrono
+        name: Nombre del pool en la API ("primary", "replica", "async")
+
+    Returns:
+        Métricas del pool
+    """
+    if name not in pool_metrics:
+        pool_metrics[name] = PoolMetrics(engine, name)
+        pool_controllers[name] = PoolController(pool_metrics[name])
+    return pool_metrics[name]
+
+
+def _collect_pool_metrics():
+    """Estado y contadores de los pools instrumentados para /metrics."""
+    gauges = {"size": {}, "checkedout": {}, "checkedin": {}, "overflow": {}, "max_overflow": {}}
+    counters = {"checkouts": {}, "timeouts": {}, "connects": {}, "invalidations": {}}
+    for name, metrics in pool_metrics.items():
+        state = metrics.pool_state()
+        for key, samples in gauges.items():
+            if key in state:
+                samples[(name,)] = state[key]
+        for key, samples in counters.items():
+            samples[(name,)] = getattr(metrics, key)
+
+    return [
+        (f"db_pool_{key}", "gauge", f"Pool de conexiones: {key}", ("pool",), samples)
+        for key, samples in gauges.items()
+    ] + [
+        (f"db_pool_{key}_total", "counter", f"Pool de conexiones: {key} acumulados", ("pool",), samples)
+        for key, samples in counters.items()
+    ]
+
+
+registry.add_collector(_collect_pool_metrics)
+
+
+def start_pool_controllers() -> None:
+    """Inicia los controladores adaptativos si POOL_CONTROLLER_ENABLED."""
+    if not POOL_CONTROLLER_ENABLED:
+        return
+    for controller in pool_controllers.values():
+        controller.start()
+
+
+def stop_pool_controllers() -> None:
+    for controller in pool_controllers.values():
+        controller.stop()
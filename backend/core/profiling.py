@@ -0,0 +1,263 @@
+"""
+Perfilado bajo demanda de requests individuales.
+
+Un administrador envía el header `X-Profile: 1` y solo esa request se
+perfila con un muestreador de pila: un hilo lee sys._current_frames()
+cada PROFILE_SAMPLE_INTERVAL_MS y cuenta las pilas del hilo del event
+loop y de los hilos del threadpool (rutas sync, exportaciones Excel,
+entrenamiento). Los hilos en espera no se cuentan.
+
+El resultado se guarda en formato "collapsed stacks" (una pila por línea,
+`raiz;...;hoja conteo`), listo para flamegraph.pl o speedscope, en un
+buffer circular en disco de PROFILE_MAX_FILES perfiles. La respuesta lleva
+el header X-Profile-ID para descargarlo desde /api/diagnostico/profiles.
+
+Sin el header el costo es revisar los headers de la request; con
+PROFILING_ENABLED=false el middleware no se registra.
+
+El muestreo ve todo el proceso: si otras requests corren en el mismo
+worker durante el perfil, sus pilas también aparecen.
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.database import AsyncSessionLocal
+from core.dependencies import get_user_from_token, is_admin
+from core.request_context import route_template
+
+logger = logging.getLogger("app")
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+# Tope de muestreo por perfil (un entrenamiento puede tardar minutos)
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "900"))
+
+# Nombre de los hilos del threadpool de Starlette (anyio)
+WORKER_THREAD_NAME = "AnyIO worker thread"
+
+# Hoja de la pila de un hilo sin trabajo: esperando tarea o eventos
+_IDLE_LEAVES = {("threading.py", "wait"), ("selectors.py", "select")}
+
+_PROFILE_ID = re.compile(r"^\d{8}-\d{9}-[0-9a-f]{8}$")
+
+
+@lru_cache(maxsize=8192)
+def _frame_label(code: CodeType) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Muestreador de pilas del hilo del event loop y del threadpool."""
+
+    def __init__(
+        self,
+        interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS,
+        max_seconds: float = PROFILE_MAX_SECONDS
+    ):
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            self.sample()
+
+    def sample(self) -> None:
+        """Toma una muestra de las pilas de los hilos que atienden requests."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != self._loop_thread and names.get(thread_id) != WORKER_THREAD_NAME:
+                continue
+
+            leaf = frame.f_code
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        """Pilas en formato collapsed (`raiz;...;hoja conteo`)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Buffer circular de perfiles en disco (`<id>.collapsed` + `<id>.json`)."""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def new_id(self) -> str:
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        return f"{stamp}{int(now * 1000) % 1000:03d}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, sampler: StackSampler, meta: Dict[str, Any]) -> None:
+        """Guarda un perfil y elimina los más antiguos sobre max_files."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{profile_id}.collapsed").write_text(sampler.collapsed(), encoding="utf-8")
+        (self.directory / f"{profile_id}.json").write_text(
+            json.dumps({
+                "id": profile_id,
+                **meta,
+                "samples": sampler.samples,
+                "interval_ms": sampler.interval * 1000,
+            }),
+            encoding="utf-8"
+        )
+
+        # Los IDs empiezan con la fecha: el orden por nombre es cronológico
+        profiles = sorted(self.directory.glob("*.collapsed"))
+        for old in profiles[:max(len(profiles) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadatos de los perfiles guardados, del más reciente al más antiguo."""
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                meta = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            collapsed = path.with_suffix(".collapsed")
+            meta["size_bytes"] = collapsed.stat().st_size if collapsed.exists() else 0
+            profiles.append(meta)
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """Ruta del archivo collapsed, o None si el ID no es válido o no existe."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.collapsed"
+        return path if path.exists() else None
+
+
+profile_store = ProfileStore(PROFILE_DIR, PROFILE_MAX_FILES)
+
+# Un perfil a la vez por proceso: acota el costo del muestreo
+_profile_lock = threading.Lock()
+
+
+async def _is_admin(token: str) -> bool:
+    """Verifica que el token JWT pertenezca a un administrador activo."""
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_user_from_token(token, db)
+        except HTTPException:
+            return False
+        return is_admin(user)
+
+
+def _profile_token(scope: Scope) -> Optional[str]:
+    """Token Bearer si la request pide perfilado (`X-Profile: 1`), si no None."""
+    wants_profile = False
+    token = None
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            wants_profile = value.strip().lower() in (b"1", b"true")
+        elif name == b"authorization" and value[:7].lower() == b"bearer ":
+            token = value[7:].decode("latin-1").strip()
+    return token if wants_profile else None
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que perfila las requests marcadas con `X-Profile: 1`."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _profile_token(scope)
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await _is_admin(token):
+            logger.warning(f"⚠️ X-Profile ignorado: {scope['path']} (requiere administrador)")
+            await self.app(scope, receive, send)
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            logger.warning(f"⚠️ X-Profile ignorado: {scope['path']} (otro perfil en curso)")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = profile_store.new_id()
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-ID", profile_id)
+            await send(message)
+
+        sampler = StackSampler()
+        start_time = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            _profile_lock.release()
+
+            meta = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_template(scope),
+                "status_code": status_code,
+                "duration_ms": round(duration_ms, 2),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            try:
+                await run_in_threadpool(profile_store.save, profile_id, sampler, meta)
+                logger.info(
+                    f"🔬 Perfil {profile_id}: {scope['method']} {scope['path']} "
+                    f"({duration_ms:.0f}ms, {sampler.samples} muestras)"
+                )
+            except OSError as e:
+                logger.error(f"❌ No se pudo guardar el perfil {profile_id}: {e}")
@@ -0,0 +1,113 @@
+"""
+Contador de consultas SQL por request y detector de N+1.
+
+Los hooks before/after_cursor_execute de SQLAlchemy acumulan, en el
+`QueryStats` de la request en curso (ContextVar que crea
+LoggingMiddleware), el número de sentencias y el tiempo en la base de
+datos. Una misma sentencia repetida con distintos parámetros
+N_PLUS_ONE_THRESHOLD veces o más se marca como probable N+1 (típico de
+relaciones lazy recorridas fila por fila).
+
+Presupuestos: una ruta declara su máximo con
+`dependencies=[Depends(query_budget(n))]`. Si se excede, el middleware
+registra un warning; con DB_QUERY_BUDGET_ENFORCE=true (los tests) lanza
+QueryBudgetExceeded y la request falla.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+QUERY_BUDGET_ENFORCE = os.getenv("DB_QUERY_BUDGET_ENFORCE", "false").lower() in ("1", "true", "yes")
+
+# Presupuesto por defecto para rutas sin query_budget (0 = sin límite)
+QUERY_BUDGET_DEFAULT = int(os.getenv("DB_QUERY_BUDGET_DEFAULT", "0"))
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Una ruta ejecutó más consultas que su presupuesto."""
+
+
+class QueryStats:
+    """Consultas ejecutadas durante una request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Dict[str, int] = {}
+        self.budget: Optional[int] = QUERY_BUDGET_DEFAULT or None
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """
+        Sentencias idénticas (salvo parámetros) ejecutadas `threshold` veces o más.
+
+        Returns:
+            Lista (sentencia, repeticiones) ordenada de mayor a menor
+        """
+        with self._lock:
+            items = [(sql, n) for sql, n in self.statements.items() if n >= threshold]
+        return sorted(items, key=lambda item: item[1], reverse=True)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def query_budget(max_queries: int):
+    """
+    Dependency factory: declara el máximo de consultas SQL de una ruta.
+
+    Args:
+        max_queries: Sentencias permitidas en toda la request
+            (incluye dependencias como la autenticación)
+
+    Returns:
+        Dependency para usar en `dependencies=[Depends(...)]`
+    """
+    def set_budget() -> None:
+        stats = query_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+    return set_budget
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if query_stats.get() is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    start = getattr(context, "_query_start", None)
+    if stats is None or start is None:
+        return
+    stats.record(" ".join(statement.split()), (time.perf_counter() - start) * 1000)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """
+    Registra los hooks de conteo en un engine.
+
+    Para engines async se debe pasar `async_engine.sync_engine`.
+
+    Args:
+        engine: Engine síncrono
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
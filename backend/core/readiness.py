@@ -0,0 +1,148 @@
+"""
+Estado de inicialización del worker (liveness / readiness).
+
+El arranque ya no espera a que el modelo ML esté cargado: el esquema se
+verifica al iniciar y el modelo se carga y calienta en segundo plano.
+Este módulo guarda el estado de cada componente para que:
+
+- /health/live responda siempre que el proceso esté vivo
+- /health/ready reporte esquema, pool de conexiones y modelo
+- las rutas ML respondan 503 inmediato mientras el modelo se carga,
+  sin bloquear a las rutas CRUD
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from core.exceptions import ServiceNotReadyException
+
+logger = logging.getLogger("app")
+
+# Estados por componente
+NOT_STARTED = "not_started"
+LOADING = "loading"
+READY = "ready"
+UNAVAILABLE = "unavailable"  # p. ej. no hay modelo entrenado todavía
+ERROR = "error"
+
+RETRY_AFTER_SECONDS = int(os.getenv("READINESS_RETRY_AFTER_SECONDS", "5"))
+
+
+class ReadinessState:
+    """
+    Estado thread-safe de los componentes que se inicializan al arrancar.
+
+    Cada componente guarda `status`, la fecha del último cambio y datos
+    adicionales (error, duración de carga, versión del modelo...).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._started = time.monotonic()
+
+    def set(self, component: str, status: str, **info: Any) -> None:
+        """
+        Actualiza el estado de un componente.
+
+        Args:
+            component: Nombre del componente ('schema', 'model')
+            status: Nuevo estado
+            **info: Datos adicionales a reportar
+        """
+        with self._lock:
+            self._components[component] = {
+                "status": status,
+                "since": datetime.now().isoformat(),
+                **info
+            }
+
+    def get(self, component: str) -> Dict[str, Any]:
+        """Estado de un componente (NOT_STARTED si nunca se registró)."""
+        with self._lock:
+            return dict(self._components.get(component, {"status": NOT_STARTED}))
+
+    def status(self, component: str) -> str:
+        """Solo el estado de un componente."""
+        return self.get(component)["status"]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copia del estado de todos los componentes."""
+        with self._lock:
+            return {name: dict(state) for name, state in self._components.items()}
+
+    @property
+    def uptime_seconds(self) -> float:
+        """Segundos desde que se creó el estado (arranque del worker)."""
+        return round(time.monotonic() - self._started, 3)
+
+    def reset(self) -> None:
+        """Olvida el estado de todos los componentes (útil en pruebas)."""
+        with self._lock:
+            self._components.clear()
+
+
+# Estado global del worker
+readiness = ReadinessState()
+
+
+def database_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Verifica la conexión a la base de datos y reporta el pool.
+
+    Args:
+        engine: Engine de SQLAlchemy
+
+    Returns:
+        Diccionario con `status`, latencia del ping y estadísticas del pool
+    """
+    pool = engine.pool
+    info: Dict[str, Any] = {"pool": type(pool).__name__}
+
+    # QueuePool (PostgreSQL) expone contadores; los pools de SQLite no todos
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            info[name] = method()
+
+    start = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        info["status"] = READY
+    except Exception as e:
+        logger.warning(f"⚠️ Base de datos no disponible: {type(e).__name__}")
+        info["status"] = ERROR
+        info["error"] = f"{type(e).__name__}: {e}"
+    info["ping_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    return info
+
+
+def require_ready(component: str):
+    """
+    Dependency factory: responde 503 mientras el componente se inicializa.
+
+    Solo bloquea los estados transitorios (LOADING); si el componente no
+    se inició o falló, la ruta se ejecuta y aplica su propio manejo.
+
+    Args:
+        component: Nombre del componente
+
+    Returns:
+        Dependency para usar con Depends()
+    """
+    def dependency() -> None:
+        state = readiness.status(component)
+        if state == LOADING:
+            raise ServiceNotReadyException(component, state, retry_after=RETRY_AFTER_SECONDS)
+
+    return dependency
+
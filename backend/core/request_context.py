@@ -0,0 +1,53 @@
+"""
+Contexto de la request en curso.
+
+LoggingMiddleware guarda el scope ASGI en una ContextVar. Como Starlette
+copia el contexto al threadpool, el código de base de datos (eventos del
+pool, contadores de consultas) puede saber qué ruta lo está ejecutando
+sin recibir la request como parámetro.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+
+# endpoint -> plantilla de la ruta ("/api/control-operacion/{control_id}")
+_route_paths: Dict[Callable, str] = {}
+
+
+def route_template(scope: Dict[str, Any]) -> Optional[str]:
+    """Plantilla de la ruta resuelta por el router, o None si no hubo match."""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return None
+
+    path = _route_paths.get(endpoint)
+    if path is None:
+        app = scope.get("app")
+        for route in getattr(app, "routes", ()):
+            if getattr(route, "endpoint", None) is endpoint:
+                path = route.path
+                _route_paths[endpoint] = path
+                break
+    return path
+
+
+def route_label(default: str = "sin_request") -> str:
+    """
+    Etiqueta "MÉTODO /plantilla" de la ruta en curso.
+
+    Usa la plantilla de la ruta (con {parámetros}) para no crear una
+    etiqueta por ID; antes del ruteo usa la ruta literal.
+
+    Args:
+        default: Etiqueta fuera de una request (tareas de fondo, scripts)
+
+    Returns:
+        Etiqueta de la ruta
+    """
+    scope = request_scope.get()
+    if scope is None:
+        return default
+    path = route_template(scope) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
@@ -0,0 +1,241 @@
+"""
+Caché de resultados para endpoints de lectura costosos.
+
+Los dashboards consultan constantemente los mismos rangos de
+/api/ml/anomalies y /api/ml/stats. Este módulo guarda la respuesta
+calculada, indexada por los parámetros normalizados y la versión del
+modelo cargado, y la invalida cuando se confirman escrituras sobre las
+tablas de las que depende.
+
+Arquitectura:
+- Cada tabla tiene un contador de generación; los hooks de sesión
+  SQLAlchemy lo incrementan al confirmar cambios (incluye UPDATE/DELETE
+  masivos). Una entrada es válida solo si las generaciones de sus tablas
+  no cambiaron desde que se calculó, por lo que un cálculo que coincide
+  con una escritura nunca queda guardado como vigente
+- Single-flight: peticiones concurrentes con la misma clave esperan el
+  mismo cálculo en lugar de repetirlo
+- TTL como cota de antigüedad para escrituras que no pasan por este
+  proceso (otros workers, scripts de carga)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from core.metrics import registry
+
+logger = logging.getLogger("app")
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+
+
+class ResultCache:
+    """
+    Caché LRU en memoria con invalidación por tabla y single-flight.
+
+    `get_or_compute` se llama desde el event loop; el cálculo (síncrono,
+    normalmente consultas a la base de datos) se ejecuta en el thread pool.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        enabled: bool = RESULT_CACHE_ENABLED
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Dict[str, int], float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._shared = 0
+
+    def _snapshot(self, tables: Iterable[str]) -> Dict[str, int]:
+        """Generación actual de cada tabla (llamar con el lock adquirido)."""
+        return {table: self._generations.get(table, 0) for table in tables}
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Busca una entrada vigente (llamar con el lock adquirido)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+
+        value, generations, stored_at = entry
+        expired = time.monotonic() - stored_at > self.ttl_seconds
+        if expired or generations != self._snapshot(generations):
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, value
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        tables: Iterable[str],
+        compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Devuelve el resultado guardado o lo calcula una sola vez.
+
+        Args:
+            key: Clave normalizada (endpoint, parámetros, versión de modelo)
+            tables: Tablas cuyas escrituras invalidan el resultado
+            compute: Función síncrona que calcula el resultado
+
+        Returns:
+            Resultado calculado o guardado
+
+        Raises:
+            La excepción de `compute`, propagada también a quienes esperaban
+        """
+        if not self.enabled:
+            return await run_in_threadpool(compute)
+
+        tables = tuple(tables)
+
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                self._misses += 1
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                generations = self._snapshot(tables)
+            else:
+                self._shared += 1
+
+        if waiting is not None:
+            # shield: si este cliente se desconecta no se cancela el cálculo compartido
+            return await asyncio.shield(waiting)
+
+        try:
+            value = await run_in_threadpool(compute)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            if not future.done():
+                future.set_exception(e)
+                # Evita el aviso "exception was never retrieved" si nadie esperaba
+                future.exception()
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            # Se guarda con las generaciones previas al cálculo: si hubo una
+            # escritura durante el cálculo, la entrada nace invalidada
+            self._entries[key] = (value, generations, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        future.set_result(value)
+        return value
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        """
+        Invalida los resultados que dependen de las tablas indicadas.
+
+        Args:
+            tables: Nombres de tabla con escrituras confirmadas
+        """
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado de la caché (entradas, aciertos y cálculos compartidos)."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "shared_inflight": self._shared,
+            }
+
+
+result_cache = ResultCache()
+
+
+def _collect_cache_metrics():
+    """Aciertos, fallos y cálculos compartidos para /metrics."""
+    stats = result_cache.stats()
+    return [
+        ("result_cache_hits_total", "counter", "Respuestas servidas desde la caché de resultados", (), {(): stats["hits"]}),
+        ("result_cache_misses_total", "counter", "Respuestas calculadas (fallos de caché)", (), {(): stats["misses"]}),
+        ("result_cache_shared_total", "counter", "Requests que esperaron un cálculo en curso", (), {(): stats["shared_inflight"]}),
+        ("result_cache_entries", "gauge", "Entradas vigentes en la caché de resultados", (), {(): stats["entries"]}),
+    ]
+
+
+registry.add_collector(_collect_cache_metrics)
+
+
+# ============================================================================
+# Hooks de sesión SQLAlchemy
+# ============================================================================
+
+def register_cache_invalidation(session_factory, cache: Optional[ResultCache] = None) -> None:
+    """
+    Registra los hooks que invalidan la caché al confirmar escrituras.
+
+    Args:
+        session_factory: sessionmaker (o clase de Session) cuyas sesiones se observan
+        cache: Caché a invalidar (por defecto la global)
+    """
+    cache = cache or result_cache
+
+    def _pending(session) -> set:
+        return session.info.setdefault("cache_tables", set())
+
+    @event.listens_for(session_factory, "after_flush")
+    def _collect_tables(session, flush_context):
+        tables = _pending(session)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            table = getattr(obj, "__tablename__", None)
+            if table:
+                tables.add(table)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _collect_bulk_tables(orm_execute_state):
+        # query.delete() / query.update() no pasan por session.new/dirty/deleted
+        if orm_execute_state.is_update or orm_execute_state.is_delete:
+            mapper = orm_execute_state.bind_mapper
+            if mapper is not None:
+                _pending(orm_execute_state.session).add(mapper.local_table.name)
+
+    @event.listens_for(session_factory, "after_commit")
+    def _invalidate(session):
+        tables = session.info.pop("cache_tables", None)
+        if tables:
+            cache.invalidate_tables(tables)
+
+    @event.listens_for(session_factory, "after_soft_rollback")
+    def _discard(session, previous_transaction):
+        session.info.pop("cache_tables", None)
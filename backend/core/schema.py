@@ -0,0 +1,122 @@
+"""
+Verificación de la versión del esquema de base de datos.
+
+Al arrancar, cada worker compara la revisión guardada por Alembic
+(`alembic_version`) con la que espera este código en una sola consulta,
+en lugar de ejecutar `create_all` (que refleja cada tabla con varias
+consultas al catálogo). Las migraciones no se aplican al arrancar: se
+ejecutan explícitamente con `python migrate.py upgrade`.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app")
+
+# Revisión head de migrations/versions; actualizar con cada migración nueva
+SCHEMA_REVISION = "0002"
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Resultados de check_schema
+SCHEMA_OK = "ok"
+SCHEMA_OUTDATED = "outdated"
+SCHEMA_UNVERSIONED = "unversioned"
+
+
+def get_current_revision(engine: Engine) -> Optional[str]:
+    """
+    Lee la revisión aplicada en la base de datos.
+
+    Args:
+        engine: Engine de SQLAlchemy
+
+    Returns:
+        Revisión actual, o None si la base no está versionada
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        # La tabla no existe: base nueva o creada antes de usar Alembic
+        return None
+
+
+def check_schema(engine: Engine) -> Dict[str, Any]:
+    """
+    Compara la revisión de la base con la esperada (una consulta).
+
+    Args:
+        engine: Engine de SQLAlchemy
+
+    Returns:
+        Diccionario con `result` (ok/outdated/unversioned), `current` y `expected`
+    """
+    current = get_current_revision(engine)
+    if current == SCHEMA_REVISION:
+        result = SCHEMA_OK
+    elif current is None:
+        result = SCHEMA_UNVERSIONED
+    else:
+        result = SCHEMA_OUTDATED
+
+    return {"result": result, "current": current, "expected": SCHEMA_REVISION}
+
+
+def _alembic_config():
+    """Config de Alembic con rutas absolutas (independiente del cwd)."""
+    from alembic.config import Config
+
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def _run_command(command, engine: Optional[Engine], *args) -> None:
+    cfg = _alembic_config()
+    if engine is None:
+        command(cfg, *args)
+        return
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command(cfg, *args)
+
+
+def upgrade_schema(engine: Optional[Engine] = None, revision: str = "head") -> None:
+    """
+    Aplica las migraciones pendientes.
+
+    Args:
+        engine: Engine a migrar (por defecto, DATABASE_URL)
+        revision: Revisión destino
+    """
+    from alembic import command
+
+    _run_command(command.upgrade, engine, revision)
+    logger.info(f"✅ Esquema migrado a {revision}")
+
+
+def stamp_schema(engine: Optional[Engine] = None, revision: str = "head") -> None:
+    """
+    Marca una base existente como migrada sin ejecutar DDL.
+
+    Args:
+        engine: Engine a marcar (por defecto, DATABASE_URL)
+        revision: Revisión a registrar
+    """
+    from alembic import command
+
+    _run_command(command.stamp, engine, revision)
+    logger.info(f"✅ Esquema marcado en {revision}")
+
+
+def head_revision() -> str:
+    """Revisión head según los scripts de migrations/versions."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
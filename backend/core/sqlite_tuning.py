@@ -0,0 +1,158 @@
+"""
+Perfil de rendimiento para SQLite.
+
+Las plantas pequeñas usan la base SQLite por defecto. Sin ajustes, SQLite
+trabaja en modo rollback-journal con fsync completo en cada commit y los
+escritores bloquean a los lectores. Este módulo aplica en cada conexión
+nueva un perfil configurable por variables de entorno:
+
+- journal_mode=WAL: lectores y un escritor concurrentes
+- synchronous=NORMAL: en WAL, fsync solo en checkpoints (seguro ante
+  caídas del proceso; ante cortes de energía puede perder las últimas
+  transacciones, nunca corromper la base)
+- mmap_size, cache_size, temp_store=MEMORY: menos syscalls de lectura
+- busy_timeout: esperar el lock en lugar de fallar con "database is locked"
+
+Además, `SQLiteMaintenance` ejecuta periódicamente `PRAGMA optimize` y un
+checkpoint del WAL para que el archivo -wal no crezca sin límite.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("app")
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+SQLITE_PROFILE_ENABLED = _env_bool("SQLITE_PROFILE_ENABLED", "true")
+
+# PRAGMA -> valor; configurables por variable de entorno
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negativo = KiB (64 MiB)
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("SQLITE_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+
+
+def _is_memory_database(engine: Engine) -> bool:
+    database = engine.url.database
+    return not database or database == ":memory:" or database.startswith("file::memory:")
+
+
+def apply_sqlite_profile(engine: Engine, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Registra un hook `connect` que aplica los PRAGMA en cada conexión nueva.
+
+    Para engines async se debe pasar `async_engine.sync_engine`.
+
+    Args:
+        engine: Engine SQLite (síncrono)
+        pragmas: PRAGMA a aplicar (por defecto SQLITE_PRAGMAS)
+    """
+    pragmas = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+    if _is_memory_database(engine):
+        # WAL y mmap no aplican a bases en memoria
+        pragmas.pop("journal_mode", None)
+        pragmas.pop("mmap_size", None)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def sqlite_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Valores efectivos de los PRAGMA del perfil en una conexión.
+
+    Args:
+        engine: Engine SQLite
+
+    Returns:
+        PRAGMA -> valor actual
+    """
+    with engine.connect() as conn:
+        return {
+            name: conn.execute(text(f"PRAGMA {name}")).scalar()
+            for name in SQLITE_PRAGMAS
+        }
+
+
+class SQLiteMaintenance:
+    """
+    Tarea periódica de mantenimiento de SQLite.
+
+    Cada `interval` segundos ejecuta `PRAGMA optimize` (actualiza
+    estadísticas del planificador solo donde hace falta) y un checkpoint
+    PASSIVE del WAL. Al detenerse hace un checkpoint TRUNCATE.
+    """
+
+    def __init__(self, engine: Engine, interval: float = MAINTENANCE_INTERVAL_SECONDS):
+        self.engine = engine
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_checkpoint: Optional[Dict[str, int]] = None
+
+    def run_once(self, checkpoint_mode: str = "PASSIVE") -> Dict[str, int]:
+        """
+        Ejecuta optimize + checkpoint (bloqueante).
+
+        Args:
+            checkpoint_mode: PASSIVE, FULL, RESTART o TRUNCATE
+
+        Returns:
+            Resultado del checkpoint: busy, páginas en el WAL y páginas copiadas
+        """
+        with self.engine.connect() as conn:
+            conn.execute(text("PRAGMA optimize"))
+            busy, log_pages, checkpointed = conn.execute(
+                text(f"PRAGMA wal_checkpoint({checkpoint_mode})")
+            ).one()
+            conn.commit()
+
+        self.runs += 1
+        self.last_checkpoint = {"busy": busy, "log_pages": log_pages, "checkpointed": checkpointed}
+        return self.last_checkpoint
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                result = await run_in_threadpool(self.run_once)
+                logger.info(f"🧹 Mantenimiento SQLite: {result}")
+            except Exception as e:
+                logger.warning(f"⚠️ Falló el mantenimiento de SQLite: {e}")
+
+    def start(self) -> None:
+        """Inicia la tarea periódica en el event loop actual."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Detiene la tarea y deja el WAL vacío."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await run_in_threadpool(self.run_once, "TRUNCATE")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo hacer checkpoint final de SQLite: {e}")
@@ -1,10 +1,10 @@
-from core.database import SessionLocal, engine, Base
+from core.database import SessionLocal, init_db
 from core.security import get_password_hash
 from models.usuario import Usuario
 from models.rol import Rol
 
-# Crear todas las tablas
-Base.metadata.create_all(bind=engine)
+# Crear o migrar las tablas
+init_db()
 
 db = SessionLocal()
 
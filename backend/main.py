@@ -3,14 +3,29 @@ Archivo principal de FastAPI
 Sistema de Gestión de Planta de Tratamiento de Agua "La Esperanza"
 """
 
+import asyncio
+import time
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
 from pathlib import Path
-from core.database import engine
-from models import Base
+from core.database import (
+    engine, read_engine, async_engine, SessionLocal, AsyncSyncSession, is_sqlite, has_read_replica
+)
+from core.sqlite_tuning import SQLiteMaintenance, SQLITE_PROFILE_ENABLED
+from core.pool_metrics import instrument_pool, start_pool_controllers, stop_pool_controllers
+from core.query_counter import instrument_queries
+from core.metrics import registry as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.live_events import register_session_events
+from core.result_cache import register_cache_invalidation
 from core.logging_middleware import LoggingMiddleware, setup_logging
+from core.profiling import ProfilingMiddleware, PROFILING_ENABLED
+from core.schema import check_schema, SCHEMA_OK
+from core.readiness import readiness, database_status, LOADING, READY, UNAVAILABLE, ERROR
 from core.exceptions import (
     APIException,
     api_exception_handler,
@@ -32,7 +47,9 @@ from routers import (
     monitoreo_fisicoquimico,
     auth,
     logs,
-    ml
+    ml,
+    live,
+    diagnostico
 )
 
 # Configurar logging
@@ -55,6 +72,11 @@ app.add_exception_handler(Exception, generic_exception_handler)
 # Agregar middleware de logging
 app.add_middleware(LoggingMiddleware)
 
+# Perfilado bajo demanda (X-Profile: 1, solo administradores). Va por fuera
+# del logging para que la verificación del usuario no cuente consultas
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Configurar CORS para permitir peticiones desde Angular
 app.add_middleware(
     CORSMiddleware,
@@ -88,29 +110,146 @@ app.include_router(monitoreo_fisicoquimico.router, prefix="/api/monitoreo-fisico
 app.include_router(auth.router, prefix="/api/auth", tags=["Autenticación"])
 app.include_router(logs.router)  # Ya tiene prefix="/api/logs" en el router
 app.include_router(ml.router, prefix="/api")  # ML router (ya tiene prefix "/ml")
+app.include_router(live.router)  # Ya tiene prefix="/api/live" en el router
+app.include_router(diagnostico.router)  # Ya tiene prefix="/api/diagnostico" en el router
+
+# Métricas de los pools de conexiones (/api/diagnostico/pool)
+instrument_pool(engine, "primary")
+if has_read_replica:
+    instrument_pool(read_engine, "replica")
+instrument_pool(async_engine.sync_engine, "async")
+
+# Conteo de consultas por request (X-DB-Queries / X-DB-Time, detector N+1)
+for instrumented_engine in {engine, read_engine, async_engine.sync_engine}:
+    instrument_queries(instrumented_engine)
+
+# Publicar en el canal en vivo los registros confirmados
+# (sesiones síncronas y las internas de las sesiones async)
+register_session_events(SessionLocal)
+register_session_events(AsyncSyncSession)
+
+# Invalidar la caché de resultados al confirmar escrituras
+register_cache_invalidation(SessionLocal)
+register_cache_invalidation(AsyncSyncSession)
+
+
+def warm_up_model() -> None:
+    """
+    Carga el modelo ML y ejecuta predicciones de calentamiento.
+
+    Corre en un hilo de fondo: el worker ya acepta tráfico CRUD mientras
+    tanto y las rutas ML responden 503 hasta que termina.
+    """
+    from ml.inference.predictor_service import ChemicalConsumptionPredictor
+    from ml.utils.config_manager import get_config
+    from ml.utils.validation import ModelNotFoundError
+
+    predictor = ChemicalConsumptionPredictor()
+    start = time.perf_counter()
+    try:
+        predictor.load_model()
+    except ModelNotFoundError as e:
+        readiness.set("model", UNAVAILABLE, error=str(e))
+        logger.warning(f"⚠️  No hay modelo ML entrenado: {str(e)}")
+        logger.warning("   El sistema funcionará sin predicciones ML")
+        return
+    except Exception as e:
+        readiness.set("model", ERROR, error=f"{type(e).__name__}: {e}")
+        logger.warning(f"⚠️  No se pudo cargar el modelo ML: {str(e)}")
+        logger.warning("   El sistema funcionará sin predicciones ML")
+        return
+
+    info = {
+        "model_version": predictor.model_version,
+        "load_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
+    if get_config().get('inference.warmup.enabled', True):
+        try:
+            info.update(predictor.warm_up())
+        except Exception as e:
+            # El modelo cargó; un fallo de calentamiento no lo invalida
+            info["warmup_error"] = f"{type(e).__name__}: {e}"
+            logger.warning(f"⚠️  Falló el calentamiento del modelo: {str(e)}")
+
+    readiness.set("model", READY, **info)
+    logger.info(f"✅ Modelo ML cargado en segundo plano ({info['load_ms']:.0f} ms)")
 
 
 @app.on_event("startup")
 async def startup_event():
     """Evento que se ejecuta al iniciar la aplicación"""
-    Base.metadata.create_all(bind=engine)
+    # Una consulta a alembic_version; las migraciones se aplican con migrate.py
+    readiness.set("schema", LOADING)
+    start = time.perf_counter()
+    schema = check_schema(engine)
+    schema["check_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    if schema["result"] == SCHEMA_OK:
+        readiness.set("schema", READY, **schema)
+    else:
+        readiness.set(
+            "schema", ERROR, **schema,
+            error="Esquema desactualizado: ejecute `python migrate.py upgrade` "
+                  "(si la base se creó sin Alembic, antes `python migrate.py stamp --revision 0001`)"
+        )
+        logger.error(
+            f"❌ Revisión de esquema {schema['current']} != {schema['expected']}: "
+            f"ejecute `python migrate.py upgrade`"
+        )
+
     logger.info("="*60)
     logger.info("🚀 API Planta La Esperanza - INICIADA")
     logger.info(f"📘 Documentación: http://localhost:8000/docs")
     logger.info(f"📗 ReDoc: http://localhost:8000/redoc")
-    
-    # Cargar modelo ML si existe
-    try:
-        from ml.inference.predictor_service import ChemicalConsumptionPredictor
-        predictor = ChemicalConsumptionPredictor()
-        predictor.load_model()
-        logger.info("✅ Modelo ML cargado exitosamente")
-    except Exception as e:
-        logger.warning(f"⚠️  No se pudo cargar el modelo ML: {str(e)}")
-        logger.warning("   El sistema funcionará sin predicciones ML")
-    
     logger.info("="*60)
 
+    # Cargar modelo ML en segundo plano sin bloquear el arranque
+    readiness.set("model", LOADING)
+    app.state.model_warmup = asyncio.create_task(run_in_threadpool(warm_up_model))
+
+    # PRAGMA optimize + checkpoint del WAL periódicos
+    if is_sqlite and SQLITE_PROFILE_ENABLED:
+        app.state.sqlite_maintenance = SQLiteMaintenance(engine)
+        app.state.sqlite_maintenance.start()
+
+    # Ajuste adaptativo de max_overflow (POOL_CONTROLLER_ENABLED)
+    start_pool_controllers()
+
+    # Volcado periódico de métricas con varios workers (METRICS_MULTIPROC_DIR)
+    metrics_registry.start_flusher()
+
+    # Evaluación periódica de deriva de features (drift.schedule_seconds)
+    from ml.inference.drift_monitor import get_drift_monitor
+    get_drift_monitor().start()
+
+    # Reentrenamiento automático (optimization.auto_retrain): revisa y
+    # entrena fuera del camino de los requests; todos los workers recargan
+    # el modelo cuando cambia el puntero de producción
+    from ml.models.auto_retrain import get_auto_retrainer
+    from routers.ml import load_predictor_model
+    get_auto_retrainer().start(SessionLocal, on_promote=load_predictor_model)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Evento que se ejecuta al detener la aplicación"""
+    stop_pool_controllers()
+    metrics_registry.flush()
+
+    from ml.inference.drift_monitor import get_drift_monitor
+    get_drift_monitor().stop()
+
+    from ml.models.auto_retrain import get_auto_retrainer
+    get_auto_retrainer().stop()
+
+    maintenance = getattr(app.state, "sqlite_maintenance", None)
+    if maintenance is not None:
+        await maintenance.stop()
+
+    # aiosqlite mantiene un hilo por conexión del pool: cerrarlas para
+    # que el proceso pueda terminar
+    await async_engine.dispose()
+
 
 @app.get("/", tags=["Root"])
 async def root():
@@ -132,6 +271,50 @@ async def health_check():
     }
 
 
+@app.get("/health/live", tags=["Health"])
+async def liveness_check():
+    """Liveness: el proceso está vivo y atiende el event loop"""
+    return {
+        "status": "alive",
+        "uptime_seconds": readiness.uptime_seconds
+    }
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness: esquema verificado y base de datos alcanzable.
+
+    Reporta también el estado del modelo ML y de la réplica de lectura;
+    un modelo cargando o ausente no saca al worker de rotación (las rutas
+    CRUD siguen disponibles) y sin réplica las lecturas usan el primario.
+    """
+    database = await run_in_threadpool(database_status, engine)
+    replica = await run_in_threadpool(database_status, read_engine) if has_read_replica else None
+    schema = readiness.get("schema")
+    model = readiness.get("model")
+
+    ready = schema["status"] == READY and database["status"] == READY
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "uptime_seconds": readiness.uptime_seconds,
+            "schema": schema,
+            "database": database,
+            "database_replica": replica,
+            "model": model
+        }
+    )
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    """Métricas en formato de texto de Prometheus (todos los workers)"""
+    body = await run_in_threadpool(metrics_registry.render)
+    return Response(content=body, media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
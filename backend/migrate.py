@@ -0,0 +1,44 @@
+"""
+Migraciones de esquema de la base de datos.
+
+La API ya no crea tablas al arrancar: solo verifica que la revisión de
+la base coincida con la esperada. Este comando aplica las migraciones.
+
+Uso:
+    python migrate.py upgrade   # aplicar migraciones pendientes (base nueva o existente)
+    python migrate.py stamp --revision 0001   # base creada antes de Alembic (luego `upgrade`)
+    python migrate.py stamp     # marcar la base en head sin DDL
+    python migrate.py check     # comparar revisión actual vs esperada (código de salida 1 si difieren)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Agregar directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.database import engine
+from core.schema import check_schema, upgrade_schema, stamp_schema, SCHEMA_OK
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migraciones de esquema")
+    parser.add_argument("action", choices=["upgrade", "stamp", "check"])
+    parser.add_argument("--revision", default="head", help="Revisión destino (por defecto head)")
+    args = parser.parse_args()
+
+    print(f"Base de datos: {engine.url.render_as_string(hide_password=True)}")
+
+    if args.action == "upgrade":
+        upgrade_schema(engine, args.revision)
+    elif args.action == "stamp":
+        stamp_schema(engine, args.revision)
+
+    status = check_schema(engine)
+    print(f"Revisión actual: {status['current']} | esperada: {status['expected']} -> {status['result']}")
+    sys.exit(0 if status["result"] == SCHEMA_OK else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""Esquema inicial (tablas existentes al adoptar Alembic)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 07:15:17.099721
+
+Bases creadas antes con create_all o database_schema.sql ya tienen estas
+tablas: marcarlas con `python migrate.py stamp --revision 0001` y luego
+aplicar las revisiones siguientes con `python migrate.py upgrade`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('filtros',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('numero', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=50), nullable=False),
+    sa.Column('capacidad_maxima', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('altura_maxima', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('fecha_instalacion', sa.Date(), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=True),
+    sa.Column('ultima_limpieza', sa.Date(), nullable=True),
+    sa.Column('activo', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('numero')
+    )
+    with op.batch_alter_table('filtros', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_filtros_id'), ['id'], unique=False)
+
+    op.create_table('quimicos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('tipo', sa.String(length=50), nullable=False),
+    sa.Column('unidad_medida', sa.String(length=20), nullable=False),
+    sa.Column('peso_por_unidad', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('stock_minimo', sa.Integer(), nullable=True),
+    sa.Column('stock_actual', sa.Integer(), nullable=True),
+    sa.Column('proveedor', sa.String(length=100), nullable=True),
+    sa.Column('activo', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('codigo')
+    )
+    with op.batch_alter_table('quimicos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_quimicos_id'), ['id'], unique=False)
+
+    op.create_table('roles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codigo', sa.String(length=50), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('descripcion', sa.Text(), nullable=True),
+    sa.Column('nivel_jerarquia', sa.Integer(), nullable=False),
+    sa.Column('categoria', sa.String(length=20), nullable=False),
+    sa.Column('activo', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_roles_activo'), ['activo'], unique=False)
+        batch_op.create_index(batch_op.f('ix_roles_categoria'), ['categoria'], unique=False)
+        batch_op.create_index(batch_op.f('ix_roles_codigo'), ['codigo'], unique=True)
+        batch_op.create_index(batch_op.f('ix_roles_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_roles_nivel_jerarquia'), ['nivel_jerarquia'], unique=False)
+
+    op.create_table('usuarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(length=100), nullable=False),
+    sa.Column('apellido', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('telefono', sa.String(length=20), nullable=True),
+    sa.Column('activo', sa.Boolean(), nullable=True),
+    sa.Column('fecha_contratacion', sa.Date(), nullable=True),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('rol_id', sa.Integer(), nullable=False),
+    sa.Column('rol_antiguo', sa.String(length=20), nullable=True),
+    sa.Column('foto_perfil', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['rol_id'], ['roles.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_usuarios_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_usuarios_rol_id'), ['rol_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_usuarios_username'), ['username'], unique=True)
+
+    op.create_table('consumo_quimicos_mensual',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('mes', sa.Integer(), nullable=False),
+    sa.Column('anio', sa.Integer(), nullable=False),
+    sa.Column('sulfato_con', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('sulfato_ing', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('sulfato_guia', sa.String(length=50), nullable=True),
+    sa.Column('sulfato_re', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('cal_con', sa.Integer(), nullable=True),
+    sa.Column('cal_ing', sa.Integer(), nullable=True),
+    sa.Column('cal_guia', sa.String(length=50), nullable=True),
+    sa.Column('hipoclorito_con', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('hipoclorito_ing', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('hipoclorito_guia', sa.String(length=50), nullable=True),
+    sa.Column('cloro_gas_con', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('cloro_gas_ing_bal', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('cloro_gas_ing_bdg', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('cloro_gas_guia', sa.String(length=50), nullable=True),
+    sa.Column('cloro_gas_egre', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('produccion_m3_dia', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('inicio_mes_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('ingreso_mes_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('consumo_mes_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('egreso_mes_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('fin_mes_kg', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('mes >= 1 AND mes <= 12', name='check_mes_valido'),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('mes', 'anio', name='uq_mes_anio')
+    )
+    with op.batch_alter_table('consumo_quimicos_mensual', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_consumo_quimicos_mensual_id'), ['id'], unique=False)
+
+    op.create_table('control_cloro_libre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fecha_mes', sa.Date(), nullable=False),
+    sa.Column('documento_soporte', sa.String(length=100), nullable=True),
+    sa.Column('proveedor_solicitante', sa.String(length=100), nullable=True),
+    sa.Column('codigo', sa.String(length=50), nullable=True),
+    sa.Column('especificacion', sa.String(length=200), nullable=True),
+    sa.Column('cantidad_entra', sa.Integer(), nullable=True),
+    sa.Column('cantidad_sale', sa.Integer(), nullable=True),
+    sa.Column('cantidad_saldo', sa.Integer(), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('control_cloro_libre', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_control_cloro_libre_codigo'), ['codigo'], unique=False)
+        batch_op.create_index(batch_op.f('ix_control_cloro_libre_fecha_mes'), ['fecha_mes'], unique=False)
+        batch_op.create_index(batch_op.f('ix_control_cloro_libre_id'), ['id'], unique=False)
+
+    op.create_table('control_consumo_diario_quimicos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('quimico_id', sa.Integer(), nullable=True),
+    sa.Column('bodega_ingresa', sa.Integer(), nullable=True),
+    sa.Column('bodega_egresa', sa.Integer(), nullable=True),
+    sa.Column('bodega_stock', sa.Integer(), nullable=True),
+    sa.Column('tanque1_hora', sa.Time(), nullable=True),
+    sa.Column('tanque1_lectura_inicial', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('tanque1_lectura_final', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('tanque1_consumo', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('tanque2_hora', sa.Time(), nullable=True),
+    sa.Column('tanque2_lectura_inicial', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('tanque2_lectura_final', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('tanque2_consumo', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('total_consumo', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['quimico_id'], ['quimicos.id'], ),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('control_consumo_diario_quimicos', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_control_consumo_diario_quimicos_fecha'), ['fecha'], unique=False)
+        batch_op.create_index(batch_op.f('ix_control_consumo_diario_quimicos_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_control_consumo_diario_quimicos_quimico_id'), ['quimico_id'], unique=False)
+
+    op.create_table('control_operacion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=False),
+    sa.Column('turbedad_ac', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('turbedad_at', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('ph_ac', sa.Numeric(precision=4, scale=2), nullable=True),
+    sa.Column('ph_sulf', sa.Numeric(precision=4, scale=2), nullable=True),
+    sa.Column('ph_at', sa.Numeric(precision=4, scale=2), nullable=True),
+    sa.Column('dosis_sulfato', sa.Numeric(precision=10, scale=3), nullable=True),
+    sa.Column('dosis_cal', sa.Numeric(precision=10, scale=3), nullable=True),
+    sa.Column('dosis_floergel', sa.Numeric(precision=10, scale=3), nullable=True),
+    sa.Column('ff', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('clarificacion_is', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('clarificacion_cs', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('clarificacion_fs', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('presion_psi', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('presion_pre', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('presion_pos', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('presion_total', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('cloro_residual', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('fecha', 'hora', name='uq_fecha_hora_operacion')
+    )
+    with op.batch_alter_table('control_operacion', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_control_operacion_fecha'), ['fecha'], unique=False)
+        batch_op.create_index(batch_op.f('ix_control_operacion_hora'), ['hora'], unique=False)
+        batch_op.create_index(batch_op.f('ix_control_operacion_id'), ['id'], unique=False)
+
+    op.create_table('logs_auditoria',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('usuario_nombre', sa.String(length=200), nullable=True),
+    sa.Column('accion', sa.String(length=50), nullable=False),
+    sa.Column('entidad', sa.String(length=100), nullable=True),
+    sa.Column('entidad_id', sa.Integer(), nullable=True),
+    sa.Column('detalles', sa.Text(), nullable=True),
+    sa.Column('ip_address', sa.String(length=50), nullable=True),
+    sa.Column('user_agent', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('logs_auditoria', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_logs_auditoria_accion'), ['accion'], unique=False)
+        batch_op.create_index(batch_op.f('ix_logs_auditoria_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_logs_auditoria_entidad'), ['entidad'], unique=False)
+        batch_op.create_index(batch_op.f('ix_logs_auditoria_id'), ['id'], unique=False)
+
+    op.create_table('monitoreo_fisicoquimico',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('lugar_agua_cruda', sa.String(length=200), nullable=True),
+    sa.Column('lugar_agua_tratada', sa.String(length=200), nullable=True),
+    sa.Column('muestra_numero', sa.Integer(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=False),
+    sa.Column('ac_ph', sa.Numeric(precision=4, scale=2), nullable=True),
+    sa.Column('ac_ce', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('ac_tds', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('ac_salinidad', sa.Numeric(precision=10, scale=3), nullable=True),
+    sa.Column('ac_temperatura', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('at_ph', sa.Numeric(precision=4, scale=2), nullable=True),
+    sa.Column('at_ce', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('at_tds', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('at_salinidad', sa.Numeric(precision=10, scale=3), nullable=True),
+    sa.Column('at_temperatura', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.CheckConstraint('muestra_numero >= 1 AND muestra_numero <= 3', name='check_muestra_numero'),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('fecha', 'muestra_numero', name='uq_fecha_muestra')
+    )
+    with op.batch_alter_table('monitoreo_fisicoquimico', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_monitoreo_fisicoquimico_fecha'), ['fecha'], unique=False)
+        batch_op.create_index(batch_op.f('ix_monitoreo_fisicoquimico_id'), ['id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_monitoreo_fisicoquimico_usuario_id'), ['usuario_id'], unique=False)
+
+    op.create_table('produccion_filtros',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=False),
+    sa.Column('filtro1_h', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro1_q', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro2_h', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro2_q', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro3_h', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro3_q', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro4_h', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro4_q', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro5_h', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro5_q', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro6_h', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('filtro6_q', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('caudal_total', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('observaciones', sa.Text(), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('fecha', 'hora', name='uq_fecha_hora_produccion')
+    )
+    with op.batch_alter_table('produccion_filtros', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_produccion_filtros_fecha'), ['fecha'], unique=False)
+        batch_op.create_index(batch_op.f('ix_produccion_filtros_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('produccion_filtros', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_produccion_filtros_id'))
+        batch_op.drop_index(batch_op.f('ix_produccion_filtros_fecha'))
+
+    op.drop_table('produccion_filtros')
+    with op.batch_alter_table('monitoreo_fisicoquimico', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_monitoreo_fisicoquimico_usuario_id'))
+        batch_op.drop_index(batch_op.f('ix_monitoreo_fisicoquimico_id'))
+        batch_op.drop_index(batch_op.f('ix_monitoreo_fisicoquimico_fecha'))
+
+    op.drop_table('monitoreo_fisicoquimico')
+    with op.batch_alter_table('logs_auditoria', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_logs_auditoria_id'))
+        batch_op.drop_index(batch_op.f('ix_logs_auditoria_entidad'))
+        batch_op.drop_index(batch_op.f('ix_logs_auditoria_created_at'))
+        batch_op.drop_index(batch_op.f('ix_logs_auditoria_accion'))
+
+    op.drop_table('logs_auditoria')
+    with op.batch_alter_table('control_operacion', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_control_operacion_id'))
+        batch_op.drop_index(batch_op.f('ix_control_operacion_hora'))
+        batch_op.drop_index(batch_op.f('ix_control_operacion_fecha'))
+
+    op.drop_table('control_operacion')
+    with op.batch_alter_table('control_consumo_diario_quimicos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_control_consumo_diario_quimicos_quimico_id'))
+        batch_op.drop_index(batch_op.f('ix_control_consumo_diario_quimicos_id'))
+        batch_op.drop_index(batch_op.f('ix_control_consumo_diario_quimicos_fecha'))
+
+    op.drop_table('control_consumo_diario_quimicos')
+    with op.batch_alter_table('control_cloro_libre', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_control_cloro_libre_id'))
+        batch_op.drop_index(batch_op.f('ix_control_cloro_libre_fecha_mes'))
+        batch_op.drop_index(batch_op.f('ix_control_cloro_libre_codigo'))
+
+    op.drop_table('control_cloro_libre')
+    with op.batch_alter_table('consumo_quimicos_mensual', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_consumo_quimicos_mensual_id'))
+
+    op.drop_table('consumo_quimicos_mensual')
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_usuarios_username'))
+        batch_op.drop_index(batch_op.f('ix_usuarios_rol_id'))
+        batch_op.drop_index(batch_op.f('ix_usuarios_id'))
+
+    op.drop_table('usuarios')
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_roles_nivel_jerarquia'))
+        batch_op.drop_index(batch_op.f('ix_roles_id'))
+        batch_op.drop_index(batch_op.f('ix_roles_codigo'))
+        batch_op.drop_index(batch_op.f('ix_roles_categoria'))
+        batch_op.drop_index(batch_op.f('ix_roles_activo'))
+
+    op.drop_table('roles')
+    with op.batch_alter_table('quimicos', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quimicos_id'))
+
+    op.drop_table('quimicos')
+    with op.batch_alter_table('filtros', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_filtros_id'))
+
+    op.drop_table('filtros')
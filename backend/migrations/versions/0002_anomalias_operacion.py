@@ -0,0 +1,55 @@
+"""Anomalías de operación detectadas en línea
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:12:41.530218
+
+Tabla de la detección de anomalías en línea (EWMA) por registro de
+control de operación.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # database/create_database.sql ya crea la tabla en bases nuevas
+    if sa.inspect(op.get_bind()).has_table('anomalias_operacion'):
+        return
+
+    op.create_table('anomalias_operacion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('control_operacion_id', sa.Integer(), nullable=False),
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('hora', sa.Time(), nullable=False),
+    sa.Column('parametro', sa.String(length=50), nullable=False),
+    sa.Column('valor', sa.Float(), nullable=False),
+    sa.Column('severidad', sa.String(length=20), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('metodo', sa.String(length=20), nullable=False),
+    sa.Column('explicacion', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['control_operacion_id'], ['control_operacion.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('anomalias_operacion', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_anomalias_operacion_control_operacion_id'), ['control_operacion_id'], unique=False)
+        batch_op.create_index('ix_anomalias_operacion_fecha_hora', ['fecha', 'hora'], unique=False)
+        batch_op.create_index(batch_op.f('ix_anomalias_operacion_id'), ['id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('anomalias_operacion', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_anomalias_operacion_id'))
+        batch_op.drop_index('ix_anomalias_operacion_fecha_hora')
+        batch_op.drop_index(batch_op.f('ix_anomalias_operacion_control_operacion_id'))
+
+    op.drop_table('anomalias_operacion')
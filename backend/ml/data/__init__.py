@@ -1,7 +1,20 @@
 """Data layer package initialization."""
 
-from .repository import PlantDataRepository
-from .preprocessor import DataPreprocessor
+from importlib import import_module
+
+# Carga diferida: DataPreprocessor depende de sklearn
+_LAZY_ATTRS = {
+    "PlantDataRepository": ".repository",
+    "DataPreprocessor": ".preprocessor",
+}
+
+
+def __getattr__(name):
+    """Lazy loading de la capa de datos."""
+    if name in _LAZY_ATTRS:
+        return getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 __all__ = [
     "PlantDataRepository",
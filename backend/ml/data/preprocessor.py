@@ -5,7 +5,7 @@ Implementa limpieza, transformación y preparación de datos
 siguiendo buenas prácticas de data science.
 """
 
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict, Any
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, RobustScaler, MinMaxScaler
@@ -333,6 +333,39 @@ class DataPreprocessor:
         
         return X, y
     
+    def to_artifacts(self) -> Dict[str, Any]:
+        """
+        Artefactos a persistir, por nombre de archivo.
+        
+        Returns:
+            Diccionario archivo -> objeto (solo los componentes ajustados)
+        """
+        artifacts = {}
+        if self.scaler:
+            artifacts['scaler.pkl'] = self.scaler
+        if self.imputer:
+            artifacts['imputer.pkl'] = self.imputer
+        if self.feature_names:
+            artifacts['feature_names.pkl'] = self.feature_names
+        return artifacts
+    
+    @classmethod
+    def from_artifacts(cls, artifacts: Dict[str, Any]) -> 'DataPreprocessor':
+        """
+        Reconstruye el preprocesador desde artefactos ya cargados.
+        
+        Args:
+            artifacts: Diccionario archivo -> objeto
+            
+        Returns:
+            Instancia de DataPreprocessor
+        """
+        preprocessor = cls()
+        preprocessor.scaler = artifacts.get('scaler.pkl')
+        preprocessor.imputer = artifacts.get('imputer.pkl')
+        preprocessor.feature_names = artifacts.get('feature_names.pkl', [])
+        return preprocessor
+    
     def save(self, path: Path) -> None:
         """
         Guarda el preprocesador (scaler, imputer).
@@ -342,18 +375,9 @@ class DataPreprocessor:
         """
         path.mkdir(parents=True, exist_ok=True)
         
-        if self.scaler:
-            joblib.dump(self.scaler, path / "scaler.pkl")
-            logger.info(f"Scaler guardado en {path / 'scaler.pkl'}")
-        
-        if self.imputer:
-            joblib.dump(self.imputer, path / "imputer.pkl")
-            logger.info(f"Imputer guardado en {path / 'imputer.pkl'}")
-        
-        # Guardar feature names
-        if self.feature_names:
-            joblib.dump(self.feature_names, path / "feature_names.pkl")
-            logger.info(f"Feature names guardados")
+        for filename, obj in self.to_artifacts().items():
+            joblib.dump(obj, path / filename)
+            logger.info(f"{filename} guardado en {path}")
     
     @classmethod
     def load(cls, path: Path) -> 'DataPreprocessor':
@@ -5,10 +5,9 @@ Implementa el patrón Repository para abstraer el acceso a datos
 y permitir sustitución de la fuente de datos si es necesario.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from datetime import date, datetime, time
 from decimal import Decimal
-import pandas as pd
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, func, extract
 
@@ -17,11 +16,14 @@ from models.control_operacion import ControlOperacion
 from models.consumo_quimico_mensual import ConsumoQuimicoMensual
 from models.monitoreo_fisicoquimico import MonitoreoFisicoquimico
 from models.produccion_filtro import ProduccionFiltro
+from models.anomalia_operacion import AnomaliaOperacion
 
-from ..domain.entities import OperationalData, ChemicalConsumption
+from ..domain.entities import OperationalData, ChemicalConsumption, AnomalyResult
 from ..utils.logger import MLLogger
 from ..utils.validation import DataValidator, InsufficientDataError
 
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = MLLogger.get_training_logger()
 
@@ -53,7 +55,7 @@ class PlantDataRepository:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         limit: Optional[int] = None
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Obtiene datos de control de operación.
         
@@ -68,6 +70,8 @@ class PlantDataRepository:
         Raises:
             InsufficientDataError: Si no hay suficientes datos
         """
+        import pandas as pd
+
         logger.info(f"Obteniendo datos operativos desde {start_date} hasta {end_date}")
         
         query = self.db.query(ControlOperacion)
@@ -116,7 +120,7 @@ class PlantDataRepository:
         self,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Obtiene datos de monitoreo fisicoquímico.
         
@@ -127,6 +131,8 @@ class PlantDataRepository:
         Returns:
             DataFrame con datos fisicoquímicos
         """
+        import pandas as pd
+
         logger.info("Obteniendo datos fisicoquímicos")
         
         query = self.db.query(MonitoreoFisicoquimico)
@@ -166,7 +172,7 @@ class PlantDataRepository:
         self,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Obtiene datos de consumo mensual de químicos.
         
@@ -180,6 +186,8 @@ class PlantDataRepository:
         Raises:
             InsufficientDataError: Si no hay suficientes datos
         """
+        import pandas as pd
+
         logger.info("Obteniendo datos de consumo de químicos")
         
         query = self.db.query(ConsumoQuimicoMensual)
@@ -219,7 +227,7 @@ class PlantDataRepository:
         self,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Obtiene datos de producción de filtros.
         
@@ -230,6 +238,8 @@ class PlantDataRepository:
         Returns:
             DataFrame con datos de producción
         """
+        import pandas as pd
+
         logger.info("Obteniendo datos de producción")
         
         query = self.db.query(ProduccionFiltro)
@@ -263,7 +273,7 @@ class PlantDataRepository:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         min_samples: int = 90
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Obtiene dataset combinado para entrenamiento de modelos.
         
@@ -284,6 +294,8 @@ class PlantDataRepository:
         Raises:
             InsufficientDataError: Si no hay suficientes datos
         """
+        import pandas as pd
+
         logger.info("Construyendo dataset combinado para ML")
         
         # 1. Obtener datos operativos (base)
@@ -373,3 +385,185 @@ class PlantDataRepository:
         }
         
         return stats
+
+    def count_operational_records(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """
+        Cuenta registros de control de operación en un rango (usa índice por fecha).
+        
+        Args:
+            start_date: Fecha de inicio
+            end_date: Fecha de fin
+            
+        Returns:
+            Número de registros
+        """
+        query = self.db.query(func.count(ControlOperacion.id))
+        
+        if start_date:
+            query = query.filter(ControlOperacion.fecha >= start_date)
+        if end_date:
+            query = query.filter(ControlOperacion.fecha <= end_date)
+        
+        return query.scalar() or 0
+    
+    def get_recent_operational_records(
+        self,
+        limit: int,
+        exclude_id: Optional[int] = None,
+        before_date: Optional[date] = None
+    ) -> List[ControlOperacion]:
+        """
+        Obtiene los últimos N registros de control de operación en orden cronológico.
+        
+        Args:
+            limit: Número de registros
+            exclude_id: ID de registro a excluir (opcional)
+            before_date: Solo registros anteriores a esta fecha (opcional)
+            
+        Returns:
+            Lista de registros, del más antiguo al más reciente
+        """
+        query = self.db.query(ControlOperacion)
+        
+        if exclude_id is not None:
+            query = query.filter(ControlOperacion.id != exclude_id)
+        if before_date:
+            query = query.filter(ControlOperacion.fecha < before_date)
+        
+        records = query.order_by(
+            ControlOperacion.fecha.desc(),
+            ControlOperacion.hora.desc()
+        ).limit(limit).all()
+        
+        return list(reversed(records))
+    
+    def iter_operational_records(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        batch_size: int = 1000
+    ):
+        """
+        Itera registros de control de operación en orden cronológico por lotes.
+        
+        Args:
+            start_date: Fecha de inicio
+            end_date: Fecha de fin
+            batch_size: Tamaño de lote para la consulta
+            
+        Yields:
+            Registros ControlOperacion
+        """
+        query = self.db.query(ControlOperacion)
+        
+        if start_date:
+            query = query.filter(ControlOperacion.fecha >= start_date)
+        if end_date:
+            query = query.filter(ControlOperacion.fecha <= end_date)
+        
+        query = query.order_by(ControlOperacion.fecha, ControlOperacion.hora)
+        
+        yield from query.yield_per(batch_size)
+    
+    def replace_anomalies(
+        self,
+        control_operacion_id: int,
+        anomalies: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Reemplaza las anomalías almacenadas de un registro de control de operación.
+        
+        Args:
+            control_operacion_id: ID del registro puntuado
+            anomalies: Diccionarios con columnas de AnomaliaOperacion
+        """
+        self.delete_anomalies(control_operacion_id)
+        self.add_anomalies(control_operacion_id, anomalies)
+        self.db.commit()
+    
+    def add_anomalies(
+        self,
+        control_operacion_id: int,
+        anomalies: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Agrega anomalías de un registro a la sesión (sin commit).
+        
+        Args:
+            control_operacion_id: ID del registro puntuado
+            anomalies: Diccionarios con columnas de AnomaliaOperacion
+        """
+        for anomaly in anomalies:
+            self.db.add(AnomaliaOperacion(
+                control_operacion_id=control_operacion_id,
+                **anomaly
+            ))
+    
+    def delete_anomalies(
+        self,
+        control_operacion_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """
+        Elimina anomalías almacenadas por registro o por rango de fechas.
+        
+        Args:
+            control_operacion_id: ID del registro (opcional)
+            start_date: Fecha de inicio (opcional)
+            end_date: Fecha de fin (opcional)
+            
+        Returns:
+            Número de anomalías eliminadas
+        """
+        query = self.db.query(AnomaliaOperacion)
+        
+        if control_operacion_id is not None:
+            query = query.filter(AnomaliaOperacion.control_operacion_id == control_operacion_id)
+        if start_date:
+            query = query.filter(AnomaliaOperacion.fecha >= start_date)
+        if end_date:
+            query = query.filter(AnomaliaOperacion.fecha <= end_date)
+        
+        return query.delete(synchronize_session=False)
+    
+    def get_stored_anomalies(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> List[AnomalyResult]:
+        """
+        Lee anomalías almacenadas por el detector en línea (lectura por índice fecha/hora).
+        
+        Args:
+            start_date: Fecha de inicio
+            end_date: Fecha de fin
+            
+        Returns:
+            Lista de AnomalyResult ordenada cronológicamente
+        """
+        rows = self.db.query(AnomaliaOperacion).filter(
+            AnomaliaOperacion.fecha >= start_date,
+            AnomaliaOperacion.fecha <= end_date
+        ).order_by(
+            AnomaliaOperacion.fecha,
+            AnomaliaOperacion.hora
+        ).all()
+        
+        return [
+            AnomalyResult(
+                fecha=row.fecha,
+                hora=row.hora,
+                parametro=row.parametro,
+                valor=row.valor,
+                es_anomalia=True,
+                severidad=row.severidad,
+                anomaly_score=row.score,
+                explicacion=row.explicacion
+            )
+            for row in rows
+        ]
@@ -7,7 +7,7 @@ con sus reglas y validaciones.
 
 from dataclasses import dataclass, field
 from datetime import date, time
-from typing import Optional
+from typing import Dict, Optional
 from decimal import Decimal
 
 
@@ -167,6 +167,7 @@ class PredictionResult:
     confidence_score: float = field(default=0.0)  # 0-1
     model_name: str = field(default="unknown")
     prediction_date: date = field(default_factory=date.today)
+    model_version: Optional[str] = None  # Directorio del modelo en el registro
     
     # Intervalos de confianza (opcional)
     sulfato_lower: Optional[float] = None
@@ -174,6 +175,10 @@ class PredictionResult:
     cal_lower: Optional[float] = None
     cal_upper: Optional[float] = None
     
+    # Duración de cada etapa de la predicción en ms
+    # (validation, features, scaling, model, total)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    
     @property
     def estimated_cost(self) -> float:
         """Costo estimado total basado en predicciones."""
@@ -193,6 +198,7 @@ class PredictionResult:
             'cloro_gas_kg': self.cloro_gas_predicho,
             'confidence': self.confidence_score,
             'model': self.model_name,
+            'model_version': self.model_version,
             'estimated_cost_usd': self.estimated_cost,
             'prediction_date': self.prediction_date.isoformat()
         }
@@ -1,9 +1,36 @@
 """Inference services package initialization."""
 
-from .predictor_service import ChemicalConsumptionPredictor
-from .anomaly_service import AnomalyDetectorService
+from importlib import import_module
+
+# Carga diferida: importar el paquete no debe arrastrar sklearn/xgboost/lightgbm
+_LAZY_ATTRS = {
+    "ChemicalConsumptionPredictor": ".predictor_service",
+    "AnomalyDetectorService": ".anomaly_service",
+    "OnlineAnomalyDetector": ".online_anomaly_service",
+    "get_online_detector": ".online_anomaly_service",
+    "ModelBundle": ".model_pool",
+    "ModelPool": ".model_pool",
+    "get_model_pool": ".model_pool",
+    "ShadowScorer": ".shadow_service",
+    "get_shadow_scorer": ".shadow_service",
+}
+
+
+def __getattr__(name):
+    """Lazy loading de servicios de inferencia."""
+    if name in _LAZY_ATTRS:
+        return getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 __all__ = [
     "ChemicalConsumptionPredictor",
     "AnomalyDetectorService",
+    "OnlineAnomalyDetector",
+    "get_online_detector",
+    "ModelBundle",
+    "ModelPool",
+    "get_model_pool",
+    "ShadowScorer",
+    "get_shadow_scorer",
 ]
@@ -6,6 +6,10 @@ Identifica valores anormales que pueden indicar problemas en el proceso.
 
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest
@@ -21,6 +25,37 @@ from ..utils.validation import DataValidator
 logger = MLLogger.get_anomaly_logger()
 config = get_config()
 
+# Detector de solo lectura de cada proceso del pool (se recibe una vez por proceso)
+_worker_service: Optional['AnomalyDetectorService'] = None
+
+
+def default_detector_dir() -> Path:
+    """Directorio del detector que entrena /ml/train (`anomaly_detection.model.dir`)."""
+    return Path(config.get(
+        'anomaly_detection.model.dir',
+        str(config.models_dir / 'anomaly_detector')
+    ))
+
+
+def _init_worker(state: Dict[str, Any]) -> None:
+    """Inicializa un proceso del pool con el detector entrenado."""
+    global _worker_service
+    _worker_service = AnomalyDetectorService._from_state(state)
+
+
+def _analyze_chunk(
+    chunk: pd.DataFrame,
+    use_thresholds: bool,
+    fill_values: Optional[pd.Series]
+) -> pd.DataFrame:
+    """Analiza un bloque de fechas dentro de un proceso del pool."""
+    return _worker_service._analyze_frame(
+        chunk,
+        use_model=True,
+        use_thresholds=use_thresholds,
+        fill_values=fill_values
+    )
+
 
 class AnomalyDetectorService:
     """
@@ -39,8 +74,11 @@ class AnomalyDetectorService:
         self.detector: Optional[IsolationForest] = None
         self.scaler: Optional[StandardScaler] = None
         self.feature_columns: List[str] = []
+        self.fill_values: Optional[pd.Series] = None
         self.thresholds: Dict[str, Dict] = {}
         self._is_trained = False
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
         
         #Cargar umbrales de configuración
         self._load_thresholds()
@@ -64,6 +102,9 @@ class AnomalyDetectorService:
         """
         logger.info("Entrenando detector de anomalías")
         
+        # El pool tiene una copia del detector anterior
+        self.shutdown_pool()
+        
         # Seleccionar columnas relevantes
         self.feature_columns = [
             'turbedad_ac', 'turbedad_at', 'ph_ac', 'ph_at',
@@ -81,8 +122,9 @@ class AnomalyDetectorService:
         # Preparar datos
         X = df[self.feature_columns].copy()
         
-        # Manejar valores faltantes
-        X = X.fillna(X.median())
+        # Manejar valores faltantes (las medianas se conservan para inferencia)
+        self.fill_values = X.median()
+        X = X.fillna(self.fill_values)
         
         # Escalar features
         self.scaler = StandardScaler()
@@ -122,6 +164,47 @@ class AnomalyDetectorService:
         """
         logger.info(f"Analizando anomalías en {len(df)} registros")
         
+        model_active = use_model and self._is_trained
+        
+        # Valores de imputación fijos: el resultado no depende de cómo se
+        # divida el rango en bloques
+        fill_values = self._compute_fill_values(df) if model_active else None
+        
+        df_result = None
+        if model_active and self._should_parallelize(df):
+            try:
+                df_result = self._detect_parallel(df, use_thresholds, fill_values)
+            except Exception as e:
+                logger.warning(f"Análisis paralelo falló, se continúa en un proceso: {e}")
+                self.shutdown_pool()
+        
+        if df_result is None:
+            df_result = self._analyze_frame(df, use_model, use_thresholds, fill_values)
+        
+        anomaly_count = df_result['is_anomaly'].sum()
+        logger.info(f"Anomalías detectadas: {anomaly_count} ({anomaly_count/len(df)*100:.1f}%)")
+        
+        return df_result
+    
+    def _analyze_frame(
+        self,
+        df: pd.DataFrame,
+        use_model: bool = True,
+        use_thresholds: bool = True,
+        fill_values: Optional[pd.Series] = None
+    ) -> pd.DataFrame:
+        """
+        Pipeline de detección sobre un DataFrame (completo o un bloque).
+        
+        Args:
+            df: DataFrame con datos a analizar
+            use_model: Usar modelo ML para detección
+            use_thresholds: Usar umbrales definidos
+            fill_values: Valores para imputar faltantes (opcional)
+            
+        Returns:
+            DataFrame con columnas adicionales de detección
+        """
         df_result = df.copy()
         df_result['is_anomaly'] = False
         df_result['anomaly_score'] = 0.0
@@ -130,7 +213,7 @@ class AnomalyDetectorService:
         
         # Detección basada en modelo ML
         if use_model and self._is_trained:
-            df_result = self._detect_with_model(df_result)
+            df_result = self._detect_with_model(df_result, fill_values)
         
         # Detección basada en umbrales
         if use_thresholds:
@@ -139,17 +222,146 @@ class AnomalyDetectorService:
         # Clasificar severidad
         df_result = self._classify_severity(df_result)
         
-        anomaly_count = df_result['is_anomaly'].sum()
-        logger.info(f"Anomalías detectadas: {anomaly_count} ({anomaly_count/len(df)*100:.1f}%)")
-        
         return df_result
     
-    def _detect_with_model(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _compute_fill_values(self, df: pd.DataFrame) -> Optional[pd.Series]:
+        """
+        Valores para imputar faltantes.
+        
+        Usa las medianas de entrenamiento; los detectores guardados antes de
+        conservarlas usan las medianas del rango analizado.
+        """
+        if self.fill_values is not None:
+            return self.fill_values
+        available_cols = [col for col in self.feature_columns if col in df.columns]
+        if not available_cols:
+            return None
+        return df[available_cols].median()
+    
+    def _should_parallelize(self, df: pd.DataFrame) -> bool:
+        """Decide si el rango es suficientemente largo para el pool de procesos."""
+        if not config.get('anomaly_detection.parallel.enabled', True):
+            return False
+        # Con un solo núcleo el pool solo agrega costo de serialización
+        if (os.cpu_count() or 1) < 2:
+            return False
+        return len(df) >= config.get('anomaly_detection.parallel.min_rows', 5000)
+    
+    def _split_by_date(self, df: pd.DataFrame) -> List[pd.DataFrame]:
+        """
+        Divide el DataFrame en bloques contiguos de fechas.
+        
+        Args:
+            df: DataFrame con columna 'fecha' (si no existe, bloques por filas)
+            
+        Returns:
+            Lista de bloques en orden cronológico
+        """
+        chunk_days = config.get('anomaly_detection.parallel.chunk_days', 30)
+        
+        if 'fecha' in df.columns:
+            fechas = pd.to_datetime(df['fecha'])
+            keys = ((fechas - fechas.min()).dt.days // chunk_days).to_numpy()
+        else:
+            rows_per_chunk = config.get('anomaly_detection.parallel.min_rows', 5000)
+            keys = np.arange(len(df)) // rows_per_chunk
+        
+        return [chunk for _, chunk in df.groupby(keys, sort=True)]
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Obtiene el pool de procesos, creándolo con el detector actual.
+        
+        El detector, scaler y umbrales se envían una sola vez a cada proceso
+        (initializer) y se reutilizan en todas las consultas.
+        """
+        with self._pool_lock:
+            if self._pool is None:
+                max_workers = config.get('anomaly_detection.parallel.max_workers')
+                start_method = config.get('anomaly_detection.parallel.start_method', 'spawn')
+                
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context(start_method),
+                    initializer=_init_worker,
+                    initargs=(self._export_state(),)
+                )
+                logger.info(f"Pool de análisis iniciado ({start_method}, workers={self._pool._max_workers})")
+            return self._pool
+    
+    def shutdown_pool(self) -> None:
+        """Detiene el pool de procesos (se recrea bajo demanda)."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+    
+    def _detect_parallel(
+        self,
+        df: pd.DataFrame,
+        use_thresholds: bool,
+        fill_values: Optional[pd.Series]
+    ) -> pd.DataFrame:
+        """
+        Analiza un rango largo por bloques de fechas en el pool de procesos.
+        
+        Args:
+            df: DataFrame con datos a analizar
+            use_thresholds: Usar umbrales definidos
+            fill_values: Valores de imputación del rango completo
+            
+        Returns:
+            DataFrame con detecciones, en el mismo orden que la entrada
+        """
+        chunks = self._split_by_date(df)
+        
+        if len(chunks) < 2:
+            return self._analyze_frame(df, True, use_thresholds, fill_values)
+        
+        pool = self._get_pool()
+        logger.info(f"Análisis paralelo: {len(chunks)} bloques")
+        
+        futures = [
+            pool.submit(_analyze_chunk, chunk, use_thresholds, fill_values)
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+        
+        return pd.concat(results).loc[df.index]
+    
+    def _export_state(self) -> Dict[str, Any]:
+        """Estado de solo lectura necesario para puntuar en otro proceso."""
+        return {
+            'detector': self.detector,
+            'scaler': self.scaler,
+            'feature_columns': self.feature_columns,
+            'fill_values': self.fill_values,
+            'thresholds': self.thresholds,
+        }
+    
+    @classmethod
+    def _from_state(cls, state: Dict[str, Any]) -> 'AnomalyDetectorService':
+        """Reconstruye un detector entrenado a partir de `_export_state`."""
+        service = cls()
+        service.detector = state['detector']
+        service.scaler = state['scaler']
+        service.feature_columns = state['feature_columns']
+        service.fill_values = state['fill_values']
+        service.thresholds = state['thresholds']
+        service._is_trained = True
+        return service
+    
+    def _detect_with_model(
+        self,
+        df: pd.DataFrame,
+        fill_values: Optional[pd.Series] = None
+    ) -> pd.DataFrame:
         """
         Detecta anomalías usando Isolation Forest.
         
         Args:
             df: DataFrame con datos
+            fill_values: Valores para imputar faltantes (por defecto, los de entrenamiento)
             
         Returns:
             DataFrame con detecciones del modelo
@@ -165,17 +377,19 @@ class AnomalyDetectorService:
             return df
         
         X = df[available_cols].copy()
-        X = X.fillna(X.median())
+        if fill_values is None:
+            fill_values = self._compute_fill_values(df)
+        X = X.fillna(fill_values)
         
         try:
             X_scaled = self.scaler.transform(X)
             
-            # Predecir (-1 = anomalía, 1 = normal)
-            predictions = self.detector.predict(X_scaled)
+            # Un solo recorrido de los árboles: predict() equivale a
+            # score_samples(X) - offset_ < 0
             scores = self.detector.score_samples(X_scaled)
             
             # Marcar anomalías
-            is_anomaly_model = predictions == -1
+            is_anomaly_model = scores < self.detector.offset_
             df.loc[is_anomaly_model, 'is_anomaly'] = True
             df['anomaly_score'] = scores
             
@@ -257,7 +471,9 @@ class AnomalyDetectorService:
         self,
         df: pd.DataFrame,
         fecha_column: str = 'fecha',
-        hora_column: str = 'hora'
+        hora_column: str = 'hora',
+        use_model: bool = True,
+        use_thresholds: bool = True
     ) -> List[AnomalyResult]:
         """
         Analiza datos operativos y genera lista de anomalías.
@@ -266,6 +482,8 @@ class AnomalyDetectorService:
             df: DataFrame con datos operativos
             fecha_column: Nombre de columna de fecha
             hora_column: Nombre de columna de hora
+            use_model: Usar modelo ML para detección
+            use_thresholds: Usar umbrales definidos
             
         Returns:
             Lista de AnomalyResult
@@ -273,7 +491,7 @@ class AnomalyDetectorService:
         logger.info("Analizando datos operativos para anomalías")
         
         # Detectar anomalías
-        df_analyzed = self.detect_anomalies(df)
+        df_analyzed = self.detect_anomalies(df, use_model=use_model, use_thresholds=use_thresholds)
         
         # Filtrar solo anomalías
         df_anomalies = df_analyzed[df_analyzed['is_anomaly']].copy()
@@ -327,9 +545,17 @@ class AnomalyDetectorService:
         
         path.mkdir(parents=True, exist_ok=True)
         
-        joblib.dump(self.detector, path / "anomaly_detector.pkl")
-        joblib.dump(self.scaler, path / "anomaly_scaler.pkl")
-        joblib.dump(self.feature_columns, path / "anomaly_features.pkl")
+        # Cada archivo se reemplaza completo y el detector va al final: quien
+        # recarga al cambiar anomaly_detector.pkl ya encuentra el resto
+        for name, obj in (
+            ("anomaly_scaler.pkl", self.scaler),
+            ("anomaly_features.pkl", self.feature_columns),
+            ("anomaly_fill_values.pkl", self.fill_values),
+            ("anomaly_detector.pkl", self.detector),
+        ):
+            tmp = path / f".{name}.tmp"
+            joblib.dump(obj, tmp)
+            os.replace(tmp, path / name)
         
         logger.info(f"Detector guardado en {path}")
     
@@ -351,6 +577,11 @@ class AnomalyDetectorService:
             service.detector = joblib.load(detector_file)
             service.scaler = joblib.load(path / "anomaly_scaler.pkl")
             service.feature_columns = joblib.load(path / "anomaly_features.pkl")
+            
+            fill_values_file = path / "anomaly_fill_values.pkl"
+            if fill_values_file.exists():
+                service.fill_values = joblib.load(fill_values_file)
+            
             service._is_trained = True
             logger.info("Detector cargado")
         
@@ -0,0 +1,357 @@
+"""
+Monitoreo de deriva de features.
+
+Al entrenar se guardan, por feature, los bordes de bins (cuantiles) y los
+conteos de la matriz de entrenamiento. En producción se mantienen
+histogramas vivos con las últimas observaciones de cada fuente (entradas
+de /ml/predict y lecturas de control de operación) y se comparan con la
+referencia calculando PSI y KS de todas las features en una sola pasada
+vectorizada sobre matrices (features x bins).
+"""
+
+from typing import Dict, Any, Optional, List, TYPE_CHECKING
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+import threading
+
+import numpy as np
+
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = MLLogger.get_inference_logger()
+config = get_config()
+
+SOURCES = ('predicciones', 'lecturas')
+
+# Evita log(0) en bins vacíos
+_EPSILON = 1e-6
+
+
+def build_reference_histograms(X: "pd.DataFrame", bins: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Calcula los histogramas de referencia de la matriz de entrenamiento.
+
+    Los bordes internos son cuantiles de cada feature (bins de igual
+    frecuencia); los extremos son abiertos, así que valores fuera del
+    rango de entrenamiento caen en el primer o último bin.
+
+    Args:
+        X: Matriz de features en unidades originales (sin escalar)
+        bins: Bins por feature (drift.bins)
+
+    Returns:
+        Diccionario serializable con features, bordes internos, conteos y muestras
+    """
+    bins = bins or config.get('drift.bins', 10)
+    values = X.to_numpy(dtype=float)
+
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    inner_edges = np.nanquantile(values, quantiles, axis=0).T  # (features, bins - 1)
+    inner_edges = np.nan_to_num(inner_edges)
+
+    counts = np.zeros((values.shape[1], bins), dtype=np.int64)
+    _accumulate(counts, _bin_indices(values, inner_edges), 1)
+
+    return {
+        'features': list(X.columns),
+        'inner_edges': inner_edges.tolist(),
+        'counts': counts.tolist(),
+        'n_samples': int(len(values)),
+    }
+
+
+def _bin_indices(values: np.ndarray, inner_edges: np.ndarray) -> np.ndarray:
+    """
+    Bin de cada valor, vectorizado sobre filas y features.
+
+    Args:
+        values: Matriz (filas, features)
+        inner_edges: Bordes internos (features, bins - 1)
+
+    Returns:
+        Matriz (filas, features) con el índice de bin; -1 para NaN
+    """
+    indices = (values[:, :, None] >= inner_edges[None, :, :]).sum(axis=2)
+    indices[np.isnan(values)] = -1
+    return indices
+
+
+def _accumulate(counts: np.ndarray, indices: np.ndarray, sign: int) -> None:
+    """Suma (o resta) las filas de índices de bin a la matriz de conteos."""
+    rows, features = np.nonzero(indices >= 0)
+    np.add.at(counts, (features, indices[rows, features]), sign)
+
+
+def drift_statistics(reference: np.ndarray, live: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    PSI y KS (sobre bins) de todas las features en una pasada.
+
+    Args:
+        reference: Conteos de referencia (features, bins)
+        live: Conteos vivos (features, bins)
+
+    Returns:
+        Diccionario con arreglos psi, ks y muestras por feature
+    """
+    samples = live.sum(axis=1)
+    p = reference / np.maximum(reference.sum(axis=1, keepdims=True), 1)
+    q = live / np.maximum(samples[:, None], 1)
+
+    p_smooth = np.maximum(p, _EPSILON)
+    q_smooth = np.maximum(q, _EPSILON)
+    psi = ((q_smooth - p_smooth) * np.log(q_smooth / p_smooth)).sum(axis=1)
+    ks = np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)).max(axis=1)
+
+    return {'psi': psi, 'ks': ks, 'samples': samples}
+
+
+class _LiveWindow:
+    """Histograma de las últimas `size` observaciones de una fuente."""
+
+    def __init__(self, features: int, bins: int, size: int):
+        self.counts = np.zeros((features, bins), dtype=np.int64)
+        self.rows: deque = deque()
+        self.size = size
+        self.total = 0
+
+    def add(self, indices: np.ndarray) -> None:
+        """Agrega filas de índices de bin y descarta las más antiguas (O(features) por fila)."""
+        _accumulate(self.counts, indices, 1)
+        self.rows.extend(indices)
+        self.total += len(indices)
+
+        overflow = len(self.rows) - self.size
+        if overflow > 0:
+            oldest = np.array([self.rows.popleft() for _ in range(overflow)])
+            _accumulate(self.counts, oldest, -1)
+
+
+class DriftMonitor:
+    """
+    Compara la distribución reciente de las features con la de entrenamiento.
+
+    - Referencia: `feature_histograms` del metadata del modelo en producción
+    - Ventana: últimas `window_size` observaciones por fuente
+    - Estado por feature: ok / advertencia / alerta según los umbrales de
+      PSI y KS de `drift.thresholds`
+    """
+
+    def __init__(self):
+        """Inicializa el monitor con la configuración de `drift`."""
+        self.enabled = config.get('drift.enabled', True)
+        self.window_size = config.get('drift.window_size', 5000)
+        self.min_samples = config.get('drift.min_samples', 100)
+        self.schedule_seconds = config.get('drift.schedule_seconds', 60)
+        self.thresholds: Dict[str, float] = config.get('drift.thresholds', {})
+
+        self.model_version: Optional[str] = None
+        self.features: List[str] = []
+        self._inner_edges: Optional[np.ndarray] = None
+        self._reference: Optional[np.ndarray] = None
+        self._windows: Dict[str, _LiveWindow] = {}
+        self._lock = threading.Lock()
+        self._last_report: Optional[Dict[str, Any]] = None
+        self._alerting: Dict[str, List[str]] = {}
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def has_reference(self) -> bool:
+        return self._reference is not None
+
+    def set_reference(self, histograms: Optional[Dict[str, Any]], model_version: Optional[str] = None) -> None:
+        """
+        Cambia la referencia (al cargar un modelo) y reinicia las ventanas.
+
+        Args:
+            histograms: `feature_histograms` del metadata (None si el modelo no los tiene)
+            model_version: Versión del modelo de referencia
+        """
+        with self._lock:
+            self.model_version = model_version
+            self._windows = {}
+            self._last_report = None
+            self._alerting = {}
+
+            if not histograms:
+                self.features = []
+                self._inner_edges = None
+                self._reference = None
+                logger.warning(
+                    f"Modelo {model_version} sin histogramas de entrenamiento: "
+                    f"deriva no disponible hasta reentrenar"
+                )
+                return
+
+            self.features = list(histograms['features'])
+            self._inner_edges = np.asarray(histograms['inner_edges'], dtype=float)
+            self._reference = np.asarray(histograms['counts'], dtype=np.int64)
+            bins = self._reference.shape[1]
+            self._windows = {
+                source: _LiveWindow(len(self.features), bins, self.window_size)
+                for source in SOURCES
+            }
+
+    def observe(self, rows: "pd.DataFrame", source: str = 'predicciones') -> None:
+        """
+        Incorpora observaciones a la ventana de una fuente.
+
+        Las columnas que no son features del modelo se ignoran y las
+        features ausentes cuentan como faltantes (NaN).
+
+        Args:
+            rows: Filas con columnas de features en unidades originales
+            source: 'predicciones' o 'lecturas'
+        """
+        if not self.enabled or self._reference is None:
+            return
+
+        # Las predicciones ya llegan con las columnas del modelo, en orden
+        if list(rows.columns) != self.features:
+            rows = rows.reindex(columns=self.features)
+        values = rows.to_numpy(dtype=float)
+
+        with self._lock:
+            if self._inner_edges is None:
+                return
+            self._windows[source].add(_bin_indices(values, self._inner_edges))
+
+    def observe_record(self, record: Any) -> None:
+        """
+        Incorpora una lectura de control de operación.
+
+        Solo cuentan las features que existen como columnas del registro
+        (las derivadas por feature engineering quedan fuera).
+
+        Args:
+            record: Instancia ORM de ControlOperacion
+        """
+        import pandas as pd
+
+        if not self.enabled or self._reference is None:
+            return
+        reading = {
+            name: getattr(record, name)
+            for name in self.features
+            if getattr(record, name, None) is not None
+        }
+        if reading:
+            self.observe(pd.DataFrame([reading], dtype=float), source='lecturas')
+
+    def _status(self, psi: float, ks: float) -> str:
+        if psi >= self.thresholds.get('psi_alert', 0.25) or ks >= self.thresholds.get('ks_alert', 0.2):
+            return 'alerta'
+        if psi >= self.thresholds.get('psi_warning', 0.1) or ks >= self.thresholds.get('ks_warning', 0.1):
+            return 'advertencia'
+        return 'ok'
+
+    def evaluate(self) -> Dict[str, Any]:
+        """
+        Calcula PSI y KS de todas las features y fuentes.
+
+        Returns:
+            Diccionario con la versión de referencia y, por fuente, las
+            observaciones, el estado global y las métricas por feature
+        """
+        report: Dict[str, Any] = {
+            'timestamp': datetime.now().isoformat(),
+            'model_version': self.model_version,
+            'thresholds': self.thresholds,
+            'min_samples': self.min_samples,
+        }
+
+        with self._lock:
+            if self._reference is None:
+                report['status'] = 'sin_referencia'
+                report['sources'] = {}
+                return report
+            reference = self._reference
+            windows = {
+                source: (window.counts.copy(), window.total, len(window.rows))
+                for source, window in self._windows.items()
+            }
+
+        sources = {}
+        for source, (live, total, window_rows) in windows.items():
+            stats = drift_statistics(reference, live)
+            features = {}
+            for i, name in enumerate(self.features):
+                samples = int(stats['samples'][i])
+                if samples < self.min_samples:
+                    continue
+                features[name] = {
+                    'psi': round(float(stats['psi'][i]), 4),
+                    'ks': round(float(stats['ks'][i]), 4),
+                    'samples': samples,
+                    'status': self._status(stats['psi'][i], stats['ks'][i]),
+                }
+
+            statuses = [f['status'] for f in features.values()]
+            sources[source] = {
+                'observations': total,
+                'window': window_rows,
+                'status': (
+                    'insuficiente' if not features
+                    else 'alerta' if 'alerta' in statuses
+                    else 'advertencia' if 'advertencia' in statuses
+                    else 'ok'
+                ),
+                'features': features,
+            }
+
+        report['sources'] = sources
+        self._last_report = report
+        self._log_alerts(sources)
+        return report
+
+    def _log_alerts(self, sources: Dict[str, Any]) -> None:
+        """Registra las features que entran en alerta (una vez por cambio)."""
+        for source, data in sources.items():
+            alerting = sorted(name for name, f in data['features'].items() if f['status'] == 'alerta')
+            if alerting and alerting != self._alerting.get(source):
+                logger.warning(f"Deriva en {source} (modelo {self.model_version}): {', '.join(alerting)}")
+            self._alerting[source] = alerting
+
+    @property
+    def last_report(self) -> Optional[Dict[str, Any]]:
+        """Último reporte calculado (bajo demanda o por el programador)."""
+        return self._last_report
+
+    def start(self) -> None:
+        """Evalúa la deriva cada `schedule_seconds` en un hilo de fondo (0 = desactivado)."""
+        if not self.enabled or not self.schedule_seconds or self._scheduler is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(self.schedule_seconds):
+                try:
+                    self.evaluate()
+                except Exception as e:
+                    logger.error(f"Error evaluando deriva: {e}")
+
+        self._stop.clear()
+        self._scheduler = threading.Thread(target=loop, name="drift-monitor", daemon=True)
+        self._scheduler.start()
+
+    def stop(self) -> None:
+        """Detiene la evaluación periódica."""
+        self._stop.set()
+        if self._scheduler is not None:
+            self._scheduler.join()
+            self._scheduler = None
+
+
+@lru_cache(maxsize=1)
+def get_drift_monitor() -> DriftMonitor:
+    """
+    Factory function para obtener el monitor de deriva compartido.
+
+    Returns:
+        Instancia de DriftMonitor
+    """
+    return DriftMonitor()
@@ -0,0 +1,161 @@
+"""
+Pool de modelos cargados en memoria.
+
+Permite atender predicciones con versiones distintas del modelo (por
+ejemplo, el de producción y un candidato recién entrenado) sin recargar
+artefactos en cada request.
+"""
+
+from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+import threading
+
+from ..models.model_manager import ModelManager
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+from ..utils.validation import ModelNotFoundError
+
+logger = MLLogger.get_inference_logger()
+config = get_config()
+
+
+@dataclass
+class ModelBundle:
+    """Modelo cargado con su preprocesador y metadata."""
+
+    version: str
+    model: Any
+    preprocessor: Any
+    metadata: Dict[str, Any]
+    path: Optional[Path] = None
+    feature_names: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.feature_names:
+            self.feature_names = self.metadata.get('feature_names', [])
+
+
+class ModelPool:
+    """
+    Pool LRU acotado de modelos cargados, indexado por versión.
+
+    La versión es el nombre de directorio del modelo en el registro
+    (por ejemplo `model_xgboost_20260301_120000`). Cargas concurrentes de
+    la misma versión esperan a una sola lectura de disco.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, models_dir: Optional[Path] = None):
+        """
+        Inicializa el pool.
+
+        Args:
+            max_size: Máximo de modelos en memoria (inference.model_pool.max_size)
+            models_dir: Directorio raíz de modelos (opcional)
+        """
+        self.max_size = max_size or config.get('inference.model_pool.max_size', 3)
+        self.models_dir = models_dir
+        self._bundles: "OrderedDict[str, ModelBundle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+
+    def get(self, version: str) -> ModelBundle:
+        """
+        Obtiene un modelo del pool, cargándolo si no está en memoria.
+
+        Args:
+            version: Nombre de directorio del modelo
+
+        Returns:
+            ModelBundle cargado
+
+        Raises:
+            ModelNotFoundError: Si la versión no existe
+        """
+        with self._lock:
+            bundle = self._bundles.get(version)
+            if bundle is not None:
+                self._bundles.move_to_end(version)
+                return bundle
+            version_lock = self._loading.setdefault(version, threading.Lock())
+
+        with version_lock:
+            # Otro hilo pudo haberlo cargado mientras se esperaba
+            with self._lock:
+                bundle = self._bundles.get(version)
+                if bundle is not None:
+                    self._bundles.move_to_end(version)
+                    return bundle
+
+            try:
+                bundle = self._load(version)
+            except Exception:
+                # Versiones inexistentes no acumulan locks
+                with self._lock:
+                    self._loading.pop(version, None)
+                raise
+
+            # Mismo bloque: un hilo que llegue después encuentra el modelo, no un lock nuevo
+            with self._lock:
+                self._loading.pop(version, None)
+                self._bundles[version] = bundle
+                self._bundles.move_to_end(version)
+                while len(self._bundles) > self.max_size:
+                    evicted, _ = self._bundles.popitem(last=False)
+                    logger.info(f"Modelo liberado del pool: {evicted}")
+
+        return bundle
+
+    def _load(self, version: str) -> ModelBundle:
+        """Carga una versión desde disco."""
+        manager = ModelManager(self.models_dir)
+
+        if manager.registry.get(version) is None:
+            raise ModelNotFoundError(f"Versión de modelo no registrada: {version}")
+
+        model, preprocessor, metadata = manager.load_model(version=version)
+        logger.info(f"Modelo agregado al pool: {version}")
+
+        return ModelBundle(
+            version=version,
+            model=model,
+            preprocessor=preprocessor,
+            metadata=metadata,
+            path=manager.model_path
+        )
+
+    def put(self, bundle: ModelBundle) -> None:
+        """
+        Agrega un modelo ya cargado (por ejemplo, el de producción).
+
+        Args:
+            bundle: Modelo cargado
+        """
+        with self._lock:
+            self._bundles[bundle.version] = bundle
+            self._bundles.move_to_end(bundle.version)
+            while len(self._bundles) > self.max_size:
+                self._bundles.popitem(last=False)
+
+    def evict(self, version: str) -> None:
+        """Libera una versión del pool."""
+        with self._lock:
+            self._bundles.pop(version, None)
+
+    def loaded_versions(self) -> List[str]:
+        """Versiones en memoria, de la menos a la más recientemente usada."""
+        with self._lock:
+            return list(self._bundles.keys())
+
+
+@lru_cache(maxsize=1)
+def get_model_pool() -> ModelPool:
+    """
+    Factory function para obtener el pool compartido de modelos.
+
+    Returns:
+        Instancia de ModelPool
+    """
+    return ModelPool()
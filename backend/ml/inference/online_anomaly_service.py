@@ -0,0 +1,373 @@
+"""
+Servicio de detección de anomalías en línea.
+
+Puntúa cada registro de control de operación en el momento en que se
+crea o actualiza, en tiempo constante, manteniendo en memoria la media y
+varianza móviles (EWMA) de cada parámetro.
+"""
+
+from typing import List, Dict, Any, Optional, Iterable
+from datetime import date
+from functools import lru_cache
+import math
+import threading
+
+from ..domain.entities import AnomalyResult
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+
+logger = MLLogger.get_anomaly_logger()
+config = get_config()
+
+
+class _ParameterState:
+    """Media y varianza móviles exponenciales de un parámetro."""
+
+    __slots__ = ('mean', 'var', 'count')
+
+    def __init__(self):
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def update(self, value: float, alpha: float) -> None:
+        """Actualiza media y varianza con una nueva observación (O(1))."""
+        if self.count == 0:
+            self.mean = value
+            self.var = 0.0
+        else:
+            diff = value - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.var = (1 - alpha) * (self.var + diff * increment)
+        self.count += 1
+
+    def z_score(self, value: float) -> float:
+        """Desviación de la observación respecto a la media móvil."""
+        std = math.sqrt(self.var)
+        if std < 1e-9:
+            return 0.0
+        return (value - self.mean) / std
+
+
+class OnlineAnomalyDetector:
+    """
+    Detector de anomalías incremental para datos operativos.
+
+    Combina dos criterios por parámetro:
+    - Umbrales de `anomaly_detection.thresholds` (mismos que el detector batch)
+    - z-score respecto a la media/varianza EWMA de lecturas anteriores
+
+    El costo por registro es O(número de parámetros), independiente del
+    histórico. El estado vive en memoria de cada worker y se inicializa con
+    las últimas `warmup_samples` lecturas la primera vez que se usa.
+    """
+
+    def __init__(
+        self,
+        alpha: Optional[float] = None,
+        z_threshold: Optional[float] = None,
+        z_critical: Optional[float] = None,
+        warmup_samples: Optional[int] = None,
+        parameters: Optional[List[str]] = None
+    ):
+        """
+        Inicializa el detector con la configuración de `anomaly_detection.online`.
+
+        Args:
+            alpha: Peso de la nueva observación en la EWMA (0-1)
+            z_threshold: |z| para marcar una lectura como sospechosa
+            z_critical: |z| para marcar una lectura como crítica
+            warmup_samples: Lecturas mínimas antes de evaluar por z-score
+            parameters: Parámetros a monitorear
+        """
+        self.enabled = config.get('anomaly_detection.online.enabled', True)
+        self.alpha = alpha or config.get('anomaly_detection.online.alpha', 0.1)
+        self.z_threshold = z_threshold or config.get('anomaly_detection.online.z_threshold', 3.0)
+        self.z_critical = z_critical or config.get('anomaly_detection.online.z_critical', 5.0)
+        self.warmup_samples = warmup_samples or config.get('anomaly_detection.online.warmup_samples', 20)
+        self.thresholds: Dict[str, Dict] = config.get('anomaly_detection.thresholds', {})
+        self.parameters = parameters or config.get(
+            'anomaly_detection.online.parameters',
+            list(self.thresholds.keys())
+        )
+
+        self._states: Dict[str, _ParameterState] = {
+            param: _ParameterState() for param in self.parameters
+        }
+        self._lock = threading.Lock()
+        self._warmed_up = False
+
+    @staticmethod
+    def record_to_reading(record: Any, parameters: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Extrae los valores numéricos de un registro ControlOperacion.
+
+        Args:
+            record: Instancia ORM de ControlOperacion
+            parameters: Parámetros a extraer
+
+        Returns:
+            Diccionario parámetro -> valor (None si falta)
+        """
+        reading = {}
+        for param in parameters:
+            value = getattr(record, param, None)
+            reading[param] = float(value) if value is not None else None
+        return reading
+
+    def reset(self) -> None:
+        """Reinicia el estado EWMA de todos los parámetros."""
+        with self._lock:
+            self._states = {param: _ParameterState() for param in self.parameters}
+            self._warmed_up = False
+
+    def warm_up(self, readings: Iterable[Dict[str, Optional[float]]]) -> None:
+        """
+        Alimenta el estado EWMA con lecturas históricas sin puntuarlas.
+
+        Args:
+            readings: Lecturas en orden cronológico
+        """
+        with self._lock:
+            for reading in readings:
+                self._update_state(reading)
+            self._warmed_up = True
+
+    def _update_state(self, reading: Dict[str, Optional[float]]) -> None:
+        """Actualiza el estado EWMA (llamar con el lock adquirido)."""
+        for param, state in self._states.items():
+            value = reading.get(param)
+            if value is not None:
+                state.update(value, self.alpha)
+
+    def score(
+        self,
+        reading: Dict[str, Optional[float]],
+        update_state: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Puntúa una lectura contra el estado actual y, opcionalmente, lo actualiza.
+
+        Args:
+            reading: Diccionario parámetro -> valor
+            update_state: Si la lectura se incorpora a la media móvil
+
+        Returns:
+            Lista de anomalías (una por parámetro anómalo) con claves
+            parametro, valor, severidad, score, metodo y explicacion
+        """
+        anomalies = []
+
+        with self._lock:
+            for param, state in self._states.items():
+                value = reading.get(param)
+                if value is None:
+                    continue
+
+                reasons = []
+                severity = None
+                method = None
+
+                # Umbrales configurados
+                limits = self.thresholds.get(param, {})
+                critical_min = limits.get('critical_min')
+                critical_max = limits.get('critical_max')
+                min_val = limits.get('min')
+                max_val = limits.get('max')
+
+                if critical_min is not None and value < critical_min:
+                    reasons.append(f"{param} CRÍTICO < {critical_min}")
+                    severity = "critico"
+                elif critical_max is not None and value > critical_max:
+                    reasons.append(f"{param} CRÍTICO > {critical_max}")
+                    severity = "critico"
+                elif min_val is not None and value < min_val:
+                    reasons.append(f"{param} < {min_val}")
+                    severity = "sospechoso"
+                elif max_val is not None and value > max_val:
+                    reasons.append(f"{param} > {max_val}")
+                    severity = "sospechoso"
+
+                if severity:
+                    method = "umbral"
+
+                # Desviación respecto a la media móvil
+                z = state.z_score(value) if state.count >= self.warmup_samples else 0.0
+
+                if abs(z) >= self.z_threshold:
+                    reasons.append(
+                        f"{param} se desvía {z:+.1f}σ de la media móvil ({state.mean:.2f})"
+                    )
+                    if abs(z) >= self.z_critical:
+                        severity = "critico"
+                    elif severity is None:
+                        severity = "sospechoso"
+                    method = method or "ewma"
+
+                if severity:
+                    anomalies.append({
+                        'parametro': param,
+                        'valor': value,
+                        'severidad': severity,
+                        'score': round(z, 4),
+                        'metodo': method,
+                        'explicacion': "; ".join(reasons)
+                    })
+
+            if update_state:
+                self._update_state(reading)
+
+        return anomalies
+
+    def _ensure_warm(self, repository, exclude_id: Optional[int] = None) -> None:
+        """Inicializa el estado con las últimas lecturas la primera vez."""
+        if self._warmed_up:
+            return
+
+        records = repository.get_recent_operational_records(
+            self.warmup_samples,
+            exclude_id=exclude_id
+        )
+        self.warm_up(self.record_to_reading(r, self.parameters) for r in records)
+        logger.info(f"Detector en línea inicializado con {len(records)} lecturas")
+
+    def process_record(
+        self,
+        db,
+        record: Any,
+        update_state: bool = True
+    ) -> List[AnomalyResult]:
+        """
+        Puntúa un registro de control de operación y almacena sus anomalías.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            record: Instancia ControlOperacion ya persistida
+            update_state: False para actualizaciones de un registro ya contabilizado
+
+        Returns:
+            Lista de AnomalyResult detectadas
+        """
+        from ..data.repository import PlantDataRepository
+
+        repository = PlantDataRepository(db)
+        self._ensure_warm(repository, exclude_id=record.id)
+
+        reading = self.record_to_reading(record, self.parameters)
+        anomalies = self.score(reading, update_state=update_state)
+
+        repository.replace_anomalies(
+            record.id,
+            [dict(a, fecha=record.fecha, hora=record.hora) for a in anomalies]
+        )
+
+        if anomalies:
+            logger.info(
+                f"Registro {record.id} ({record.fecha} {record.hora}): "
+                f"{len(anomalies)} anomalías en línea"
+            )
+
+        return [
+            AnomalyResult(
+                fecha=record.fecha,
+                hora=record.hora,
+                parametro=a['parametro'],
+                valor=a['valor'],
+                es_anomalia=True,
+                severidad=a['severidad'],
+                anomaly_score=a['score'],
+                explicacion=a['explicacion']
+            )
+            for a in anomalies
+        ]
+
+    def rebuild(
+        self,
+        db,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, int]:
+        """
+        Reconstruye las anomalías almacenadas reprocesando el histórico en orden.
+
+        Útil para registros anteriores a la detección en línea o tras
+        cambiar umbrales. El reproceso usa un detector aparte, así que el
+        estado EWMA en vivo del worker no cambia.
+
+        Args:
+            db: Sesión de SQLAlchemy
+            start_date: Fecha de inicio (opcional)
+            end_date: Fecha de fin (opcional)
+
+        Returns:
+            Diccionario con registros procesados y anomalías almacenadas
+        """
+        from ..data.repository import PlantDataRepository
+
+        repository = PlantDataRepository(db)
+        replay = OnlineAnomalyDetector(
+            alpha=self.alpha,
+            z_threshold=self.z_threshold,
+            z_critical=self.z_critical,
+            warmup_samples=self.warmup_samples,
+            parameters=self.parameters
+        )
+
+        # La reconstrucción no se difunde por el canal en vivo
+        db.info['live_events'] = False
+
+        previous = []
+        if start_date:
+            previous = repository.get_recent_operational_records(
+                self.warmup_samples,
+                before_date=start_date
+            )
+        replay.warm_up(self.record_to_reading(r, self.parameters) for r in previous)
+
+        repository.delete_anomalies(start_date=start_date, end_date=end_date)
+
+        processed = 0
+        stored = 0
+        for record in repository.iter_operational_records(start_date, end_date):
+            anomalies = replay.score(self.record_to_reading(record, self.parameters))
+            repository.add_anomalies(
+                record.id,
+                [dict(a, fecha=record.fecha, hora=record.hora) for a in anomalies]
+            )
+            processed += 1
+            stored += len(anomalies)
+
+        db.commit()
+
+        logger.info(f"Anomalías reconstruidas: {processed} registros, {stored} anomalías")
+
+        return {'records_processed': processed, 'anomalies_stored': stored}
+
+    def get_state(self) -> Dict[str, Dict[str, float]]:
+        """
+        Obtiene el estado EWMA actual por parámetro.
+
+        Returns:
+            Diccionario parámetro -> {mean, std, count}
+        """
+        with self._lock:
+            return {
+                param: {
+                    'mean': state.mean,
+                    'std': math.sqrt(state.var),
+                    'count': state.count
+                }
+                for param, state in self._states.items()
+            }
+
+
+@lru_cache(maxsize=1)
+def get_online_detector() -> OnlineAnomalyDetector:
+    """
+    Factory function para obtener la instancia compartida del detector en línea.
+
+    Returns:
+        Instancia de OnlineAnomalyDetector
+    """
+    return OnlineAnomalyDetector()
@@ -0,0 +1,262 @@
+"""
+Registro compacto de predicciones.
+
+Cada predicción de /ml/predict se guarda como un registro binario de
+ancho fijo (entradas, salidas, versión del modelo y latencia por etapa)
+en un archivo por día. Un hilo de fondo escribe en lotes, fuera del
+camino de la respuesta, y los archivos se leen directamente como arreglos
+de numpy para resúmenes de latencia y análisis de deriva.
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, TYPE_CHECKING
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+import atexit
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from ..domain.entities import PredictionResult
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = MLLogger.get_inference_logger()
+config = get_config()
+
+# Cambiar el formato de los registros requiere subir la versión (va en el nombre del archivo)
+FORMAT_VERSION = 1
+
+INPUT_FIELDS = (
+    'turbedad_ac', 'turbedad_at', 'ph_ac', 'ph_at', 'temperatura_ac',
+    'caudal_total', 'dosis_sulfato', 'dosis_cal', 'cloro_residual'
+)
+OUTPUT_FIELDS = ('sulfato_kg', 'cal_kg', 'hipoclorito_kg', 'cloro_gas_kg', 'confidence')
+STAGES = ('validation', 'features', 'scaling', 'model', 'total')
+
+RECORD_DTYPE = np.dtype(
+    [('timestamp', '<f8'), ('model_version', 'S48')]
+    + [(name, '<f4') for name in INPUT_FIELDS]
+    + [(name, '<f4') for name in OUTPUT_FIELDS]
+    + [(f'{stage}_ms', '<f4') for stage in STAGES]
+)
+
+
+class PredictionLog:
+    """
+    Escritor en segundo plano del registro de predicciones.
+
+    - Cola acotada: con `max_pending` registros en cola, los nuevos se
+      descartan (nunca se frena la respuesta principal)
+    - Escritura en lotes de hasta `batch_size` registros o cada
+      `flush_seconds`, en modo append
+    - Cada lote es un único write() con O_APPEND: los workers de uvicorn
+      comparten el archivo sin intercalar registros
+    - Un archivo por día en `log_dir` (`predictions_v1_YYYYMMDD.bin`)
+    """
+
+    def __init__(self):
+        """Inicializa el registro con la configuración de `inference.prediction_log`."""
+        self.enabled = config.get('inference.prediction_log.enabled', True)
+        self.log_dir = Path(config.get('inference.prediction_log.log_dir', 'logs/predictions'))
+        self.batch_size = config.get('inference.prediction_log.batch_size', 256)
+        self.flush_seconds = config.get('inference.prediction_log.flush_seconds', 1.0)
+
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=config.get('inference.prediction_log.max_pending', 10000)
+        )
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._counters = {'submitted': 0, 'dropped': 0, 'written': 0, 'errors': 0}
+
+    def submit(
+        self,
+        input_data: Dict[str, Any],
+        result: PredictionResult,
+        timestamp: Optional[float] = None
+    ) -> bool:
+        """
+        Encola el registro de una predicción.
+
+        Args:
+            input_data: Parámetros de la predicción (None se guarda como NaN)
+            result: Resultado entregado al cliente
+            timestamp: Momento de la predicción (por defecto ahora)
+
+        Returns:
+            True si el registro se encoló
+        """
+        if not self.enabled:
+            return False
+
+        record = (
+            time.time() if timestamp is None else timestamp,
+            (result.model_version or '').encode('utf-8')[:48],
+            *(_as_float(input_data.get(name)) for name in INPUT_FIELDS),
+            result.sulfato_predicho,
+            result.cal_predicha,
+            result.hipoclorito_predicho,
+            result.cloro_gas_predicho,
+            result.confidence_score,
+            *(result.timings_ms.get(stage, np.nan) for stage in STAGES),
+        )
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._counters['dropped'] += 1
+            return False
+
+        with self._lock:
+            self._counters['submitted'] += 1
+        return True
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        """Bucle del hilo escritor: agrupa registros y los escribe por lotes."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+                counter, amount = 'written', len(batch)
+            except Exception as e:
+                logger.error(f"Error escribiendo el registro de predicciones: {e}")
+                counter, amount = 'errors', len(batch)
+            finally:
+                with self._lock:
+                    self._counters[counter] += amount
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _log_path(self, day: date) -> Path:
+        return self.log_dir / f"predictions_v{FORMAT_VERSION}_{day:%Y%m%d}.bin"
+
+    def _write(self, batch: List[Tuple]) -> None:
+        """Agrega un lote de registros al archivo de cada día."""
+        records = np.array(batch, dtype=RECORD_DTYPE)
+        days = np.array([date.fromtimestamp(ts) for ts in records['timestamp']])
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        for day in np.unique(days):
+            # Un solo write por lote: con O_APPEND el kernel no intercala
+            # escrituras de otros procesos dentro de él
+            data = records[days == day].tobytes()
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            fd = os.open(self._log_path(day), flags, 0o644)
+            try:
+                written = os.write(fd, data)
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+            finally:
+                os.close(fd)
+
+    def flush(self) -> None:
+        """Espera a que los registros encolados queden escritos."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def read(self, day: Optional[date] = None) -> "pd.DataFrame":
+        """
+        Lee los registros de un día.
+
+        Args:
+            day: Fecha (por defecto hoy)
+
+        Returns:
+            DataFrame con una fila por predicción
+        """
+        import pandas as pd
+
+        path = self._log_path(day or date.today())
+        if not path.exists():
+            return pd.DataFrame(columns=list(RECORD_DTYPE.names))
+
+        # Un registro a medio escribir (proceso terminado) queda fuera
+        count = path.stat().st_size // RECORD_DTYPE.itemsize
+        records = np.fromfile(path, dtype=RECORD_DTYPE, count=count)
+        df = pd.DataFrame(records)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
+        df['model_version'] = df['model_version'].str.decode('utf-8')
+        return df
+
+    def latency_summary(self, day: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Resume la latencia por etapa de las predicciones de un día.
+
+        Args:
+            day: Fecha (por defecto hoy)
+
+        Returns:
+            Diccionario con predicciones y p50/p95/p99 (ms) por etapa
+        """
+        df = self.read(day)
+
+        stages = {}
+        for stage in STAGES:
+            values = df[f'{stage}_ms'].dropna().to_numpy(dtype=float)
+            if len(values) == 0:
+                stages[stage] = None
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stages[stage] = {
+                'p50': round(float(p50), 3),
+                'p95': round(float(p95), 3),
+                'p99': round(float(p99), 3),
+            }
+
+        return {
+            'date': str(day or date.today()),
+            'predictions': len(df),
+            'model_versions': sorted(df['model_version'].unique().tolist()),
+            'latency_ms': stages,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del registro y contadores de este worker."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'pending': self._queue.qsize(),
+                **self._counters,
+            }
+
+
+def _as_float(value: Any) -> float:
+    return np.nan if value is None else float(value)
+
+
+@lru_cache(maxsize=1)
+def get_prediction_log() -> PredictionLog:
+    """
+    Factory function para obtener el registro de predicciones compartido.
+
+    Returns:
+        Instancia de PredictionLog
+    """
+    return PredictionLog()
@@ -4,19 +4,23 @@ Servicio de predicción de consumo de químicos en producción.
 Proporciona interfaz de alto nivel para inferencia con modelo entrenado.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, TYPE_CHECKING
 from datetime import date
-import pandas as pd
 import numpy as np
 from pathlib import Path
+import time
 
 from ..models.model_manager import ModelManager
-from ..features.feature_engineer import FeatureEngineer
+from .model_pool import ModelBundle, get_model_pool
+from .drift_monitor import get_drift_monitor
 from ..domain.entities import PredictionResult
 from ..utils.logger import MLLogger
 from ..utils.validation import DataValidator, MLValidationError
 from ..utils.config_manager import get_config
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = MLLogger.get_inference_logger()
 config = get_config()
 
@@ -56,6 +60,7 @@ class ChemicalConsumptionPredictor:
         self.preprocessor = None
         self.metadata = None
         self.feature_names = []
+        self._bundle: Optional[ModelBundle] = None
         self._is_loaded = False
         self._initialized = True
     
@@ -78,6 +83,22 @@ class ChemicalConsumptionPredictor:
         self.feature_names = self.metadata.get('feature_names', [])
         self._is_loaded = True
         
+        # El modelo por defecto también queda disponible por versión
+        self._bundle = ModelBundle(
+            version=self.model_manager.model_path.name,
+            model=self.model,
+            preprocessor=self.preprocessor,
+            metadata=self.metadata,
+            path=self.model_manager.model_path
+        )
+        get_model_pool().put(self._bundle)
+        
+        # La deriva se mide contra la distribución de entrenamiento de este modelo
+        get_drift_monitor().set_reference(
+            self.metadata.get('feature_histograms'),
+            model_version=self._bundle.version
+        )
+        
         logger.info(f"Predictor listo: modelo '{self.metadata.get('model_name')}'")
     
     def _ensure_model_loaded(self) -> None:
@@ -97,15 +118,40 @@ class ChemicalConsumptionPredictor:
                     "Ejecute primero load_model(). Error: " + str(e)
                 )
     
+    def _resolve_bundle(self, model_version: Optional[str] = None) -> ModelBundle:
+        """
+        Obtiene el modelo a usar para una predicción.
+        
+        Args:
+            model_version: Versión solicitada (None = modelo por defecto)
+            
+        Returns:
+            ModelBundle cargado
+            
+        Raises:
+            ModelNotFoundError: Si la versión no existe
+            RuntimeError: Si no hay modelo por defecto cargado
+        """
+        if model_version and (self._bundle is None or model_version != self._bundle.version):
+            return get_model_pool().get(model_version)
+        
+        self._ensure_model_loaded()
+        return self._bundle
+    
     def _prepare_input_features(
         self,
-        input_data: Dict[str, Any]
-    ) -> pd.DataFrame:
+        input_data: Dict[str, Any],
+        bundle: Optional[ModelBundle] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> "pd.DataFrame":
         """
         Prepara features de entrada para el modelo.
         
         Args:
             input_data: Diccionario con parámetros operativos
+            bundle: Modelo destino (por defecto, el modelo cargado)
+            timings: Diccionario donde registrar la duración (ms) de las
+                etapas validation, features y scaling (opcional)
             
         Returns:
             DataFrame con features preparadas
@@ -113,8 +159,39 @@ class ChemicalConsumptionPredictor:
         Raises:
             MLValidationError: Si los datos son inválidos
         """
+        X = self._build_feature_frame(input_data, bundle, timings)
+        return self._scale_features(X, bundle, timings)
+    
+    def _build_feature_frame(
+        self,
+        input_data: Dict[str, Any],
+        bundle: Optional[ModelBundle] = None,
+        timings: Optional[Dict[str, float]] = None,
+        filled: Optional[List[str]] = None
+    ) -> "pd.DataFrame":
+        """
+        Valida la entrada y construye las features sin escalar.
+        
+        Args:
+            input_data: Diccionario con parámetros operativos
+            bundle: Modelo destino (por defecto, el modelo cargado)
+            timings: Diccionario donde registrar validation y features (opcional)
+            filled: Lista donde agregar las features rellenadas con 0 (opcional)
+            
+        Returns:
+            DataFrame con las features que espera el modelo (unidades originales)
+            
+        Raises:
+            MLValidationError: Si los datos son inválidos
+        """
+        import pandas as pd
+        from ..features.feature_engineer import FeatureEngineer
+
+        start = time.perf_counter()
+        
         # Validar datos de entrada
         DataValidator.validate_prediction_input(input_data)
+        validated = time.perf_counter()
         
         # Crear DataFrame base
         df = pd.DataFrame([input_data])
@@ -130,24 +207,55 @@ class ChemicalConsumptionPredictor:
             create_lags=False  # No aplicable en predicción única
         )
         
+        feature_names = bundle.feature_names if bundle else self.feature_names
+        
         # Seleccionar solo las features que el modelo espera
         # (algunas features engineered pueden no estar disponibles sin histórico)
-        available_features = [f for f in self.feature_names if f in df_engineered.columns]
+        available_features = [f for f in feature_names if f in df_engineered.columns]
         
-        if len(available_features) < len(self.feature_names) * 0.7:  # Al menos 70%
-            missing = set(self.feature_names) - set(available_features)
+        if len(available_features) < len(feature_names) * 0.7:  # Al menos 70%
+            missing = set(feature_names) - set(available_features)
             logger.warning(f"Features faltantes: {missing}")
         
         # Crear DataFrame con todas las features esperadas, rellenar con 0 las faltantes
-        X = pd.DataFrame(columns=self.feature_names)
-        for feature in self.feature_names:
+        X = pd.DataFrame(columns=feature_names)
+        for feature in feature_names:
             if feature in df_engineered.columns:
                 X[feature] = df_engineered[feature]
             else:
                 X[feature] = 0  # Valor por defecto para features faltantes
+                if filled is not None:
+                    filled.append(feature)
         
-        # Aplicar mismo preprocesamiento (scaling)
-        X_scaled = self.preprocessor.scale_features(X, fit=False)
+        if timings is not None:
+            timings['validation'] = (validated - start) * 1000
+            timings['features'] = (time.perf_counter() - validated) * 1000
+        
+        return X
+    
+    def _scale_features(
+        self,
+        X: "pd.DataFrame",
+        bundle: Optional[ModelBundle] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> "pd.DataFrame":
+        """
+        Aplica el mismo escalado que en entrenamiento.
+        
+        Args:
+            X: Features sin escalar
+            bundle: Modelo destino (por defecto, el modelo cargado)
+            timings: Diccionario donde registrar scaling (opcional)
+            
+        Returns:
+            DataFrame escalado
+        """
+        start = time.perf_counter()
+        preprocessor = bundle.preprocessor if bundle else self.preprocessor
+        X_scaled = preprocessor.scale_features(X, fit=False)
+        
+        if timings is not None:
+            timings['scaling'] = (time.perf_counter() - start) * 1000
         
         return X_scaled
     
@@ -162,6 +270,8 @@ class ChemicalConsumptionPredictor:
         dosis_sulfato: Optional[float] = None,
         dosis_cal: Optional[float] = None,
         cloro_residual: Optional[float] = None,
+        model_version: Optional[str] = None,
+        observe_drift: bool = True,
         **kwargs
     ) -> PredictionResult:
         """
@@ -177,6 +287,8 @@ class ChemicalConsumptionPredictor:
             dosis_sulfato: Dosis actual de sulfato (l/s) (opcional)
             dosis_cal: Dosis actual de cal (l/s) (opcional)
             cloro_residual: Cloro residual (mg/L) (opcional)
+            model_version: Versión del modelo a usar (opcional, por defecto el cargado)
+            observe_drift: Si la entrada cuenta para el monitor de deriva
             **kwargs: Parámetros adicionales
             
         Returns:
@@ -185,10 +297,11 @@ class ChemicalConsumptionPredictor:
         Raises:
             MLValidationError: Si los datos son inválidos
             RuntimeError: Si el modelo no está cargado
+            ModelNotFoundError: Si la versión solicitada no existe
         """
-        self._ensure_model_loaded()
+        bundle = self._resolve_bundle(model_version)
         
-        logger.info("Realizando predicción de consumo")
+        logger.debug("Realizando predicción de consumo (modelo %s)", bundle.version)
         
         # Preparar input
         input_data = {
@@ -207,11 +320,18 @@ class ChemicalConsumptionPredictor:
         input_data.update(kwargs)
         
         try:
-            # Preparar features
-            X = self._prepare_input_features(input_data)
+            start = time.perf_counter()
+            timings: Dict[str, float] = {}
+            filled: List[str] = []
+            
+            # Preparar features (validación, feature engineering y escalado)
+            X_raw = self._build_feature_frame(input_data, bundle, timings, filled)
+            X = self._scale_features(X_raw, bundle, timings)
+            features_done = time.perf_counter()
             
             # Predecir
-            y_pred = self.model.predict(X)
+            y_pred = bundle.model.predict(X)
+            timings['model'] = (time.perf_counter() - features_done) * 1000
             
             # Asegurar valores no negativos
             y_pred = np.maximum(y_pred, 0)
@@ -223,7 +343,7 @@ class ChemicalConsumptionPredictor:
             cloro_gas = float(y_pred[0, 3])
             
             # Calcular confianza basada en métricas del modelo
-            r2_score = self.metadata.get('metrics', {}).get('r2', 0.5)
+            r2_score = bundle.metadata.get('metrics', {}).get('r2', 0.5)
             confidence = min(max(r2_score, 0.0), 1.0)  # Clamp entre 0-1
             
             result = PredictionResult(
@@ -232,13 +352,27 @@ class ChemicalConsumptionPredictor:
                 hipoclorito_predicho=hipoclorito,
                 cloro_gas_predicho=cloro_gas,
                 confidence_score=confidence,
-                model_name=self.metadata.get('model_name', 'unknown'),
-                prediction_date=date.today()
+                model_name=bundle.metadata.get('model_name', 'unknown'),
+                prediction_date=date.today(),
+                model_version=bundle.version,
+                timings_ms=timings
             )
+            timings['total'] = (time.perf_counter() - start) * 1000
             
-            logger.info(f"Predicción exitosa - Sulfato: {sulfato:.2f} kg, "
-                       f"Cal: {cal:.2f} kg, Hipoclorito: {hipoclorito:.2f} kg, "
-                       f"Cloro Gas: {cloro_gas:.2f} kg")
+            # Deriva: solo el tráfico real del modelo de producción. Las
+            # features rellenadas con 0 no son observaciones (NaN = faltante)
+            if observe_drift and bundle is self._bundle:
+                X_observed = X_raw.copy()
+                X_observed[filled] = np.nan
+                get_drift_monitor().observe(X_observed, source='predicciones')
+            
+            # Cada predicción queda en el registro binario (prediction_log);
+            # el texto solo en DEBUG para no formatearlo en cada request
+            logger.debug(
+                "Predicción exitosa - Sulfato: %.2f kg, Cal: %.2f kg, "
+                "Hipoclorito: %.2f kg, Cloro Gas: %.2f kg",
+                sulfato, cal, hipoclorito, cloro_gas
+            )
             
             return result
         
@@ -282,6 +416,48 @@ class ChemicalConsumptionPredictor:
         
         return results
     
+    @property
+    def model_version(self) -> str:
+        """Identificador del modelo cargado (nombre y fecha de entrenamiento)."""
+        if not self._is_loaded:
+            return 'not_loaded'
+        return f"{self.metadata.get('model_name')}@{self.metadata.get('training_date')}"
+    
+    def warm_up(self, iterations: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ejecuta predicciones de calentamiento con el modelo por defecto.
+
+        La primera predicción paga imports diferidos, cachés de sklearn y
+        la paginación de artefactos mapeados; hacerlo al arrancar evita
+        que ese costo lo pague el primer request real.
+
+        Args:
+            iterations: Predicciones a ejecutar (inference.warmup.predictions)
+
+        Returns:
+            Diccionario con número de predicciones y latencias (ms)
+
+        Raises:
+            RuntimeError: Si no hay modelo y no se pudo cargar
+        """
+        if iterations is None:
+            iterations = config.get('inference.warmup.predictions', 3)
+
+        sample = config.get('inference.warmup.sample_input', {})
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            self.predict(**sample, observe_drift=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        logger.info(f"Predictor calentado: {iterations} predicciones en {sum(latencies):.0f}ms")
+
+        return {
+            'warmup_predictions': iterations,
+            'first_prediction_ms': round(latencies[0], 1) if latencies else None,
+            'last_prediction_ms': round(latencies[-1], 1) if latencies else None,
+        }
+
     def get_model_info(self) -> Dict[str, Any]:
         """
         Obtiene información del modelo actual.
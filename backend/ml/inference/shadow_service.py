@@ -0,0 +1,224 @@
+"""
+Evaluación en sombra (shadow) de modelos candidatos.
+
+Puntúa un modelo candidato sobre una muestra del tráfico real de
+/ml/predict, fuera del camino de la respuesta, y guarda ambas
+predicciones para compararlas offline antes de promover el candidato.
+"""
+
+from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+import json
+import random
+import threading
+import time
+
+from ..domain.entities import PredictionResult
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+
+logger = MLLogger.get_inference_logger()
+config = get_config()
+
+_PREDICTION_KEYS = ('sulfato_kg', 'cal_kg', 'hipoclorito_kg', 'cloro_gas_kg')
+
+
+class ShadowScorer:
+    """
+    Ejecuta el modelo candidato en segundo plano sobre tráfico muestreado.
+
+    - Muestreo: `sample_rate` de las predicciones de producción
+    - Cola acotada: si hay `max_pending` evaluaciones pendientes, la
+      muestra se descarta (nunca se frena la respuesta principal)
+    - Resultados: JSON Lines diario en `log_dir` (`shadow_YYYYMMDD.jsonl`)
+    """
+
+    def __init__(self):
+        """Inicializa el evaluador con la configuración de `inference.shadow`."""
+        self.enabled = config.get('inference.shadow.enabled', False)
+        self.candidate_version: Optional[str] = config.get('inference.shadow.candidate_version')
+        self.sample_rate = config.get('inference.shadow.sample_rate', 0.1)
+        self.max_pending = config.get('inference.shadow.max_pending', 100)
+        self.log_dir = Path(config.get('inference.shadow.log_dir', 'logs/shadow'))
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._rng = random.Random()
+        self._pending = 0
+        self._counters = {'submitted': 0, 'dropped': 0, 'scored': 0, 'errors': 0}
+
+    @property
+    def active(self) -> bool:
+        """Hay un candidato configurado y la evaluación está habilitada."""
+        return bool(self.enabled and self.candidate_version)
+
+    def configure(
+        self,
+        candidate_version: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ) -> None:
+        """
+        Cambia el candidato o el muestreo en caliente.
+
+        Args:
+            candidate_version: Versión del modelo candidato
+            sample_rate: Fracción del tráfico a evaluar (0-1)
+            enabled: Activar o desactivar la evaluación
+        """
+        with self._lock:
+            if candidate_version is not None:
+                self.candidate_version = candidate_version
+            if sample_rate is not None:
+                self.sample_rate = sample_rate
+            if enabled is not None:
+                self.enabled = enabled
+
+        logger.info(
+            f"Shadow {'activo' if self.active else 'inactivo'}: "
+            f"candidato={self.candidate_version}, muestreo={self.sample_rate}"
+        )
+
+    def submit(self, input_data: Dict[str, Any], primary: PredictionResult) -> bool:
+        """
+        Encola la evaluación del candidato para una predicción de producción.
+
+        Args:
+            input_data: Parámetros de la predicción
+            primary: Resultado entregado al cliente
+
+        Returns:
+            True si la muestra se encoló
+        """
+        if not self.active or primary.model_version == self.candidate_version:
+            return False
+
+        with self._lock:
+            if self._rng.random() >= self.sample_rate:
+                return False
+            if self._pending >= self.max_pending:
+                self._counters['dropped'] += 1
+                return False
+            self._pending += 1
+            self._counters['submitted'] += 1
+            candidate = self.candidate_version
+
+        self._executor.submit(self._score, dict(input_data), primary, candidate)
+        return True
+
+    def _score(self, input_data: Dict[str, Any], primary: PredictionResult, candidate: str) -> None:
+        """Evalúa el candidato y guarda la comparación (hilo de fondo)."""
+        from .predictor_service import ChemicalConsumptionPredictor
+
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'input': input_data,
+            'primary_version': primary.model_version,
+            'primary': {k: primary.to_dict()[k] for k in _PREDICTION_KEYS},
+            'candidate_version': candidate,
+        }
+
+        try:
+            start = time.perf_counter()
+            result = ChemicalConsumptionPredictor().predict(**input_data, model_version=candidate)
+            record['candidate_latency_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            record['candidate'] = {k: result.to_dict()[k] for k in _PREDICTION_KEYS}
+            counter = 'scored'
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            counter = 'errors'
+            logger.warning(f"Error en evaluación shadow de {candidate}: {e}")
+
+        try:
+            self._write(record)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._counters[counter] += 1
+
+    def _log_path(self, day: date) -> Path:
+        return self.log_dir / f"shadow_{day:%Y%m%d}.jsonl"
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Agrega una comparación al archivo del día."""
+        with self._write_lock:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._log_path(date.today()), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def read_records(self, day: Optional[date] = None) -> List[Dict[str, Any]]:
+        """
+        Lee las comparaciones guardadas de un día.
+
+        Args:
+            day: Fecha (por defecto hoy)
+
+        Returns:
+            Lista de comparaciones
+        """
+        path = self._log_path(day or date.today())
+        if not path.exists():
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def summary(self, day: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Resume las diferencias entre candidato y producción de un día.
+
+        Args:
+            day: Fecha (por defecto hoy)
+
+        Returns:
+            Diccionario con muestras y diferencia absoluta media por químico
+        """
+        records = [r for r in self.read_records(day) if 'candidate' in r]
+
+        mean_abs_diff = {}
+        for key in _PREDICTION_KEYS:
+            diffs = [abs(r['candidate'][key] - r['primary'][key]) for r in records]
+            mean_abs_diff[key] = round(sum(diffs) / len(diffs), 4) if diffs else None
+
+        return {
+            'date': str(day or date.today()),
+            'samples': len(records),
+            'candidates': sorted({r['candidate_version'] for r in records}),
+            'mean_abs_diff': mean_abs_diff,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del evaluador y contadores de este worker."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'active': self.active,
+                'candidate_version': self.candidate_version,
+                'sample_rate': self.sample_rate,
+                'pending': self._pending,
+                **self._counters,
+            }
+
+    def wait_idle(self, timeout: float = 5.0) -> bool:
+        """Espera a que no haya evaluaciones pendientes (útil en pruebas)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if self._pending == 0:
+                    return True
+            time.sleep(0.01)
+        return False
+
+
+@lru_cache(maxsize=1)
+def get_shadow_scorer() -> ShadowScorer:
+    """
+    Factory function para obtener el evaluador shadow compartido.
+
+    Returns:
+        Instancia de ShadowScorer
+    """
+    return ShadowScorer()
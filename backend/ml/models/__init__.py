@@ -1,11 +1,26 @@
 """Models package initialization."""
 
-from .trainer import ChemicalConsumptionTrainer
-from .evaluator import ModelEvaluator
-from .model_manager import ModelManager
+from importlib import import_module
+
+# Carga diferida: importar el paquete no debe arrastrar sklearn/xgboost/lightgbm
+_LAZY_ATTRS = {
+    "ChemicalConsumptionTrainer": ".trainer",
+    "ModelEvaluator": ".evaluator",
+    "ModelManager": ".model_manager",
+    "ModelRegistry": ".model_registry",
+}
+
+
+def __getattr__(name):
+    """Lazy loading de componentes de modelos."""
+    if name in _LAZY_ATTRS:
+        return getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 __all__ = [
     "ChemicalConsumptionTrainer",
     "ModelEvaluator",
     "ModelManager",
+    "ModelRegistry",
 ]
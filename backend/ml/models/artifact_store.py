@@ -0,0 +1,291 @@
+"""
+Almacén de artefactos de modelo direccionado por contenido.
+
+Cada artefacto (model.pkl, scaler.pkl, imputer.pkl, feature_names.pkl,
+metadata.pkl) se guarda una sola vez en `objects/<sha256>` y el directorio
+del modelo contiene enlaces a esos objetos más un manifiesto
+`artifacts.json` con los digests. Así:
+
+- Artefactos idénticos entre reentrenamientos (por ejemplo el mismo
+  scaler) ocupan disco una sola vez y se reutilizan en memoria
+- La carga lee los artefactos en paralelo y verifica cada digest
+- Un `save_model` interrumpido nunca deja un modelo a medio escribir: se
+  escribe en un directorio temporal que se renombra al final
+- `save_model` y `collect_garbage` se excluyen con un lock de archivo
+  (`.artifacts.lock`), también entre procesos: la recolección nunca borra
+  objetos de un guardado que todavía no escribió su manifiesto
+"""
+
+from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import joblib
+
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+from ..utils.file_lock import file_lock
+from ..utils.validation import ModelIntegrityError
+
+logger = MLLogger.get_inference_logger()
+config = get_config()
+
+MANIFEST_FILENAME = "artifacts.json"
+OBJECTS_DIRNAME = "objects"
+LOCK_FILENAME = ".artifacts.lock"
+
+# Artefactos pequeños ya cargados, por digest (el modelo lo maneja el pool)
+_loaded_objects: "OrderedDict[str, Any]" = OrderedDict()
+_loaded_lock = threading.Lock()
+_LOADED_MAX = 32
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula el SHA-256 de un archivo.
+
+    Args:
+        path: Archivo a leer
+        chunk_size: Tamaño de bloque de lectura
+
+    Returns:
+        Digest hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Almacén de objetos compartido por todos los modelos de un directorio.
+    """
+
+    def __init__(self, models_dir: Path):
+        """
+        Inicializa el almacén.
+
+        Args:
+            models_dir: Directorio raíz de modelos
+        """
+        self.models_dir = Path(models_dir)
+        self.objects_dir = self.models_dir / OBJECTS_DIRNAME
+        self._lock = file_lock(self.models_dir / LOCK_FILENAME)
+
+    @staticmethod
+    def has_manifest(model_dir: Path) -> bool:
+        """Indica si el modelo usa el formato direccionado por contenido."""
+        return (Path(model_dir) / MANIFEST_FILENAME).exists()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.pkl"
+
+    def _put(self, tmp_file: Path) -> Dict[str, Any]:
+        """Mueve un archivo al almacén (o lo descarta si ya existe)."""
+        digest = hash_file(tmp_file)
+        size = tmp_file.stat().st_size
+        target = self._object_path(digest)
+
+        if target.exists():
+            tmp_file.unlink()
+            logger.info(f"Artefacto reutilizado: {digest[:12]}")
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_file, target)
+
+        return {'sha256': digest, 'size': size}
+
+    @staticmethod
+    def _link(source: Path, dest: Path) -> None:
+        """Enlaza el objeto en el directorio del modelo (copia si no hay hardlinks)."""
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copy2(source, dest)
+
+    def _swap_in(self, staging: Path, model_dir: Path) -> None:
+        """
+        Mueve el staging a su directorio final.
+
+        Dos guardados en el mismo segundo generan la misma versión; como
+        antes, el último reemplaza al anterior. El directorio existente se
+        aparta con un rename (os.replace no acepta un destino con archivos)
+        y se restaura si el swap falla.
+        """
+        if not model_dir.exists():
+            os.replace(staging, model_dir)
+            return
+
+        aside = Path(tempfile.mkdtemp(prefix=f".{model_dir.name}-old-", dir=str(self.models_dir)))
+        os.replace(model_dir, aside / model_dir.name)
+        try:
+            os.replace(staging, model_dir)
+        except BaseException:
+            os.replace(aside / model_dir.name, model_dir)
+            shutil.rmtree(aside, ignore_errors=True)
+            raise
+        shutil.rmtree(aside, ignore_errors=True)
+        logger.warning(f"Versión {model_dir.name} reemplazada por un guardado más reciente")
+
+    def save_model(
+        self,
+        model_dir: Path,
+        artifacts: Dict[str, Any],
+        compress: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Guarda los artefactos de un modelo de forma atómica.
+
+        Args:
+            model_dir: Directorio final del modelo (si existe, se reemplaza)
+            artifacts: Nombre de archivo -> objeto a serializar
+            compress: Nivel de compresión joblib por archivo (0 por defecto)
+
+        Returns:
+            Manifiesto escrito en `artifacts.json`
+        """
+        model_dir = Path(model_dir)
+        compress = compress or {}
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            return self._save_locked(model_dir, artifacts, compress)
+
+    def _save_locked(
+        self,
+        model_dir: Path,
+        artifacts: Dict[str, Any],
+        compress: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Cuerpo de `save_model` (con el lock del almacén tomado)."""
+        staging = Path(tempfile.mkdtemp(prefix=f".{model_dir.name}-", dir=str(self.models_dir)))
+        try:
+            entries = {}
+            for name, obj in artifacts.items():
+                fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=str(self.objects_dir))
+                os.close(fd)
+                tmp_path = Path(tmp)
+                joblib.dump(obj, tmp_path, compress=compress.get(name, 0))
+
+                entry = self._put(tmp_path)
+                entry['compress'] = compress.get(name, 0)
+                self._link(self._object_path(entry['sha256']), staging / name)
+                entries[name] = entry
+
+            manifest = {'format': 1, 'artifacts': entries}
+            with open(staging / MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # El modelo aparece completo o no aparece
+            self._swap_in(staging, model_dir)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        return manifest
+
+    @staticmethod
+    def read_manifest(model_dir: Path) -> Dict[str, Any]:
+        """Lee `artifacts.json` de un modelo."""
+        with open(Path(model_dir) / MANIFEST_FILENAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def load_model(
+        self,
+        model_dir: Path,
+        mmap_modes: Optional[Dict[str, Optional[str]]] = None,
+        verify: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Carga en paralelo todos los artefactos de un modelo.
+
+        Args:
+            model_dir: Directorio del modelo
+            mmap_modes: Modo mmap por archivo (p. ej. {'model.pkl': 'r'})
+            verify: Verificar digests (por defecto persistence.verify_integrity)
+
+        Returns:
+            Nombre de archivo -> objeto cargado
+
+        Raises:
+            ModelIntegrityError: Si falta un artefacto o su digest no coincide
+        """
+        model_dir = Path(model_dir)
+        mmap_modes = mmap_modes or {}
+        if verify is None:
+            verify = config.get('persistence.verify_integrity', True)
+
+        entries = self.read_manifest(model_dir)['artifacts']
+
+        def load_one(name: str, entry: Dict[str, Any]) -> Any:
+            path = model_dir / name
+            if not path.exists():
+                raise ModelIntegrityError(f"Falta el artefacto {name} en {model_dir.name}")
+
+            digest = entry['sha256']
+            shareable = mmap_modes.get(name) is None and name != "model.pkl"
+            if shareable:
+                with _loaded_lock:
+                    if digest in _loaded_objects:
+                        _loaded_objects.move_to_end(digest)
+                        return _loaded_objects[digest]
+
+            if verify and hash_file(path) != digest:
+                raise ModelIntegrityError(
+                    f"Digest inválido para {name} en {model_dir.name}: el artefacto está dañado"
+                )
+
+            obj = joblib.load(path, mmap_mode=mmap_modes.get(name))
+
+            if shareable:
+                with _loaded_lock:
+                    _loaded_objects[digest] = obj
+                    while len(_loaded_objects) > _LOADED_MAX:
+                        _loaded_objects.popitem(last=False)
+            return obj
+
+        with ThreadPoolExecutor(max_workers=len(entries) or 1) as pool:
+            futures = {name: pool.submit(load_one, name, entry) for name, entry in entries.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def collect_garbage(self) -> int:
+        """
+        Elimina objetos que ningún modelo referencia.
+
+        Returns:
+            Número de objetos eliminados
+        """
+        if not self.objects_dir.exists():
+            return 0
+
+        with self._lock:
+            return self._collect_locked()
+
+    def _collect_locked(self) -> int:
+        """Cuerpo de `collect_garbage` (con el lock del almacén tomado)."""
+        referenced = set()
+        for model_dir in self.models_dir.iterdir():
+            if model_dir.is_dir() and self.has_manifest(model_dir):
+                for entry in self.read_manifest(model_dir)['artifacts'].values():
+                    referenced.add(entry['sha256'])
+
+        removed = 0
+        for obj in self.objects_dir.glob("*/*.pkl"):
+            if obj.stem not in referenced:
+                obj.unlink()
+                removed += 1
+
+        if removed:
+            logger.info(f"Objetos sin referencia eliminados: {removed}")
+        return removed
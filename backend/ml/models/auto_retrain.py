@@ -0,0 +1,770 @@
+"""
+Reentrenamiento automático del modelo de consumo.
+
+Un hilo de fondo revisa cada `check_interval_seconds`:
+
+- Lecturas nuevas de control de operación desde el `training_date` del
+  modelo en producción (`min_new_samples`)
+- Deriva verificada: alguna fuente de `drift_sources` en `alerta` durante
+  `drift_confirmations` revisiones seguidas
+
+Si se cruza un umbral (y pasó `min_interval_hours` desde el último
+intento) se entrena un candidato en un proceso aparte, se evalúa junto al
+modelo en producción sobre el mismo conjunto de test y solo se promueve si
+cumple `ModelEvaluator.check_thresholds` y mejora la métrica principal.
+Un candidato rechazado se elimina del registro y del disco, y el siguiente
+intento espera `min_new_samples` lecturas posteriores a ese intento.
+
+Si el modelo en producción es XGBoost o LightGBM, el candidato puede
+continuar su boosting solo con las lecturas nuevas (modo incremental).
+Cada `full_refit_every` pasos incrementales, pasados `full_refit_days`
+desde el último ajuste completo o ante deriva se reentrena desde cero con
+todo el historial. El linaje queda en el metadata de cada modelo.
+
+Con varios workers, solo el que obtiene el lock de archivo (`lock_file`)
+revisa y entrena; todos siguen el puntero de producción del registro y
+recargan el modelo cuando cambia.
+"""
+
+from typing import Dict, Any, Optional, Callable, List
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+from .model_registry import ModelRegistry
+from .artifact_store import ArtifactStore
+
+logger = MLLogger.get_training_logger()
+config = get_config()
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _acquire_lock(path: Path) -> Optional[Any]:
+    """
+    Intenta tomar un lock exclusivo de archivo sin bloquear.
+
+    El sistema operativo lo libera si el proceso termina, así que un
+    worker caído no deja el lock tomado.
+
+    Args:
+        path: Archivo de lock
+
+    Returns:
+        Archivo abierto que mantiene el lock, o None si otro proceso lo tiene
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, 'a+')
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle
+
+
+def _lowercase_metrics(metrics: Dict[str, float]) -> Dict[str, float]:
+    """Métricas de `calculate_metrics` ('R2', 'MAPE') con las claves de `check_thresholds`."""
+    return {name.lower(): float(value) for name, value in metrics.items()}
+
+
+def _full_lineage(parent: Optional[str], reason: str) -> Dict[str, Any]:
+    """Linaje de un reentrenamiento completo (reinicia la cuenta incremental)."""
+    return {
+        'mode': 'full',
+        'parent': parent,
+        'incremental_steps': 0,
+        'last_full_refit': datetime.now().isoformat(),
+        'mode_reason': reason,
+    }
+
+
+def _prepare_with(preprocessor, df, target_columns: List[str]):
+    """
+    Prepara filas nuevas con el preprocesador de un modelo existente.
+
+    Limpieza, outliers y faltantes como en entrenamiento; el escalado usa
+    el scaler ya ajustado (sin reajustar) y las columnas del modelo.
+
+    Returns:
+        Tupla (X, y) en la escala del modelo
+    """
+    from ..data.preprocessor import DataPreprocessor
+
+    X, y = DataPreprocessor(scaling_method=config.scaling_method).prepare_dataset(
+        df,
+        target_columns=target_columns,
+        handle_outliers_flag=True,
+        scale=False
+    )
+    X = X.reindex(columns=preprocessor.feature_names)
+    if X.isna().any().any():
+        raise ValueError("las lecturas nuevas no tienen todas las features del modelo")
+    if preprocessor.scaler is not None:
+        X = preprocessor.scale_features(X, fit=False)
+    return X, y
+
+
+def _retrain_worker(
+    df,
+    models_dir: str,
+    production_path: Optional[str],
+    conn,
+    mode: str = 'full',
+    lineage: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Entrena y evalúa un candidato (se ejecuta en un proceso aparte).
+
+    El modelo en producción se evalúa sobre el mismo test del candidato.
+    En modo completo las features se llevan a unidades originales con el
+    scaler del candidato y se escalan con el preprocesador del modelo en
+    producción; en modo incremental ambos comparten el preprocesador.
+
+    Args:
+        df: Dataset combinado del repositorio (solo lecturas nuevas en modo incremental)
+        models_dir: Directorio de modelos
+        production_path: Modelo en producción (None si no hay)
+        conn: Extremo de envío del Pipe para el resultado
+        mode: 'full' o 'incremental'
+        lineage: Linaje del candidato (se completa con tiempos y métricas)
+    """
+    try:
+        import pandas as pd
+        from ..data.preprocessor import DataPreprocessor
+        from ..features.feature_engineer import FeatureEngineer
+        from .trainer import ChemicalConsumptionTrainer
+        from .evaluator import ModelEvaluator
+        from .model_manager import ModelManager
+
+        target_columns = config.target_variables
+        df = FeatureEngineer.engineer_features(df)
+        trainer = ChemicalConsumptionTrainer()
+        start = time.perf_counter()
+
+        if mode == 'incremental':
+            base_model, preprocessor, base_metadata = ModelManager(Path(models_dir)).load_model(
+                Path(production_path)
+            )
+            X, y = _prepare_with(preprocessor, df, target_columns)
+            X_train, X_val, X_test, y_train, y_val, y_test = trainer.split_data(X, y)
+            trainer.train_incremental(
+                base_model, base_metadata['model_name'],
+                X_train, y_train,
+                X_val, y_val
+            )
+            # Sin las filas históricas, la referencia de deriva sigue siendo la del modelo base
+            trainer.training_metadata['feature_histograms'] = base_metadata.get('feature_histograms')
+        else:
+            preprocessor = DataPreprocessor(scaling_method=config.scaling_method)
+            X, y = preprocessor.prepare_dataset(
+                df,
+                target_columns=target_columns,
+                handle_outliers_flag=True,
+                scale=True
+            )
+            X_train, X_val, X_test, y_train, y_val, y_test = trainer.split_data(X, y)
+            trainer.train_all_models(
+                X_train, y_train,
+                X_val, y_val,
+                perform_cv=config.get('optimization.auto_retrain.perform_cv', False)
+            )
+
+        _, best_model = trainer.select_best_model()
+        training_seconds = time.perf_counter() - start
+        trainer.extract_feature_importance(preprocessor.feature_names)
+
+        candidate_metrics = _lowercase_metrics(ModelEvaluator.calculate_metrics(
+            y_test, best_model.predict(X_test), target_names=target_columns
+        )['average'])
+        trainer.training_metadata['lineage'] = {
+            **(lineage or {'mode': mode}),
+            'training_seconds': round(training_seconds, 2),
+            'train_samples': len(X_train),
+            'test_metrics': candidate_metrics,
+        }
+        model_path = trainer.save_model(
+            preprocessor,
+            save_dir=Path(models_dir),
+            X_train=X_train if mode == 'full' else None,
+            promote=False
+        )
+
+        production_metrics = None
+        if mode == 'incremental':
+            production_metrics = ModelEvaluator.calculate_metrics(
+                y_test, base_model.predict(X_test), target_names=target_columns
+            )['average']
+        elif production_path:
+            try:
+                model, prod_preprocessor, metadata = ModelManager(Path(models_dir)).load_model(
+                    Path(production_path)
+                )
+                X_raw = X_test
+                if preprocessor.scaler is not None:
+                    X_raw = pd.DataFrame(
+                        preprocessor.scaler.inverse_transform(X_test),
+                        columns=X_test.columns,
+                        index=X_test.index
+                    )
+                X_prod = X_raw.reindex(columns=metadata.get('feature_names') or list(X_raw.columns))
+                if X_prod.isna().any().any():
+                    raise ValueError("el modelo en producción usa features que el candidato no tiene")
+                if prod_preprocessor.scaler is not None:
+                    X_prod = prod_preprocessor.scale_features(X_prod, fit=False)
+                production_metrics = ModelEvaluator.calculate_metrics(
+                    y_test, model.predict(X_prod), target_names=target_columns
+                )['average']
+            except Exception as e:
+                logger.warning(f"No se pudo evaluar el modelo en producción: {e}")
+
+        conn.send({
+            'candidate': model_path.name,
+            'mode': mode,
+            'candidate_metrics': candidate_metrics,
+            'production_metrics': (
+                _lowercase_metrics(production_metrics) if production_metrics else None
+            ),
+            'training_seconds': round(training_seconds, 2),
+            'test_samples': len(X_test),
+        })
+    except Exception as e:
+        logger.error(f"Error en reentrenamiento automático: {e}", exc_info=True)
+        conn.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+class AutoRetrainer:
+    """
+    Programador de reentrenamiento por volumen de datos nuevos y deriva.
+
+    Configuración en `optimization.auto_retrain` de `ml_config.yaml`.
+    """
+
+    def __init__(self, models_dir: Optional[Path] = None):
+        """
+        Inicializa el programador.
+
+        Args:
+            models_dir: Directorio de modelos (por defecto `persistence.models_dir`)
+        """
+        self.models_dir = Path(models_dir or config.models_dir)
+        self.registry = ModelRegistry(self.models_dir)
+
+        self.enabled = config.get('optimization.auto_retrain.enabled', False)
+        self.check_interval = config.get('optimization.auto_retrain.check_interval_seconds', 3600)
+        self.min_new_samples = config.get('optimization.auto_retrain.min_new_samples', 30)
+        self.drift_trigger = config.get('optimization.auto_retrain.drift_trigger', True)
+        self.drift_sources = config.get('optimization.auto_retrain.drift_sources', ['lecturas'])
+        self.drift_confirmations = config.get('optimization.auto_retrain.drift_confirmations', 3)
+        self.keep_rejected = config.get('optimization.auto_retrain.keep_rejected', False)
+        self.min_interval = timedelta(
+            hours=config.get('optimization.auto_retrain.min_interval_hours', 24)
+        )
+        self.lookback_days = config.get('optimization.auto_retrain.lookback_days', 180)
+        self.min_improvement = config.get('optimization.auto_retrain.min_improvement', 0.0)
+        self.timeout = config.get('optimization.auto_retrain.timeout_seconds', 3600)
+        self.start_method = config.get('optimization.auto_retrain.start_method', 'spawn')
+        self.incremental_enabled = config.get('optimization.auto_retrain.incremental.enabled', True)
+        self.incremental_min_samples = config.get(
+            'optimization.auto_retrain.incremental.min_samples', self.min_new_samples
+        )
+        self.full_refit_every = config.get('optimization.auto_retrain.incremental.full_refit_every', 4)
+        self.full_refit_age = timedelta(
+            days=config.get('optimization.auto_retrain.incremental.full_refit_days', 30)
+        )
+        self.lock_path = Path(config.get(
+            'optimization.auto_retrain.lock_file',
+            str(self.models_dir / '.auto_retrain.lock')
+        ))
+
+        self._session_factory: Optional[Callable] = None
+        self._on_promote: Optional[Callable[[Path], None]] = None
+        self._lock_handle = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._process = None
+        self._production_seen: Optional[str] = None
+        self._last_attempt: Optional[datetime] = None
+        self._last_rejected: Optional[date] = None
+        self._drift_model: Optional[str] = None
+        self._drift_streaks: Dict[str, int] = {}
+        self._last_check: Optional[Dict[str, Any]] = None
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_handle is not None
+
+    # ------------------------------------------------------------------
+    # Disparadores
+    # ------------------------------------------------------------------
+
+    def _new_samples(self, training_date: Optional[str]) -> int:
+        """
+        Lecturas de control de operación posteriores al día de entrenamiento.
+
+        Tras un candidato rechazado solo cuentan las lecturas posteriores a
+        ese intento, para no reentrenar con los mismos datos en cada ciclo.
+        """
+        from ..data.repository import PlantDataRepository
+
+        since = None
+        if training_date:
+            since = datetime.fromisoformat(training_date).date() + timedelta(days=1)
+        if self._last_rejected is not None:
+            after_rejected = self._last_rejected + timedelta(days=1)
+            since = max(since, after_rejected) if since else after_rejected
+
+        db = self._session_factory()
+        try:
+            return PlantDataRepository(db).count_operational_records(start_date=since)
+        finally:
+            db.close()
+
+    def _drifting_sources(self) -> List[str]:
+        """
+        Fuentes con deriva verificada.
+
+        Solo cuentan las fuentes de `drift_sources` (por defecto las lecturas
+        de la planta, no las entradas de /ml/predict) que siguen en `alerta`
+        en `drift_confirmations` revisiones seguidas, cada una con un reporte
+        nuevo. Un cambio de modelo en producción reinicia la cuenta.
+
+        Returns:
+            Fuentes con deriva verificada
+        """
+        from ..inference.drift_monitor import get_drift_monitor
+
+        report = get_drift_monitor().evaluate()
+        if report.get('model_version') != self._drift_model:
+            self._drift_model = report.get('model_version')
+            self._drift_streaks = {}
+
+        sources = report.get('sources', {})
+        for source in self.drift_sources:
+            if sources.get(source, {}).get('status') == 'alerta':
+                self._drift_streaks[source] = self._drift_streaks.get(source, 0) + 1
+            else:
+                self._drift_streaks[source] = 0
+
+        return sorted(
+            source for source, streak in self._drift_streaks.items()
+            if streak >= self.drift_confirmations
+        )
+
+    def plan_lineage(self, production: Optional[str], drifting: List[str]) -> Dict[str, Any]:
+        """
+        Decide entre reentrenamiento incremental y completo.
+
+        Incremental solo si el modelo en producción es de boosting y no hay
+        deriva, ni se cumplieron `full_refit_every` pasos incrementales o
+        `full_refit_days` desde el último ajuste completo.
+
+        Args:
+            production: Nombre del modelo en producción
+            drifting: Fuentes con deriva verificada
+
+        Returns:
+            Linaje del candidato: mode, parent, incremental_steps,
+            last_full_refit y el motivo del modo (mode_reason)
+        """
+        from .trainer import INCREMENTAL_MODELS
+
+        entry = self.registry.get(production) if production else None
+        parent_lineage = (entry or {}).get('lineage') or {}
+        steps = parent_lineage.get('incremental_steps', 0)
+        last_full = parent_lineage.get('last_full_refit') or (entry or {}).get('training_date')
+
+        if not self.incremental_enabled:
+            reason = 'incremental desactivado'
+        elif entry is None:
+            reason = 'sin modelo en producción'
+        elif entry.get('model_name') not in INCREMENTAL_MODELS:
+            reason = f"{entry.get('model_name')} no admite boosting incremental"
+        elif drifting:
+            reason = 'deriva de features'
+        elif steps >= self.full_refit_every:
+            reason = f"{steps} pasos incrementales desde el último ajuste completo"
+        elif last_full and datetime.now() - datetime.fromisoformat(last_full) >= self.full_refit_age:
+            reason = f"último ajuste completo: {last_full[:10]}"
+        else:
+            return {
+                'mode': 'incremental',
+                'parent': production,
+                'incremental_steps': steps + 1,
+                'last_full_refit': last_full,
+                'since': entry.get('training_date'),
+                'mode_reason': f"paso incremental {steps + 1} de {self.full_refit_every}",
+            }
+
+        return _full_lineage(production, reason)
+
+    def check(self) -> Dict[str, Any]:
+        """
+        Evalúa los disparadores y, si corresponde, reentrena.
+
+        Returns:
+            Diccionario con lecturas nuevas, fuentes con deriva, motivos y
+            si se lanzó el reentrenamiento
+        """
+        production = self.registry.get_production_name()
+        entry = self.registry.get(production) if production else None
+
+        new_samples = self._new_samples(entry.get('training_date') if entry else None)
+        drifting = self._drifting_sources() if self.drift_trigger else []
+
+        reasons = []
+        if new_samples >= self.min_new_samples:
+            reasons.append(f"{new_samples} lecturas nuevas")
+        if drifting:
+            reasons.append(f"deriva en {', '.join(drifting)}")
+
+        cooling_down = (
+            self._last_attempt is not None
+            and datetime.now() - self._last_attempt < self.min_interval
+        )
+
+        lineage = self.plan_lineage(production, drifting)
+        result = {
+            'timestamp': datetime.now().isoformat(),
+            'production': production,
+            'new_samples': new_samples,
+            'drifting_sources': drifting,
+            'reasons': reasons,
+            'mode': lineage['mode'],
+            'mode_reason': lineage['mode_reason'],
+            'cooling_down': cooling_down,
+            'triggered': bool(reasons) and not cooling_down,
+        }
+        self._last_check = result
+
+        if result['triggered']:
+            logger.info(
+                f"Reentrenamiento automático ({lineage['mode']}, {lineage['mode_reason']}): "
+                f"{'; '.join(reasons)}"
+            )
+            self.run_retraining(reasons, lineage)
+
+        return result
+
+    # ------------------------------------------------------------------
+    # Reentrenamiento
+    # ------------------------------------------------------------------
+
+    def _load_dataset(self, lineage: Dict[str, Any]):
+        """
+        Lee el dataset del candidato: las lecturas nuevas en modo
+        incremental o `lookback_days` de historial en modo completo.
+
+        Si no hay suficientes lecturas nuevas el linaje pasa a completo.
+        """
+        from ..data.repository import PlantDataRepository
+        from ..utils.validation import InsufficientDataError
+
+        end_date = datetime.now().date()
+        db = self._session_factory()
+        try:
+            repository = PlantDataRepository(db)
+            if lineage['mode'] == 'incremental':
+                since = datetime.fromisoformat(lineage.pop('since')).date() + timedelta(days=1)
+                try:
+                    return repository.get_combined_dataset(
+                        start_date=since,
+                        end_date=end_date,
+                        min_samples=self.incremental_min_samples
+                    )
+                except InsufficientDataError as e:
+                    logger.info(f"Reentrenamiento completo: {e}")
+                    lineage.update(_full_lineage(
+                        lineage['parent'], 'lecturas nuevas insuficientes para el modo incremental'
+                    ))
+
+            return repository.get_combined_dataset(
+                start_date=end_date - timedelta(days=self.lookback_days),
+                end_date=end_date
+            )
+        finally:
+            db.close()
+
+    def run_retraining(
+        self,
+        reasons: List[str],
+        lineage: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Entrena un candidato en un proceso aparte y decide si promoverlo.
+
+        Args:
+            reasons: Motivos del reentrenamiento (para el historial)
+            lineage: Plan de `plan_lineage` (por defecto se calcula sin deriva)
+
+        Returns:
+            Resultado del intento (ver `decide`)
+        """
+        self._last_attempt = datetime.now()
+        start = time.perf_counter()
+        production_path = self.registry.get_production_path()
+        lineage = dict(lineage or self.plan_lineage(self.registry.get_production_name(), []))
+
+        try:
+            df = self._load_dataset(lineage)
+        except Exception as e:
+            logger.warning(f"Reentrenamiento automático omitido: {e}")
+            result = {'error': f"{type(e).__name__}: {e}"}
+            df = None
+
+        if df is not None:
+            result = self._train_in_subprocess(df, production_path, lineage)
+
+            if lineage['mode'] == 'incremental' and result.get('error') not in (None, 'timeout'):
+                logger.warning(f"Reentrenamiento incremental fallido ({result['error']}), entrenando completo")
+                lineage = _full_lineage(lineage['parent'], f"incremental fallido: {result['error']}")
+                try:
+                    df = self._load_dataset(lineage)
+                    result = self._train_in_subprocess(df, production_path, lineage)
+                except Exception as e:
+                    result = {'error': f"{type(e).__name__}: {e}"}
+
+        if 'error' not in result:
+            result.update(self.decide(result))
+
+        result.update({
+            'reasons': reasons,
+            'started_at': self._last_attempt.isoformat(),
+            'duration_seconds': round(time.perf_counter() - start, 1),
+        })
+        self._last_run = result
+        return result
+
+    def _train_in_subprocess(
+        self,
+        df,
+        production_path: Optional[Path],
+        lineage: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Lanza `_retrain_worker` y espera su resultado hasta `timeout_seconds`."""
+        ctx = multiprocessing.get_context(self.start_method)
+        receiver, sender = ctx.Pipe(duplex=False)
+        self._process = ctx.Process(
+            target=_retrain_worker,
+            args=(
+                df, str(self.models_dir), str(production_path) if production_path else None,
+                sender, lineage['mode'], lineage
+            ),
+            name="auto-retrain"
+        )
+        self._process.start()
+        sender.close()
+
+        try:
+            if receiver.poll(self.timeout):
+                return receiver.recv()
+            logger.error(f"Reentrenamiento automático cancelado: superó {self.timeout}s")
+            return {'error': 'timeout'}
+        except EOFError:
+            return {'error': f"el proceso terminó sin resultado (exitcode {self._process.exitcode})"}
+        finally:
+            receiver.close()
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def decide(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Promueve el candidato si cumple umbrales y mejora al modelo en producción.
+
+        La comparación usa la métrica principal (`models.selection_criteria`)
+        sobre el mismo test; con `min_improvement` se exige una mejora
+        relativa mínima. Sin modelo en producción evaluable basta con los
+        umbrales.
+
+        Args:
+            result: Resultado de `_retrain_worker`
+
+        Un candidato rechazado se elimina (salvo `keep_rejected`) y el día
+        del intento pasa a ser el punto de partida de las lecturas nuevas.
+
+        Returns:
+            Diccionario con promoted, passes_thresholds y warnings
+        """
+        from .evaluator import ModelEvaluator
+
+        candidate = result['candidate_metrics']
+        production = result.get('production_metrics')
+
+        passes, warnings = ModelEvaluator.check_thresholds(
+            candidate,
+            min_r2=config.min_r2_score,
+            max_mape=config.get('evaluation.thresholds.max_mape_percent', 15.0)
+        )
+
+        metric = config.primary_metric
+        minimize = config.get('models.selection_criteria.minimize', True)
+        better = True
+        if production is not None and metric in candidate and metric in production:
+            margin = abs(production[metric]) * self.min_improvement
+            if minimize:
+                better = candidate[metric] < production[metric] - margin
+            else:
+                better = candidate[metric] > production[metric] + margin
+            if not better:
+                warnings.append(
+                    f"{metric} {candidate[metric]:.4f} no mejora al modelo en producción "
+                    f"({production[metric]:.4f})"
+                )
+
+        promoted = passes and better
+        if promoted:
+            self.registry.set_production(result['candidate'])
+            logger.info(f"Candidato promovido a producción: {result['candidate']}")
+            self._sync_production()
+        else:
+            logger.warning(
+                f"Candidato {result['candidate']} no promovido: {'; '.join(warnings)}"
+            )
+            self._last_rejected = (self._last_attempt or datetime.now()).date()
+            if not self.keep_rejected:
+                self._discard_candidate(result['candidate'])
+
+        return {'promoted': promoted, 'passes_thresholds': passes, 'warnings': warnings}
+
+    def _discard_candidate(self, name: str) -> None:
+        """Elimina un candidato rechazado del disco, del registro y sus objetos sin referencia."""
+        try:
+            shutil.rmtree(self.models_dir / name, ignore_errors=True)
+            self.registry.remove([name])
+            ArtifactStore(self.models_dir).collect_garbage()
+            logger.info(f"Candidato rechazado eliminado: {name}")
+        except Exception as e:
+            logger.error(f"Error eliminando el candidato {name}: {e}")
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def _sync_production(self) -> None:
+        """Recarga el modelo si el puntero de producción cambió (en cualquier worker)."""
+        name = self.registry.get_production_name()
+        if name == self._production_seen:
+            return
+        self._production_seen = name
+        if name and self._on_promote is not None:
+            try:
+                self._on_promote(self.models_dir / name)
+            except Exception as e:
+                logger.error(f"Error recargando el modelo {name}: {e}")
+
+    def start(
+        self,
+        session_factory: Callable,
+        on_promote: Optional[Callable[[Path], None]] = None
+    ) -> None:
+        """
+        Inicia el hilo de revisión.
+
+        Args:
+            session_factory: Fábrica de sesiones de base de datos
+            on_promote: Callback que recarga el modelo en este worker
+        """
+        if not self.enabled or self._thread is not None:
+            return
+
+        self._session_factory = session_factory
+        self._on_promote = on_promote
+        self._production_seen = self.registry.get_production_name()
+        self._lock_handle = _acquire_lock(self.lock_path)
+        if self.is_leader:
+            logger.info(f"Reentrenamiento automático activo en este worker (pid {os.getpid()})")
+
+        def loop():
+            while not self._stop.wait(self.check_interval):
+                try:
+                    if self._lock_handle is None:
+                        # El líder pudo terminar: el lock queda libre
+                        self._lock_handle = _acquire_lock(self.lock_path)
+                    if self.is_leader:
+                        self.check()
+                    self._sync_production()
+                except Exception as e:
+                    logger.error(f"Error en reentrenamiento automático: {e}", exc_info=True)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name="auto-retrain", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el hilo, termina un entrenamiento en curso y libera el lock."""
+        self._stop.set()
+        process = self._process
+        if process is not None and process.is_alive():
+            process.terminate()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._lock_handle is not None:
+            self._lock_handle.close()
+            self._lock_handle = None
+
+    def retraining_report(self) -> List[Dict[str, Any]]:
+        """
+        Reporte comparativo de reentrenamientos incrementales y completos.
+
+        Returns:
+            Una fila por modo: corridas, métricas de test y tiempo promedio
+        """
+        from .evaluator import ModelEvaluator
+
+        report = ModelEvaluator.compare_retraining_modes(self.registry.list_models())
+        return report.to_dict('records')
+
+    def status(self) -> Dict[str, Any]:
+        """Estado del programador en este worker."""
+        return {
+            'enabled': self.enabled,
+            'leader': self.is_leader,
+            'running': self._process is not None,
+            'check_interval_seconds': self.check_interval,
+            'min_new_samples': self.min_new_samples,
+            'drift_trigger': self.drift_trigger,
+            'drift_sources': self.drift_sources,
+            'drift_confirmations': self.drift_confirmations,
+            'drift_streaks': dict(self._drift_streaks),
+            'last_rejected': self._last_rejected.isoformat() if self._last_rejected else None,
+            'last_attempt': self._last_attempt.isoformat() if self._last_attempt else None,
+            'last_check': self._last_check,
+            'last_run': self._last_run,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_auto_retrainer() -> AutoRetrainer:
+    """
+    Factory function para obtener el programador de reentrenamiento compartido.
+
+    Returns:
+        Instancia de AutoRetrainer
+    """
+    return AutoRetrainer()
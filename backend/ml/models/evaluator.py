@@ -152,6 +152,44 @@ class ModelEvaluator:
         
         return df_comparison
     
+    @staticmethod
+    def compare_retraining_modes(
+        entries: List[Dict]
+    ) -> pd.DataFrame:
+        """
+        Compara reentrenamientos incrementales y completos.
+        
+        Promedia, por modo, las métricas de test y el tiempo de
+        entrenamiento guardados en el linaje de cada modelo. Los modelos
+        sin linaje (entrenados manualmente) no cuentan.
+        
+        Args:
+            entries: Entradas del registro de modelos (con 'lineage')
+        
+        Returns:
+            DataFrame con una fila por modo (reporte comparativo)
+        """
+        runs: Dict[str, List[Dict[str, float]]] = {}
+        for entry in entries:
+            lineage = entry.get('lineage')
+            if not lineage:
+                continue
+            runs.setdefault(lineage['mode'], []).append({
+                **lineage.get('test_metrics', {}),
+                'training_seconds': lineage.get('training_seconds'),
+                'train_samples': lineage.get('train_samples'),
+            })
+        
+        scores = {
+            mode: {
+                'runs': len(rows),
+                **pd.DataFrame(rows).mean(numeric_only=True).round(4).to_dict()
+            }
+            for mode, rows in runs.items()
+        }
+        
+        return ModelEvaluator.generate_comparison_report(scores)
+    
     @staticmethod
     def check_thresholds(
         metrics: Dict[str, float],
@@ -0,0 +1,384 @@
+"""
+Búsqueda de hiperparámetros por successive halving.
+
+Para XGBoost y LightGBM se muestrean `n_candidates` configuraciones del
+espacio de `models.search.space` y se entrenan por rondas (rungs): en la
+primera cada configuración recibe `min_estimators` árboles, en cada ronda
+siguiente el presupuesto se multiplica por `reduction_factor` (la última
+llega a `max_estimators`) y solo sigue la mejor fracción
+1/`reduction_factor`. Todas las corridas usan early stopping sobre el
+split de validación existente, así que una configuración que deja de
+mejorar no consume el presupuesto completo.
+
+Las configuraciones se entrenan en paralelo en un pool de hilos (el
+entrenamiento de XGBoost/LightGBM libera el GIL) con `n_jobs=1` cada una,
+hasta agotar `time_budget_seconds` entre todos los modelos. Un callback
+de XGBoost/LightGBM revisa el deadline en cada iteración de boosting, así
+que las corridas en curso también se detienen al agotarse el presupuesto.
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import itertools
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+import xgboost as xgb
+from sklearn.multioutput import MultiOutputRegressor
+
+from ..utils.logger import MLLogger
+from ..utils.config_manager import get_config
+
+logger = MLLogger.get_training_logger()
+config = get_config()
+
+ESTIMATORS = {
+    'xgboost': xgb.XGBRegressor,
+    'lightgbm': lgb.LGBMRegressor,
+}
+
+
+def sample_candidates(
+    space: Dict[str, List[Any]],
+    n_candidates: int,
+    random_state: int
+) -> List[Dict[str, Any]]:
+    """
+    Muestrea configuraciones distintas de la grilla del espacio.
+
+    Args:
+        space: Parámetro -> lista de valores
+        n_candidates: Configuraciones a muestrear (toda la grilla si es menor)
+        random_state: Semilla
+
+    Returns:
+        Lista de diccionarios de parámetros
+    """
+    names = sorted(space)
+    grid = list(itertools.product(*(space[name] for name in names)))
+    rng = np.random.default_rng(random_state)
+    chosen = rng.permutation(len(grid))[:n_candidates]
+    return [dict(zip(names, grid[i])) for i in sorted(chosen)]
+
+
+class SearchDeadlineExceeded(TimeoutError):
+    """La corrida se detuvo por el presupuesto de tiempo de la búsqueda."""
+
+
+class _XGBDeadline(xgb.callback.TrainingCallback):
+    """Detiene el boosting de XGBoost al pasar el deadline."""
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+
+    def after_iteration(self, model, epoch: int, evals_log) -> bool:
+        return time.monotonic() >= self.deadline
+
+
+def _lgb_deadline(deadline: float):
+    """Callback de LightGBM que detiene el boosting al pasar el deadline."""
+    def _callback(env) -> None:
+        if time.monotonic() >= deadline:
+            raise lgb.callback.EarlyStopException(env.iteration, env.evaluation_result_list)
+    _callback.order = 40  # LightGBM ordena los callbacks por este atributo
+    return _callback
+
+
+def fit_with_early_stopping(
+    model_name: str,
+    params: Dict[str, Any],
+    n_estimators: int,
+    X_train: pd.DataFrame,
+    y_train: pd.DataFrame,
+    X_val: pd.DataFrame,
+    y_val: pd.DataFrame,
+    early_stopping_rounds: int,
+    deadline: Optional[float] = None
+) -> Tuple[MultiOutputRegressor, List[int]]:
+    """
+    Entrena un estimador por target con early stopping en validación.
+
+    MultiOutputRegressor no separa el `eval_set` por target, así que cada
+    estimador se ajusta por separado y se arma el wrapper al final.
+
+    Args:
+        model_name: 'xgboost' o 'lightgbm'
+        params: Hiperparámetros (sin n_estimators)
+        n_estimators: Presupuesto de árboles por target
+        X_train: Features de entrenamiento
+        y_train: Targets de entrenamiento
+        X_val: Features de validación
+        y_val: Targets de validación
+        early_stopping_rounds: Rondas sin mejora antes de detenerse
+        deadline: Instante (`time.monotonic()`) en que se corta el boosting
+
+    Returns:
+        Tupla (modelo ajustado, mejor iteración por target)
+
+    Raises:
+        SearchDeadlineExceeded: Si el deadline cortó el entrenamiento
+    """
+    estimator_cls = ESTIMATORS[model_name]
+    estimators = []
+    best_iterations = []
+
+    for i in range(y_train.shape[1]):
+        target_train = y_train.iloc[:, i]
+        eval_set = [(X_val, y_val.iloc[:, i])]
+
+        if model_name == 'xgboost':
+            estimator = estimator_cls(
+                **params, n_estimators=n_estimators, early_stopping_rounds=early_stopping_rounds,
+                callbacks=[_XGBDeadline(deadline)] if deadline is not None else None
+            )
+            estimator.fit(X_train, target_train, eval_set=eval_set, verbose=False)
+            # El callback no queda en el modelo guardado
+            estimator.set_params(callbacks=None)
+            best_iterations.append(int(estimator.best_iteration) + 1)
+        else:
+            callbacks = [lgb.early_stopping(early_stopping_rounds, verbose=False)]
+            if deadline is not None:
+                callbacks.append(_lgb_deadline(deadline))
+            estimator = estimator_cls(**params, n_estimators=n_estimators)
+            estimator.fit(X_train, target_train, eval_set=eval_set, callbacks=callbacks)
+            best_iterations.append(int(estimator.best_iteration_ or n_estimators))
+        estimators.append(estimator)
+
+        if deadline is not None and time.monotonic() >= deadline:
+            raise SearchDeadlineExceeded("presupuesto de búsqueda agotado")
+
+    # La plantilla (para clone/CV) usa el número de árboles encontrado, sin early stopping
+    model = MultiOutputRegressor(estimator_cls(**params, n_estimators=max(best_iterations)))
+    model.estimators_ = estimators
+    model.n_features_in_ = X_train.shape[1]
+    model.feature_names_in_ = np.asarray(X_train.columns, dtype=object)
+
+    return model, best_iterations
+
+
+def _validation_rmse(model: MultiOutputRegressor, X_val: pd.DataFrame, y_val: pd.DataFrame) -> float:
+    """RMSE promedio de los targets en validación."""
+    errors = model.predict(X_val) - y_val.to_numpy()
+    return float(np.sqrt((errors ** 2).mean(axis=0)).mean())
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive halving con early stopping para modelos de boosting.
+
+    Configuración en `models.search` de `ml_config.yaml`.
+    """
+
+    def __init__(
+        self,
+        time_budget_seconds: Optional[float] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Inicializa la búsqueda.
+
+        Args:
+            time_budget_seconds: Tiempo total para todos los modelos
+                (por defecto models.search.time_budget_seconds)
+            max_workers: Configuraciones entrenando a la vez (por defecto CPUs)
+        """
+        self.n_candidates = config.get('models.search.n_candidates', 27)
+        self.min_estimators = config.get('models.search.min_estimators', 50)
+        self.max_estimators = config.get('models.search.max_estimators', 1000)
+        self.reduction_factor = config.get('models.search.reduction_factor', 3)
+        self.early_stopping_rounds = config.get('models.search.early_stopping_rounds', 20)
+        self.random_state = config.get('models.search.random_state', config.random_state)
+        self.space: Dict[str, Dict[str, List[Any]]] = config.get('models.search.space', {})
+        self.time_budget = time_budget_seconds or config.get('models.search.time_budget_seconds', 600)
+        self.max_workers = (
+            max_workers or config.get('models.search.max_workers') or os.cpu_count() or 1
+        )
+
+        self.history: List[Dict[str, Any]] = []
+
+    def _budgets(self) -> List[int]:
+        """Árboles por ronda: min_estimators * factor^k; la última ronda usa max_estimators."""
+        budgets = [self.min_estimators]
+        while budgets[-1] * self.reduction_factor < self.max_estimators:
+            budgets.append(budgets[-1] * self.reduction_factor)
+        if budgets[-1] < self.max_estimators:
+            budgets.append(self.max_estimators)
+        return budgets
+
+    def _base_params(self, model_name: str) -> Dict[str, Any]:
+        """Parámetros fijos del yaml sin n_estimators; un hilo por configuración."""
+        params = dict(config.get_model_params(model_name))
+        params.pop('n_estimators', None)
+        params['n_jobs'] = 1
+        if model_name == 'lightgbm':
+            params['verbose'] = -1
+        return params
+
+    def run(
+        self,
+        model_names: List[str],
+        X_train: pd.DataFrame,
+        y_train: pd.DataFrame,
+        X_val: pd.DataFrame,
+        y_val: pd.DataFrame
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Ejecuta la búsqueda para cada modelo.
+
+        Las rondas de todos los modelos comparten el pool y el presupuesto
+        de tiempo; al agotarse, las corridas pendientes se cancelan, las que
+        están en curso se detienen en la siguiente iteración y cada
+        modelo conserva su mejor configuración de la ronda más alta que
+        completó al menos una corrida.
+
+        Args:
+            model_names: Modelos a buscar (xgboost, lightgbm)
+            X_train: Features de entrenamiento
+            y_train: Targets de entrenamiento
+            X_val: Features de validación (early stopping y ranking)
+            y_val: Targets de validación
+
+        Returns:
+            Por modelo: model, params, best_iterations, rmse, rung, n_estimators
+        """
+        deadline = time.monotonic() + self.time_budget
+        budgets = self._budgets()
+
+        survivors = {
+            name: [
+                {**self._base_params(name), **candidate}
+                for candidate in sample_candidates(
+                    self.space.get(name, {}), self.n_candidates, self.random_state
+                )
+            ]
+            for name in model_names
+        }
+        best: Dict[str, Dict[str, Any]] = {}
+
+        logger.info(
+            f"Búsqueda de hiperparámetros: {', '.join(model_names)}, "
+            f"{self.n_candidates} candidatos, rondas de {budgets} árboles, "
+            f"{self.max_workers} en paralelo, presupuesto {self.time_budget}s"
+        )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hp-search") as pool:
+            for rung, n_estimators in enumerate(budgets):
+                if time.monotonic() >= deadline:
+                    break
+
+                futures = {
+                    pool.submit(self._evaluate, name, params, n_estimators,
+                                X_train, y_train, X_val, y_val, deadline): (name, params)
+                    for name, candidates in survivors.items()
+                    for params in candidates
+                }
+                results: Dict[str, List[Dict[str, Any]]] = {name: [] for name in survivors}
+
+                pending = set(futures)
+                while pending:
+                    remaining = deadline - time.monotonic()
+                    done, pending = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, params = futures[future]
+                        try:
+                            result = future.result()
+                        except SearchDeadlineExceeded:
+                            continue
+                        except Exception as e:
+                            logger.warning(f"Configuración descartada ({name}, {params}): {e}")
+                            continue
+                        result['rung'] = rung
+                        results[name].append(result)
+                    if remaining <= 0:
+                        for future in pending:
+                            future.cancel()
+                        logger.warning(
+                            f"Presupuesto de búsqueda agotado en la ronda {rung} "
+                            f"({len(pending)} corridas canceladas)"
+                        )
+                        break
+
+                # Las corridas en curso se detienen en el deadline y sus resultados no se usan
+                next_survivors = {}
+                for name, rung_results in results.items():
+                    if not rung_results:
+                        continue
+                    rung_results.sort(key=lambda r: r['rmse'])
+                    best[name] = rung_results[0]
+                    keep = max(len(rung_results) // self.reduction_factor, 1)
+                    next_survivors[name] = [r['params'] for r in rung_results[:keep]]
+
+                survivors = next_survivors
+                if not survivors:
+                    break
+
+        for name, result in best.items():
+            logger.info(
+                f"Mejor configuración {name}: rmse={result['rmse']:.4f}, "
+                f"ronda {result['rung']}, árboles {result['best_iterations']}, {result['params']}"
+            )
+
+        return best
+
+    def _evaluate(
+        self,
+        model_name: str,
+        params: Dict[str, Any],
+        n_estimators: int,
+        X_train: pd.DataFrame,
+        y_train: pd.DataFrame,
+        X_val: pd.DataFrame,
+        y_val: pd.DataFrame,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Entrena y puntúa una configuración con un presupuesto de árboles."""
+        start = time.perf_counter()
+        model, best_iterations = fit_with_early_stopping(
+            model_name, params, n_estimators,
+            X_train, y_train, X_val, y_val,
+            self.early_stopping_rounds,
+            deadline=deadline
+        )
+        result = {
+            'model_name': model_name,
+            'model': model,
+            'params': params,
+            'n_estimators': n_estimators,
+            'best_iterations': best_iterations,
+            'rmse': _validation_rmse(model, X_val, y_val),
+            'seconds': time.perf_counter() - start,
+        }
+        self.history.append({k: v for k, v in result.items() if k != 'model'})
+        return result
+
+    def summary(self, best: Dict[str, Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        """
+        Resumen serializable para el metadata del modelo.
+
+        Args:
+            best: Resultado de `run`
+            elapsed: Segundos de pared de la búsqueda
+
+        Returns:
+            Diccionario con presupuesto, corridas y mejor configuración por modelo
+        """
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'time_budget_seconds': self.time_budget,
+            'evaluations': len(self.history),
+            'train_seconds': round(sum(r['seconds'] for r in self.history), 2),
+            'budgets': self._budgets(),
+            'best': {
+                name: {
+                    'params': result['params'],
+                    'rmse': round(result['rmse'], 4),
+                    'rung': result['rung'],
+                    'best_iterations': result['best_iterations'],
+                }
+                for name, result in best.items()
+            },
+        }
@@ -13,6 +13,8 @@ import json
 from ..utils.logger import MLLogger
 from ..utils.config_manager import get_config
 from ..utils.validation import ModelNotFoundError
+from .model_registry import ModelRegistry
+from .artifact_store import ArtifactStore
 
 logger = MLLogger.get_inference_logger()
 config = get_config()
@@ -42,6 +44,8 @@ class ModelManager:
         """
         self.models_dir = models_dir or config.models_dir
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.registry = ModelRegistry(self.models_dir)
+        self.store = ArtifactStore(self.models_dir)
         
         self.current_model: Optional[Any] = None
         self.current_preprocessor: Optional[Any] = None
@@ -50,60 +54,50 @@ class ModelManager:
     
     def list_available_models(self) -> List[Dict[str, Any]]:
         """
-        Lista todos los modelos disponibles.
+        Lista todos los modelos disponibles (desde el manifiesto del registro).
         
         Returns:
-            Lista de diccionarios con información de modelos
+            Lista de diccionarios con información de modelos, del más
+            reciente al más antiguo
         """
-        models_info = []
-        
-        if not self.models_dir.exists():
-            logger.warning(f"Directorio de modelos no existe: {self.models_dir}")
-            return models_info
-        
-        for model_dir in self.models_dir.iterdir():
-            if model_dir.is_dir() and (model_dir / "model.pkl").exists():
-                metadata_path = model_dir / "metadata.pkl"
-                
-                info = {
-                    'path': str(model_dir),
-                    'name': model_dir.name,
-                    'created': datetime.fromtimestamp(model_dir.stat().st_ctime).isoformat()
-                }
-                
-                # Cargar metadata si existe
-                if metadata_path.exists():
-                    try:
-                        metadata = joblib.load(metadata_path)
-                        info['model_name'] = metadata.get('model_name')
-                        info['training_date'] = metadata.get('training_date')
-                        info['metrics'] = metadata.get('metrics', {})
-                    except Exception as e:
-                        logger.warning(f"Error cargando metadata de {model_dir}: {e}")
-                
-                models_info.append(info)
-        
-        # Ordenar por fecha de creación (más reciente primero)
-        models_info.sort(key=lambda x: x['created'], reverse=True)
+        models_info = [
+            dict(info, created=info.get('registered_at'))
+            for info in self.registry.list_models()
+        ]
         
         logger.info(f"Modelos disponibles: {len(models_info)}")
         return models_info
     
     def get_latest_model_path(self) -> Optional[Path]:
         """
-        Obtiene la ruta del modelo más reciente.
+        Obtiene la ruta del modelo en producción (por defecto, el más reciente).
+        
+        Consulta el puntero del manifiesto, sin recorrer directorios.
         
         Returns:
             Path del modelo o None si no hay modelos
         """
-        models = self.list_available_models()
+        path = self.registry.get_production_path()
         
-        if not models:
+        if path is None:
             logger.warning("No hay modelos disponibles")
-            return None
         
-        latest = models[0]  # Ya está ordenado por fecha
-        return Path(latest['path'])
+        return path
+    
+    def set_production_model(self, version: str) -> None:
+        """
+        Marca un modelo como el modelo en producción.
+        
+        Args:
+            version: Nombre de directorio del modelo
+            
+        Raises:
+            ModelNotFoundError: Si el modelo no está registrado
+        """
+        try:
+            self.registry.set_production(version)
+        except KeyError as e:
+            raise ModelNotFoundError(str(e))
     
     def load_model(
         self,
@@ -122,6 +116,7 @@ class ModelManager:
             
         Raises:
             ModelNotFoundError: Si no se encuentra el modelo
+            ModelIntegrityError: Si un artefacto falta o no coincide con su digest
         """
         # Determinar qué modelo cargar
         if model_path:
@@ -138,34 +133,91 @@ class ModelManager:
         
         logger.info(f"Cargando modelo desde: {target_path}")
         
-        # Cargar modelo
         model_file = target_path / "model.pkl"
         if not model_file.exists():
             raise ModelNotFoundError(f"Archivo de modelo no encontrado: {model_file}")
         
-        model = joblib.load(model_file)
-        logger.info("Modelo cargado")
+        if self.store.has_manifest(target_path):
+            model, preprocessor, metadata = self._load_from_store(target_path)
+        else:
+            model, preprocessor, metadata = self._load_legacy(target_path)
         
-        # Cargar preprocesador
+        # Actualizar estado interno
+        self.current_model = model
+        self.current_preprocessor = preprocessor
+        self.current_metadata = metadata
+        self.model_path = target_path
+        
+        return model, preprocessor, metadata
+    
+    def _load_from_store(self, target_path: Path) -> Tuple[Any, Any, Dict]:
+        """
+        Carga un modelo con manifiesto de digests (artefactos en paralelo).
+        
+        Raises:
+            ModelIntegrityError: Si un artefacto falta o está dañado
+        """
+        from ..data.preprocessor import DataPreprocessor
+        
+        # El manifiesto indica si model.pkl se guardó sin compresión (admite mmap)
+        entries = self.store.read_manifest(target_path)['artifacts']
+        mmap_mode = self._mmap_mode_for(
+            {'serialization': {'compress': entries['model.pkl'].get('compress', 0)}}
+        )
+        
+        artifacts = self.store.load_model(target_path, mmap_modes={'model.pkl': mmap_mode})
+        logger.info(
+            f"Artefactos cargados y verificados: {len(artifacts)}"
+            f"{' (model.pkl con mmap)' if mmap_mode else ''}"
+        )
+        
+        return (
+            artifacts['model.pkl'],
+            DataPreprocessor.from_artifacts(artifacts),
+            artifacts.get('metadata.pkl', {})
+        )
+    
+    def _load_legacy(self, target_path: Path) -> Tuple[Any, Any, Dict]:
+        """Carga un modelo guardado antes del almacén por contenido (sin verificación)."""
         from ..data.preprocessor import DataPreprocessor
-        preprocessor = DataPreprocessor.load(target_path)
-        logger.info("Preprocesador cargado")
         
-        # Cargar metadata
+        # Cargar metadata (indica si model.pkl admite mmap)
         metadata_file = target_path / "metadata.pkl"
         metadata = {}
         if metadata_file.exists():
             metadata = joblib.load(metadata_file)
             logger.info(f"Metadata cargada: modelo '{metadata.get('model_name')}'")
         
-        # Actualizar estado interno
-        self.current_model = model
-        self.current_preprocessor = preprocessor
-        self.current_metadata = metadata
-        self.model_path = target_path
+        # Cargar modelo
+        mmap_mode = self._mmap_mode_for(metadata)
+        model = joblib.load(target_path / "model.pkl", mmap_mode=mmap_mode)
+        logger.info(f"Modelo cargado{' (mmap)' if mmap_mode else ''}")
+        
+        # Cargar preprocesador
+        preprocessor = DataPreprocessor.load(target_path)
+        logger.info("Preprocesador cargado")
         
         return model, preprocessor, metadata
     
+    @staticmethod
+    def _mmap_mode_for(metadata: Dict[str, Any]) -> Optional[str]:
+        """
+        Modo mmap para cargar model.pkl.
+        
+        Solo aplica a artefactos guardados sin compresión; los modelos
+        anteriores (sin 'serialization' en metadata) estaban comprimidos.
+        
+        Args:
+            metadata: Metadata del modelo
+            
+        Returns:
+            'r' (o el modo configurado) o None para carga completa
+        """
+        compress = metadata.get('serialization', {}).get('compress', 3)
+        if compress:
+            return None
+        return config.get('persistence.serialization.mmap_mode', 'r')
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         Obtiene información del modelo actualmente cargado.
@@ -182,7 +234,8 @@ class ModelManager:
             'model_name': self.current_metadata.get('model_name', 'unknown'),
             'training_date': self.current_metadata.get('training_date'),
             'metrics': self.current_metadata.get('metrics', {}),
-            'feature_count': len(self.current_metadata.get('feature_names', []))
+            'feature_count': len(self.current_metadata.get('feature_names', [])),
+            'is_production': self.model_path.name == self.registry.get_production_name()
         }
         
         return info
@@ -191,6 +244,8 @@ class ModelManager:
         """
         Limpia modelos antiguos, manteniendo solo los N más recientes.
         
+        El modelo en producción nunca se elimina.
+        
         Args:
             keep_last_n: Número de modelos a mantener
             
@@ -203,8 +258,8 @@ class ModelManager:
             logger.info(f"Solo hay {len(models)} modelos, no se eliminará ninguno")
             return 0
         
-        models_to_delete = models[keep_last_n:]
-        deleted_count = 0
+        models_to_delete = [m for m in models[keep_last_n:] if not m.get('is_production')]
+        deleted = []
         
         for model_info in models_to_delete:
             try:
@@ -215,11 +270,17 @@ class ModelManager:
                 shutil.rmtree(model_path)
                 
                 logger.info(f"Modelo eliminado: {model_path.name}")
-                deleted_count += 1
+                deleted.append(model_path.name)
             
             except Exception as e:
                 logger.error(f"Error eliminando modelo {model_info['path']}: {e}")
         
+        # Una sola escritura atómica del manifiesto
+        if deleted:
+            self.registry.remove(deleted)
+            self.store.collect_garbage()
+        deleted_count = len(deleted)
+        
         logger.info(f"Limpieza completada: {deleted_count} modelos eliminados")
         return deleted_count
     
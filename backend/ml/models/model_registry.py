@@ -0,0 +1,343 @@
+"""
+Registro indexado de modelos entrenados.
+
+Mantiene un manifiesto JSON en el directorio de modelos con la información
+de cada modelo (nombre, métricas, fecha de entrenamiento, tamaño de
+artefactos) y un puntero al modelo en producción, para que seleccionar el
+modelo a cargar no requiera recorrer directorios ni deserializar metadata.
+"""
+
+from typing import Optional, Dict, Any, List, Iterable
+from pathlib import Path
+from datetime import datetime
+import json
+import os
+import tempfile
+
+import joblib
+
+from ..utils.logger import MLLogger
+from ..utils.file_lock import file_lock
+
+logger = MLLogger.get_inference_logger()
+
+MANIFEST_FILENAME = "registry.json"
+MANIFEST_VERSION = 1
+LOCK_FILENAME = ".registry.lock"
+
+
+class ModelRegistry:
+    """
+    Manifiesto de modelos entrenados.
+
+    Formato de `registry.json`:
+
+        {
+          "version": 1,
+          "production": "model_xgboost_20260301_120000",
+          "models": {
+            "model_xgboost_20260301_120000": {
+              "name": ..., "model_name": ..., "training_date": ...,
+              "registered_at": ..., "metrics": {...}, "lineage": {...},
+              "artifacts": {"model.pkl": 123456, ...}, "total_size": ...
+            }
+          }
+        }
+
+    Las escrituras son atómicas (archivo temporal + `os.replace`) y cada
+    lectura-modificación-escritura se hace bajo un lock de archivo
+    (`.registry.lock`), así los workers y el proceso de reentrenamiento
+    no pierden actualizaciones entre sí. Si el manifiesto no existe o está
+    dañado se reconstruye una vez recorriendo los directorios de modelos.
+    """
+
+    def __init__(self, models_dir: Path):
+        """
+        Inicializa el registro.
+
+        Args:
+            models_dir: Directorio raíz de modelos
+        """
+        self.models_dir = Path(models_dir)
+        self.manifest_path = self.models_dir / MANIFEST_FILENAME
+        self._lock = file_lock(self.models_dir / LOCK_FILENAME)
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_stamp: Optional[tuple] = None
+
+    @staticmethod
+    def _stamp(stat: os.stat_result) -> tuple:
+        """Identidad del archivo: cada `os.replace` crea un inodo nuevo."""
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def _read(self) -> Dict[str, Any]:
+        """Lee el manifiesto (reutiliza la copia en memoria si no cambió)."""
+        try:
+            stamp = self._stamp(self.manifest_path.stat())
+        except FileNotFoundError:
+            return self.rebuild()
+
+        if self._cache is not None and self._cache_stamp == stamp:
+            return self._cache
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError(f"versión de manifiesto {manifest.get('version')}")
+        except (ValueError, OSError) as e:
+            logger.warning(f"Manifiesto de modelos inválido ({e}), reconstruyendo")
+            return self.rebuild()
+
+        self._cache = manifest
+        self._cache_stamp = stamp
+        return manifest
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """
+        Lista los modelos registrados, del más reciente al más antiguo.
+
+        Returns:
+            Lista de entradas del manifiesto (incluye 'path' absoluto)
+        """
+        manifest = self._read()
+        production = manifest.get('production')
+
+        models = [
+            dict(
+                entry,
+                path=str(self.models_dir / name),
+                is_production=(name == production)
+            )
+            for name, entry in manifest['models'].items()
+        ]
+        models.sort(key=lambda m: m.get('registered_at') or '', reverse=True)
+        return models
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la entrada de un modelo.
+
+        Args:
+            name: Nombre del directorio del modelo
+
+        Returns:
+            Entrada del manifiesto o None
+        """
+        return self._read()['models'].get(name)
+
+    def get_production_name(self) -> Optional[str]:
+        """Nombre del modelo marcado como producción."""
+        return self._read().get('production')
+
+    def get_production_path(self) -> Optional[Path]:
+        """
+        Ruta del modelo en producción.
+
+        Si el directorio apuntado ya no existe, reconstruye el manifiesto
+        una vez antes de rendirse.
+
+        Returns:
+            Path del modelo o None si no hay modelos
+        """
+        name = self.get_production_name()
+        if name and (self.models_dir / name / "model.pkl").exists():
+            return self.models_dir / name
+
+        if name:
+            logger.warning(f"Modelo en producción no encontrado: {name}, reconstruyendo manifiesto")
+            name = self.rebuild().get('production')
+            if name:
+                return self.models_dir / name
+
+        return None
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def _write(self, manifest: Dict[str, Any]) -> None:
+        """Escribe el manifiesto de forma atómica."""
+        self.models_dir.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".registry-", suffix=".json", dir=str(self.models_dir)
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.manifest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._cache = manifest
+        self._cache_stamp = self._stamp(self.manifest_path.stat())
+
+    @staticmethod
+    def _artifact_sizes(model_dir: Path) -> Dict[str, int]:
+        """Tamaño en bytes de cada archivo del modelo."""
+        return {
+            f.name: f.stat().st_size
+            for f in sorted(model_dir.iterdir())
+            if f.is_file()
+        }
+
+    @classmethod
+    def _build_entry(
+        cls,
+        model_dir: Path,
+        metadata: Dict[str, Any],
+        registered_at: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Construye la entrada de manifiesto de un modelo."""
+        artifacts = cls._artifact_sizes(model_dir)
+        return {
+            'name': model_dir.name,
+            'model_name': metadata.get('model_name'),
+            'training_date': metadata.get('training_date'),
+            'registered_at': registered_at or datetime.now().isoformat(),
+            'metrics': metadata.get('metrics', {}),
+            'feature_count': len(metadata.get('feature_names', [])),
+            'lineage': metadata.get('lineage'),
+            'artifacts': artifacts,
+            'total_size': sum(artifacts.values()),
+        }
+
+    def register(
+        self,
+        model_dir: Path,
+        metadata: Dict[str, Any],
+        promote: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Registra un modelo recién guardado.
+
+        Args:
+            model_dir: Directorio del modelo
+            metadata: Metadata guardada con el modelo
+            promote: Marcarlo como modelo en producción
+
+        Returns:
+            Entrada registrada
+        """
+        model_dir = Path(model_dir)
+        entry = self._build_entry(model_dir, metadata)
+
+        with self._lock:
+            manifest = self._read()
+            manifest['models'][model_dir.name] = entry
+            if promote or not manifest.get('production'):
+                manifest['production'] = model_dir.name
+            self._write(manifest)
+
+        logger.info(
+            f"Modelo registrado: {model_dir.name}"
+            f"{' (producción)' if manifest['production'] == model_dir.name else ''}"
+        )
+        return entry
+
+    def set_production(self, name: str) -> None:
+        """
+        Cambia el puntero de producción.
+
+        Args:
+            name: Nombre del directorio del modelo
+
+        Raises:
+            KeyError: Si el modelo no está registrado
+        """
+        with self._lock:
+            manifest = self._read()
+            if name not in manifest['models']:
+                raise KeyError(f"Modelo no registrado: {name}")
+            manifest['production'] = name
+            self._write(manifest)
+
+        logger.info(f"Modelo en producción: {name}")
+
+    def remove(self, names: Iterable[str]) -> None:
+        """
+        Elimina modelos del manifiesto.
+
+        Si se elimina el modelo en producción, el puntero pasa al más
+        reciente de los restantes.
+
+        Args:
+            names: Nombres de directorio a eliminar
+        """
+        with self._lock:
+            manifest = self._read()
+            for name in names:
+                manifest['models'].pop(name, None)
+
+            if manifest.get('production') not in manifest['models']:
+                manifest['production'] = self._most_recent(manifest['models'])
+
+            self._write(manifest)
+
+    @staticmethod
+    def _most_recent(models: Dict[str, Dict[str, Any]]) -> Optional[str]:
+        if not models:
+            return None
+        return max(models.values(), key=lambda m: m.get('registered_at') or '')['name']
+
+    def rebuild(self) -> Dict[str, Any]:
+        """
+        Reconstruye el manifiesto recorriendo los directorios de modelos.
+
+        Es la única operación que deserializa `metadata.pkl`; el puntero de
+        producción se conserva si el modelo sigue existiendo, si no apunta
+        al más reciente.
+
+        Returns:
+            Manifiesto reconstruido
+        """
+        previous_production = None
+        if self._cache is not None:
+            previous_production = self._cache.get('production')
+
+        models: Dict[str, Dict[str, Any]] = {}
+
+        if self.models_dir.exists():
+            for model_dir in self.models_dir.iterdir():
+                # Los directorios ocultos son guardados en curso
+                if model_dir.name.startswith('.'):
+                    continue
+                if not (model_dir.is_dir() and (model_dir / "model.pkl").exists()):
+                    continue
+
+                metadata = {}
+                metadata_path = model_dir / "metadata.pkl"
+                if metadata_path.exists():
+                    try:
+                        metadata = joblib.load(metadata_path)
+                    except Exception as e:
+                        logger.warning(f"Error cargando metadata de {model_dir}: {e}")
+
+                created = datetime.fromtimestamp(model_dir.stat().st_ctime).isoformat()
+                models[model_dir.name] = self._build_entry(
+                    model_dir,
+                    metadata,
+                    registered_at=metadata.get('training_date') or created
+                )
+
+        production = previous_production if previous_production in models else self._most_recent(models)
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'production': production,
+            'models': models,
+        }
+
+        with self._lock:
+            self._write(manifest)
+
+        logger.info(f"Manifiesto de modelos reconstruido: {len(models)} modelos")
+        return manifest
@@ -10,10 +10,12 @@ import numpy as np
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.model_selection import train_test_split, cross_val_score, KFold
 from sklearn.multioutput import MultiOutputRegressor
+from sklearn.base import clone
 import xgboost as xgb
 import lightgbm as lgb
 from datetime import datetime
 from pathlib import Path
+import time
 
 from ..utils.logger import MLLogger
 from ..utils.config_manager import get_config
@@ -23,6 +25,11 @@ from ..features.feature_engineer import FeatureEngineer
 logger = MLLogger.get_training_logger()
 config = get_config()
 
+# Modelos de boosting: admiten early stopping, búsqueda por successive
+# halving y continuar desde un modelo ya entrenado
+BOOSTING_MODELS = ('xgboost', 'lightgbm')
+INCREMENTAL_MODELS = BOOSTING_MODELS
+
 
 class ChemicalConsumptionTrainer:
     """
@@ -154,6 +161,27 @@ class ChemicalConsumptionTrainer:
         # Entrenar
         model.fit(X_train, y_train)
         
+        return self._validation_metrics(model, model_name, X_val, y_val)
+    
+    def _validation_metrics(
+        self,
+        model: Any,
+        model_name: str,
+        X_val: pd.DataFrame,
+        y_val: pd.DataFrame
+    ) -> Dict[str, float]:
+        """
+        Calcula las métricas de un modelo entrenado en validación.
+        
+        Args:
+            model: Modelo entrenado
+            model_name: Nombre del modelo
+            X_val: Features de validación
+            y_val: Targets de validación
+            
+        Returns:
+            Diccionario con métricas de validación
+        """
         # Predecir en validación
         y_pred = model.predict(X_val)
         
@@ -245,7 +273,8 @@ class ChemicalConsumptionTrainer:
         y_train: pd.DataFrame,
         X_val: pd.DataFrame,
         y_val: pd.DataFrame,
-        perform_cv: bool = True
+        perform_cv: bool = True,
+        search: Optional[bool] = None
     ) -> Dict[str, Dict[str, float]]:
         """
         Entrena todos los modelos configurados.
@@ -256,6 +285,10 @@ class ChemicalConsumptionTrainer:
             X_val: Features de validación
             y_val: Targets de validación
             perform_cv: Si se realiza validación cruzada
+            search: Buscar hiperparámetros de XGBoost/LightGBM con
+                successive halving (por defecto models.search.enabled); los
+                scores se miden entonces en la parte de validación que la
+                búsqueda no usó
             
         Returns:
             Diccionario con scores de todos los modelos
@@ -265,13 +298,31 @@ class ChemicalConsumptionTrainer:
         self.models = self._initialize_models()
         all_scores = {}
         
-        for model_name, model in self.models.items():
-            # Entrenar y evaluar en validación
-            val_metrics = self.train_model(
-                model, model_name,
+        if search is None:
+            search = config.get('models.search.enabled', False)
+        searched = {}
+        X_eval, y_eval = X_val, y_val
+        if search:
+            # La búsqueda usa su parte de validación para early stopping y
+            # ranking; la selección se hace sobre filas que no vio
+            X_search, X_eval, y_search, y_eval = self._split_search_holdout(X_val, y_val)
+            searched = self.search_hyperparameters(
+                [name for name in self.models if name in BOOSTING_MODELS],
                 X_train, y_train,
-                X_val, y_val
+                X_search, y_search
             )
+        
+        for model_name, model in self.models.items():
+            # Entrenar y evaluar en validación
+            if model_name in searched:
+                self.models[model_name] = model = searched[model_name]
+                val_metrics = self._validation_metrics(model, model_name, X_eval, y_eval)
+            else:
+                val_metrics = self.train_model(
+                    model, model_name,
+                    X_train, y_train,
+                    X_eval, y_eval
+                )
             
             all_scores[model_name] = val_metrics
             
@@ -292,6 +343,152 @@ class ChemicalConsumptionTrainer:
         
         return all_scores
     
+    def _split_search_holdout(
+        self,
+        X_val: pd.DataFrame,
+        y_val: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Separa la validación en la parte de la búsqueda y la de selección.
+        
+        Las métricas de un modelo buscado sobre las filas que usó para early
+        stopping y ranking son optimistas; todos los modelos se comparan en
+        la parte reservada (models.search.holdout_fraction).
+        
+        Args:
+            X_val: Features de validación
+            y_val: Targets de validación
+            
+        Returns:
+            Tupla (X_search, X_holdout, y_search, y_holdout)
+        """
+        holdout_fraction = config.get('models.search.holdout_fraction', 0.5)
+        n_holdout = int(round(len(X_val) * holdout_fraction))
+        if n_holdout < 2 or len(X_val) - n_holdout < 2:
+            logger.warning(
+                f"Validación muy chica ({len(X_val)} filas) para reservar datos fuera de la búsqueda; "
+                "las métricas de los modelos buscados serán optimistas"
+            )
+            return X_val, X_val, y_val, y_val
+        
+        X_search, X_holdout, y_search, y_holdout = train_test_split(
+            X_val, y_val,
+            test_size=n_holdout,
+            random_state=config.random_state,
+            shuffle=True
+        )
+        logger.info(f"Validación: {len(X_search)} filas para la búsqueda, {len(X_holdout)} para selección")
+        
+        return X_search, X_holdout, y_search, y_holdout
+    
+    def search_hyperparameters(
+        self,
+        model_names: List[str],
+        X_train: pd.DataFrame,
+        y_train: pd.DataFrame,
+        X_val: pd.DataFrame,
+        y_val: pd.DataFrame,
+        time_budget_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Busca hiperparámetros con successive halving y early stopping.
+        
+        El resumen (mejor configuración, corridas, tiempo) queda en
+        `training_metadata['hyperparameter_search']`.
+        
+        Args:
+            model_names: Modelos de boosting a buscar
+            X_train: Features de entrenamiento
+            y_train: Targets de entrenamiento
+            X_val: Features de validación (early stopping y ranking)
+            y_val: Targets de validación
+            time_budget_seconds: Tiempo total (por defecto models.search.time_budget_seconds)
+            
+        Returns:
+            Diccionario nombre -> mejor modelo ajustado
+        """
+        from .hyperparameter_search import SuccessiveHalvingSearch
+        
+        if not model_names:
+            return {}
+        
+        start = time.perf_counter()
+        searcher = SuccessiveHalvingSearch(time_budget_seconds=time_budget_seconds)
+        best = searcher.run(model_names, X_train, y_train, X_val, y_val)
+        self.training_metadata['hyperparameter_search'] = searcher.summary(
+            best, time.perf_counter() - start
+        )
+        
+        return {name: result['model'] for name, result in best.items()}
+    
+    def train_incremental(
+        self,
+        base_model: Any,
+        model_name: str,
+        X_train: pd.DataFrame,
+        y_train: pd.DataFrame,
+        X_val: pd.DataFrame,
+        y_val: pd.DataFrame,
+        n_estimators: Optional[int] = None
+    ) -> Dict[str, float]:
+        """
+        Continúa el boosting de un modelo ya entrenado con filas nuevas.
+        
+        Cada estimador del MultiOutputRegressor agrega `n_estimators`
+        árboles sobre los existentes (`xgb_model=` en XGBoost,
+        `init_model=` en LightGBM); el modelo base no se modifica. Las
+        features deben venir escaladas con el preprocesador del modelo base.
+        
+        Args:
+            base_model: Modelo en producción (MultiOutputRegressor ajustado)
+            model_name: 'xgboost' o 'lightgbm'
+            X_train: Features nuevas de entrenamiento
+            y_train: Targets nuevos de entrenamiento
+            X_val: Features de validación
+            y_val: Targets de validación
+            n_estimators: Árboles a agregar por target
+                (optimization.auto_retrain.incremental.n_estimators)
+            
+        Returns:
+            Diccionario con métricas de validación
+            
+        Raises:
+            ValueError: Si el modelo no admite entrenamiento incremental
+        """
+        if model_name not in INCREMENTAL_MODELS:
+            raise ValueError(f"Entrenamiento incremental no disponible para {model_name}")
+        
+        n_estimators = n_estimators or config.get(
+            'optimization.auto_retrain.incremental.n_estimators', 50
+        )
+        logger.info(f"Entrenamiento incremental: {model_name} (+{n_estimators} árboles por target)")
+        
+        estimators = []
+        for i, base in enumerate(base_model.estimators_):
+            params = dict(base.get_params(), n_estimators=n_estimators)
+            if model_name == 'xgboost':
+                # Modelos de la búsqueda traen early stopping (sin eval_set aquí)
+                params['early_stopping_rounds'] = None
+            estimator = type(base)(**params)
+            target = y_train.iloc[:, i]
+            if model_name == 'xgboost':
+                estimator.fit(X_train, target, xgb_model=base.get_booster())
+            else:
+                estimator.fit(X_train, target, init_model=base.booster_)
+            estimators.append(estimator)
+        
+        model = clone(base_model)
+        model.estimators_ = estimators
+        for attr in ('n_features_in_', 'feature_names_in_'):
+            if hasattr(base_model, attr):
+                setattr(model, attr, getattr(base_model, attr))
+        
+        metrics = self._validation_metrics(model, model_name, X_val, y_val)
+        self.models = {model_name: model}
+        self.scores = {model_name: metrics}
+        
+        return metrics
+    
     def select_best_model(self) -> Tuple[str, Any]:
         """
         Selecciona el mejor modelo según métrica configurada.
@@ -375,7 +572,9 @@ class ChemicalConsumptionTrainer:
     def save_model(
         self,
         preprocessor: DataPreprocessor,
-        save_dir: Optional[Path] = None
+        save_dir: Optional[Path] = None,
+        X_train: Optional[pd.DataFrame] = None,
+        promote: bool = True
     ) -> Path:
         """
         Guarda el mejor modelo con metadata.
@@ -383,6 +582,11 @@ class ChemicalConsumptionTrainer:
         Args:
             preprocessor: Preprocesador utilizado
             save_dir: Directorio donde guardar (opcional)
+            X_train: Matriz de entrenamiento (escalada, como la recibe el
+                modelo); con ella se guardan los histogramas de referencia
+                para el monitoreo de deriva (opcional)
+            promote: Marcarlo como modelo en producción (False para
+                candidatos que se evalúan antes de promover)
             
         Returns:
             Path donde se guardó
@@ -393,26 +597,23 @@ class ChemicalConsumptionTrainer:
         if save_dir is None:
             save_dir = config.models_dir
         
-        # Crear directorio con timestamp
+        # Directorio con timestamp (se crea al final, ya completo)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         model_dir = save_dir / f"model_{self.best_model_name}_{timestamp}"
-        model_dir.mkdir(parents=True, exist_ok=True)
+        save_dir.mkdir(parents=True, exist_ok=True)
         
         logger.info(f"Guardando modelo en: {model_dir}")
         
-        # Guardar modelo
-        import joblib
-        joblib.dump(self.best_model, model_dir / "model.pkl", compress=3)
+        # Sin compresión, model.pkl se puede cargar con mmap
+        compress = config.get('persistence.serialization.compress', 0)
         
-        # Guardar preprocesador
-        preprocessor.save(model_dir)
-        
-        # Guardar metadata
+        # Metadata
         metadata = {
             'model_name': self.best_model_name,
             'training_date': datetime.now().isoformat(),
             'metrics': self.scores[self.best_model_name],
             'feature_names': preprocessor.feature_names,
+            'serialization': {'compress': compress},
             'config': {
                 'test_size': config.test_size,
                 'validation_size': config.validation_size,
@@ -423,7 +624,36 @@ class ChemicalConsumptionTrainer:
         if self.feature_importance is not None:
             metadata['top_features'] = self.feature_importance.to_dict('records')
         
-        joblib.dump(metadata, model_dir / "metadata.pkl")
+        # Linaje del reentrenamiento, histogramas heredados, etc.
+        metadata.update(self.training_metadata)
+        
+        # Histogramas por feature en unidades originales (deriva en producción)
+        if X_train is not None:
+            from ..inference.drift_monitor import build_reference_histograms
+            X_raw = X_train
+            if preprocessor.scaler is not None:
+                X_raw = pd.DataFrame(
+                    preprocessor.scaler.inverse_transform(X_train),
+                    columns=X_train.columns
+                )
+            metadata['feature_histograms'] = build_reference_histograms(X_raw)
+        
+        # Guardar modelo, preprocesador y metadata en el almacén por contenido
+        from .artifact_store import ArtifactStore
+        artifacts = {
+            'model.pkl': self.best_model,
+            **preprocessor.to_artifacts(),
+            'metadata.pkl': metadata,
+        }
+        ArtifactStore(save_dir).save_model(
+            model_dir,
+            artifacts,
+            compress={'model.pkl': compress}
+        )
+        
+        # Registrar en el manifiesto (por defecto pasa a ser el modelo en producción)
+        from .model_registry import ModelRegistry
+        ModelRegistry(save_dir).register(model_dir, metadata, promote=promote)
         
         logger.info(f"Modelo guardado exitosamente en {model_dir}")
         
@@ -0,0 +1,112 @@
+"""
+Lock exclusivo de archivo entre procesos.
+
+Los workers de uvicorn y el proceso de reentrenamiento comparten el
+directorio de modelos; un lock de hilos no los coordina. `file_lock`
+devuelve un lock reentrante por ruta que, en la adquisición más externa
+de cada hilo, toma además un lock del sistema operativo sobre el archivo
+(fcntl.flock o msvcrt.locking). El sistema operativo lo libera si el
+proceso termina.
+"""
+
+from typing import Dict, Optional, IO
+from pathlib import Path
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Lock reentrante entre hilos y procesos sobre un archivo."""
+
+    def __init__(self, path: Path):
+        """
+        Inicializa el lock (no crea el archivo hasta la primera adquisición).
+
+        Args:
+            path: Archivo de lock
+        """
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._handle: Optional[IO] = None
+
+    def _lock_file(self) -> IO:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            else:
+                handle.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK reintenta 10 s antes de fallar
+                        msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            handle.close()
+            raise
+        return handle
+
+    @staticmethod
+    def _unlock_file(handle: IO) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            handle.close()
+
+    def __enter__(self) -> 'FileLock':
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._handle = self._lock_file()
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            handle, self._handle = self._handle, None
+            try:
+                self._unlock_file(handle)
+            finally:
+                self._thread_lock.release()
+        else:
+            self._thread_lock.release()
+
+
+# Una instancia por ruta: los hilos del proceso comparten el mismo lock
+_locks: Dict[str, FileLock] = {}
+_locks_guard = threading.Lock()
+
+
+def file_lock(path: Path) -> FileLock:
+    """
+    Obtiene el lock compartido de un archivo.
+
+    Args:
+        path: Archivo de lock
+
+    Returns:
+        FileLock (usar como context manager)
+    """
+    key = str(Path(path).resolve())
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = FileLock(Path(path))
+        return lock
@@ -4,13 +4,56 @@ Sistema de logging estructurado para el módulo ML.
 Proporciona loggers configurados para diferentes subsistemas.
 """
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
 
+class InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler que encola el registro sin formatearlo.
+
+    El QueueHandler estándar formatea en el hilo que loguea (para poder
+    serializar el registro entre procesos); la cola aquí es del mismo
+    proceso, así que el formateo queda para el hilo del listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def move_handlers_to_queue(target: logging.Logger) -> Optional[QueueListener]:
+    """
+    Reemplaza los handlers de un logger por un QueueHandler.
+
+    Los handlers originales pasan a un QueueListener que los ejecuta en
+    su propio hilo, así que loguear no bloquea con formateo ni I/O.
+
+    Args:
+        target: Logger a modificar
+
+    Returns:
+        Listener ya iniciado (None si el logger no tenía handlers)
+    """
+    handlers = list(target.handlers)
+    if not handlers:
+        return None
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in handlers:
+        target.removeHandler(handler)
+    target.addHandler(InProcessQueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 class MLLogger:
     """
     Gestor centralizado de logging para el sistema ML.
@@ -23,6 +66,7 @@ class MLLogger:
     """
     
     _loggers: dict[str, logging.Logger] = {}
+    _listeners: list[QueueListener] = []
     
     @classmethod
     def _setup_logger(
@@ -71,8 +115,21 @@ class MLLogger:
             file_handler.setFormatter(formatter)
             logger.addHandler(file_handler)
         
+        # Consola y archivo se escriben en un hilo aparte: loguear desde
+        # la inferencia no bloquea el event loop con I/O
+        listener = move_handlers_to_queue(logger)
+        if not cls._listeners:
+            atexit.register(cls.stop)
+        cls._listeners.append(listener)
+        
         return logger
     
+    @classmethod
+    def stop(cls) -> None:
+        """Vacía las colas de logging y detiene los hilos de escritura."""
+        while cls._listeners:
+            cls._listeners.pop().stop()
+    
     @classmethod
     def get_training_logger(cls) -> logging.Logger:
         """Logger para procesos de entrenamiento."""
@@ -2,10 +2,12 @@
 Validadores y excepciones personalizadas para el sistema ML.
 """
 
-from typing import Any, Optional
+from typing import Any, Optional, TYPE_CHECKING
 from datetime import date, datetime
 import numpy as np
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class MLValidationError(Exception):
@@ -28,6 +30,11 @@ class ModelNotFoundError(Exception):
     pass
 
 
+class ModelIntegrityError(Exception):
+    """Se lanza cuando un artefacto de modelo falta o no coincide con su digest."""
+    pass
+
+
 class DataValidator:
     """
     Validador de datos de entrada para el sistema ML.
@@ -150,7 +157,7 @@ class DataValidator:
     
     @staticmethod
     def validate_dataframe(
-        df: pd.DataFrame,
+        df: "pd.DataFrame",
         required_columns: list[str],
         min_rows: int = 1
     ) -> None:
@@ -165,6 +172,8 @@ class DataValidator:
         Raises:
             MLValidationError: Si la validación falla
         """
+        import pandas as pd
+
         if df.empty:
             raise MLValidationError("DataFrame vacío")
         
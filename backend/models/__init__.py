@@ -20,6 +20,7 @@ from .control_consumo_diario import ControlConsumoDiario
 from .control_cloro_libre import ControlCloroLibre
 from .monitoreo_fisicoquimico import MonitoreoFisicoquimico
 from .log import LogAuditoria
+from .anomalia_operacion import AnomaliaOperacion
 
 __all__ = [
     "Base",
@@ -35,4 +36,5 @@ __all__ = [
     "ControlCloroLibre",
     "MonitoreoFisicoquimico",
     "LogAuditoria",
+    "AnomaliaOperacion",
 ]
@@ -0,0 +1,38 @@
+"""
+Modelo para las anomalías detectadas en línea sobre el control de operación
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, Text, ForeignKey, Float, Index
+from . import Base
+
+
+class AnomaliaOperacion(Base):
+    """Anomalía detectada por el detector en línea al registrar un control de operación"""
+    __tablename__ = "anomalias_operacion"
+
+    id = Column(Integer, primary_key=True, index=True)
+    control_operacion_id = Column(
+        Integer,
+        ForeignKey("control_operacion.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    fecha = Column(Date, nullable=False)
+    hora = Column(Time, nullable=False)
+
+    parametro = Column(String(50), nullable=False)
+    valor = Column(Float, nullable=False)
+    severidad = Column(String(20), nullable=False)  # sospechoso, critico
+    score = Column(Float, nullable=False)  # z-score respecto a la media móvil (EWMA)
+    metodo = Column(String(20), nullable=False)  # ewma, umbral
+    explicacion = Column(Text)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_anomalias_operacion_fecha_hora', 'fecha', 'hora'),
+    )
+
+    def __repr__(self):
+        return f"<AnomaliaOperacion(id={self.id}, fecha={self.fecha}, parametro='{self.parametro}', severidad='{self.severidad}')>"
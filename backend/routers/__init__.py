@@ -15,7 +15,9 @@ from . import (
     monitoreo_fisicoquimico,
     auth,
     logs,
-    ml
+    ml,
+    live,
+    diagnostico
 )
 
 __all__ = [
@@ -31,5 +33,7 @@ __all__ = [
     "monitoreo_fisicoquimico",
     "auth",
     "logs",
-    "ml"
+    "ml",
+    "live",
+    "diagnostico"
 ]
@@ -2,10 +2,13 @@
 from datetime import timedelta
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from core.database import get_db
+from core.database import get_async_db
 from core.security import create_access_token, verify_password
 from models.usuario import Usuario
 from models.log import LogAuditoria
@@ -16,8 +19,8 @@ from core.dependencies import get_current_active_user
 router = APIRouter()
 
 
-def create_log(
-    db: Session,
+async def create_log(
+    db: AsyncSession,
     usuario_id: int,
     usuario_nombre: str,
     accion: str,
@@ -39,20 +42,24 @@ def create_log(
         user_agent=user_agent
     )
     db.add(log)
-    db.commit()
+    await db.commit()
 
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(Usuario).options(joinedload(Usuario.rol_obj)).filter(Usuario.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    result = await db.execute(
+        select(Usuario).options(joinedload(Usuario.rol_obj)).where(Usuario.username == form_data.username)
+    )
+    user = result.scalars().first()
+    # bcrypt es CPU intensivo: fuera del event loop
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
         # Registrar intento fallido de login
         if user:
-            create_log(
+            await create_log(
                 db=db,
                 usuario_id=user.id,
                 usuario_nombre=f"{user.nombre} {user.apellido}",
@@ -71,7 +78,7 @@ async def login_for_access_token(
         )
     
     # Registrar login exitoso
-    create_log(
+    await create_log(
         db=db,
         usuario_id=user.id,
         usuario_nombre=f"{user.nombre} {user.apellido}",
@@ -14,7 +14,8 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
-from core.database import get_db
+from core.database import get_db, get_read_db
+from core.query_counter import query_budget
 from models.control_cloro_libre import ControlCloroLibre
 from schemas.control_cloro_libre import (
     ControlCloroLibreCreate,
@@ -132,8 +133,8 @@ def delete_control_cloro(control_id: int, db: Session = Depends(get_db)):
     return None
 
 
-@router.get("/exportar-excel/mes/{fecha_mes}")
-def exportar_excel(fecha_mes: str, db: Session = Depends(get_db)):
+@router.get("/exportar-excel/mes/{fecha_mes}", dependencies=[Depends(query_budget(3))])
+def exportar_excel(fecha_mes: str, db: Session = Depends(get_read_db)):
     """Exportar registros de cloro libre a Excel con formato específico"""
     
     # Crear workbook
@@ -4,7 +4,7 @@ Router para operaciones CRUD de Control de Consumo Diario (Matriz 4)
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import date, datetime
 import io
@@ -13,7 +13,8 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
-from core.database import get_db
+from core.database import get_db, get_read_db
+from core.query_counter import query_budget
 from models.control_consumo_diario import ControlConsumoDiario
 from schemas.control_consumo_diario import (
     ControlConsumoDiarioCreate,
@@ -129,8 +130,8 @@ def delete_consumo_diario(consumo_id: int, db: Session = Depends(get_db)):
     return None
 
 
-@router.get("/exportar-excel/fecha/{fecha}")
-def exportar_excel_consumo_diario(fecha: str, db: Session = Depends(get_db)):
+@router.get("/exportar-excel/fecha/{fecha}", dependencies=[Depends(query_budget(3))])
+def exportar_excel_consumo_diario(fecha: str, db: Session = Depends(get_read_db)):
     """Exportar consumo diario a Excel con formato específico"""
     
     # Crear workbook
@@ -214,7 +215,11 @@ def exportar_excel_consumo_diario(fecha: str, db: Session = Depends(get_db)):
     apply_borders_and_merge('B4:P4')
     
     # Obtener registros y operador
-    registros = db.query(ControlConsumoDiario).filter(
+    # Químico y operador en la misma consulta (se leen por cada fila)
+    registros = db.query(ControlConsumoDiario).options(
+        joinedload(ControlConsumoDiario.quimico),
+        joinedload(ControlConsumoDiario.usuario)
+    ).filter(
         ControlConsumoDiario.fecha == fecha_obj
     ).all()
     
@@ -4,6 +4,8 @@ Router para operaciones CRUD de Control de Operación (Matriz 2)
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, time
@@ -12,8 +14,14 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
-from core.database import get_db
+import logging
+
+from core.database import get_db, get_read_db, get_async_db
+from core.query_counter import query_budget
 from models.control_operacion import ControlOperacion
+from ml.data.repository import PlantDataRepository
+from ml.inference.online_anomaly_service import get_online_detector
+from ml.inference.drift_monitor import get_drift_monitor
 from schemas.control_operacion import (
     ControlOperacionCreate,
     ControlOperacionUpdate,
@@ -22,44 +30,61 @@ from schemas.control_operacion import (
 
 router = APIRouter()
 
+logger = logging.getLogger("app")
+
+
+def _puntuar_anomalias(db: Session, control: ControlOperacion, actualizar_estado: bool = True) -> None:
+    """Puntúa el registro con el detector en línea sin interrumpir la operación CRUD"""
+    detector = get_online_detector()
+    if not detector.enabled:
+        return
+    
+    try:
+        detector.process_record(db, control, update_state=actualizar_estado)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"No se pudo puntuar anomalías del control {control.id}: {e}")
+
 
 @router.get("/", response_model=List[ControlOperacionResponse])
-def get_controles_operacion(
+async def get_controles_operacion(
     skip: int = 0,
     limit: int = 100,
     fecha: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener lista de controles de operación"""
-    query = db.query(ControlOperacion)
+    query = select(ControlOperacion)
     
     if fecha:
-        query = query.filter(ControlOperacion.fecha == fecha)
+        query = query.where(ControlOperacion.fecha == fecha)
     
-    controles = query.order_by(
+    result = await db.execute(query.order_by(
         ControlOperacion.fecha.desc(),
         ControlOperacion.hora.desc()
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))
+    controles = result.scalars().all()
     
     return controles
 
 
 @router.get("/fecha/{fecha_consulta}", response_model=List[ControlOperacionResponse])
-def get_controles_por_fecha(fecha_consulta: date, db: Session = Depends(get_db)):
+async def get_controles_por_fecha(fecha_consulta: date, db: AsyncSession = Depends(get_async_db)):
     """Obtener todos los controles de un día específico"""
-    controles = db.query(ControlOperacion).filter(
-        ControlOperacion.fecha == fecha_consulta
-    ).order_by(ControlOperacion.hora).all()
+    result = await db.execute(
+        select(ControlOperacion).where(
+            ControlOperacion.fecha == fecha_consulta
+        ).order_by(ControlOperacion.hora)
+    )
+    controles = result.scalars().all()
     
     return controles
 
 
 @router.get("/{control_id}", response_model=ControlOperacionResponse)
-def get_control_operacion(control_id: int, db: Session = Depends(get_db)):
+async def get_control_operacion(control_id: int, db: AsyncSession = Depends(get_async_db)):
     """Obtener un control de operación por ID"""
-    control = db.query(ControlOperacion).filter(
-        ControlOperacion.id == control_id
-    ).first()
+    control = await db.get(ControlOperacion, control_id)
     
     if not control:
         raise HTTPException(
@@ -89,6 +114,9 @@ def create_control_operacion(control: ControlOperacionCreate, db: Session = Depe
     db.add(db_control)
     db.commit()
     db.refresh(db_control)
+    _puntuar_anomalias(db, db_control)
+    # Histograma vivo de lecturas para el monitoreo de deriva (en memoria)
+    get_drift_monitor().observe_record(db_control)
     return db_control
 
 
@@ -116,6 +144,8 @@ def update_control_operacion(
     
     db.commit()
     db.refresh(db_control)
+    # La lectura ya forma parte de la media móvil: solo se re-puntúa
+    _puntuar_anomalias(db, db_control, actualizar_estado=False)
     return db_control
 
 
@@ -132,13 +162,14 @@ def delete_control_operacion(control_id: int, db: Session = Depends(get_db)):
             detail=f"Control de operación con ID {control_id} no encontrado"
         )
     
+    PlantDataRepository(db).delete_anomalies(control_operacion_id=control_id)
     db.delete(db_control)
     db.commit()
     return None
 
 
-@router.get("/exportar-excel/fecha/{fecha_consulta}")
-def exportar_excel_control_operacion(fecha_consulta: date, db: Session = Depends(get_db)):
+@router.get("/exportar-excel/fecha/{fecha_consulta}", dependencies=[Depends(query_budget(3))])
+def exportar_excel_control_operacion(fecha_consulta: date, db: Session = Depends(get_read_db)):
     """Exportar control de operación a Excel con formato específico"""
     
     # Obtener datos
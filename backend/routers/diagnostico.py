@@ -0,0 +1,77 @@
+"""
+Router de diagnóstico de la plataforma
+Solo accesible por ADMINISTRADOR
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from core.dependencies import require_admin
+from core.pool_metrics import pool_metrics, pool_controllers
+from core import profiling
+from models.usuario import Usuario
+
+router = APIRouter(
+    prefix="/api/diagnostico",
+    tags=["Diagnóstico"]
+)
+
+
+@router.get("/pool", response_model=dict)
+def get_pool_metrics(
+    top_routes: int = Query(20, ge=1, le=200, description="Rutas a incluir por tiempo de conexión retenida"),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    Métricas de los pools de conexiones (primario, réplica y async)
+
+    Por pool: espera de checkout (p50/p95/p99), timeouts, uso del overflow,
+    invalidaciones, tiempo que cada ruta retiene conexiones y el estado
+    del controlador adaptativo.
+    """
+    return {
+        name: {**metrics.snapshot(top_routes), "controller": pool_controllers[name].status()}
+        for name, metrics in pool_metrics.items()
+    }
+
+
+@router.post("/pool/reset", status_code=status.HTTP_204_NO_CONTENT)
+def reset_pool_metrics(
+    pool: Optional[str] = Query(None, description="Pool a reiniciar (todos si se omite)"),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    Reinicia los contadores de los pools (no cierra conexiones)
+    """
+    if pool is not None and pool not in pool_metrics:
+        raise HTTPException(status_code=404, detail=f"Pool '{pool}' no instrumentado")
+
+    for name, metrics in pool_metrics.items():
+        if pool is None or name == pool:
+            metrics.reset()
+    return None
+
+
+@router.get("/profiles", response_model=list)
+def list_profiles(current_user: Usuario = Depends(require_admin)):
+    """
+    Perfiles de requests guardados (header `X-Profile: 1`)
+
+    Del más reciente al más antiguo: ruta, estado, duración y muestras.
+    """
+    return profiling.profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, current_user: Usuario = Depends(require_admin)):
+    """
+    Descargar un perfil en formato collapsed stacks
+
+    Compatible con flamegraph.pl y speedscope.
+    """
+    path = profiling.profile_store.path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Perfil '{profile_id}' no encontrado")
+    return FileResponse(path, media_type="text/plain", filename=path.name)
@@ -0,0 +1,137 @@
+"""
+Router para el canal de eventos en vivo (SSE y WebSocket)
+"""
+
+import asyncio
+import json
+from typing import Optional, Set
+
+from fastapi import APIRouter, Header, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from core.live_events import broadcaster, EVENT_TYPES, KEEPALIVE_SECONDS
+
+router = APIRouter(prefix="/api/live", tags=["Eventos en Vivo"])
+
+
+def _parse_filter(value: Optional[str]) -> Optional[Set[str]]:
+    """Convierte 'a,b,c' en {'a', 'b', 'c'}"""
+    if not value:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+@router.get("/stream")
+async def stream_eventos(
+    request: Request,
+    tipos: Optional[str] = Query(
+        None,
+        description=f"Tipos separados por coma: {', '.join(EVENT_TYPES)}"
+    ),
+    severidad: Optional[str] = Query(
+        None,
+        description="Severidades de anomalía separadas por coma (sospechoso, critico)"
+    ),
+    last_event_id: Optional[int] = Query(
+        None,
+        description="Último ID recibido (alternativa al header Last-Event-ID)"
+    ),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events con registros nuevos y anomalías detectadas.
+
+    Al reconectar, el navegador envía `Last-Event-ID` y se repiten los
+    eventos posteriores que sigan en el buffer. Si el cliente consume
+    lento recibe un evento `lagged` con la cantidad de eventos descartados.
+    """
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    subscription = broadcaster.subscribe(
+        tipos=_parse_filter(tipos),
+        severidades=_parse_filter(severidad),
+        last_event_id=last_event_id
+    )
+
+    async def event_generator():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+
+                evt = await subscription.next_event(timeout=KEEPALIVE_SECONDS)
+                if evt is None:
+                    # Comentario SSE para mantener viva la conexión a través de proxies
+                    yield ": keepalive\n\n"
+                    continue
+
+                lines = []
+                if evt["id"] is not None:
+                    lines.append(f"id: {evt['id']}")
+                lines.append(f"event: {evt['tipo']}")
+                lines.append(f"data: {json.dumps(evt, ensure_ascii=False)}")
+                yield "\n".join(lines) + "\n\n"
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.websocket("/ws")
+async def websocket_eventos(
+    websocket: WebSocket,
+    tipos: Optional[str] = None,
+    severidad: Optional[str] = None,
+    last_event_id: Optional[int] = None
+):
+    """
+    WebSocket con registros nuevos y anomalías detectadas.
+
+    El cliente puede cambiar sus filtros enviando
+    `{"tipos": ["anomalia"], "severidad": ["critico"]}`.
+    """
+    await websocket.accept()
+
+    subscription = broadcaster.subscribe(
+        tipos=_parse_filter(tipos),
+        severidades=_parse_filter(severidad),
+        last_event_id=last_event_id
+    )
+
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_json()
+            if "tipos" in message:
+                subscription.tipos = set(message["tipos"] or EVENT_TYPES)
+            if "severidad" in message:
+                subscription.severidades = set(message["severidad"] or []) or None
+
+    receiver = asyncio.create_task(receive_filters())
+
+    try:
+        while not receiver.done():
+            evt = await subscription.next_event(timeout=KEEPALIVE_SECONDS)
+            if evt is None:
+                await websocket.send_json({"tipo": "keepalive"})
+                continue
+            await websocket.send_json(evt)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/stats")
+async def live_stats():
+    """Clientes conectados y estado del buffer de repetición de este worker"""
+    return broadcaster.stats()
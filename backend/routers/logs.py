@@ -7,10 +7,11 @@ from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 
-from core.database import get_db
-from core.dependencies import get_current_user
+from core.database import get_read_db
+from core.query_counter import query_budget
+from core.dependencies import require_admin
 from models.log import LogAuditoria
 from models.usuario import Usuario, UserRole
 from schemas.log import LogAuditoriaResponse, LogAuditoriaFilter
@@ -21,18 +22,7 @@ router = APIRouter(
 )
 
 
-def require_admin(current_user: Usuario = Depends(get_current_user)):
-    """Verificar que el usuario actual sea administrador"""
-    # Verificar usando el nuevo sistema de roles
-    if not current_user.rol_obj or current_user.rol_obj.categoria != "ADMINISTRADOR":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Solo los administradores pueden acceder a los logs"
-        )
-    return current_user
-
-
-@router.get("", response_model=dict)
+@router.get("", response_model=dict, dependencies=[Depends(query_budget(3))])
 def get_logs(
     usuario_id: Optional[int] = None,
     accion: Optional[str] = None,
@@ -41,7 +31,7 @@ def get_logs(
     fecha_fin: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """
@@ -74,14 +64,21 @@ def get_logs(
         except ValueError:
             pass
     
-    # Contar total
-    total = query.count()
+    # Página y total en una sola consulta (COUNT(*) OVER ())
+    filtered = query
+    query = query.add_columns(func.count().over().label("total"))
     
     # Ordenar por fecha descendente (más recientes primero)
     query = query.order_by(desc(LogAuditoria.created_at))
     
     # Aplicar paginación
-    logs = query.offset(offset).limit(limit).all()
+    rows = query.offset(offset).limit(limit).all()
+    logs = [row[0] for row in rows]
+    if rows:
+        total = rows[0].total
+    else:
+        # Página fuera de rango: el total se consulta aparte
+        total = filtered.count() if offset else 0
     
     return {
         "total": total,
@@ -93,7 +90,7 @@ def get_logs(
 
 @router.get("/acciones", response_model=List[str])
 def get_acciones(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """
@@ -105,7 +102,7 @@ def get_acciones(
 
 @router.get("/entidades", response_model=List[str])
 def get_entidades(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """
@@ -118,7 +115,7 @@ def get_entidades(
 @router.get("/{log_id}", response_model=LogAuditoriaResponse)
 def get_log(
     log_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """
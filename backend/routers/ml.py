@@ -7,12 +7,23 @@ Endpoints para entrenamiento, predicción y detección de anomalías.
 from typing import Dict, Any, List, Optional
 from datetime import date, datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field, validator
 import logging
+import threading
+import time
 
-from core.database import get_db
+from core.database import get_db, get_read_db
+from core.metrics import (
+    ML_PREDICTION_DURATION,
+    ML_PREDICTION_ERRORS,
+    ML_ANOMALY_SCAN_DURATION,
+    ML_TRAINING_DURATION
+)
+from core.result_cache import result_cache
+from core.readiness import readiness, require_ready, READY
 from core.exceptions import (
     ValidationException,
     InsufficientDataException,
@@ -20,15 +31,19 @@ from core.exceptions import (
     ResourceNotFoundException
 )
 from ml.data.repository import PlantDataRepository
-from ml.data.preprocessor import DataPreprocessor
-from ml.features.feature_engineer import FeatureEngineer
-from ml.models.trainer import ChemicalConsumptionTrainer
-from ml.models.evaluator import ModelEvaluator
 from ml.inference.predictor_service import ChemicalConsumptionPredictor
-from ml.inference.anomaly_service import AnomalyDetectorService
+from ml.inference.online_anomaly_service import get_online_detector
+from ml.inference.model_pool import get_model_pool
+from ml.inference.shadow_service import get_shadow_scorer
+from ml.inference.prediction_log import get_prediction_log
+from ml.inference.drift_monitor import get_drift_monitor
 from ml.utils.logger import MLLogger
 from ml.utils.config_manager import get_config
-from ml.utils.validation import MLValidationError, InsufficientDataError as MLInsufficientData
+from ml.utils.validation import (
+    MLValidationError,
+    InsufficientDataError as MLInsufficientData,
+    ModelNotFoundError
+)
 
 router = APIRouter(prefix="/ml", tags=["Machine Learning"])
 
@@ -37,9 +52,88 @@ logger = logging.getLogger("app")
 ml_logger = MLLogger.get_inference_logger()
 config = get_config()
 
-# Instancias singleton de servicios
+# Instancias singleton de servicios (el modelo se carga en el primer uso)
 predictor = ChemicalConsumptionPredictor()
-anomaly_detector = AnomalyDetectorService()
+online_detector = get_online_detector()
+shadow_scorer = get_shadow_scorer()
+prediction_log = get_prediction_log()
+drift_monitor = get_drift_monitor()
+
+# Tablas cuyas escrituras invalidan las respuestas en caché
+STATS_TABLES = ("control_operacion", "monitoreo_fisicoquimico", "consumo_quimicos_mensual")
+STORED_ANOMALY_TABLES = ("control_operacion", "anomalias_operacion")
+RECOMPUTED_ANOMALY_TABLES = ("control_operacion",)
+
+
+# Detector por lotes cargado: (mtime de anomaly_detector.pkl, servicio)
+_anomaly_detector: Optional[tuple] = None
+_anomaly_detector_lock = threading.Lock()
+
+
+def get_anomaly_detector():
+    """
+    Detector de anomalías por lotes, cargado en el primer uso.
+
+    Usa el IsolationForest que guarda /ml/train; sin uno guardado solo
+    aplica umbrales. Se recarga cuando cambia el archivo del detector,
+    así todos los workers siguen al último entrenamiento. Se importa
+    aquí para que arrancar la API no cargue sklearn.
+
+    Returns:
+        Instancia de AnomalyDetectorService
+    """
+    global _anomaly_detector
+    from ml.inference.anomaly_service import AnomalyDetectorService, default_detector_dir
+
+    path = default_detector_dir()
+    try:
+        mtime = (path / "anomaly_detector.pkl").stat().st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    with _anomaly_detector_lock:
+        if _anomaly_detector is None or _anomaly_detector[0] != mtime:
+            previous = _anomaly_detector
+            _anomaly_detector = (mtime, AnomalyDetectorService.load_detector(path))
+            if previous is not None:
+                previous[1].shutdown_pool()
+        return _anomaly_detector[1]
+
+
+def train_anomaly_detector(
+    repository: PlantDataRepository,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> None:
+    """
+    Entrena y guarda el detector de anomalías por lotes (IsolationForest).
+
+    Args:
+        repository: Repositorio de datos de planta
+        start_date: Fecha de inicio (opcional)
+        end_date: Fecha de fin (opcional)
+    """
+    from ml.inference.anomaly_service import AnomalyDetectorService, default_detector_dir
+
+    df = repository.get_operational_data(start_date=start_date, end_date=end_date)
+    detector = AnomalyDetectorService()
+    detector.train_detector(df, contamination=config.get('anomaly_detection.model.contamination', 0.05))
+    detector.save_detector(default_detector_dir())
+
+
+def load_predictor_model(model_path=None) -> None:
+    """
+    Carga un modelo en el predictor y marca el componente como listo.
+
+    Args:
+        model_path: Ruta del modelo (opcional, por defecto el de producción)
+    """
+    predictor.load_model(model_path)
+    readiness.set("model", READY, model_version=predictor.model_version)
+
+
+# Rutas que usan el modelo por defecto: 503 inmediato mientras se carga
+model_ready = Depends(require_ready("model"))
 
 
 # ============================================================================
@@ -108,6 +202,11 @@ class PredictionRequest(BaseModel):
         description="Cloro residual (mg/L)",
         example=0.6
     )
+    model_version: Optional[str] = Field(
+        None,
+        description="Versión del modelo (directorio en el registro); por defecto el de producción",
+        example="model_random_forest_20260224_213050"
+    )
     
     @validator('turbedad_at')
     def turbedad_at_lower_than_ac(cls, v, values):
@@ -142,10 +241,26 @@ class PredictionResponse(BaseModel):
     cloro_gas_kg: float = Field(..., description="Predicción de cloro gas en kg")
     confidence: float = Field(..., ge=0, le=1, description="Confianza del modelo (0-1)")
     model_name: str = Field(..., description="Nombre del modelo utilizado")
+    model_version: Optional[str] = Field(None, description="Versión del modelo utilizado")
     estimated_cost_usd: float = Field(..., description="Costo estimado en USD")
     prediction_date: str = Field(..., description="Fecha de predicción (ISO format)")
 
 
+class ShadowConfigRequest(BaseModel):
+    """Request para configurar la evaluación en sombra."""
+    candidate_version: Optional[str] = Field(
+        None,
+        description="Versión del modelo candidato (directorio en el registro)"
+    )
+    sample_rate: Optional[float] = Field(
+        None,
+        ge=0,
+        le=1,
+        description="Fracción del tráfico de /ml/predict a evaluar"
+    )
+    enabled: Optional[bool] = Field(None, description="Activar o desactivar la evaluación")
+
+
 class TrainingRequest(BaseModel):
     """Request para entrenamiento de modelo."""
     start_date: Optional[date] = Field(
@@ -164,6 +279,11 @@ class TrainingRequest(BaseModel):
         True,
         description="Aplicar feature engineering"
     )
+    hyperparameter_search: Optional[bool] = Field(
+        None,
+        description="Buscar hiperparámetros de XGBoost/LightGBM (successive halving); "
+                    "por defecto models.search.enabled"
+    )
     
     @validator('end_date')
     def end_date_after_start(cls, v, values):
@@ -222,11 +342,50 @@ class AnomalyResponse(BaseModel):
         }
 
 
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def _build_anomaly_response(
+    results: List[Any],
+    total_records: int,
+    start_date: date,
+    end_date: date
+) -> AnomalyResponse:
+    """Construye la respuesta de anomalías con estadísticas por severidad."""
+    anomalies = [result.to_dict() for result in results]
+    
+    anomalies_detected = len(anomalies)
+    anomaly_rate = (anomalies_detected / total_records * 100) if total_records > 0 else 0
+    
+    by_severity = {
+        'critico': sum(1 for a in results if a.severidad == 'critico'),
+        'sospechoso': sum(1 for a in results if a.severidad == 'sospechoso'),
+        'normal': sum(1 for a in results if a.severidad == 'normal')
+    }
+    
+    if total_records:
+        logger.info(
+            f"🔍 Anomalías detectadas: {anomalies_detected}/{total_records} "
+            f"({anomaly_rate:.2f}%) - Críticas: {by_severity['critico']}"
+        )
+    
+    return AnomalyResponse(
+        status="success",
+        total_records=total_records,
+        anomalies_detected=anomalies_detected,
+        anomaly_rate_pct=round(anomaly_rate, 2),
+        by_severity=by_severity,
+        date_range={"start": str(start_date), "end": str(end_date)},
+        anomalies=anomalies
+    )
+
+
 # ============================================================================
 # Endpoints
 # ============================================================================
 
-@router.post("/predict", response_model=PredictionResponse)
+@router.post("/predict", response_model=PredictionResponse, dependencies=[model_ready])
 async def predict_consumption(
     request: PredictionRequest
 ) -> PredictionResponse:
@@ -239,6 +398,10 @@ async def predict_consumption(
     - `ph_ac`, `ph_at`: pH (6.0-9.5)
     - `temperatura_ac`: Temperatura °C (0-50)
     - Opcionales: `caudal_total`, `dosis_sulfato`, `dosis_cal`, `cloro_residual`
+    - `model_version`: Versión específica del modelo (por defecto la de producción)
+    
+    Si hay un modelo candidato en evaluación shadow, una muestra de las
+    predicciones de producción se repite con el candidato en segundo plano.
     
     **Retorna:**
     - Predicción de consumo en kg para cada químico
@@ -267,18 +430,35 @@ async def predict_consumption(
             }
         )
         
-        # Realizar predicción
-        result = predictor.predict(
-            turbedad_ac=request.turbedad_ac,
-            turbedad_at=request.turbedad_at,
-            ph_ac=request.ph_ac,
-            ph_at=request.ph_at,
-            temperatura_ac=request.temperatura_ac,
-            caudal_total=request.caudal_total,
-            dosis_sulfato=request.dosis_sulfato,
-            dosis_cal=request.dosis_cal,
-            cloro_residual=request.cloro_residual
-        )
+        input_data = {
+            'turbedad_ac': request.turbedad_ac,
+            'turbedad_at': request.turbedad_at,
+            'ph_ac': request.ph_ac,
+            'ph_at': request.ph_at,
+            'temperatura_ac': request.temperatura_ac,
+            'caudal_total': request.caudal_total,
+            'dosis_sulfato': request.dosis_sulfato,
+            'dosis_cal': request.dosis_cal,
+            'cloro_residual': request.cloro_residual
+        }
+        
+        # Realizar predicción. Otra versión puede requerir cargarla del disco
+        # (registro, verificación SHA, lock del pool): fuera del event loop
+        if request.model_version is None:
+            result = predictor.predict(**input_data)
+        else:
+            result = await run_in_threadpool(
+                predictor.predict, **input_data, model_version=request.model_version
+            )
+        for stage, elapsed_ms in result.timings_ms.items():
+            ML_PREDICTION_DURATION.observe(elapsed_ms / 1000, (stage,))
+        
+        # Registro binario de entradas, salidas y latencias (hilo de fondo)
+        prediction_log.submit(input_data, result)
+        
+        # Evaluación shadow del candidato (solo tráfico de producción, sin esperar)
+        if request.model_version is None:
+            shadow_scorer.submit(input_data, result)
         
         # Convertir a response
         response = PredictionResponse(
@@ -288,6 +468,7 @@ async def predict_consumption(
             cloro_gas_kg=result.cloro_gas_predicho,
             confidence=result.confidence_score,
             model_name=result.model_name,
+            model_version=result.model_version,
             estimated_cost_usd=result.estimated_cost,
             prediction_date=result.prediction_date.isoformat()
         )
@@ -300,13 +481,20 @@ async def predict_consumption(
         return response
     
     except MLValidationError as e:
+        ML_PREDICTION_ERRORS.inc(labels=(type(e).__name__,))
         logger.error(f"⚠️ Error de validación ML: {str(e)}")
         raise ValidationException(
             f"Error de validación en predicción: {str(e)}",
             details={"error": str(e)}
         )
     
+    except ModelNotFoundError:
+        ML_PREDICTION_ERRORS.inc(labels=("ModelNotFoundError",))
+        logger.warning(f"⚠️ Versión de modelo no encontrada: {request.model_version}")
+        raise ResourceNotFoundException("Modelo", request.model_version)
+    
     except Exception as e:
+        ML_PREDICTION_ERRORS.inc(labels=(type(e).__name__,))
         logger.error(
             f"❌ Error inesperado en predicción: {type(e).__name__}",
             exc_info=True
@@ -321,7 +509,7 @@ async def predict_consumption(
 async def train_model(
     request: TrainingRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> TrainingResponse:
     """
     Entrena un nuevo modelo con datos históricos.
@@ -332,11 +520,14 @@ async def train_model(
     3. Entrena múltiples modelos (RF, XGBoost, LightGBM)
     4. Selecciona el mejor por validación cruzada
     5. Guarda modelo y metadata
+    6. Entrena el detector de anomalías que usa `/ml/anomalies?recompute=true`
     
     **Parámetros:**
     - `start_date`, `end_date`: Rango de datos (opcional, usa todos si no se especifica)
     - `perform_cv`: Realizar validación cruzada (recomendado)
     - `feature_engineering`: Generar features adicionales
+    - `hyperparameter_search`: Successive halving con early stopping para
+      XGBoost/LightGBM dentro de `models.search.time_budget_seconds`
     
     **Retorna:**
     - Nombre del mejor modelo
@@ -344,8 +535,17 @@ async def train_model(
     - Duración del entrenamiento
     - Ruta del modelo guardado
     
-    **Nota:** El entrenamiento se ejecuta de forma síncrona. Puede tomar varios minutos.
+    **Nota:** El entrenamiento corre en el threadpool, sin bloquear el event loop;
+    la respuesta llega al terminar y puede tomar varios minutos.
     """
+    # Stack de entrenamiento (sklearn, xgboost, lightgbm) solo al entrenar
+    from ml.data.preprocessor import DataPreprocessor
+    from ml.features.feature_engineer import FeatureEngineer
+    from ml.models.trainer import ChemicalConsumptionTrainer
+    from ml.models.evaluator import ModelEvaluator
+
+    training_start = time.perf_counter()
+    training_status = "error"
     try:
         logger.info(
             f"🎓 TRAINING: Iniciando entrenamiento",
@@ -360,7 +560,8 @@ async def train_model(
         
         # 1. Obtener datos
         repository = PlantDataRepository(db)
-        df = repository.get_combined_dataset(
+        df = await run_in_threadpool(
+            repository.get_combined_dataset,
             start_date=request.start_date,
             end_date=request.end_date
         )
@@ -378,7 +579,7 @@ async def train_model(
         # 2. Feature Engineering
         if request.feature_engineering:
             logger.info("🔧 Aplicando feature engineering...")
-            df = FeatureEngineer.engineer_features(df)
+            df = await run_in_threadpool(FeatureEngineer.engineer_features, df)
         
         # 3. Preprocesamiento
         logger.info("⚙️ Preprocesando datos...")
@@ -387,7 +588,8 @@ async def train_model(
         )
         
         target_columns = config.target_variables
-        X, y = preprocessor.prepare_dataset(
+        X, y = await run_in_threadpool(
+            preprocessor.prepare_dataset,
             df,
             target_columns=target_columns,
             handle_outliers_flag=True,
@@ -404,11 +606,13 @@ async def train_model(
             f"📦 Split: Train={len(X_train)}, Val={len(X_val)}, Test={len(X_test)}"
         )
         
-        # Train all models
-        scores = trainer.train_all_models(
+        # Train all models (la búsqueda de hiperparámetros puede tardar minutos)
+        scores = await run_in_threadpool(
+            trainer.train_all_models,
             X_train, y_train,
             X_val, y_val,
-            perform_cv=request.perform_cv
+            perform_cv=request.perform_cv,
+            search=request.hyperparameter_search
         )
         
         # Select best
@@ -426,9 +630,18 @@ async def train_model(
         )
         
         # 5. Save model
-        model_path = trainer.save_model(preprocessor)
+        model_path = await run_in_threadpool(trainer.save_model, preprocessor, X_train=X_train)
         logger.info(f"💾 Modelo guardado: {model_path}")
         
+        # 6. Detector de anomalías por lotes (/ml/anomalies?recompute=true)
+        try:
+            await run_in_threadpool(
+                train_anomaly_detector, repository, request.start_date, request.end_date
+            )
+            logger.info("🔍 Detector de anomalías entrenado")
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo entrenar el detector de anomalías: {e}")
+        
         # Duration
         duration = (datetime.now() - start_time).total_seconds()
         
@@ -444,14 +657,17 @@ async def train_model(
         
         # Reload predictor with new model in background
         logger.info("🔄 Recargando predictor con nuevo modelo...")
-        background_tasks.add_task(predictor.load_model, model_path)
+        background_tasks.add_task(load_predictor_model, model_path)
         
+        training_status = "success"
         return response
     
     except InsufficientDataException:
+        training_status = "insufficient_data"
         raise
     
     except MLInsufficientData as e:
+        training_status = "insufficient_data"
         logger.error(f"⚠️ Datos insuficientes: {str(e)}")
         raise InsufficientDataException(
             str(e),
@@ -512,7 +728,7 @@ async def train_model(
         )
         
         # Reload predictor with new model in background
-        background_tasks.add_task(predictor.load_model, model_path)
+        background_tasks.add_task(load_predictor_model, model_path)
         
         return response
     
@@ -526,6 +742,9 @@ async def train_model(
     except Exception as e:
         logger.error(f"Error en entrenamiento: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error en entrenamiento: {str(e)}")
+    
+    finally:
+        ML_TRAINING_DURATION.observe(time.perf_counter() - training_start, (training_status,))
 
 
 @router.get("/anomalies", response_model=AnomalyResponse)
@@ -552,16 +771,32 @@ async def detect_anomalies(
         True,
         description="Usar umbrales estadísticos"
     ),
+    recompute: bool = Query(
+        False,
+        description="Re-analizar el rango completo en lugar de leer las anomalías almacenadas en línea"
+    ),
     db: Session = Depends(get_db)
 ) -> AnomalyResponse:
     """
     Detecta anomalías en datos operativos.
     
+    Por defecto lee las anomalías que el detector en línea almacenó al
+    registrar cada control de operación (lectura indexada por fecha).
+    Con `recompute=true` re-analiza todo el rango con el detector batch.
+    
+    La respuesta se guarda en caché por rango de fechas normalizado y
+    versión del modelo; se invalida al confirmar escrituras en
+    `control_operacion` o en las anomalías almacenadas.
+    Lee del primario y no de la réplica: la invalidación ocurre al confirmar
+    en el primario y una réplica con retraso volvería a guardar en caché
+    datos anteriores a la escritura.
+    
     **Parámetros:**
     - `days`: Analiza los últimos N días (por defecto 7)
     - `fecha_inicio` y `fecha_fin`: Rango de fechas específico (sobrescribe `days`)
-    - `use_model`: Usar modelo ML para detección
-    - `use_thresholds`: Usar umbrales estadísticos
+    - `use_model`: Usar modelo ML para detección (solo con `recompute`)
+    - `use_thresholds`: Usar umbrales estadísticos (solo con `recompute`)
+    - `recompute`: Re-analizar el rango completo
     
     **Retorna:**
     - Lista de anomalías detectadas con severidad
@@ -594,59 +829,55 @@ async def detect_anomalies(
                 details={"fecha_inicio": str(start_date), "fecha_fin": str(end_date)}
             )
         
-        # Obtener datos
-        repository = PlantDataRepository(db)
-        df = repository.get_operational_data(
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        # Verificar datos suficientes
-        if df.empty or len(df) == 0:
-            logger.warning(f"⚠️ No hay datos disponibles para el rango {start_date} a {end_date}")
-            return AnomalyResponse(
-                status="success",
-                total_records=0,
-                anomalies_detected=0,
-                anomaly_rate_pct=0.0,
-                by_severity={"critico": 0, "sospechoso": 0, "normal": 0},
-                date_range={"start": str(start_date), "end": str(end_date)},
-                anomalies=[]
-            )
-        
-        logger.info(f"✅ Datos cargados: {len(df)} registros")
-        
-        # Detectar anomalías
-        results = anomaly_detector.analyze_operational_data(df)
+        stored = online_detector.enabled and not recompute
         
-        # Convertir a dict
-        anomalies = [result.to_dict() for result in results]
+        def compute_response() -> AnomalyResponse:
+            with ML_ANOMALY_SCAN_DURATION.time(("stored" if stored else "recompute",)):
+                return scan()
         
-        # Estadísticas
-        total_records = len(df)
-        anomalies_detected = len(anomalies)
-        anomaly_rate = (anomalies_detected / total_records * 100) if total_records > 0 else 0
+        def scan() -> AnomalyResponse:
+            repository = PlantDataRepository(db)
+            
+            if stored:
+                # Lectura indexada de anomalías detectadas en línea
+                total_records = repository.count_operational_records(start_date, end_date)
+                results = repository.get_stored_anomalies(start_date, end_date)
+                logger.info(f"✅ Anomalías almacenadas leídas: {len(results)} en {total_records} registros")
+            
+            else:
+                # Obtener datos
+                df = repository.get_operational_data(
+                    start_date=start_date,
+                    end_date=end_date
+                )
+                
+                # Verificar datos suficientes
+                if df.empty or len(df) == 0:
+                    logger.warning(f"⚠️ No hay datos disponibles para el rango {start_date} a {end_date}")
+                    return _build_anomaly_response([], 0, start_date, end_date)
+                
+                logger.info(f"✅ Datos cargados: {len(df)} registros")
+                
+                # Detectar anomalías
+                results = get_anomaly_detector().analyze_operational_data(
+                    df, use_model=use_model, use_thresholds=use_thresholds
+                )
+                total_records = len(df)
+            
+            return _build_anomaly_response(results, total_records, start_date, end_date)
         
-        by_severity = {
-            'critico': sum(1 for a in results if a.severidad == 'critico'),
-            'sospechoso': sum(1 for a in results if a.severidad == 'sospechoso'),
-            'normal': sum(1 for a in results if a.severidad == 'normal')
-        }
-        
-        logger.info(
-            f"🔍 Anomalías detectadas: {anomalies_detected}/{total_records} "
-            f"({anomaly_rate:.2f}%) - Críticas: {by_severity['critico']}"
-        )
+        if stored:
+            # use_model/use_thresholds no afectan la lectura almacenada
+            cache_key = ("anomalies", "stored", start_date, end_date, predictor.model_version)
+            tables = STORED_ANOMALY_TABLES
+        else:
+            cache_key = (
+                "anomalies", "recompute", start_date, end_date,
+                use_model, use_thresholds, predictor.model_version
+            )
+            tables = RECOMPUTED_ANOMALY_TABLES
         
-        return AnomalyResponse(
-            status="success",
-            total_records=total_records,
-            anomalies_detected=anomalies_detected,
-            anomaly_rate_pct=round(anomaly_rate, 2),
-            by_severity=by_severity,
-            date_range={"start": str(start_date), "end": str(end_date)},
-            anomalies=anomalies
-        )
+        return await result_cache.get_or_compute(cache_key, tables, compute_response)
     
     except ValidationException:
         raise
@@ -654,15 +885,7 @@ async def detect_anomalies(
     except MLInsufficientData as e:
         # Caso esperado: no hay datos en el rango solicitado
         logger.warning(f"⚠️ No hay datos disponibles para el rango {start_date} a {end_date}: {str(e)}")
-        return AnomalyResponse(
-            status="success",
-            total_records=0,
-            anomalies_detected=0,
-            anomaly_rate_pct=0.0,
-            by_severity={"critico": 0, "sospechoso": 0, "normal": 0},
-            date_range={"start": str(start_date), "end": str(end_date)},
-            anomalies=[]
-        )
+        return _build_anomaly_response([], 0, start_date, end_date)
     
     except Exception as e:
         logger.error(f"❌ Error en detección de anomalías: {type(e).__name__} - {str(e)}", exc_info=True)
@@ -672,7 +895,52 @@ async def detect_anomalies(
         )
 
 
-@router.get("/model/info")
+@router.post("/anomalies/rebuild")
+async def rebuild_anomalies(
+    fecha_inicio: Optional[date] = Query(
+        None,
+        description="Fecha de inicio (YYYY-MM-DD) - por defecto todo el histórico"
+    ),
+    fecha_fin: Optional[date] = Query(
+        None,
+        description="Fecha de fin (YYYY-MM-DD)"
+    ),
+    db: Session = Depends(get_db)
+) -> JSONResponse:
+    """
+    Reconstruye las anomalías almacenadas reprocesando el histórico.
+    
+    **Uso:**
+    - Puntuar registros anteriores a la detección en línea
+    - Recalcular tras cambiar umbrales en `ml_config.yaml`
+    
+    **Nota:** Recorre todos los registros del rango una sola vez.
+    """
+    try:
+        if fecha_inicio and fecha_fin and fecha_inicio > fecha_fin:
+            raise ValidationException(
+                "La fecha de inicio no puede ser posterior a la fecha de fin",
+                details={"fecha_inicio": str(fecha_inicio), "fecha_fin": str(fecha_fin)}
+            )
+        
+        logger.info("🔄 REQUEST: Reconstruir anomalías en línea")
+        with ML_ANOMALY_SCAN_DURATION.time(("rebuild",)):
+            summary = online_detector.rebuild(db, fecha_inicio, fecha_fin)
+        
+        return JSONResponse(content={'status': 'success', **summary})
+    
+    except ValidationException:
+        raise
+    
+    except Exception as e:
+        logger.error(f"❌ Error reconstruyendo anomalías: {type(e).__name__}", exc_info=True)
+        raise MLModelException(
+            "Error al reconstruir anomalías",
+            details={"exception_type": type(e).__name__, "message": str(e)}
+        )
+
+
+@router.get("/model/info", dependencies=[model_ready])
 async def get_model_info() -> JSONResponse:
     """
     Obtiene información del modelo actual en producción.
@@ -707,7 +975,7 @@ async def get_model_info() -> JSONResponse:
         )
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[model_ready])
 async def get_ml_stats(
     db: Session = Depends(get_db)
 ) -> JSONResponse:
@@ -723,12 +991,21 @@ async def get_ml_stats(
     - `data_availability`: Cantidad de datos por tipo
     - `current_model`: Info del modelo en producción
     - `config`: Parámetros de configuración ML
+    
+    Las estadísticas de datos se guardan en caché hasta que se confirmen
+    escrituras en las tablas de origen; por eso se leen del primario.
     """
     try:
         logger.info("📊 REQUEST: Estadísticas ML")
         
-        repository = PlantDataRepository(db)
-        data_stats = repository.get_data_statistics()
+        def compute_data_stats() -> Dict[str, Any]:
+            return PlantDataRepository(db).get_data_statistics()
+        
+        data_stats = await result_cache.get_or_compute(
+            ("stats", predictor.model_version),
+            STATS_TABLES,
+            compute_data_stats
+        )
         
         model_info = predictor.get_model_info()
         
@@ -756,7 +1033,7 @@ async def get_ml_stats(
         )
 
 
-@router.post("/model/reload")
+@router.post("/model/reload", dependencies=[model_ready])
 async def reload_model() -> JSONResponse:
     """
     Recarga el modelo más reciente en memoria.
@@ -775,7 +1052,7 @@ async def reload_model() -> JSONResponse:
     try:
         logger.info("🔄 REQUEST: Recargar modelo")
         
-        predictor.load_model()
+        load_predictor_model()
         info = predictor.get_model_info()
         
         logger.info(f"✅ Modelo recargado: {info.get('model_name', 'N/A')}")
@@ -792,3 +1069,155 @@ async def reload_model() -> JSONResponse:
             "Error al recargar modelo",
             details={"exception_type": type(e).__name__, "message": str(e)}
         )
+
+
+@router.get("/models")
+async def list_models() -> JSONResponse:
+    """
+    Lista las versiones de modelo registradas.
+    
+    **Retorna:**
+    - `production`: Versión usada por defecto en `/ml/predict`
+    - `loaded`: Versiones en memoria en este worker (pool LRU)
+    - `models`: Versiones registradas con métricas y tamaño de artefactos
+    """
+    try:
+        registry = predictor.model_manager.registry
+        
+        return JSONResponse(content={
+            'production': registry.get_production_name(),
+            'loaded': get_model_pool().loaded_versions(),
+            'models': registry.list_models()
+        })
+    
+    except Exception as e:
+        logger.error(f"❌ Error listando modelos: {type(e).__name__}", exc_info=True)
+        raise MLModelException(
+            "Error al listar modelos",
+            details={"exception_type": type(e).__name__, "message": str(e)}
+        )
+
+
+@router.get("/shadow")
+async def get_shadow_status(
+    fecha: Optional[date] = Query(
+        None,
+        description="Día a resumir (YYYY-MM-DD) - por defecto hoy"
+    )
+) -> JSONResponse:
+    """
+    Estado de la evaluación shadow y resumen de comparaciones del día.
+    
+    **Retorna:**
+    - `status`: Candidato, muestreo y contadores de este worker
+    - `summary`: Muestras y diferencia absoluta media por químico
+    
+    Las comparaciones completas están en `logs/shadow/shadow_YYYYMMDD.jsonl`.
+    """
+    return JSONResponse(content={
+        'status': shadow_scorer.stats(),
+        'summary': shadow_scorer.summary(fecha)
+    })
+
+
+@router.get("/prediction-log")
+async def get_prediction_log_summary(
+    fecha: Optional[date] = Query(
+        None,
+        description="Día a resumir (YYYY-MM-DD) - por defecto hoy"
+    )
+) -> JSONResponse:
+    """
+    Estado del registro de predicciones y latencia por etapa del día.
+    
+    **Retorna:**
+    - `status`: Registros encolados, escritos y descartados en este worker
+    - `summary`: Predicciones, versiones de modelo y p50/p95/p99 (ms) de
+      validation, features, scaling, model y total
+    
+    Los registros completos están en `logs/predictions/predictions_v1_YYYYMMDD.bin`
+    (leer con `PredictionLog.read`).
+    """
+    summary = await run_in_threadpool(prediction_log.latency_summary, fecha)
+    return JSONResponse(content={
+        'status': prediction_log.stats(),
+        'summary': summary
+    })
+
+
+@router.get("/drift")
+async def get_feature_drift() -> JSONResponse:
+    """
+    Deriva de las features respecto a la distribución de entrenamiento.
+    
+    Compara los histogramas guardados con el modelo en producción contra
+    las últimas `drift.window_size` observaciones de cada fuente:
+    - `predicciones`: entradas de /ml/predict (features construidas)
+    - `lecturas`: registros nuevos de control de operación
+    
+    **Retorna por fuente y feature:**
+    - `psi`: Population Stability Index
+    - `ks`: Estadístico de Kolmogorov-Smirnov sobre los bins
+    - `status`: ok / advertencia / alerta según `drift.thresholds` en `ml_config.yaml`
+    
+    Las features con menos de `drift.min_samples` observaciones no se
+    evalúan. Modelos entrenados antes de este monitoreo no tienen
+    histogramas (`status: sin_referencia`) hasta reentrenar.
+    
+    **Nota:** Las ventanas viven en memoria de cada worker.
+    """
+    report = await run_in_threadpool(drift_monitor.evaluate)
+    return JSONResponse(content=report)
+
+
+@router.get("/auto-retrain")
+async def get_auto_retrain_status() -> JSONResponse:
+    """
+    Estado del reentrenamiento automático.
+    
+    Configurado en `optimization.auto_retrain` de `ml_config.yaml`. Solo el
+    worker líder (lock de archivo) revisa los disparadores y entrena.
+    
+    **Retorna:**
+    - `leader`: Si este worker es el que revisa y entrena
+    - `last_check`: Lecturas nuevas desde el entrenamiento del modelo en
+      producción, fuentes con deriva en alerta, modo (incremental o
+      completo) y si se disparó
+    - `last_run`: Candidato, métricas de candidato y producción sobre el
+      mismo test, y si se promovió
+    - `report`: Por modo (`incremental` / `full`), corridas, métricas de
+      test y tiempo de entrenamiento promedio, desde el linaje del registro
+    
+    **Nota:** El estado vive en memoria de cada worker; `last_run` solo
+    aparece en el líder.
+    """
+    from ml.models.auto_retrain import get_auto_retrainer
+    retrainer = get_auto_retrainer()
+    report = await run_in_threadpool(retrainer.retraining_report)
+    return JSONResponse(content={**retrainer.status(), 'report': report})
+
+
+@router.put("/shadow")
+async def configure_shadow(request: ShadowConfigRequest) -> JSONResponse:
+    """
+    Configura el modelo candidato de la evaluación shadow.
+    
+    **Ejemplo:**
+    ```json
+    {"candidate_version": "model_xgboost_20260301_120000", "sample_rate": 0.2, "enabled": true}
+    ```
+    
+    **Nota:** La configuración aplica al worker que atiende el request.
+    """
+    if request.candidate_version:
+        if predictor.model_manager.registry.get(request.candidate_version) is None:
+            raise ResourceNotFoundException("Modelo", request.candidate_version)
+    
+    logger.info(f"🔄 REQUEST: Configurar shadow - candidato {request.candidate_version}")
+    shadow_scorer.configure(
+        candidate_version=request.candidate_version,
+        sample_rate=request.sample_rate,
+        enabled=request.enabled
+    )
+    
+    return JSONResponse(content={'status': 'success', 'shadow': shadow_scorer.stats()})
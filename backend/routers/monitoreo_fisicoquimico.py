@@ -4,6 +4,8 @@ Router para operaciones CRUD de Monitoreo Fisicoquímico (Matriz 6)
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
@@ -14,7 +16,8 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
-from core.database import get_db
+from core.database import get_db, get_read_db, get_async_db
+from core.query_counter import query_budget
 from models.monitoreo_fisicoquimico import MonitoreoFisicoquimico
 from schemas.monitoreo_fisicoquimico import (
     MonitoreoFisicoquimicoCreate,
@@ -26,42 +29,44 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[MonitoreoFisicoquimicoResponse])
-def get_monitoreos(
+async def get_monitoreos(
     skip: int = 0,
     limit: int = 100,
     fecha: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener lista de monitoreos fisicoquímicos"""
-    query = db.query(MonitoreoFisicoquimico)
+    query = select(MonitoreoFisicoquimico)
     
     if fecha:
-        query = query.filter(MonitoreoFisicoquimico.fecha == fecha)
+        query = query.where(MonitoreoFisicoquimico.fecha == fecha)
     
-    monitoreos = query.order_by(
+    result = await db.execute(query.order_by(
         MonitoreoFisicoquimico.fecha.desc(),
         MonitoreoFisicoquimico.muestra_numero
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))
+    monitoreos = result.scalars().all()
     
     return monitoreos
 
 
 @router.get("/fecha/{fecha_consulta}", response_model=List[MonitoreoFisicoquimicoResponse])
-def get_monitoreos_por_fecha(fecha_consulta: date, db: Session = Depends(get_db)):
+async def get_monitoreos_por_fecha(fecha_consulta: date, db: AsyncSession = Depends(get_async_db)):
     """Obtener todos los monitoreos de un día específico (3 muestras)"""
-    monitoreos = db.query(MonitoreoFisicoquimico).filter(
-        MonitoreoFisicoquimico.fecha == fecha_consulta
-    ).order_by(MonitoreoFisicoquimico.muestra_numero).all()
+    result = await db.execute(
+        select(MonitoreoFisicoquimico).where(
+            MonitoreoFisicoquimico.fecha == fecha_consulta
+        ).order_by(MonitoreoFisicoquimico.muestra_numero)
+    )
+    monitoreos = result.scalars().all()
     
     return monitoreos
 
 
 @router.get("/{monitoreo_id}", response_model=MonitoreoFisicoquimicoResponse)
-def get_monitoreo(monitoreo_id: int, db: Session = Depends(get_db)):
+async def get_monitoreo(monitoreo_id: int, db: AsyncSession = Depends(get_async_db)):
     """Obtener un monitoreo por ID"""
-    monitoreo = db.query(MonitoreoFisicoquimico).filter(
-        MonitoreoFisicoquimico.id == monitoreo_id
-    ).first()
+    monitoreo = await db.get(MonitoreoFisicoquimico, monitoreo_id)
     
     if not monitoreo:
         raise HTTPException(
@@ -139,8 +144,8 @@ def delete_monitoreo(monitoreo_id: int, db: Session = Depends(get_db)):
     return None
 
 
-@router.get("/exportar-excel/fecha/{fecha}")
-def exportar_excel(fecha: str, db: Session = Depends(get_db)):
+@router.get("/exportar-excel/fecha/{fecha}", dependencies=[Depends(query_budget(3))])
+def exportar_excel(fecha: str, db: Session = Depends(get_read_db)):
     """Exportar monitoreos fisicoquímicos a Excel con formato específico"""
     
     # Crear workbook
@@ -4,6 +4,8 @@ Router para operaciones CRUD de Producción de Filtros (Matriz 3)
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
@@ -14,7 +16,8 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 
-from core.database import get_db
+from core.database import get_db, get_read_db, get_async_db
+from core.query_counter import query_budget
 from models.produccion_filtro import ProduccionFiltro
 from schemas.produccion_filtro import (
     ProduccionFiltroCreate,
@@ -26,42 +29,44 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[ProduccionFiltroResponse])
-def get_producciones(
+async def get_producciones(
     skip: int = 0,
     limit: int = 100,
     fecha: Optional[date] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtener lista de producciones por filtro"""
-    query = db.query(ProduccionFiltro)
+    query = select(ProduccionFiltro)
     
     if fecha:
-        query = query.filter(ProduccionFiltro.fecha == fecha)
+        query = query.where(ProduccionFiltro.fecha == fecha)
     
-    producciones = query.order_by(
+    result = await db.execute(query.order_by(
         ProduccionFiltro.fecha.desc(),
         ProduccionFiltro.hora.desc()
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))
+    producciones = result.scalars().all()
     
     return producciones
 
 
 @router.get("/fecha/{fecha_consulta}", response_model=List[ProduccionFiltroResponse])
-def get_producciones_por_fecha(fecha_consulta: date, db: Session = Depends(get_db)):
+async def get_producciones_por_fecha(fecha_consulta: date, db: AsyncSession = Depends(get_async_db)):
     """Obtener todas las producciones de un día específico"""
-    producciones = db.query(ProduccionFiltro).filter(
-        ProduccionFiltro.fecha == fecha_consulta
-    ).order_by(ProduccionFiltro.hora).all()
+    result = await db.execute(
+        select(ProduccionFiltro).where(
+            ProduccionFiltro.fecha == fecha_consulta
+        ).order_by(ProduccionFiltro.hora)
+    )
+    producciones = result.scalars().all()
     
     return producciones
 
 
 @router.get("/{produccion_id}", response_model=ProduccionFiltroResponse)
-def get_produccion(produccion_id: int, db: Session = Depends(get_db)):
+async def get_produccion(produccion_id: int, db: AsyncSession = Depends(get_async_db)):
     """Obtener una producción por ID"""
-    produccion = db.query(ProduccionFiltro).filter(
-        ProduccionFiltro.id == produccion_id
-    ).first()
+    produccion = await db.get(ProduccionFiltro, produccion_id)
     
     if not produccion:
         raise HTTPException(
@@ -139,8 +144,8 @@ def delete_produccion(produccion_id: int, db: Session = Depends(get_db)):
     return None
 
 
-@router.get("/exportar-excel/fecha/{fecha}")
-def exportar_excel(fecha: str, db: Session = Depends(get_db)):
+@router.get("/exportar-excel/fecha/{fecha}", dependencies=[Depends(query_budget(3))])
+def exportar_excel(fecha: str, db: Session = Depends(get_read_db)):
     """Exportar producción por filtros a Excel con formato específico"""
     
     # Crear workbook
@@ -13,6 +13,7 @@ from pathlib import Path
 import uuid
 
 from core.database import get_db
+from core.query_counter import query_budget
 from models.usuario import Usuario, UserRole
 from models.rol import Rol
 from models.log import LogAuditoria
@@ -66,7 +67,7 @@ def check_admin_role(current_user: Usuario):
         )
 
 
-@router.get("/", response_model=List[UsuarioList])
+@router.get("/", response_model=List[UsuarioList], dependencies=[Depends(query_budget(3))])
 def get_usuarios(
     skip: int = 0,
     limit: int = 100,
@@ -0,0 +1,49 @@
+"""
+Configuración común de los tests.
+
+Se ejecuta antes de importar la app: en los tests una ruta que excede su
+presupuesto de consultas SQL (query_budget) falla la request. El fixture
+`migrated_db` da a la app una base temporal migrada.
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("DB_QUERY_BUDGET_ENFORCE", "true")
+
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    """
+    Base SQLite temporal migrada en lugar de la base de desarrollo.
+
+    Reemplaza get_db y get_read_db de la app mientras dura el test, así
+    las rutas CRUD funcionan en un checkout limpio.
+
+    Returns:
+        sessionmaker de la base temporal
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from main import app
+    from core.database import get_db, get_read_db
+    from core.schema import upgrade_schema
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    upgrade_schema(engine)
+    Session = sessionmaker(bind=engine)
+
+    def override():
+        with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_read_db] = override
+    try:
+        yield Session
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
+        engine.dispose()
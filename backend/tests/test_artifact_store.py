@@ -0,0 +1,102 @@
+"""
+Tests del almacén de artefactos por contenido.
+
+Ejecutar con:
+    pytest tests/test_artifact_store.py -v
+"""
+
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+import numpy as np
+
+from ml.models.artifact_store import ArtifactStore
+from ml.models.model_manager import ModelManager
+from ml.utils.validation import ModelIntegrityError
+
+
+def _artifacts(seed: int, scaler: StandardScaler):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(50, 3))
+    model = LinearRegression().fit(X, X @ [1.0, 2.0, 3.0])
+    return {
+        "model.pkl": model,
+        "scaler.pkl": scaler,
+        "feature_names.pkl": ["a", "b", "c"],
+        "metadata.pkl": {"model_name": "linear", "training_date": f"2026-01-0{seed}T00:00:00"},
+    }
+
+
+def test_identical_artifacts_are_stored_once_and_loaded_verified(tmp_path):
+    """Un scaler idéntico entre reentrenamientos se guarda una sola vez."""
+    scaler = StandardScaler().fit(np.arange(30, dtype=float).reshape(10, 3))
+    store = ArtifactStore(tmp_path)
+
+    first = store.save_model(tmp_path / "model_a", _artifacts(1, scaler))
+    second = store.save_model(tmp_path / "model_b", _artifacts(2, scaler))
+
+    assert first["artifacts"]["scaler.pkl"]["sha256"] == second["artifacts"]["scaler.pkl"]["sha256"]
+    assert first["artifacts"]["model.pkl"]["sha256"] != second["artifacts"]["model.pkl"]["sha256"]
+    assert len(list((tmp_path / "objects").glob("*/*.pkl"))) == 6  # scaler y feature_names compartidos
+    assert not [p for p in tmp_path.iterdir() if p.is_dir() and p.name.startswith(".")]
+
+    manager = ModelManager(models_dir=tmp_path)
+    model, preprocessor, metadata = manager.load_model(version="model_b")
+    _, preprocessor_a, _ = ModelManager(models_dir=tmp_path).load_model(version="model_a")
+
+    assert metadata["model_name"] == "linear"
+    assert preprocessor.feature_names == ["a", "b", "c"]
+    assert preprocessor.scaler is preprocessor_a.scaler
+
+
+def test_corrupted_artifact_is_rejected(tmp_path):
+    """Un artefacto que no coincide con su digest no se sirve."""
+    scaler = StandardScaler().fit(np.ones((4, 3)) * np.arange(4).reshape(4, 1))
+    store = ArtifactStore(tmp_path)
+    store.save_model(tmp_path / "model_a", _artifacts(3, scaler))
+
+    with open(tmp_path / "model_a" / "model.pkl", "r+b") as f:
+        f.seek(10)
+        f.write(b"\x00\x00\x00\x00")
+
+    with pytest.raises(ModelIntegrityError):
+        ModelManager(models_dir=tmp_path).load_model(version="model_a")
+
+
+def test_saving_existing_version_replaces_it(tmp_path):
+    """Dos guardados con la misma versión (mismo segundo): queda el último."""
+    scaler = StandardScaler().fit(np.arange(30, dtype=float).reshape(10, 3))
+    store = ArtifactStore(tmp_path)
+
+    store.save_model(tmp_path / "model_a", _artifacts(1, scaler))
+    second = store.save_model(tmp_path / "model_a", _artifacts(2, scaler))
+
+    assert store.read_manifest(tmp_path / "model_a") == second
+    assert not [p for p in tmp_path.iterdir() if p.is_dir() and p.name.startswith(".")]
+    _, _, metadata = ModelManager(models_dir=tmp_path).load_model(version="model_a")
+    assert metadata["training_date"] == "2026-01-02T00:00:00"
+
+
+def test_garbage_collection_waits_for_saves_in_progress(tmp_path, monkeypatch):
+    """La recolección no borra objetos de un guardado que aún no escribió su manifiesto."""
+    import threading
+
+    scaler = StandardScaler().fit(np.arange(30, dtype=float).reshape(10, 3))
+    removed = []
+    collector = threading.Thread(target=lambda: removed.append(ArtifactStore(tmp_path).collect_garbage()))
+    real_link = ArtifactStore._link
+
+    def link_during_collection(source, dest):
+        # El primer objeto ya está en el almacén pero ningún manifiesto lo referencia
+        if collector.ident is None:
+            collector.start()
+            collector.join(timeout=0.5)
+        real_link(source, dest)
+
+    monkeypatch.setattr(ArtifactStore, "_link", staticmethod(link_during_collection))
+    ArtifactStore(tmp_path).save_model(tmp_path / "model_a", _artifacts(1, scaler))
+    collector.join(timeout=5)
+
+    assert removed == [0]
+    _, _, metadata = ModelManager(models_dir=tmp_path).load_model(version="model_a")
+    assert metadata["model_name"] == "linear"
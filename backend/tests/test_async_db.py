@@ -0,0 +1,83 @@
+"""
+Tests de las rutas de lectura sobre la capa async de base de datos.
+
+Usan una base SQLite temporal migrada con Alembic y reemplazan la
+dependencia get_async_db por una sesión aiosqlite sobre ella.
+
+Ejecutar con:
+    pytest tests/test_async_db.py -v
+"""
+
+from datetime import date, time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import app
+from core.database import get_async_db
+from core.schema import upgrade_schema
+from core.security import create_access_token
+from models import ControlOperacion, Rol, Usuario
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    """Base temporal con un usuario y dos controles, servida por get_async_db."""
+    path = tmp_path / "async.db"
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade_schema(engine)
+
+    with sessionmaker(bind=engine)() as db:
+        rol = Rol(codigo="OPERADOR", nombre="Operador", nivel_jerarquia=4, categoria="OPERADOR")
+        db.add(rol)
+        db.flush()
+        db.add(Usuario(
+            nombre="Ana", apellido="Pérez", username="ana",
+            hashed_password="x", rol_id=rol.id, activo=True
+        ))
+        db.add_all([
+            ControlOperacion(fecha=date(2026, 3, 1), hora=time(8, 0), turbedad_ac=12.5),
+            ControlOperacion(fecha=date(2026, 3, 1), hora=time(9, 0), turbedad_ac=14.0),
+        ])
+        db.commit()
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
+
+
+def test_read_routes_use_async_session(async_db):
+    """Listado, consulta por fecha y por ID responden desde la sesión async."""
+    listado = client.get("/api/control-operacion/", params={"fecha": "2026-03-01"})
+    assert listado.status_code == 200
+    assert [c["hora"] for c in listado.json()] == ["09:00:00", "08:00:00"]
+
+    por_fecha = client.get("/api/control-operacion/fecha/2026-03-01").json()
+    assert [c["hora"] for c in por_fecha] == ["08:00:00", "09:00:00"]
+
+    control_id = por_fecha[0]["id"]
+    assert client.get(f"/api/control-operacion/{control_id}").json()["id"] == control_id
+    assert client.get("/api/control-operacion/999").status_code == 404
+
+
+def test_current_user_resolved_with_async_session(async_db):
+    """El usuario del token se carga con su rol desde la sesión async."""
+    token = create_access_token(subject="ana")
+    response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["username"] == "ana"
+    assert response.json()["rol"]["categoria"] == "OPERADOR"
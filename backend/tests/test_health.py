@@ -0,0 +1,65 @@
+"""
+Tests de liveness/readiness y del bloqueo de rutas ML durante el arranque.
+
+Ejecutar con:
+    pytest tests/test_health.py -v
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from core.readiness import readiness, LOADING, READY, ERROR
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def reset_readiness():
+    """Cada test parte sin estado de arranque."""
+    readiness.reset()
+    yield
+    readiness.reset()
+
+
+def test_readiness_reports_schema_database_and_model():
+    """/health/ready depende del esquema y la base de datos, y reporta el modelo."""
+    readiness.set("schema", READY)
+    readiness.set("model", LOADING)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["database"]["status"] == "ready"
+    assert "pool" in body["database"]
+    assert body["model"]["status"] == LOADING
+
+    readiness.set("schema", ERROR, error="sin conexión")
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["schema"]["error"] == "sin conexión"
+
+    assert client.get("/health/live").status_code == 200
+
+
+def test_ml_routes_fail_fast_while_model_loads(migrated_db):
+    """Mientras el modelo carga, las rutas ML responden 503 y las CRUD siguen."""
+    readiness.set("model", LOADING)
+
+    start = time.perf_counter()
+    response = client.post("/api/ml/predict", json={
+        "turbedad_ac": 25.5, "turbedad_at": 0.8, "ph_ac": 7.2,
+        "ph_at": 7.5, "temperatura_ac": 22.0
+    })
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 503
+    assert response.json()["error_code"] == "SERVICE_NOT_READY"
+    assert response.headers["Retry-After"]
+    assert elapsed < 1.0
+
+    assert client.get("/api/ml/model/info").status_code == 503
+    assert client.get("/api/quimicos/").status_code == 200
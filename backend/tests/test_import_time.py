@@ -0,0 +1,60 @@
+"""
+Tests del tiempo de importación de la API.
+
+Importa `main` en un proceso limpio y verifica que el stack de ML pesado
+(sklearn, xgboost, lightgbm, pandas...) no se cargue al arrancar. Eso es
+lo que mantiene bajo el arranque; el tiempo de pared solo se controla con
+un margen amplio, porque en máquinas compartidas varía de una corrida a
+otra.
+
+Ejecutar con:
+    pytest tests/test_import_time.py -v
+
+Límite de tiempo configurable con IMPORT_TIME_BUDGET_SECONDS (por defecto 10.0).
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "10.0"))
+
+# Dependencias que solo deben cargarse al entrenar o predecir
+HEAVY_PACKAGES = ("sklearn", "xgboost", "lightgbm", "pandas", "scipy", "matplotlib", "seaborn")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "heavy": sorted(name for name in %r if name in sys.modules),
+}))
+""" % (HEAVY_PACKAGES,)
+
+
+def _import_main():
+    """Importa `main` en un proceso nuevo y devuelve {seconds, heavy}."""
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def test_api_import_skips_ml_stack():
+    """Importar la API no deja sklearn/xgboost/lightgbm/pandas en sys.modules."""
+    report = _import_main()
+
+    assert not report["heavy"], f"Dependencias pesadas importadas al arrancar: {report['heavy']}"
+    assert report["seconds"] <= BUDGET_SECONDS, (
+        f"import main tardó {report['seconds']:.2f}s (límite {BUDGET_SECONDS:.2f}s)"
+    )
@@ -0,0 +1,79 @@
+"""
+Tests del canal de eventos en vivo.
+
+Ejecutar con:
+    pytest tests/test_live_events.py -v
+"""
+
+import asyncio
+
+from core.live_events import EventBroadcaster
+
+
+def test_replay_after_reconnect_respects_filters():
+    """Al reconectar se repiten solo los eventos posteriores que pasan el filtro."""
+
+    async def scenario():
+        broadcaster = EventBroadcaster(replay_size=10)
+        broadcaster.publish("operacion", "created", {"id": 1})
+        broadcaster.publish("anomalia", "created", {"severidad": "sospechoso"})
+        broadcaster.publish("anomalia", "created", {"severidad": "critico"})
+
+        subscription = broadcaster.subscribe(
+            tipos={"anomalia"},
+            severidades={"critico"},
+            last_event_id=1
+        )
+        evt = await subscription.next_event(timeout=0.1)
+        empty = await subscription.next_event(timeout=0.01)
+        return evt, empty
+
+    evt, empty = asyncio.run(scenario())
+
+    assert evt["id"] == 3
+    assert evt["data"]["severidad"] == "critico"
+    assert empty is None
+
+
+def test_slow_client_drops_oldest_and_is_notified():
+    """Un cliente lento pierde los eventos más antiguos y recibe un aviso 'lagged'."""
+
+    async def scenario():
+        broadcaster = EventBroadcaster(replay_size=10)
+        subscription = broadcaster.subscribe()
+        subscription.queue = asyncio.Queue(maxsize=2)
+
+        for i in range(5):
+            broadcaster.publish("produccion", "created", {"n": i})
+        await asyncio.sleep(0)
+
+        first = await subscription.next_event(timeout=0.1)
+        second = await subscription.next_event(timeout=0.1)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first["tipo"] == "lagged"
+    assert first["data"]["descartados"] == 3
+    assert second["data"]["n"] == 3
+
+
+def test_out_of_order_live_events_are_delivered_and_replay_is_not_duplicated():
+    """Eventos en vivo que llegan fuera de orden se entregan; los ya repetidos no se duplican."""
+
+    async def scenario():
+        broadcaster = EventBroadcaster(replay_size=10)
+        replayed = broadcaster.publish("operacion", "created", {"id": 1})
+        subscription = broadcaster.subscribe(last_event_id=0)
+
+        # Entrega tardía del evento repetido; los ids 2 y 3 (de hilos distintos) llegan invertidos
+        subscription.offer(replayed)
+        for evt_id in (3, 2):
+            subscription.offer({"id": evt_id, "tipo": "operacion", "accion": "created", "data": {}})
+
+        received = []
+        while (evt := await subscription.next_event(timeout=0.01)) is not None:
+            received.append(evt["id"])
+        return received
+
+    assert asyncio.run(scenario()) == [1, 3, 2]
@@ -0,0 +1,72 @@
+"""
+Tests del middleware ASGI de logging.
+
+Ejecutar con:
+    pytest tests/test_logging_middleware.py -v
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+import core.logging_middleware as logging_middleware
+from core.logging_middleware import LoggingMiddleware
+
+
+class _Collector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def collector():
+    handler = _Collector()
+    app_logger = logging.getLogger("app")
+    level = app_logger.level
+    app_logger.setLevel(logging.INFO)
+    app_logger.addHandler(handler)
+    yield handler
+    app_logger.removeHandler(handler)
+    app_logger.setLevel(level)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            for i in range(5):
+                yield f"{i}".encode()
+        return StreamingResponse(body())
+
+    return TestClient(app)
+
+
+def test_streaming_response_passes_through_with_headers(client, collector):
+    """El cuerpo llega completo y la respuesta lleva los headers del middleware."""
+    response = client.get("/stream")
+
+    assert response.content == b"01234"
+    for header in ("X-Request-ID", "X-Process-Time", "X-DB-Queries", "X-DB-Time"):
+        assert header in response.headers
+    assert "RESPONSE: GET /stream - 200" in collector.messages
+
+
+def test_sampling_skips_successes_but_not_errors(client, collector, monkeypatch):
+    """Con muestreo 0 no se registran requests exitosas, sí los errores."""
+    monkeypatch.setattr(logging_middleware, "LOG_SUCCESS_SAMPLE_RATE", 0.0)
+
+    client.get("/stream")
+    client.get("/no-existe")
+
+    assert collector.messages == ["RESPONSE: GET /no-existe - 404"]
@@ -0,0 +1,105 @@
+"""
+Tests de las métricas Prometheus y del endpoint /metrics.
+
+Ejecutar con:
+    pytest tests/test_metrics.py -v
+"""
+
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+import core.metrics as metrics_module
+from core.metrics import MetricsRegistry
+from main import app
+
+
+def test_histogram_buckets_and_counter_shards_across_threads():
+    """Los shards por hilo se suman y los buckets se exponen acumulados."""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Trabajos", ("kind",))
+    histogram = registry.histogram("job_seconds", "Duración", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(labels=("a",))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = registry.render()
+    assert 'jobs_total{kind="a"} 4000' in text
+    assert 'job_seconds_bucket{le="0.1"} 4' in text
+    assert 'job_seconds_bucket{le="1"} 8' in text
+    assert 'job_seconds_bucket{le="+Inf"} 12' in text
+    assert "job_seconds_count 12" in text
+    assert "# TYPE job_seconds histogram" in text
+
+
+def test_dead_thread_shards_are_folded_into_totals():
+    """Los shards de hilos terminados se suman a la base y se descartan."""
+    registry = MetricsRegistry()
+    counter = registry.counter("short_jobs_total", "Trabajos")
+    histogram = registry.histogram("short_job_seconds", "Duración", buckets=(0.1, 1.0))
+
+    def work():
+        counter.inc()
+        histogram.observe(0.5)
+
+    for _ in range(200):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert len(counter._shards) <= 1
+    text = registry.render()
+    assert "short_jobs_total 200" in text
+    assert "short_job_seconds_count 200" in text
+    assert len(counter._shards) == 0
+    assert len(histogram._shards) == 0
+
+
+def test_metrics_endpoint_reports_route_template(migrated_db):
+    """/metrics expone la latencia por plantilla de ruta y los colectores."""
+    client = TestClient(app)
+    client.get("/health/live")
+    client.get("/api/filtros/999999")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health/live",status="200",le="+Inf"}' in body
+    assert 'route="/api/filtros/{filtro_id}"' in body
+    assert "/999999" not in body
+    assert 'db_pool_size{pool="primary"}' in body
+    assert "result_cache_hits_total" in body
+
+
+def test_multiprocess_merge_sums_counters_and_drops_dead_gauges(tmp_path, monkeypatch):
+    """Con varios workers se suman contadores; los gauges de procesos muertos se omiten."""
+    monkeypatch.setattr(metrics_module, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Trabajos").inc(2)
+    registry.gauge("in_flight", "En curso").inc(1)
+
+    dead_pid = 2 ** 22 + 1  # por encima de pid_max por defecto
+    (tmp_path / f"metrics_{dead_pid}.json").write_text(json.dumps({
+        "pid": dead_pid,
+        "families": {
+            "jobs_total": {"type": "counter", "help": "Trabajos", "labelnames": [], "samples": [[[], 3]]},
+            "in_flight": {"type": "gauge", "help": "En curso", "labelnames": [], "samples": [[[], 7]]},
+        }
+    }))
+
+    text = registry.render()
+    assert "jobs_total 5" in text
+    assert "in_flight 1" in text
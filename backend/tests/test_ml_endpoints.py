@@ -8,7 +8,7 @@ Ejecutar con:
 
 import pytest
 from fastapi.testclient import TestClient
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from unittest.mock import patch, MagicMock
 import pandas as pd
 
@@ -16,6 +16,7 @@ import pandas as pd
 import sys
 sys.path.insert(0, '..')
 from main import app
+from core.result_cache import result_cache
 
 client = TestClient(app)
 
@@ -142,6 +143,175 @@ def test_anomalies_empty_data():
     assert len(data["anomalies"]) == 0
 
 
+def test_anomalies_recompute_mode():
+    """Test endpoint /ml/anomalies re-analizando el rango completo."""
+    
+    response = client.get("/api/ml/anomalies?days=7&recompute=true")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert "anomalies" in data
+    assert "by_severity" in data
+
+
+def test_anomalies_recompute_uses_trained_detector(tmp_path, monkeypatch):
+    """recompute=true carga el detector guardado por /ml/train y llega al análisis por bloques."""
+    import numpy as np
+    from ml.inference import anomaly_service
+    from ml.inference.anomaly_service import AnomalyDetectorService
+    from routers import ml as ml_router
+    
+    rng = np.random.default_rng(2)
+    n = 24 * 60
+    df = pd.DataFrame({
+        'fecha': [date(2001, 1, 1) + timedelta(days=i // 24) for i in range(n)],
+        'hora': [datetime(2001, 1, 1, i % 24).time() for i in range(n)],
+        'turbedad_ac': rng.normal(20, 3, n),
+        'turbedad_at': rng.normal(2, 0.5, n),
+        'ph_ac': rng.normal(7.2, 0.2, n),
+        'ph_at': rng.normal(7.0, 0.2, n),
+    })
+    monkeypatch.setattr(anomaly_service, "default_detector_dir", lambda: tmp_path)
+    
+    repository = MagicMock()
+    repository.get_operational_data.return_value = df
+    ml_router.train_anomaly_detector(repository)
+    assert (tmp_path / "anomaly_detector.pkl").exists()
+    
+    # El pool de procesos se reemplaza por el análisis en el mismo proceso
+    chunked = MagicMock(side_effect=lambda self, frame, use_thresholds, fill_values:
+                        self._analyze_frame(frame, True, use_thresholds, fill_values))
+    result_cache.clear()
+    with patch.object(ml_router.PlantDataRepository, "get_operational_data", return_value=df), \
+         patch.object(AnomalyDetectorService, "_should_parallelize", return_value=True), \
+         patch.object(AnomalyDetectorService, "_detect_parallel", autospec=True, side_effect=chunked):
+        response = client.get("/api/ml/anomalies?fecha_inicio=2001-01-01&fecha_fin=2001-03-01&recompute=true")
+    result_cache.clear()
+    
+    assert response.status_code == 200
+    assert response.json()["total_records"] == n
+    assert ml_router.get_anomaly_detector()._is_trained
+    assert chunked.call_count == 1
+
+
+def test_anomalies_rebuild():
+    """Test reconstrucción de anomalías almacenadas."""
+    
+    response = client.post("/api/ml/anomalies/rebuild?fecha_inicio=2000-01-01&fecha_fin=2000-01-07")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["records_processed"] == 0
+
+
+def test_anomalies_rebuild_keeps_live_state():
+    """Reconstruir un rango histórico no altera el estado EWMA en vivo."""
+    from ml.inference.online_anomaly_service import get_online_detector
+    
+    detector = get_online_detector()
+    detector.score({'turbedad_ac': 20.0})
+    before = detector.get_state()
+    
+    response = client.post("/api/ml/anomalies/rebuild?fecha_inicio=2000-01-01&fecha_fin=2000-01-07")
+    
+    assert response.status_code == 200
+    assert detector.get_state() == before
+
+
+# ============================================================================
+# Tests del detector en línea (EWMA)
+# ============================================================================
+
+def test_online_detector_flags_deviation_after_warmup():
+    """El detector en línea marca lecturas alejadas de la media móvil."""
+    from ml.inference.online_anomaly_service import OnlineAnomalyDetector
+    
+    detector = OnlineAnomalyDetector(warmup_samples=5, parameters=['turbedad_ac'])
+    detector.warm_up(
+        {'turbedad_ac': 20.0 + (i % 3)} for i in range(30)
+    )
+    
+    assert detector.score({'turbedad_ac': 21.0}) == []
+    
+    anomalies = detector.score({'turbedad_ac': 60.0}, update_state=False)
+    assert len(anomalies) == 1
+    assert anomalies[0]['metodo'] == 'ewma'
+    assert anomalies[0]['severidad'] == 'critico'
+
+
+def test_online_detector_applies_configured_thresholds():
+    """El detector en línea aplica los umbrales de configuración sin histórico."""
+    from ml.inference.online_anomaly_service import OnlineAnomalyDetector
+    
+    detector = OnlineAnomalyDetector(parameters=['ph_ac'])
+    
+    anomalies = detector.score({'ph_ac': 5.0})
+    assert anomalies[0]['severidad'] == 'critico'
+    assert anomalies[0]['metodo'] == 'umbral'
+    
+    assert detector.score({'ph_ac': 7.2}) == []
+
+
+def test_parallel_anomaly_detection_matches_serial():
+    """El análisis por bloques en el pool da el mismo resultado que en un proceso."""
+    import numpy as np
+    from ml.inference.anomaly_service import AnomalyDetectorService, config as anomaly_config
+    
+    rng = np.random.default_rng(0)
+    n = 24 * 90
+    df = pd.DataFrame({
+        'fecha': [date(2025, 1, 1) + timedelta(days=i // 24) for i in range(n)],
+        'turbedad_ac': rng.normal(20, 3, n),
+        'turbedad_at': rng.normal(2, 0.5, n),
+        'ph_ac': rng.normal(7.2, 0.2, n),
+        'ph_at': rng.normal(7.0, 0.2, n),
+    })
+    df.loc[::50, 'ph_ac'] = np.nan
+    
+    service = AnomalyDetectorService()
+    service.train_detector(df)
+    
+    serial = service._analyze_frame(df, fill_values=service._compute_fill_values(df))
+    
+    overrides = {'anomaly_detection.parallel.min_rows': 100, 'anomaly_detection.parallel.max_workers': 2}
+    original_get = anomaly_config.get
+    with patch.object(anomaly_config, 'get', side_effect=lambda k, d=None: overrides.get(k, original_get(k, d))):
+        try:
+            parallel = service._detect_parallel(df, True, service._compute_fill_values(df))
+        finally:
+            service.shutdown_pool()
+    
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_model_scoring_single_pass_matches_predict():
+    """Las etiquetas derivadas de offset_ coinciden con predict() y no dependen del lote."""
+    import numpy as np
+    from ml.inference.anomaly_service import AnomalyDetectorService
+    
+    rng = np.random.default_rng(1)
+    n = 2000
+    df = pd.DataFrame({
+        'turbedad_ac': rng.normal(20, 3, n),
+        'ph_ac': rng.normal(7.2, 0.2, n),
+    })
+    df.loc[::7, 'ph_ac'] = np.nan
+    
+    service = AnomalyDetectorService()
+    service.train_detector(df)
+    
+    result = service.detect_anomalies(df, use_thresholds=False)
+    
+    X_scaled = service.scaler.transform(df[service.feature_columns].fillna(service.fill_values))
+    expected = service.detector.predict(X_scaled) == -1
+    assert (result['is_anomaly'].to_numpy() == expected).all()
+    
+    # Un lote pequeño obtiene los mismos scores que dentro del rango completo
+    subset = service.detect_anomalies(df.iloc[:10], use_thresholds=False)
+    np.testing.assert_allclose(subset['anomaly_score'], result['anomaly_score'].iloc[:10])
+
+
 # ============================================================================
 # Tests para /ml/predict
 # ============================================================================
@@ -178,6 +348,564 @@ def test_predict_valid_request():
     assert data["confidence"] >= 0 and data["confidence"] <= 1
 
 
+def test_predict_with_model_version():
+    """Predicción con una versión explícita del registro; versión inexistente da 404."""
+    from ml.inference.predictor_service import ChemicalConsumptionPredictor
+    
+    version = ChemicalConsumptionPredictor().model_manager.registry.get_production_name()
+    payload = {
+        "turbedad_ac": 25.5,
+        "turbedad_at": 0.8,
+        "ph_ac": 7.2,
+        "ph_at": 7.5,
+        "temperatura_ac": 22.0,
+        "model_version": version
+    }
+    
+    response = client.post("/api/ml/predict", json=payload)
+    assert response.status_code == 200
+    assert response.json()["model_version"] == version
+    
+    payload["model_version"] = "model_inexistente_20000101_000000"
+    response = client.post("/api/ml/predict", json=payload)
+    assert response.status_code == 404
+    
+    # Una carga fallida no deja su lock en el pool
+    from ml.inference.model_pool import get_model_pool
+    assert payload["model_version"] not in get_model_pool()._loading
+
+
+def test_model_pool_loads_each_version_once(tmp_path):
+    """Un hilo que llega al terminar la carga encuentra el modelo, sin volver a leerlo del disco."""
+    import threading
+    from ml.inference.model_pool import ModelPool, ModelBundle
+    
+    pool = ModelPool(max_size=2, models_dir=tmp_path)
+    loads = []
+    late = []
+    
+    class HandOff:
+        """Lock del pool que atiende otra petición en cuanto se suelta tras la carga."""
+        
+        def __init__(self):
+            self.lock = threading.Lock()
+        
+        def __enter__(self):
+            self.lock.acquire()
+        
+        def __exit__(self, *exc):
+            self.lock.release()
+            if loads and not late:
+                late.append(threading.Thread(target=pool.get, args=("v1",)))
+                late[0].start()
+                late[0].join(timeout=5)
+    
+    def fake_load(version):
+        loads.append(version)
+        return ModelBundle(version=version, model=object(), preprocessor=None, metadata={})
+    
+    pool._lock = HandOff()
+    pool._load = fake_load
+    bundle = pool.get("v1")
+    
+    assert loads == ["v1"]
+    assert pool.get("v1") is bundle
+    assert not pool._loading
+
+
+def test_shadow_scorer_stores_comparison(tmp_path):
+    """El candidato se evalúa en segundo plano y la comparación queda guardada."""
+    from ml.domain.entities import PredictionResult
+    from ml.inference.predictor_service import ChemicalConsumptionPredictor
+    from ml.inference.shadow_service import ShadowScorer
+    
+    candidate = ChemicalConsumptionPredictor().model_manager.registry.get_production_name()
+    scorer = ShadowScorer()
+    scorer.log_dir = tmp_path
+    scorer.configure(candidate_version=candidate, sample_rate=1.0, enabled=True)
+    
+    primary = PredictionResult(
+        sulfato_predicho=1.0,
+        cal_predicha=1.0,
+        hipoclorito_predicho=1.0,
+        cloro_gas_predicho=1.0,
+        model_version="model_anterior"
+    )
+    input_data = {
+        "turbedad_ac": 25.5, "turbedad_at": 0.8, "ph_ac": 7.2,
+        "ph_at": 7.5, "temperatura_ac": 22.0
+    }
+    
+    assert scorer.submit(input_data, primary) is True
+    assert scorer.wait_idle()
+    
+    records = scorer.read_records()
+    assert len(records) == 1
+    assert records[0]["candidate_version"] == candidate
+    assert "candidate" in records[0]
+    assert scorer.summary()["samples"] == 1
+
+
+def test_prediction_reports_stage_timings():
+    """La predicción mide cada etapa; total cubre las demás."""
+    from ml.inference.predictor_service import ChemicalConsumptionPredictor
+    
+    result = ChemicalConsumptionPredictor().predict(
+        turbedad_ac=25.5, turbedad_at=0.8, ph_ac=7.2, ph_at=7.5, temperatura_ac=22.0
+    )
+    
+    timings = result.timings_ms
+    assert set(timings) == {"validation", "features", "scaling", "model", "total"}
+    assert all(value >= 0 for value in timings.values())
+    assert timings["total"] >= sum(v for k, v in timings.items() if k != "total")
+
+
+def test_prediction_log_writes_daily_binary_records(tmp_path):
+    """El registro escribe en segundo plano un archivo por día y se lee como DataFrame."""
+    from datetime import datetime
+    from ml.domain.entities import PredictionResult
+    from ml.inference.prediction_log import PredictionLog
+    
+    log = PredictionLog()
+    log.log_dir = tmp_path
+    log.enabled = True
+    result = PredictionResult(
+        sulfato_predicho=10.5,
+        cal_predicha=2.0,
+        hipoclorito_predicho=1.0,
+        cloro_gas_predicho=0.5,
+        confidence_score=0.9,
+        model_version="model_test_20260301_120000",
+        timings_ms={"validation": 0.1, "features": 2.0, "scaling": 0.5, "model": 1.5, "total": 4.2}
+    )
+    input_data = {"turbedad_ac": 25.5, "turbedad_at": 0.8, "ph_ac": 7.2, "ph_at": 7.5,
+                  "temperatura_ac": 22.0, "caudal_total": None}
+    
+    yesterday = datetime(2026, 3, 1, 23, 59).timestamp()
+    today = datetime(2026, 3, 2, 0, 1).timestamp()
+    assert log.submit(input_data, result, timestamp=yesterday)
+    for _ in range(3):
+        assert log.submit(input_data, result, timestamp=today)
+    log.flush()
+    
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "predictions_v1_20260301.bin", "predictions_v1_20260302.bin"
+    ]
+    df = log.read(date(2026, 3, 2))
+    assert len(df) == 3
+    assert df["model_version"].iloc[0] == "model_test_20260301_120000"
+    assert df["sulfato_kg"].iloc[0] == pytest.approx(10.5)
+    assert pd.isna(df["caudal_total"].iloc[0])
+    
+    summary = log.latency_summary(date(2026, 3, 2))
+    assert summary["predictions"] == 3
+    assert summary["latency_ms"]["model"]["p50"] == pytest.approx(1.5)
+    assert log.stats()["written"] == 4
+
+
+def test_prediction_log_concurrent_writers_keep_records_aligned(tmp_path):
+    """Varios escritores (workers) agregan lotes al mismo archivo sin intercalarlos."""
+    import threading
+    import numpy as np
+    from datetime import datetime
+    from ml.inference.prediction_log import PredictionLog, RECORD_DTYPE
+    
+    timestamp = datetime(2026, 3, 2, 12, 0).timestamp()
+    
+    def writer(name):
+        log = PredictionLog()
+        log.log_dir = tmp_path
+        record = (timestamp, name.encode()) + (1.0,) * (len(RECORD_DTYPE.names) - 2)
+        for _ in range(5):
+            log._write([record] * 2000)
+    
+    threads = [threading.Thread(target=writer, args=(f"worker_{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    log = PredictionLog()
+    log.log_dir = tmp_path
+    df = log.read(date(2026, 3, 2))
+    assert len(df) == 4 * 5 * 2000
+    assert df["model_version"].value_counts().to_dict() == {f"worker_{i}": 10000 for i in range(4)}
+    assert np.allclose(df["sulfato_kg"], 1.0)
+
+
+def test_predictions_feed_drift_only_with_real_inputs(monkeypatch):
+    """Features rellenadas con 0 llegan como NaN al monitor; el calentamiento no cuenta."""
+    import ml.inference.predictor_service as predictor_module
+    from ml.inference.predictor_service import ChemicalConsumptionPredictor
+    
+    observed = []
+    
+    class FakeMonitor:
+        def observe(self, rows, source='predicciones'):
+            observed.append(rows)
+    
+    monkeypatch.setattr(predictor_module, "get_drift_monitor", lambda: FakeMonitor())
+    predictor = ChemicalConsumptionPredictor()
+    predictor.predict(turbedad_ac=25.5, turbedad_at=0.8, ph_ac=7.2, ph_at=7.5, temperatura_ac=22.0)
+    
+    assert len(observed) == 1
+    rows = observed[0]
+    assert rows["turbedad_ac"].iloc[0] == pytest.approx(25.5)
+    missing = [name for name in ("mes_num", "dia_semana", "conductividad_ac") if name in rows.columns]
+    assert missing and rows[missing].isna().all(axis=None)
+    
+    predictor.warm_up(iterations=2)
+    assert len(observed) == 1
+
+
+def test_drift_monitor_flags_shifted_feature():
+    """PSI/KS marcan solo la feature desplazada; la ventana descarta lo antiguo."""
+    import numpy as np
+    from ml.inference.drift_monitor import DriftMonitor, build_reference_histograms
+    
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame({
+        "turbedad_ac": rng.normal(25, 5, 2000),
+        "ph_ac": rng.normal(7.2, 0.2, 2000),
+    })
+    histograms = build_reference_histograms(train, bins=10)
+    assert all(sum(counts) == 2000 for counts in histograms["counts"])
+    
+    monitor = DriftMonitor()
+    monitor.window_size = 500
+    monitor.min_samples = 100
+    monitor.thresholds = {"psi_warning": 0.1, "psi_alert": 0.25, "ks_warning": 0.1, "ks_alert": 0.2}
+    monitor.set_reference(histograms, model_version="model_test")
+    
+    monitor.observe(pd.DataFrame({
+        "turbedad_ac": rng.normal(25, 5, 500),
+        "ph_ac": rng.normal(7.2, 0.2, 500),
+    }))
+    report = monitor.evaluate()["sources"]["predicciones"]
+    assert report["status"] == "ok"
+    
+    # Turbiedad desplazada; el pH sigue igual. La ventana conserva las últimas 500
+    monitor.observe(pd.DataFrame({
+        "turbedad_ac": rng.normal(40, 5, 500),
+        "ph_ac": rng.normal(7.2, 0.2, 500),
+        "columna_ajena": 1.0,
+    }))
+    report = monitor.evaluate()["sources"]["predicciones"]
+    assert report["window"] == 500
+    assert report["observations"] == 1000
+    assert report["features"]["turbedad_ac"]["status"] == "alerta"
+    assert report["features"]["turbedad_ac"]["psi"] > 1
+    assert report["features"]["ph_ac"]["status"] == "ok"
+    assert report["status"] == "alerta"
+    assert monitor.evaluate()["sources"]["lecturas"]["status"] == "insuficiente"
+
+
+def test_drift_endpoint():
+    """/ml/drift responde aunque el modelo no tenga histogramas de referencia."""
+    response = client.get("/api/ml/drift")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert "model_version" in data
+    assert "sources" in data
+
+
+def test_auto_retrain_promotes_only_better_candidate(tmp_path):
+    """El candidato se promueve solo si cumple umbrales y mejora la métrica principal."""
+    from ml.models.auto_retrain import AutoRetrainer
+    
+    for name in ("model_prod", "model_candidato"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "model.pkl").write_bytes(b"modelo")
+    
+    retrainer = AutoRetrainer(models_dir=tmp_path)
+    retrainer.registry.register(tmp_path / "model_prod", {"training_date": "2026-03-01T12:00:00"})
+    retrainer.registry.register(tmp_path / "model_candidato", {}, promote=False)
+    reloaded = []
+    retrainer._on_promote = reloaded.append
+    retrainer._production_seen = "model_prod"
+    
+    production = {"rmse": 10.0, "r2": 0.85, "mape": 8.0}
+    worse = retrainer.decide({
+        "candidate": "model_candidato",
+        "candidate_metrics": {"rmse": 11.0, "r2": 0.80, "mape": 9.0},
+        "production_metrics": production,
+    })
+    below_thresholds = retrainer.decide({
+        "candidate": "model_candidato",
+        "candidate_metrics": {"rmse": 9.0, "r2": 0.50, "mape": 30.0},
+        "production_metrics": production,
+    })
+    assert not worse["promoted"] and worse["passes_thresholds"]
+    assert not below_thresholds["promoted"] and not below_thresholds["passes_thresholds"]
+    assert retrainer.registry.get_production_name() == "model_prod"
+    
+    # El candidato rechazado sale del registro y del disco
+    assert retrainer.registry.get("model_candidato") is None
+    assert not (tmp_path / "model_candidato").exists()
+    assert retrainer._last_rejected is not None
+    
+    (tmp_path / "model_candidato").mkdir()
+    (tmp_path / "model_candidato" / "model.pkl").write_bytes(b"modelo")
+    retrainer.registry.register(tmp_path / "model_candidato", {}, promote=False)
+    better = retrainer.decide({
+        "candidate": "model_candidato",
+        "candidate_metrics": {"rmse": 9.0, "r2": 0.88, "mape": 7.0},
+        "production_metrics": production,
+    })
+    assert better["promoted"]
+    assert retrainer.registry.get_production_name() == "model_candidato"
+    assert reloaded == [tmp_path / "model_candidato"]
+
+
+def test_auto_retrain_triggers_with_cooldown_and_single_leader(tmp_path):
+    """Lecturas nuevas o deriva disparan el reentrenamiento una vez por intervalo; un solo líder."""
+    from ml.models.auto_retrain import AutoRetrainer, _acquire_lock
+    
+    retrainer = AutoRetrainer(models_dir=tmp_path)
+    retrainer.min_new_samples = 30
+    runs = []
+    
+    def fake_run(reasons, lineage):
+        retrainer._last_attempt = datetime.now()
+        runs.append(reasons)
+    
+    with patch.object(retrainer, "_new_samples", return_value=5), \
+         patch.object(retrainer, "_drifting_sources", return_value=[]), \
+         patch.object(retrainer, "run_retraining", side_effect=fake_run):
+        assert not retrainer.check()["triggered"]
+    
+    with patch.object(retrainer, "_new_samples", return_value=40), \
+         patch.object(retrainer, "_drifting_sources", return_value=["lecturas"]), \
+         patch.object(retrainer, "run_retraining", side_effect=fake_run):
+        first = retrainer.check()
+        second = retrainer.check()
+    
+    assert first["triggered"]
+    assert first["reasons"] == ["40 lecturas nuevas", "deriva en lecturas"]
+    assert second["cooling_down"] and not second["triggered"]
+    assert len(runs) == 1
+    
+    leader = _acquire_lock(tmp_path / ".auto_retrain.lock")
+    assert leader is not None
+    assert _acquire_lock(tmp_path / ".auto_retrain.lock") is None
+    leader.close()
+    assert client.get("/api/ml/auto-retrain").json()["enabled"] is False
+
+
+def test_auto_retrain_triggers_only_on_verified_drift(tmp_path, monkeypatch):
+    """Solo cuenta la deriva de las lecturas que persiste en varias revisiones seguidas."""
+    from ml.inference import drift_monitor
+    from ml.models.auto_retrain import AutoRetrainer
+    
+    retrainer = AutoRetrainer(models_dir=tmp_path)
+    retrainer.drift_sources = ["lecturas"]
+    retrainer.drift_confirmations = 2
+    reports = iter([
+        {"model_version": "v1", "sources": {"predicciones": {"status": "alerta"}, "lecturas": {"status": "ok"}}},
+        {"model_version": "v1", "sources": {"lecturas": {"status": "alerta"}}},
+        {"model_version": "v1", "sources": {"lecturas": {"status": "ok"}}},
+        {"model_version": "v1", "sources": {"lecturas": {"status": "alerta"}}},
+        {"model_version": "v1", "sources": {"lecturas": {"status": "alerta"}}},
+        {"model_version": "v2", "sources": {"lecturas": {"status": "alerta"}}},
+    ])
+    monitor = MagicMock()
+    monitor.evaluate.side_effect = lambda: next(reports)
+    monkeypatch.setattr(drift_monitor, "get_drift_monitor", lambda: monitor)
+    
+    assert [retrainer._drifting_sources() for _ in range(6)] == [[], [], [], [], ["lecturas"], []]
+
+
+def test_incremental_training_continues_boosting():
+    """XGBoost y LightGBM agregan árboles sobre el modelo base sin modificarlo."""
+    import numpy as np
+    import lightgbm as lgb
+    import xgboost as xgb
+    from sklearn.multioutput import MultiOutputRegressor
+    from ml.models.trainer import ChemicalConsumptionTrainer
+    
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 3)), columns=["a", "b", "c"])
+    y = pd.DataFrame({"t1": X["a"] * 2, "t2": X["b"] - X["c"]})
+    
+    base_models = {
+        "xgboost": MultiOutputRegressor(xgb.XGBRegressor(n_estimators=10)).fit(X, y),
+        "lightgbm": MultiOutputRegressor(lgb.LGBMRegressor(n_estimators=10, verbose=-1)).fit(X, y),
+    }
+    rounds = {
+        "xgboost": lambda est: est.get_booster().num_boosted_rounds(),
+        "lightgbm": lambda est: est.booster_.current_iteration(),
+    }
+    
+    for name, base in base_models.items():
+        trainer = ChemicalConsumptionTrainer()
+        metrics = trainer.train_incremental(base, name, X[:50], y[:50], X[50:80], y[50:80], n_estimators=5)
+        
+        model = trainer.models[name]
+        assert [rounds[name](est) for est in model.estimators_] == [15, 15]
+        assert [rounds[name](est) for est in base.estimators_] == [10, 10]
+        assert model.predict(X).shape == (200, 2)
+        assert set(metrics) == {"mae", "rmse", "r2", "mape"}
+        assert trainer.select_best_model()[0] == name
+    
+    with pytest.raises(ValueError):
+        ChemicalConsumptionTrainer().train_incremental(base, "random_forest", X, y, X, y)
+
+
+def test_successive_halving_search_with_early_stopping(monkeypatch):
+    """Rondas con presupuesto creciente, mitad de candidatos por ronda, early stopping y presupuesto de tiempo."""
+    import numpy as np
+    from ml.models import hyperparameter_search
+    from ml.models.hyperparameter_search import SuccessiveHalvingSearch
+    from ml.models.trainer import ChemicalConsumptionTrainer
+    
+    overrides = {
+        "models.search.n_candidates": 4,
+        "models.search.min_estimators": 10,
+        "models.search.max_estimators": 40,
+        "models.search.reduction_factor": 2,
+        "models.search.early_stopping_rounds": 5,
+        "models.search.max_workers": 2,
+        "models.search.space": {
+            "xgboost": {"max_depth": [2, 4], "learning_rate": [0.1, 0.3]},
+            "lightgbm": {"num_leaves": [7, 15], "learning_rate": [0.1, 0.3]},
+        },
+    }
+    config = hyperparameter_search.config
+    real_get = config.get
+    monkeypatch.setattr(config, "get", lambda key, default=None: overrides.get(key, real_get(key, default)))
+    
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"])
+    y = pd.DataFrame({"t1": X["a"] * 2 + rng.normal(0, 0.1, 300), "t2": np.sin(X["b"])})
+    X_train, X_val, y_train, y_val = X[:200], X[200:], y[:200], y[200:]
+    
+    trainer = ChemicalConsumptionTrainer()
+    scores = trainer.train_all_models(X_train, y_train, X_val, y_val, perform_cv=False, search=True)
+    
+    summary = trainer.training_metadata["hyperparameter_search"]
+    assert summary["budgets"] == [10, 20, 40]
+    assert summary["evaluations"] == 2 * (4 + 2 + 1)
+    for name in ("xgboost", "lightgbm"):
+        assert summary["best"][name]["rung"] == 2
+        assert all(it <= 40 for it in summary["best"][name]["best_iterations"])
+        assert trainer.models[name].predict(X_val).shape == (100, 2)
+        assert "rmse" in scores[name]
+    assert set(scores) >= {"xgboost", "lightgbm"}
+    
+    # Sin tiempo no se entrena nada: cada modelo queda con su configuración fija
+    assert SuccessiveHalvingSearch(time_budget_seconds=1e-9).run(
+        ["xgboost"], X_train, y_train, X_val, y_val
+    ) == {}
+
+
+def test_search_selection_uses_rows_the_search_never_saw(monkeypatch):
+    """Los modelos buscados y los fijos se comparan en validación que la búsqueda no usó."""
+    import numpy as np
+    from ml.models.trainer import ChemicalConsumptionTrainer
+    
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame(rng.normal(size=(140, 3)), columns=["a", "b", "c"])
+    y = pd.DataFrame({"t1": X["a"] + rng.normal(0, 0.1, 140), "t2": X["b"] * 3})
+    X_train, X_val, y_train, y_val = X[:100], X[100:], y[:100], y[100:]
+    
+    trainer = ChemicalConsumptionTrainer()
+    seen = {}
+    
+    def fake_search(model_names, X_tr, y_tr, X_search, y_search):
+        seen["search"] = set(X_search.index)
+        return {}
+    
+    def spy_train(model, model_name, X_tr, y_tr, X_eval, y_eval):
+        seen.setdefault("eval", set()).update(X_eval.index)
+        return {"rmse": 0.0}
+    
+    monkeypatch.setattr(trainer, "search_hyperparameters", fake_search)
+    monkeypatch.setattr(trainer, "train_model", spy_train)
+    trainer.train_all_models(X_train, y_train, X_val, y_val, perform_cv=False, search=True)
+    
+    assert seen["search"] and seen["eval"]
+    assert not seen["search"] & seen["eval"]
+    assert seen["search"] | seen["eval"] == set(X_val.index)
+
+
+def test_successive_halving_stops_running_fits_at_deadline(monkeypatch):
+    """Las corridas en curso se detienen al agotarse el presupuesto de tiempo."""
+    import time
+    import numpy as np
+    from ml.models import hyperparameter_search
+    from ml.models.hyperparameter_search import (
+        SuccessiveHalvingSearch, SearchDeadlineExceeded, fit_with_early_stopping
+    )
+    
+    overrides = {
+        "models.search.n_candidates": 2,
+        "models.search.min_estimators": 100000,
+        "models.search.max_estimators": 100000,
+        "models.search.early_stopping_rounds": 100000,
+        "models.search.max_workers": 2,
+    }
+    config = hyperparameter_search.config
+    real_get = config.get
+    monkeypatch.setattr(config, "get", lambda key, default=None: overrides.get(key, real_get(key, default)))
+    
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(300, 3)), columns=["a", "b", "c"])
+    y = pd.DataFrame({"t1": X["a"] * 2 + rng.normal(0, 0.1, 300), "t2": np.sin(X["b"])})
+    
+    for name in ("xgboost", "lightgbm"):
+        with pytest.raises(SearchDeadlineExceeded):
+            fit_with_early_stopping(name, {}, 100000, X[:200], y[:200], X[200:], y[200:], 100000,
+                                    deadline=time.monotonic() + 0.2)
+        
+        start = time.monotonic()
+        assert SuccessiveHalvingSearch(time_budget_seconds=0.5).run(
+            [name], X[:200], y[:200], X[200:], y[200:]
+        ) == {}
+        assert time.monotonic() - start < 5
+
+
+def test_auto_retrain_plans_incremental_until_full_refit(tmp_path):
+    """Incremental en modelos de boosting; completo por pasos acumulados, antigüedad o deriva."""
+    from ml.models.auto_retrain import AutoRetrainer
+    from ml.models.evaluator import ModelEvaluator
+    
+    retrainer = AutoRetrainer(models_dir=tmp_path)
+    retrainer.incremental_enabled = True
+    retrainer.full_refit_every = 2
+    retrainer.full_refit_age = timedelta(days=30)
+    recent = (datetime.now() - timedelta(days=1)).isoformat()
+    
+    def register(name, model_name, lineage):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "model.pkl").write_bytes(b"modelo")
+        retrainer.registry.register(tmp_path / name, {
+            "model_name": model_name, "training_date": recent, "lineage": lineage
+        })
+    
+    register("model_rf", "random_forest", None)
+    assert retrainer.plan_lineage("model_rf", [])["mode"] == "full"
+    
+    register("model_xgb", "xgboost", {
+        "mode": "full", "incremental_steps": 0, "last_full_refit": recent,
+        "training_seconds": 10.0, "test_metrics": {"rmse": 2.0},
+    })
+    plan = retrainer.plan_lineage("model_xgb", [])
+    assert plan["mode"] == "incremental"
+    assert plan["incremental_steps"] == 1 and plan["last_full_refit"] == recent
+    assert retrainer.plan_lineage("model_xgb", ["lecturas"])["mode"] == "full"
+    
+    register("model_xgb_inc", "xgboost", {
+        "mode": "incremental", "incremental_steps": 2, "last_full_refit": recent,
+        "training_seconds": 1.0, "test_metrics": {"rmse": 2.2},
+    })
+    assert retrainer.plan_lineage("model_xgb_inc", [])["mode"] == "full"
+    
+    report = ModelEvaluator.compare_retraining_modes(retrainer.registry.list_models())
+    assert report.set_index("Model").loc["incremental", "training_seconds"] == 1.0
+    assert report.set_index("Model").loc["full", "rmse"] == 2.0
+
+
 def test_predict_invalid_turbedad():
     """Test predicción con turbidez inválida."""
     
@@ -334,6 +1062,7 @@ def test_anomalies_response_time():
 @pytest.fixture
 def mock_empty_database():
     """Mock de base de datos vacía."""
+    result_cache.clear()
     with patch('routers.ml.PlantDataRepository') as mock:
         mock_instance = MagicMock()
         mock_instance.get_operational_data.return_value = pd.DataFrame()
@@ -344,6 +1073,7 @@ def mock_empty_database():
 @pytest.fixture
 def mock_database_with_data():
     """Mock de base de datos con datos."""
+    result_cache.clear()
     with patch('routers.ml.PlantDataRepository') as mock:
         mock_instance = MagicMock()
         # Crear DataFrame de ejemplo
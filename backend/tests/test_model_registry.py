@@ -0,0 +1,93 @@
+"""
+Tests del registro indexado de modelos.
+
+Ejecutar con:
+    pytest tests/test_model_registry.py -v
+"""
+
+import json
+from unittest.mock import patch
+
+import joblib
+
+from ml.models.model_manager import ModelManager
+from ml.models.model_registry import ModelRegistry
+
+
+def _fake_model(models_dir, name, training_date):
+    """Crea un directorio de modelo mínimo con metadata."""
+    model_dir = models_dir / name
+    model_dir.mkdir(parents=True)
+    joblib.dump({"fake": name}, model_dir / "model.pkl")
+    metadata = {
+        "model_name": "random_forest",
+        "training_date": training_date,
+        "metrics": {"mae": 1.0},
+        "feature_names": ["a", "b"],
+    }
+    joblib.dump(metadata, model_dir / "metadata.pkl")
+    return model_dir, metadata
+
+
+def test_manifest_is_built_once_and_lookups_skip_unpickling(tmp_path):
+    """El manifiesto se reconstruye una vez; después no se deserializa metadata."""
+    _fake_model(tmp_path, "model_a", "2026-01-01T00:00:00")
+    _fake_model(tmp_path, "model_b", "2026-02-01T00:00:00")
+
+    manager = ModelManager(models_dir=tmp_path)
+    assert manager.get_latest_model_path() == tmp_path / "model_b"
+
+    manifest = json.loads((tmp_path / "registry.json").read_text(encoding="utf-8"))
+    assert manifest["production"] == "model_b"
+    assert manifest["models"]["model_a"]["total_size"] > 0
+
+    with patch("ml.models.model_registry.joblib.load", side_effect=AssertionError("unpickled")):
+        fresh = ModelManager(models_dir=tmp_path)
+        assert fresh.get_latest_model_path() == tmp_path / "model_b"
+        assert [m["name"] for m in fresh.list_available_models()] == ["model_b", "model_a"]
+
+
+def test_register_promotes_and_cleanup_keeps_production(tmp_path):
+    """Registrar promueve el modelo; la limpieza nunca borra el de producción."""
+    registry = ModelRegistry(tmp_path)
+    for i, name in enumerate(["model_1", "model_2", "model_3"]):
+        model_dir, metadata = _fake_model(tmp_path, name, f"2026-0{i + 1}-01T00:00:00")
+        registry.register(model_dir, metadata)
+
+    assert registry.get_production_name() == "model_3"
+
+    manager = ModelManager(models_dir=tmp_path)
+    manager.set_production_model("model_1")
+
+    deleted = manager.cleanup_old_models(keep_last_n=1)
+
+    assert deleted == 1
+    assert not (tmp_path / "model_2").exists()
+    assert sorted(m["name"] for m in manager.list_available_models()) == ["model_1", "model_3"]
+    assert manager.get_latest_model_path() == tmp_path / "model_1"
+
+
+def _register_all(models_dir, names):
+    registry = ModelRegistry(models_dir)
+    for name in names:
+        registry.register(models_dir / name, {"model_name": "random_forest"}, promote=False)
+
+
+def test_concurrent_processes_do_not_lose_registrations(tmp_path):
+    """Varios procesos registrando a la vez no pierden entradas del manifiesto."""
+    import multiprocessing
+
+    batches = [[f"model_{p}_{i}" for i in range(15)] for p in range(4)]
+    for name in sum(batches, []):
+        _fake_model(tmp_path, name, "2026-01-01T00:00:00")
+    (tmp_path / "registry.json").write_text(json.dumps({"version": 1, "production": None, "models": {}}))
+
+    ctx = multiprocessing.get_context("fork")
+    processes = [ctx.Process(target=_register_all, args=(tmp_path, names)) for names in batches]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    assert len(ModelRegistry(tmp_path).list_models()) == 60
@@ -0,0 +1,98 @@
+"""
+Tests de la instrumentación de pools y del controlador adaptativo.
+
+Ejecutar con:
+    pytest tests/test_pool_metrics.py -v
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from main import app
+from core.pool_metrics import PoolController, PoolMetrics
+from core.dependencies import require_admin
+
+
+@pytest.fixture
+def small_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_wait_timeouts_and_hold_time(small_engine):
+    """Se registran checkouts, timeouts del pool y el tiempo retenido."""
+    metrics = PoolMetrics(small_engine, "test")
+
+    with small_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            small_engine.connect()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 1
+    assert snapshot["timeouts"] == 1
+    assert snapshot["checkout_wait_ms"]["samples"] == 2
+    assert snapshot["checkout_wait_ms"]["max"] >= 100  # esperó pool_timeout
+    assert snapshot["routes"]["sin_request"]["checkouts"] == 1
+    assert snapshot["state"]["max_overflow"] == 0
+
+
+def test_controller_adjusts_overflow_within_bounds(small_engine):
+    """El controlador sube el overflow con esperas altas y lo baja con esperas bajas."""
+    metrics = PoolMetrics(small_engine, "test")
+    controller = PoolController(metrics, min_overflow=0, max_overflow=8, target_wait_ms=50, step=5)
+
+    def record(wait_ms):
+        for _ in range(20):
+            metrics.record_wait(wait_ms)
+
+    record(200.0)
+    assert controller.evaluate() == 5
+    record(200.0)
+    assert controller.evaluate() == 8  # tope superior
+
+    record(1.0)
+    assert controller.evaluate() == 3
+    assert controller.evaluate() is None  # sin muestras nuevas no decide
+    assert [a["to"] for a in controller.status()["adjustments"]] == [5, 8, 3]
+
+    # La ventana del controlador no vacía los percentiles del diagnóstico
+    assert metrics.snapshot()["checkout_wait_ms"]["samples"] == 60
+
+
+def test_wait_average_counts_every_checkout(small_engine, monkeypatch):
+    """El promedio usa todas las esperas, no solo las muestras retenidas."""
+    monkeypatch.setattr("core.pool_metrics.POOL_METRICS_SAMPLES", 10)
+    metrics = PoolMetrics(small_engine, "test")
+
+    for _ in range(30):
+        metrics.record_wait(2.0)
+
+    waits = metrics.snapshot()["checkout_wait_ms"]
+    assert waits["samples"] == 10
+    assert waits["count"] == 30
+    assert waits["avg"] == 2.0
+
+
+def test_pool_endpoint_reports_routes():
+    """El endpoint expone los pools y el tiempo retenido por ruta."""
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        client = TestClient(app)
+        client.post("/api/diagnostico/pool/reset")
+        # /health/ready consulta la base en el pool principal sin depender
+        # de datos: responde 200 o 503 según el esquema de la base local
+        assert client.get("/health/ready").status_code in (200, 503)
+
+        data = client.get("/api/diagnostico/pool").json()
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+    assert {"primary", "async"} <= set(data)
+    assert data["primary"]["routes"]["GET /health/ready"]["checkouts"] >= 1
+    assert data["primary"]["controller"]["supported"] is True
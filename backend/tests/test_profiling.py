@@ -0,0 +1,115 @@
+"""
+Tests del perfilado bajo demanda (header X-Profile).
+
+Ejecutar con:
+    pytest tests/test_profiling.py -v
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import core.profiling as profiling
+from core.profiling import ProfileStore, ProfilingMiddleware
+from main import app
+from core.dependencies import require_admin
+
+
+def admin_check(result):
+    async def check(token):
+        return result
+    return check
+
+
+def busy_route():
+    end = time.perf_counter() + 0.15
+    while time.perf_counter() < end:
+        sum(range(1000))
+    return {"status": "ok"}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ProfileStore(str(tmp_path), max_files=2)
+    monkeypatch.setattr(profiling, "profile_store", store)
+    return store
+
+
+@pytest.fixture
+def mini_client():
+    mini = FastAPI()
+    mini.get("/busy")(busy_route)  # ruta sync: corre en el threadpool
+    mini.add_middleware(ProfilingMiddleware)
+    return TestClient(mini)
+
+
+def test_admin_request_is_profiled_into_ring_buffer(store, mini_client, monkeypatch):
+    """Con X-Profile y un administrador se guardan pilas del threadpool; se conservan las últimas N."""
+    monkeypatch.setattr(profiling, "_is_admin", admin_check(True))
+    headers = {"X-Profile": "1", "Authorization": "Bearer token"}
+
+    ids = [mini_client.get("/busy", headers=headers).headers["X-Profile-ID"] for _ in range(3)]
+
+    profiles = store.list()
+    assert [p["id"] for p in profiles] == ids[:0:-1]
+    assert profiles[0]["route"] == "/busy"
+    assert profiles[0]["samples"] > 0
+
+    collapsed = store.path(profiles[0]["id"]).read_text()
+    assert "busy_route (test_profiling.py" in collapsed
+    _, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) >= 1
+
+
+def test_non_admin_or_missing_header_is_not_profiled(store, mini_client, monkeypatch):
+    """Sin el header no se verifica nada; un usuario no administrador no perfila."""
+    async def fail(token):
+        raise AssertionError("no debe verificarse el usuario")
+
+    monkeypatch.setattr(profiling, "_is_admin", fail)
+    assert "X-Profile-ID" not in mini_client.get("/busy").headers
+
+    monkeypatch.setattr(profiling, "_is_admin", admin_check(False))
+    response = mini_client.get("/busy", headers={"X-Profile": "1", "Authorization": "Bearer token"})
+    assert response.status_code == 200
+    assert "X-Profile-ID" not in response.headers
+    assert store.list() == []
+
+
+def test_profile_endpoints_list_and_download(store, mini_client, monkeypatch):
+    """El diagnóstico lista y descarga perfiles; IDs inválidos dan 404."""
+    monkeypatch.setattr(profiling, "_is_admin", admin_check(True))
+    profile_id = mini_client.get(
+        "/busy", headers={"X-Profile": "1", "Authorization": "Bearer token"}
+    ).headers["X-Profile-ID"]
+
+    app.dependency_overrides[require_admin] = lambda: None
+    try:
+        client = TestClient(app)
+        listed = client.get("/api/diagnostico/profiles").json()
+        download = client.get(f"/api/diagnostico/profiles/{profile_id}")
+        traversal = client.get("/api/diagnostico/profiles/..%2F..%2Fmain.py")
+    finally:
+        app.dependency_overrides.pop(require_admin, None)
+
+    assert listed[0]["id"] == profile_id
+    assert download.status_code == 200
+    assert "busy_route" in download.text
+    assert traversal.status_code == 404
+
+
+def test_admin_check_is_shared_and_requires_active_user():
+    """Logs, diagnóstico y perfilado usan la misma verificación (usuario activo)."""
+    from types import SimpleNamespace
+
+    from core.dependencies import is_admin
+    from routers import diagnostico, logs
+
+    admin_role = SimpleNamespace(categoria="ADMINISTRADOR")
+    assert is_admin(SimpleNamespace(activo=True, rol_obj=admin_role))
+    assert not is_admin(SimpleNamespace(activo=False, rol_obj=admin_role))
+    assert not is_admin(SimpleNamespace(activo=True, rol_obj=None))
+
+    assert diagnostico.require_admin is logs.require_admin is require_admin
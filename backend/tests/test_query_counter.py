@@ -0,0 +1,98 @@
+"""
+Tests del contador de consultas por request y del detector de N+1.
+
+Ejecutar con:
+    pytest tests/test_query_counter.py -v
+"""
+
+from datetime import date
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import core.logging_middleware as logging_middleware
+from main import app
+from core.database import get_read_db
+from core.logging_middleware import LoggingMiddleware
+from core.query_counter import QueryBudgetExceeded, QueryStats, instrument_queries, query_budget, query_stats
+from core.schema import upgrade_schema
+from models import ControlConsumoDiario, Quimico, Rol, Usuario
+
+
+@pytest.fixture
+def consumo_db(tmp_path):
+    """Base temporal con seis consumos diarios de químicos distintos."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'consultas.db'}")
+    upgrade_schema(engine)
+    instrument_queries(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        rol = Rol(codigo="OPERADOR", nombre="Operador", nivel_jerarquia=4, categoria="OPERADOR")
+        db.add(rol)
+        db.flush()
+        usuario = Usuario(nombre="Ana", apellido="Pérez", username="ana", hashed_password="x", rol_id=rol.id)
+        db.add(usuario)
+        db.flush()
+        for i in range(6):
+            quimico = Quimico(codigo=f"Q{i}", nombre=f"Químico {i}", tipo="CAL", unidad_medida="KG")
+            db.add(quimico)
+            db.flush()
+            db.add(ControlConsumoDiario(fecha=date(2026, 3, 1), quimico=quimico, usuario_id=usuario.id))
+        db.commit()
+
+    yield Session
+    engine.dispose()
+
+
+def test_lazy_loads_flagged_as_n_plus_one(consumo_db):
+    """Recorrer una relación lazy fila por fila se detecta como N+1."""
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        with consumo_db() as db:
+            for registro in db.query(ControlConsumoDiario).all():
+                registro.quimico.nombre
+    finally:
+        query_stats.reset(token)
+
+    assert stats.count == 7
+    (statement, times), = stats.repeated()
+    assert times == 6 and "FROM quimicos" in statement
+
+
+def test_export_headers_and_no_n_plus_one(consumo_db):
+    """La exportación de consumo diario carga químicos y operador en una consulta."""
+    def override():
+        with consumo_db() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = override
+    try:
+        response = TestClient(app).get("/api/consumo-diario/exportar-excel/fecha/2026-03-01")
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+
+    assert response.status_code == 200
+    assert response.headers["X-DB-Queries"] == "1"
+    assert response.headers["X-DB-Time"].endswith("ms")
+
+
+def test_query_budget_enforced(consumo_db, monkeypatch):
+    """Una ruta que excede su presupuesto falla en modo test."""
+    monkeypatch.setattr(logging_middleware, "QUERY_BUDGET_ENFORCE", True)
+    mini = FastAPI()
+    mini.add_middleware(LoggingMiddleware)
+
+    @mini.get("/dos-consultas", dependencies=[Depends(query_budget(1))])
+    def dos_consultas():
+        with consumo_db() as db:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+        return {}
+
+    with pytest.raises(QueryBudgetExceeded):
+        TestClient(mini).get("/dos-consultas")
@@ -0,0 +1,64 @@
+"""
+Tests del ruteo de sesiones de lectura (réplica / primario).
+
+Ejecutar con:
+    pytest tests/test_read_replica.py -v
+"""
+
+import pytest
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import core.database as database
+from core.database import ReadOnlySession, get_db, get_read_db
+from main import app
+from models import Quimico
+
+
+def _read_session():
+    generator = get_read_db()
+    return generator, next(generator)
+
+
+def test_reads_use_primary_without_replica(monkeypatch):
+    """Sin DATABASE_READ_URL la sesión de lectura usa el engine primario."""
+    monkeypatch.setattr(database, "has_read_replica", False)
+
+    generator, db = _read_session()
+    assert db.get_bind() is database.engine
+    generator.close()
+
+
+def test_unreachable_replica_falls_back_to_primary(monkeypatch, tmp_path):
+    """Si la réplica no conecta se usa el primario y se omite durante el cooldown."""
+    broken = create_engine(f"sqlite:///{tmp_path / 'no-existe' / 'replica.db'}")
+    monkeypatch.setattr(database, "has_read_replica", True)
+    monkeypatch.setattr(database, "_replica_down_until", 0.0)
+    monkeypatch.setattr(
+        database, "ReadSessionLocal", sessionmaker(bind=broken, class_=ReadOnlySession)
+    )
+
+    generator, db = _read_session()
+    assert db.get_bind() is database.engine
+    generator.close()
+    assert database._replica_down_until > 0
+
+
+def test_read_session_rejects_writes():
+    """La sesión de lectura no permite hacer flush de cambios."""
+    generator, db = _read_session()
+    db.add(Quimico(codigo="X", nombre="X", unidad_medida="kg"))
+
+    with pytest.raises(RuntimeError):
+        db.flush()
+    generator.close()
+
+
+@pytest.mark.parametrize("path", ["/api/ml/anomalies", "/api/ml/stats"])
+def test_cached_ml_endpoints_read_from_primary(path):
+    """Las respuestas en caché se calculan con el primario, que es donde se invalidan."""
+    route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == path)
+    calls = {dep.call for dep in route.dependant.dependencies}
+    assert get_db in calls
+    assert get_read_db not in calls
@@ -0,0 +1,84 @@
+"""
+Tests de la caché de resultados con invalidación por escrituras.
+
+Ejecutar con:
+    pytest tests/test_result_cache.py -v
+"""
+
+import asyncio
+import threading
+import time
+
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from core.result_cache import ResultCache, register_cache_invalidation
+
+Base = declarative_base()
+
+
+class Lectura(Base):
+    __tablename__ = "control_operacion"
+
+    id = Column(Integer, primary_key=True)
+    valor = Column(String(10))
+
+
+def test_concurrent_identical_requests_compute_once():
+    """Peticiones concurrentes con la misma clave comparten un solo cálculo."""
+    cache = ResultCache()
+    calls = []
+    lock = threading.Lock()
+
+    def compute():
+        with lock:
+            calls.append(1)
+        time.sleep(0.05)
+        return {"total": 42}
+
+    async def scenario():
+        return await asyncio.gather(*[
+            cache.get_or_compute(("stats",), ("control_operacion",), compute)
+            for _ in range(5)
+        ])
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(r == {"total": 42} for r in results)
+    assert cache.stats()["shared_inflight"] == 4
+
+
+def test_commit_on_tracked_table_invalidates_entry():
+    """Confirmar cambios (incluido un DELETE masivo) invalida solo las entradas dependientes."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    cache = ResultCache()
+    register_cache_invalidation(Session, cache)
+    counter = {"n": 0}
+
+    def compute():
+        counter["n"] += 1
+        return counter["n"]
+
+    def get(key, tables):
+        return asyncio.run(cache.get_or_compute(key, tables, compute))
+
+    assert get("anomalies", ("control_operacion",)) == 1
+    assert get("other", ("quimicos",)) == 2
+    assert get("anomalies", ("control_operacion",)) == 1
+
+    session = Session()
+    session.add(Lectura(valor="a"))
+    session.commit()
+
+    assert get("anomalies", ("control_operacion",)) == 3
+    assert get("other", ("quimicos",)) == 2
+
+    session.query(Lectura).delete()
+    session.commit()
+    session.close()
+
+    assert get("anomalies", ("control_operacion",)) == 4
@@ -0,0 +1,68 @@
+"""
+Tests de la verificación de revisión de esquema y las migraciones.
+
+Ejecutar con:
+    pytest tests/test_schema.py -v
+"""
+
+from sqlalchemy import create_engine, event, inspect
+
+from models import Base
+from core.schema import (
+    SCHEMA_REVISION,
+    SCHEMA_OK,
+    SCHEMA_OUTDATED,
+    SCHEMA_UNVERSIONED,
+    check_schema,
+    head_revision,
+    stamp_schema,
+    upgrade_schema,
+)
+
+
+def test_expected_revision_matches_migration_head():
+    """SCHEMA_REVISION debe apuntar al head de migrations/versions."""
+    assert SCHEMA_REVISION == head_revision()
+
+
+def test_upgrade_creates_models_and_check_uses_one_query(tmp_path):
+    """Las migraciones crean todas las tablas y la verificación es una consulta."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    assert check_schema(engine)["result"] == SCHEMA_UNVERSIONED
+
+    upgrade_schema(engine)
+    tables = set(inspect(engine).get_table_names())
+    assert set(Base.metadata.tables) <= tables
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    status = check_schema(engine)
+    assert status == {"result": SCHEMA_OK, "current": SCHEMA_REVISION, "expected": SCHEMA_REVISION}
+    assert len(statements) == 1
+
+
+def test_stamp_marks_existing_database_without_ddl(tmp_path):
+    """Una base creada con create_all se marca al día sin recrear tablas."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    stamp_schema(engine)
+    assert check_schema(engine)["result"] == SCHEMA_OK
+
+
+def test_pre_alembic_database_is_stamped_at_0001_and_upgraded(tmp_path):
+    """Una base anterior a Alembic se marca en 0001 y `upgrade` agrega las tablas nuevas."""
+    for name in ("baseline.db", "sql_script.db"):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        tables = [
+            table for table in Base.metadata.sorted_tables
+            if name == "sql_script.db" or table.name != "anomalias_operacion"
+        ]
+        Base.metadata.create_all(bind=engine, tables=tables)
+
+        stamp_schema(engine, "0001")
+        assert check_schema(engine)["result"] == SCHEMA_OUTDATED
+
+        upgrade_schema(engine)
+        assert "anomalias_operacion" in inspect(engine).get_table_names()
+        assert check_schema(engine)["result"] == SCHEMA_OK
@@ -0,0 +1,39 @@
+"""
+Tests del perfil de rendimiento de SQLite.
+
+Ejecutar con:
+    pytest tests/test_sqlite_tuning.py -v
+"""
+
+from sqlalchemy import create_engine, text
+
+from core.sqlite_tuning import SQLiteMaintenance, apply_sqlite_profile, sqlite_status
+
+
+def test_profile_applied_on_every_connection(tmp_path):
+    """Cada conexión nueva queda en WAL con synchronous=NORMAL y busy_timeout."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'perfil.db'}")
+    apply_sqlite_profile(engine, {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 1234})
+
+    status = sqlite_status(engine)
+    assert status["journal_mode"] == "wal"
+    assert status["synchronous"] == 1
+    assert status["busy_timeout"] == 1234
+    engine.dispose()
+
+
+def test_maintenance_checkpoints_wal(tmp_path):
+    """run_once optimiza y vacía el WAL al hacer checkpoint."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'mant.db'}")
+    apply_sqlite_profile(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1), (2), (3)"))
+
+    maintenance = SQLiteMaintenance(engine, interval=0)
+    result = maintenance.run_once("TRUNCATE")
+
+    assert result["busy"] == 0
+    assert result["log_pages"] == 0  # TRUNCATE deja el WAL en cero
+    assert maintenance.runs == 1
+    engine.dispose()
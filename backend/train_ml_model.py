@@ -166,7 +166,7 @@ def main():
         
         # 10. Guardar modelo
         print("\n💾 Paso 10: Guardando modelo...")
-        model_path = trainer.save_model(preprocessor)
+        model_path = trainer.save_model(preprocessor, X_train=X_train)
         print(f"   ✓ Modelo guardado en: {model_path}")
         
         # Resumen final
@@ -470,6 +470,29 @@ CREATE INDEX IF NOT EXISTS idx_logs_created_at ON logs_auditoria(created_at);
 
 COMMENT ON TABLE logs_auditoria IS 'Registro de auditoría: LOGIN, LOGOUT, CREATE, UPDATE, DELETE';
 
+-- ==================================================================
+-- TABLA 12: ANOMALIAS_OPERACION
+-- Anomalías detectadas en línea al registrar el control de operación
+-- ==================================================================
+CREATE TABLE IF NOT EXISTS anomalias_operacion (
+    id SERIAL PRIMARY KEY,
+    control_operacion_id INTEGER NOT NULL REFERENCES control_operacion(id) ON DELETE CASCADE,
+    fecha DATE NOT NULL,
+    hora TIME NOT NULL,
+    parametro VARCHAR(50) NOT NULL,
+    valor DOUBLE PRECISION NOT NULL,
+    severidad VARCHAR(20) NOT NULL,
+    score DOUBLE PRECISION NOT NULL,
+    metodo VARCHAR(20) NOT NULL,
+    explicacion TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_anomalias_operacion_fecha_hora ON anomalias_operacion(fecha, hora);
+CREATE INDEX IF NOT EXISTS ix_anomalias_operacion_control_operacion_id ON anomalias_operacion(control_operacion_id);
+
+COMMENT ON TABLE anomalias_operacion IS 'Anomalías por parámetro detectadas en línea (EWMA + umbrales)';
+
 -- ==================================================================
 -- USUARIOS POR DEFECTO
 -- Contraseñas se actualizan vía Python después de ejecutar este script